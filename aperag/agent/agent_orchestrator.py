@@ -11,7 +11,7 @@ from typing import Any, Dict, List, Optional, Tuple
 from enum import Enum
 
 from aperag.agent import agent_registry
-from aperag.agent.core.models import AgentRole, AgentState, AgentMessage
+from aperag.agent.core.models import AgentExecutionContext, AgentRole, AgentState, AgentMessage
 
 logger = logging.getLogger(__name__)
 
@@ -74,13 +74,14 @@ class AgentOrchestrator:
         # 2. 智能体选择
         agent_assignments = self._assign_agents(subtasks, task_type)
         
-        # 3. 执行调度
+        # 3. 执行调度（请求级信息只放在执行上下文中，不修改注册中心的单例）
+        context = AgentExecutionContext(user_id=user_id, chat_id=chat_id)
         if mode == CollaborationMode.SEQUENTIAL:
-            results = await self._execute_sequential(agent_assignments, user_id, chat_id)
+            results = await self._execute_sequential(agent_assignments, context)
         elif mode == CollaborationMode.PARALLEL:
-            results = await self._execute_parallel(agent_assignments, user_id, chat_id)
+            results = await self._execute_parallel(agent_assignments, context)
         else:
-            results = await self._execute_hierarchical(agent_assignments, user_id, chat_id)
+            results = await self._execute_hierarchical(agent_assignments, context)
         
         # 4. 结果整合
         final_result = self._integrate_results(results, task, task_type)
@@ -220,8 +221,7 @@ class AgentOrchestrator:
     async def _execute_sequential(
         self,
         assignments: List[Tuple[Dict[str, Any], AgentRole]],
-        user_id: str,
-        chat_id: str
+        context: AgentExecutionContext
     ) -> List[Dict[str, Any]]:
         """
         顺序执行
@@ -229,24 +229,23 @@ class AgentOrchestrator:
         按顺序执行每个子任务，后续任务可以使用前面任务的结果
         """
         results = []
-        context = {}  # 共享上下文
+        shared_results = {}  # 共享上下文
         
         for subtask, agent_role in assignments:
             logger.info(f"Executing subtask: {subtask['name']}")
             
-            # 获取智能体
-            agent = self.registry.get_agent(agent_role)
-            agent.user_id = user_id
-            agent.chat_id = f"{chat_id}-{subtask['id']}"
+            # 获取绑定了子任务执行上下文的智能体副本
+            subtask_context = context.for_subtask(subtask["id"])
+            agent = self.registry.get_agent(agent_role).with_context(subtask_context)
             
             # 创建状态
-            state = AgentState(session_id=f"{chat_id}-{subtask['id']}")
+            state = AgentState(session_id=subtask_context.chat_id)
             
             # 执行任务（传入上下文）
             try:
                 result = await agent.run(state, {
                     "task": subtask["description"],
-                    "context": context  # 传递前面任务的结果
+                    "context": shared_results  # 传递前面任务的结果
                 })
                 
                 # 保存结果
@@ -266,7 +265,7 @@ class AgentOrchestrator:
                 results.append(result_data)
                 
                 # 更新共享上下文
-                context[subtask["id"]] = result
+                shared_results[subtask["id"]] = result
                 
                 logger.info(f"Completed subtask: {subtask['name']}")
                 
@@ -284,8 +283,7 @@ class AgentOrchestrator:
     async def _execute_parallel(
         self,
         assignments: List[Tuple[Dict[str, Any], AgentRole]],
-        user_id: str,
-        chat_id: str
+        context: AgentExecutionContext
     ) -> List[Dict[str, Any]]:
         """
         并行执行
@@ -295,7 +293,7 @@ class AgentOrchestrator:
         tasks = []
         
         for subtask, agent_role in assignments:
-            task = self._execute_single_task(subtask, agent_role, user_id, chat_id)
+            task = self._execute_single_task(subtask, agent_role, context)
             tasks.append(task)
         
         # 并行执行所有任务
@@ -319,15 +317,13 @@ class AgentOrchestrator:
         self,
         subtask: Dict[str, Any],
         agent_role: AgentRole,
-        user_id: str,
-        chat_id: str
+        context: AgentExecutionContext
     ) -> Dict[str, Any]:
         """执行单个任务"""
-        agent = self.registry.get_agent(agent_role)
-        agent.user_id = user_id
-        agent.chat_id = f"{chat_id}-{subtask['id']}"
+        subtask_context = context.for_subtask(subtask["id"])
+        agent = self.registry.get_agent(agent_role).with_context(subtask_context)
         
-        state = AgentState(session_id=f"{chat_id}-{subtask['id']}")
+        state = AgentState(session_id=subtask_context.chat_id)
         
         result = await agent.run(state, {
             "task": subtask["description"]
@@ -343,8 +339,7 @@ class AgentOrchestrator:
     async def _execute_hierarchical(
         self,
         assignments: List[Tuple[Dict[str, Any], AgentRole]],
-        user_id: str,
-        chat_id: str
+        context: AgentExecutionContext
     ) -> List[Dict[str, Any]]:
         """
         层次执行
@@ -359,7 +354,7 @@ class AgentOrchestrator:
         )
         
         # 顺序执行
-        return await self._execute_sequential(sorted_assignments, user_id, chat_id)
+        return await self._execute_sequential(sorted_assignments, context)
     
     def _integrate_results(
         self,
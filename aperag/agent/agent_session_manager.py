@@ -15,9 +15,11 @@
 """Simple agent session management - optimized for ease of maintenance and minimal bugs."""
 
 import asyncio
+import hashlib
 import logging
 import time
-from typing import Dict, Optional
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional, Tuple
 
 from mcp_agent.agents.agent import Agent
 from mcp_agent.workflows.llm.augmented_llm_openai import OpenAIAugmentedLLM
@@ -25,6 +27,8 @@ from mcp_agent.workflows.llm.augmented_llm_openai import OpenAIAugmentedLLM
 from aperag.agent.agent_config import AgentConfig
 from aperag.agent.exceptions import AgentConfigurationError
 from aperag.agent.mcp_app_factory import MCPAppFactory
+from aperag.config import settings
+from aperag.db.provider_cache import provider_config_cache
 
 logger = logging.getLogger(__name__)
 
@@ -41,6 +45,7 @@ class ChatSession:
     def __init__(self, config: AgentConfig):
         self.config = config
         self.last_used = time.time()
+        self.last_checked = self.last_used
 
         # MCP resources - created once per chat session
         self.mcp_app = None
@@ -71,7 +76,7 @@ class ChatSession:
 
             # Create reusable agent for this chat session
             self.agent = Agent(
-                name=f"aperag_agent_{self.config.user_id}_{self.config.chat_id}_{self.config.provider_name}",
+                name=self._agent_name(),
                 instruction=self.config.instruction,
                 server_names=self.config.server_names,
             )
@@ -80,9 +85,7 @@ class ChatSession:
 
             # Create and cache LLM instance for this chat session
             self.llm = await self.agent.attach_llm(OpenAIAugmentedLLM)
-            from mcp_agent.logging.logger import get_logger
-
-            self.llm.logger = get_logger(self.llm.name, session_id=self.llm.context.session_id)
+            self._bind_logger()
             self._ready = True
 
             logger.info(f"Chat session {self.config.get_session_key()} ready")
@@ -92,6 +95,14 @@ class ChatSession:
             await self._cleanup()
             raise AgentConfigurationError(f"Session init failed: {e}")
 
+    def _agent_name(self) -> str:
+        return f"aperag_agent_{self.config.user_id}_{self.config.chat_id}_{self.config.provider_name}"
+
+    def _bind_logger(self):
+        from mcp_agent.logging.logger import get_logger
+
+        self.llm.logger = get_logger(self.llm.name, session_id=self.config.chat_id)
+
     async def get_llm(self, model: str) -> OpenAIAugmentedLLM:
         """Get cached LLM instance for this chat session."""
         if not self._ready:
@@ -101,12 +112,63 @@ class ChatSession:
         # This preserves conversation state and memory for the chat session
         return self.llm
 
+    async def list_tool_names(self) -> List[str]:
+        """List the tools exposed by the MCP servers of this session."""
+        if not self.agent:
+            return []
+
+        tools_result = await self.agent.list_tools()
+        # Handle different return types: could be object with .tools attribute or direct list
+        if hasattr(tools_result, "tools"):
+            tools_list = tools_result.tools
+        elif isinstance(tools_result, (list, tuple)):
+            tools_list = tools_result
+        else:
+            tools_list = []
+        return [t.name if hasattr(t, "name") else str(t) for t in tools_list]
+
+    async def check_health(self, timeout: float) -> bool:
+        """
+        Probe the MCP connection with a tools/list round trip.
+
+        The result refreshes the cached tool manifest, so a healthy probe is never wasted.
+        """
+        if not self._ready:
+            return False
+        try:
+            tool_names = await asyncio.wait_for(self.list_tool_names(), timeout=timeout)
+        except Exception as e:
+            logger.warning(f"Health check failed for session {self.config.get_session_key()}: {e}")
+            return False
+
+        _store_tool_manifest(self.config, tool_names)
+        self.last_checked = time.time()
+        return True
+
+    def bind(self, config: AgentConfig):
+        """Bind a warm session to the chat it is handed out to, renaming its agent and LLM after the chat."""
+        self.config = config
+        if self.mcp_running_app:
+            self.mcp_running_app.context.session_id = config.chat_id
+        if self.agent:
+            self.agent.name = self._agent_name()
+        if self.llm:
+            self.llm.name = self.agent.name
+            self._bind_logger()
+
     def touch(self):
         """Update last used time."""
         self.last_used = time.time()
 
-    def is_expired(self, timeout: int = 1800) -> bool:  # 30 min default
+    def needs_health_check(self) -> bool:
+        """Check if the session was idle long enough that its connection may be stale."""
+        interval = settings.agent_session_health_check_interval
+        return interval > 0 and time.time() - max(self.last_used, self.last_checked) > interval
+
+    def is_expired(self, timeout: Optional[int] = None) -> bool:
         """Check if session expired."""
+        if timeout is None:
+            timeout = settings.agent_session_idle_timeout
         return time.time() - self.last_used > timeout
 
     async def _cleanup(self):
@@ -134,20 +196,167 @@ class ChatSession:
         self._ready = False
 
 
+@dataclass(frozen=True)
+class AgentCredentials:
+    """Everything resolved from the database to start a session for a user and provider."""
+
+    api_key: str
+    base_url: str
+    aperag_api_key: str
+
+
 # Simple global state - no complex singleton patterns
 _chat_sessions: Dict[str, ChatSession] = {}
 _cleanup_task: Optional[asyncio.Task] = None
 
+# Initialized sessions not bound to any chat yet, keyed by generate_pool_key()
+_warm_sessions: Dict[Tuple, ChatSession] = {}
+_warming_keys: set = set()
+
+# Warm-up tasks in flight, referenced so they are not garbage collected before they finish
+_warm_up_tasks: set = set()
+
+# (user_id, mcp_url) -> tool names, kept across sessions and replaced when a listing differs
+_tool_manifests: Dict[Tuple[str, str], List[str]] = {}
+
 
 def generate_session_key(user_id: str, chat_id: str, provider_name: str) -> str:
     """Generate session key based on user, chat, and provider."""
     return f"{user_id}:{chat_id}:{provider_name}"
 
 
+def generate_pool_key(config: AgentConfig) -> Tuple:
+    """
+    Key of interchangeable warm sessions.
+
+    A warm session holds MCP connections for one user and endpoint, plus an agent built
+    from the provider settings and instruction, so all of these have to match.
+    """
+    instruction_hash = hashlib.sha256((config.instruction or "").encode("utf-8")).hexdigest()
+    return (
+        config.user_id,
+        config.aperag_mcp_url,
+        config.aperag_api_key,
+        config.provider_name,
+        config.base_url,
+        config.api_key,
+        config.default_model,
+        tuple(config.server_names or []),
+        instruction_hash,
+    )
+
+
+async def resolve_credentials(db_ops, user_id: str, provider_name: str) -> AgentCredentials:
+    """
+    Resolve provider and aperag API keys for a user.
+
+    Provider settings come from provider_config_cache, which is invalidated on every provider write.
+    Creates the user's system aperag API key if it does not exist yet.
+    """
+    provider_info = await provider_config_cache.aget_provider(provider_name)
+    if not provider_info:
+        raise AgentConfigurationError("model_service_provider", f"Provider '{provider_name}' not found in database")
+
+    api_key = await provider_config_cache.aget_api_key(provider_name, user_id, need_public=True)
+    if not api_key:
+        raise AgentConfigurationError("api_key", f"No API key available for provider '{provider_name}'")
+
+    aperag_api_key = None
+    for item in await db_ops.query_api_keys(user_id, is_system=True):
+        aperag_api_key = item.key
+        break
+
+    if not aperag_api_key:
+        logger.info(f"No aperag API key found for user {user_id}, creating a new system key")
+        try:
+            api_key_result = await db_ops.create_api_key(user=user_id, description="aperag", is_system=True)
+        except Exception as e:
+            raise AgentConfigurationError("aperag_api_key", f"Failed to create aperag API key for user {user_id}: {e}")
+        aperag_api_key = api_key_result.key
+
+    return AgentCredentials(api_key=api_key, base_url=provider_info.base_url, aperag_api_key=aperag_api_key)
+
+
+def _store_tool_manifest(config: AgentConfig, tool_names: List[str]):
+    key = (config.user_id, config.aperag_mcp_url)
+    previous = _tool_manifests.get(key)
+    if previous is not None and previous != tool_names:
+        logger.info(f"Tool manifest changed for {key}: {previous} -> {tool_names}")
+    _tool_manifests[key] = tool_names
+
+
+async def get_tool_manifest(session: ChatSession) -> List[str]:
+    """Get the tool names of a session's MCP endpoint, listing them only when not cached."""
+    key = (session.config.user_id, session.config.aperag_mcp_url)
+    tool_names = _tool_manifests.get(key)
+    if tool_names is None:
+        tool_names = await session.list_tool_names()
+        _store_tool_manifest(session.config, tool_names)
+    return tool_names
+
+
+def invalidate_tool_manifest(user_id: Optional[str] = None, mcp_url: Optional[str] = None):
+    """Drop cached tool manifests, e.g. after the tools of an MCP server changed."""
+    for key in list(_tool_manifests):
+        if (user_id is None or key[0] == user_id) and (mcp_url is None or key[1] == mcp_url):
+            _tool_manifests.pop(key, None)
+
+
+async def _create_session(config: AgentConfig) -> ChatSession:
+    session = ChatSession(config)
+    await session.initialize()
+    return session
+
+
+async def _warm_up(config: AgentConfig):
+    """Initialize a spare session so the next new chat with this pool key starts instantly."""
+    pool_key = generate_pool_key(config)
+    try:
+        session = await _create_session(config)
+    except Exception as e:
+        logger.warning(f"Failed to warm up agent session for user {config.user_id}: {e}")
+        return
+    finally:
+        _warming_keys.discard(pool_key)
+
+    old = _warm_sessions.pop(pool_key, None)
+    _warm_sessions[pool_key] = session
+    if old:
+        await old._cleanup()
+
+
+def _schedule_warm_up(config: AgentConfig):
+    if not settings.agent_session_warm_pool:
+        return
+    pool_key = generate_pool_key(config)
+    if pool_key in _warm_sessions or pool_key in _warming_keys:
+        return
+    _warming_keys.add(pool_key)
+    task = asyncio.create_task(_warm_up(replace(config, chat_id=f"warm-{config.user_id}")))
+    _warm_up_tasks.add(task)
+    task.add_done_callback(_warm_up_tasks.discard)
+
+
+async def _take_warm_session(config: AgentConfig) -> Optional[ChatSession]:
+    session = _warm_sessions.pop(generate_pool_key(config), None)
+    if session is None:
+        return None
+    # A warm session idle for less than the health check interval is used without a probe
+    if session.needs_health_check() and not await session.check_health(settings.agent_session_health_check_timeout):
+        await session._cleanup()
+        return None
+    session.bind(config)
+    return session
+
+
 async def get_or_create_session(config: AgentConfig) -> ChatSession:
     """
     Get or create chat session using AgentConfig. Super simple - no complex locking.
 
+    Sessions idle for longer than AGENT_SESSION_HEALTH_CHECK_INTERVAL are probed before reuse and
+    reconnected if the probe fails. A new chat takes a warm session of the same user and MCP endpoint
+    when one is available, and a replacement is warmed up in the background.
+
     We accept some minor race conditions for simplicity. Worst case:
     we create an extra session that gets cleaned up later.
     """
@@ -156,29 +365,36 @@ async def get_or_create_session(config: AgentConfig) -> ChatSession:
     # Quick check if session exists and is ready
     session = _chat_sessions.get(session_key)
     if session and session._ready and not session.is_expired():
-        session.touch()
-        return session
+        if not session.needs_health_check() or await session.check_health(settings.agent_session_health_check_timeout):
+            session.touch()
+            return session
+        logger.info(f"Reconnecting unhealthy chat session: {session_key}")
 
     # Need new session - clean up old one if exists
     if session:
+        _chat_sessions.pop(session_key, None)
         try:
             await session._cleanup()
         except Exception as e:
             logger.warning(f"Error cleaning up old session: {e}")
 
-    # Create fresh session with config
-    session = ChatSession(config)
-    await session.initialize()
+    session = await _take_warm_session(config)
+    if session:
+        logger.info(f"Using warm chat session: {session_key}")
+    else:
+        # Create fresh session with config
+        session = await _create_session(config)
+        logger.info(f"Created new chat session: {session_key}")
 
     # Store in global dict
     _chat_sessions[session_key] = session
-    logger.info(f"Created new chat session: {session_key}")
+    _schedule_warm_up(config)
 
     return session
 
 
 async def cleanup_expired_sessions():
-    """Simple cleanup - remove expired chat sessions."""
+    """Simple cleanup - remove expired chat sessions and warm sessions."""
     expired_keys = []
 
     for key, session in _chat_sessions.items():
@@ -194,6 +410,14 @@ async def cleanup_expired_sessions():
             except Exception as e:
                 logger.error(f"Error cleaning chat session {key}: {e}")
 
+    for key in [key for key, session in _warm_sessions.items() if session.is_expired()]:
+        session = _warm_sessions.pop(key, None)
+        if session:
+            try:
+                await session._cleanup()
+            except Exception as e:
+                logger.error(f"Error cleaning warm session: {e}")
+
 
 async def _cleanup_loop():
     """Background cleanup task."""
@@ -229,8 +453,10 @@ async def shutdown_all():
         _cleanup_task = None
 
     # Clean up all chat sessions
-    sessions = list(_chat_sessions.values())
+    sessions = list(_chat_sessions.values()) + list(_warm_sessions.values())
     _chat_sessions.clear()
+    _warm_sessions.clear()
+    _tool_manifests.clear()
 
     for session in sessions:
         try:
@@ -247,4 +473,6 @@ def get_stats() -> Dict:
         "total_sessions": len(_chat_sessions),
         "active_sessions": sum(1 for s in _chat_sessions.values() if s._ready),
         "expired_sessions": sum(1 for s in _chat_sessions.values() if s.is_expired()),
+        "warm_sessions": len(_warm_sessions),
+        "cached_tool_manifests": len(_tool_manifests),
     }
@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
 import asyncio
+import copy
 from datetime import datetime
 import logging
 import os
@@ -8,6 +9,7 @@ from typing import Any, Dict, List, Optional
 from mcp_agent.workflows.llm.augmented_llm import RequestParams
 
 from aperag.agent.core.models import (
+    AgentExecutionContext,
     AgentMessage,
     AgentRole,
     AgentState,
@@ -16,6 +18,7 @@ from aperag.agent.core.models import (
 )
 from aperag.agent.agent_config import AgentConfig
 import aperag.agent.agent_session_manager as agent_session_manager
+from aperag.config import settings
 from aperag.db.ops import async_db_ops
 from aperag.service.prompt_template_service import build_agent_query_prompt, get_agent_system_prompt
 from aperag.trace import trace_async_function
@@ -36,6 +39,9 @@ class BaseAgent(ABC):
     - 模板渲染和使用
     """
 
+    # 知识库检索的延迟预算（秒），None 表示使用 AGENT_SEARCH_TIMEOUT
+    search_timeout: Optional[float] = None
+
     def __init__(
         self,
         role: AgentRole,
@@ -51,6 +57,7 @@ class BaseAgent(ABC):
         self.tools = tools or []
         self.user_id = user_id
         self.chat_id = chat_id
+        self.context = AgentExecutionContext(user_id=user_id, chat_id=chat_id)
 
         # MCP会话（延迟初始化）
         self._mcp_session = None
@@ -62,6 +69,27 @@ class BaseAgent(ABC):
         self._reference_docs = []
         self._extracted_template = None
 
+    def with_context(self, context: AgentExecutionContext) -> "BaseAgent":
+        """
+        返回绑定了执行上下文的智能体副本。
+
+        注册中心里的智能体是所有请求共享的单例，直接修改其 user_id/chat_id 会让
+        并发请求互相看到对方的上下文。副本共享无状态的依赖（如 llm_service），
+        但拥有独立的请求级状态（用户、会话、MCP会话、参考文档）。
+        """
+        agent = copy.copy(self)
+        agent.context = context
+        agent.user_id = context.user_id
+        agent.chat_id = context.chat_id
+
+        agent._mcp_session = None
+        agent._llm = None
+        agent._current_model_name = None
+        agent._current_model_provider = None
+        agent._reference_docs = []
+        agent._extracted_template = None
+        return agent
+
     async def run(self, state: AgentState, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         智能体执行的主入口。
@@ -219,47 +247,23 @@ class BaseAgent(ABC):
             if not system_prompt:
                 system_prompt = get_agent_system_prompt(language)
 
-            # 查询provider信息
-            provider_info = await async_db_ops.query_llm_provider_by_name(model_provider)
-            if not provider_info:
-                raise Exception(f"Provider '{model_provider}' not found")
-
-            # 查询API key
-            api_key = await async_db_ops.query_provider_api_key(
-                model_provider,
-                user_id=self.user_id,
-                need_public=True
+            # 查询provider和API key（按用户和provider缓存）
+            credentials = await agent_session_manager.resolve_credentials(
+                async_db_ops, self.user_id, model_provider
             )
-            if not api_key:
-                raise Exception(f"No API key for provider '{model_provider}'")
-
-            # 获取或创建aperag API key
-            aperag_api_keys = await async_db_ops.query_api_keys(self.user_id, is_system=True)
-            aperag_api_key = None
-            for item in aperag_api_keys:
-                aperag_api_key = item.key
-                break
-
-            if not aperag_api_key:
-                api_key_result = await async_db_ops.create_api_key(
-                    user=self.user_id,
-                    description="aperag",
-                    is_system=True
-                )
-                aperag_api_key = api_key_result.key
 
             # 创建AgentConfig
             config = AgentConfig(
                 user_id=self.user_id,
                 chat_id=self.chat_id or f"agent-{self.role.value}",
                 provider_name=model_provider,
-                api_key=api_key,
-                base_url=provider_info.base_url,
+                api_key=credentials.api_key,
+                base_url=credentials.base_url,
                 default_model=model_name,
                 language=language,
                 instruction=system_prompt,
                 server_names=["aperag"],
-                aperag_api_key=aperag_api_key,
+                aperag_api_key=credentials.aperag_api_key,
                 aperag_mcp_url=os.getenv(
                     "APERAG_MCP_URL", "http://localhost:8000/mcp/"),
                 temperature=0.7,
@@ -274,19 +278,9 @@ class BaseAgent(ABC):
             self._current_model_name = model_name
             self._current_model_provider = model_provider
 
-            # Debug: Log available tools
+            # Debug: Log available tools (manifest is cached per user and MCP endpoint)
             if self._mcp_session.agent:
-                tools_result = await self._mcp_session.agent.list_tools()
-                # Handle different return types: could be object with .tools attribute or direct list
-                if hasattr(tools_result, 'tools'):
-                    tools_list = tools_result.tools
-                elif isinstance(tools_result, (list, tuple)):
-                    tools_list = tools_result
-                else:
-                    tools_list = []
-
-                tool_names = [t.name if hasattr(
-                    t, 'name') else str(t) for t in tools_list]
+                tool_names = await agent_session_manager.get_tool_manifest(self._mcp_session)
                 logger.info(
                     f"Available tools for agent {self.name}: {tool_names}")
                 if tool_names:
@@ -320,7 +314,8 @@ class BaseAgent(ABC):
         top_k: int = 5,
         model_provider: Optional[str] = None,
         model_name: Optional[str] = None,
-        language: str = "zh-CN"
+        language: str = "zh-CN",
+        timeout: Optional[float] = None,
     ) -> List[Dict[str, Any]]:
         """
         从知识库检索文档（直接调用Service，绕过LLM工具调用）
@@ -333,6 +328,7 @@ class BaseAgent(ABC):
             model_provider: 模型提供商（未使用）
             model_name: 模型名称（未使用）
             language: 语言
+            timeout: 检索延迟预算（秒），默认使用智能体的 search_timeout
 
         Returns:
             检索结果列表（模拟工具调用格式）
@@ -359,50 +355,44 @@ class BaseAgent(ABC):
         )
 
         try:
-            from aperag.service.collection_service import collection_service
-            from aperag.schema import view_models
-            
+            from aperag.llm.embed.embedding_service import shared_query_embeddings
+
+            if timeout is None:
+                timeout = self.search_timeout or settings.agent_search_timeout
+
             all_documents = []
-            
-            # 遍历每个集合进行搜索
-            for col_id in collection_ids:
-                try:
-                    # 构建搜索请求
-                    # 启用所有搜索类型以获得最佳结果
-                    search_request = view_models.SearchRequest(
-                        query=query,
-                        rerank=True,
-                        vector_search=view_models.VectorSearchParams(topk=top_k, similarity=0.2),
-                        fulltext_search=view_models.FulltextSearchParams(topk=top_k),
-                        graph_search=view_models.GraphSearchParams(topk=top_k),
-                        summary_search=view_models.SummarySearchParams(topk=top_k, similarity=0.2),
+
+            if self.user_id:
+                # 并发检索所有集合（最多 AGENT_SEARCH_CONCURRENCY 个同时进行），共享查询向量；超出延迟预算的集合被放弃
+                semaphore = asyncio.Semaphore(max(1, settings.agent_search_concurrency))
+
+                async def search_collection(col_id: str) -> List[Dict[str, Any]]:
+                    async with semaphore:
+                        return await self._search_collection(col_id, query, top_k)
+
+                with shared_query_embeddings():
+                    tasks = {asyncio.create_task(search_collection(col_id)): col_id for col_id in collection_ids}
+                    done, pending = await asyncio.wait(tasks, timeout=timeout)
+                for task in pending:
+                    task.cancel()
+                if pending:
+                    skipped = [tasks[task] for task in pending]
+                    logger.warning(f"Search exceeded {timeout}s budget, skipped collections: {skipped}")
+                    self._log_thought(
+                        state,
+                        "observation",
+                        f"检索超时，已跳过知识库: {', '.join(skipped)}",
+                        detail={"timeout": timeout, "skipped_collections": skipped},
                     )
-                    
-                    # 调用服务层直接搜索
-                    if self.user_id:
-                        result = await collection_service.create_search(
-                            user=self.user_id,
-                            collection_id=col_id,
-                            data=search_request
-                        )
-                        
-                        if result.items:
-                            for item in result.items:
-                                doc = item.model_dump()
-                                # 确保 title 存在，方便后续展示
-                                if 'metadata' in doc and doc['metadata'] and 'title' in doc['metadata']:
-                                    doc['title'] = doc['metadata']['title']
-                                elif 'source' in doc:
-                                    doc['title'] = doc['source']
-                                else:
-                                    doc['title'] = 'Unknown Document'
-                                all_documents.append(doc)
-                except Exception as e:
-                    logger.warning(f"Search failed for collection {col_id}: {e}")
-                    continue
-
-            # 对合并后的结果进行排序（按 score 降序）
-            all_documents.sort(key=lambda x: x.get('score', 0) or 0, reverse=True)
+
+                for task in done:
+                    try:
+                        all_documents.extend(task.result())
+                    except Exception as e:
+                        logger.warning(f"Search failed for collection {tasks[task]}: {e}")
+
+            # 对所有集合的结果做一次全局重排序
+            all_documents = await self._rerank_documents(query, all_documents)
             # 截取 top_k
             all_documents = all_documents[:top_k]
 
@@ -434,6 +424,83 @@ class BaseAgent(ABC):
             )
             return []
 
+    async def _search_collection(self, collection_id: str, query: str, top_k: int) -> List[Dict[str, Any]]:
+        """检索单个集合，不做重排序（由 _rerank_documents 统一重排）"""
+        from aperag.schema import view_models
+        from aperag.service.collection_service import collection_service
+
+        # 启用所有搜索类型以获得最佳结果
+        search_request = view_models.SearchRequest(
+            query=query,
+            rerank=False,
+            vector_search=view_models.VectorSearchParams(topk=top_k, similarity=0.2),
+            fulltext_search=view_models.FulltextSearchParams(topk=top_k),
+            graph_search=view_models.GraphSearchParams(topk=top_k),
+            summary_search=view_models.SummarySearchParams(topk=top_k, similarity=0.2),
+        )
+        result = await collection_service.create_search(user=self.user_id, collection_id=collection_id, data=search_request)
+
+        documents = []
+        for item in result.items or []:
+            doc = item.model_dump()
+            # 确保 title 存在，方便后续展示
+            if 'metadata' in doc and doc['metadata'] and 'title' in doc['metadata']:
+                doc['title'] = doc['metadata']['title']
+            elif 'source' in doc:
+                doc['title'] = doc['source']
+            else:
+                doc['title'] = 'Unknown Document'
+            if not doc.get('metadata'):
+                doc['metadata'] = {}
+            doc['metadata']['collection_id'] = collection_id
+            documents.append(doc)
+        return documents
+
+    async def _rerank_documents(self, query: str, documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """对多个集合的合并结果做一次全局重排序，重排服务不可用时按 score 排序"""
+        if not documents:
+            return documents
+
+        from aperag.flow.base.models import SystemInput
+        from aperag.flow.runners.rerank import RerankInput, RerankNodeRunner
+        from aperag.query.query import DocumentWithScore
+        from aperag.service.default_model_service import default_model_service
+
+        try:
+            model, model_service_provider, custom_llm_provider = await default_model_service.get_default_rerank_config(
+                self.user_id
+            )
+            docs = [
+                DocumentWithScore(
+                    text=doc.get('content') or '',
+                    score=doc.get('score'),
+                    metadata={**(doc.get('metadata') or {}), "_doc_index": i},
+                )
+                for i, doc in enumerate(documents)
+            ]
+            output, _ = await RerankNodeRunner().run(
+                RerankInput(
+                    use_rerank_service=model is not None,
+                    model=model,
+                    model_service_provider=model_service_provider,
+                    custom_llm_provider=custom_llm_provider,
+                    docs=docs,
+                ),
+                SystemInput(query=query, user=self.user_id),
+            )
+        except Exception as e:
+            logger.warning(f"Global rerank failed, sorting by score: {e}")
+            return sorted(documents, key=lambda x: x.get('score', 0) or 0, reverse=True)
+
+        reranked = []
+        for rank, doc in enumerate(output.docs):
+            original = documents[doc.metadata["_doc_index"]]
+            original['rank'] = rank + 1
+            if doc.score is not None:
+                original['score'] = doc.score
+            reranked.append(original)
+        return reranked
+
     async def _web_search(
         self,
         state: AgentState,
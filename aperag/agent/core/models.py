@@ -75,6 +75,24 @@ class AgentThinkingStep(BaseModel):
     model_config = ConfigDict(populate_by_name=True)
 
 
+class AgentExecutionContext(BaseModel):
+    """
+    单次调用的执行上下文（不可变）
+
+    注册中心中的智能体是进程内共享的单例，请求相关的信息通过执行上下文
+    绑定到智能体的副本上（BaseAgent.with_context），而不是修改单例本身。
+    """
+
+    user_id: Optional[str] = None
+    chat_id: Optional[str] = None
+
+    model_config = ConfigDict(frozen=True)
+
+    def for_subtask(self, subtask_id: str) -> "AgentExecutionContext":
+        """派生子任务的执行上下文"""
+        return self.model_copy(update={"chat_id": f"{self.chat_id}-{subtask_id}"})
+
+
 class TaskStatus(str, Enum):
     PENDING = "pending"
     IN_PROGRESS = "in_progress"
@@ -1,9 +1,12 @@
+import asyncio
 import logging
 from typing import Any, Dict, List, Optional
 from datetime import datetime
 
 from aperag.agent.core.base import BaseAgent
 from aperag.agent.core.models import AgentRole, AgentState
+from aperag.config import settings
+from aperag.graph.traversal import traverse_graph
 
 logger = logging.getLogger(__name__)
 
@@ -39,7 +42,7 @@ class ArchivistAgent(BaseAgent):
         
         # 判断查询类型
         if any(keyword in query for keyword in ["关系", "连接", "路径", "关联"]):
-            return await self._graph_traversal(state, query)
+            return await self._graph_traversal(state, query, collection_ids)
         elif any(keyword in query for keyword in ["历史", "案例", "记录"]):
             return await self._historical_search(state, query, collection_ids)
         else:
@@ -106,117 +109,198 @@ class ArchivistAgent(BaseAgent):
     async def _graph_traversal(
         self,
         state: AgentState,
-        query: str
+        query: str,
+        collection_ids: Optional[List[str]] = None
     ) -> Dict[str, Any]:
-        """图谱关系遍历"""
+        """图谱关系遍历：在知识库的 LightRAG 图谱中做真实遍历，LLM 只负责总结子图"""
         self._log_thought(state, "action", "执行图谱遍历")
         
-        if self.user_id:
+        if not self.user_id:
+            return self._fallback_response(query)
+
+        try:
+            collections = await self._get_graph_collections(collection_ids)
+            if not collections:
+                self._log_thought(state, "observation", "没有启用知识图谱的知识库，跳过图谱遍历")
+                return self._fallback_response(query)
+
+            results = await asyncio.gather(
+                *[self._traverse_collection_graph(collection, query) for collection in collections],
+                return_exceptions=True,
+            )
+
+            graph_data = {"nodes": [], "edges": []}
+            truncated = []
+            for collection, result in zip(collections, results):
+                if isinstance(result, BaseException):
+                    logger.warning(f"Graph traversal failed for collection {collection.id}: {result}")
+                    continue
+                graph_data["nodes"].extend(result["nodes"])
+                graph_data["edges"].extend(result["edges"])
+                if result["truncated"]:
+                    truncated.append(str(collection.id))
+
+            self._log_thought(
+                state,
+                "observation",
+                f"图谱遍历完成，共 {len(graph_data['nodes'])} 个节点、{len(graph_data['edges'])} 条边",
+                detail={
+                    "collections": [str(c.id) for c in collections],
+                    "truncated_collections": truncated,
+                },
+            )
+
+            if not graph_data["nodes"]:
+                description = f"未在知识图谱中找到与「{query}」相关的实体。"
+            else:
+                description = await self._summarize_subgraph(state, query, graph_data)
+
+            return {
+                "answer": description,
+                "content": description,
+                "graph_data": graph_data,
+                "truncated": bool(truncated),
+            }
+
+        except Exception as e:
+            logger.warning(f"Graph traversal failed: {e}")
+            self._log_thought(state, "correction", f"图谱遍历失败: {str(e)}")
+            return self._fallback_response(query)
+
+    async def _get_graph_collections(self, collection_ids: Optional[List[str]] = None) -> List[Any]:
+        """获取启用了知识图谱的知识库（未指定时使用用户的全部知识库）"""
+        from aperag.db.ops import async_db_ops
+        from aperag.schema.utils import parseCollectionConfig
+
+        collections = await async_db_ops.query_collections([self.user_id])
+        if collection_ids:
+            wanted = set(collection_ids)
+            collections = [c for c in collections if str(c.id) in wanted]
+
+        graph_collections = []
+        for collection in collections:
             try:
-                # 使用LLM分析查询意图
-                intent_prompt = f"""
-分析以下查询的图谱遍历需求：
-查询: {query}
+                if parseCollectionConfig(collection.config).enable_knowledge_graph:
+                    graph_collections.append(collection)
+            except Exception as e:
+                logger.debug(f"Skipping collection {collection.id} due to config error: {e}")
+        return graph_collections
 
-请提取：
-1. 起始节点（设备名称）
-2. 目标节点（如果有）
-3. 关系类型（如：连接、供电、保护等）
-4. 遍历深度（1-3）
+    async def _traverse_collection_graph(self, collection: Any, query: str) -> Dict[str, Any]:
+        """在单个知识库图谱中匹配查询实体并做有界遍历，返回带属性的真实节点和边"""
+        from aperag.graph import lightrag_manager
 
-以JSON格式输出：
-{{
-    "start_node": "起始节点",
-    "target_node": "目标节点或null",
-    "relation_type": "关系类型",
-    "depth": 2
-}}
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.archivist_graph_timeout
+        collection_id = str(collection.id)
 
-只输出JSON，不要其他说明。
-"""
-                
-                self._log_thought(state, "action", "使用LLM分析查询意图")
-                
-                intent_json = await self._generate_with_llm(
-                    state=state,
-                    prompt=intent_prompt,
-                    temperature=0.3,
-                    max_tokens=500
+        rag = await lightrag_manager.create_lightrag_instance(collection)
+        try:
+            # 通过实体向量检索从查询中定位起始实体
+            matches = await asyncio.wait_for(
+                rag.entities_vdb.query(query, top_k=settings.archivist_graph_seed_entities),
+                timeout=max(0.0, deadline - loop.time()),
+            )
+            seeds = [m["entity_name"] for m in matches if m.get("entity_name")]
+            if not seeds:
+                return {"nodes": [], "edges": [], "truncated": False}
+
+            storage = rag.chunk_entity_relation_graph
+            node_ids, edge_pairs, truncated = await traverse_graph(
+                storage,
+                seeds,
+                max_depth=settings.archivist_graph_max_depth,
+                max_fanout=settings.archivist_graph_max_fanout,
+                max_nodes=settings.archivist_graph_max_nodes,
+                deadline=deadline,
+            )
+
+            # 批量读取节点和边的属性，超时则只保留结构
+            node_data, edge_data = {}, {}
+            try:
+                node_data, edge_data = await asyncio.wait_for(
+                    asyncio.gather(
+                        storage.get_nodes_batch(node_ids),
+                        storage.get_edges_batch([{"src": src, "tgt": tgt} for src, tgt in edge_pairs]),
+                    ),
+                    timeout=max(0.0, deadline - loop.time()),
                 )
-                
-                import json
-                import re
-                
-                cleaned_intent = re.sub(r"```json|```", "", intent_json).strip()
-                intent = json.loads(cleaned_intent)
-                
-                self._log_thought(
-                    state,
-                    "observation",
-                    f"识别意图: {intent}"
+            except asyncio.TimeoutError:
+                truncated = True
+
+            seed_set = set(seeds)
+            nodes = []
+            for node_id in node_ids:
+                data = node_data.get(node_id) or {}
+                nodes.append(
+                    {
+                        "id": node_id,
+                        "label": node_id,
+                        "type": data.get("entity_type", "entity"),
+                        "description": data.get("description", ""),
+                        "source_id": data.get("source_id"),
+                        "collection_id": collection_id,
+                        "seed": node_id in seed_set,
+                    }
                 )
-                
-                # 执行图谱遍历（调用图谱工具）
-                # 这里我们模拟一个图谱查询，并要求LLM返回结构化数据
-                traversal_prompt = f"""
-请查询知识图谱中的关系：
-起始节点: {intent.get('start_node')}
-目标节点: {intent.get('target_node', '所有相关节点')}
-关系类型: {intent.get('relation_type', '所有关系')}
-遍历深度: {intent.get('depth', 2)}
 
-请返回两部分内容：
-1. 自然语言描述：描述找到的关系和路径。
-2. 结构化数据：以JSON格式列出涉及的节点和边。
+            edges = []
+            for src, tgt in edge_pairs:
+                data = edge_data.get((src, tgt)) or edge_data.get((tgt, src)) or {}
+                edges.append(
+                    {
+                        "source": src,
+                        "target": tgt,
+                        "label": data.get("keywords") or "related",
+                        "description": data.get("description", ""),
+                        "weight": data.get("weight"),
+                        "source_id": data.get("source_id"),
+                        "collection_id": collection_id,
+                    }
+                )
+
+            return {"nodes": nodes, "edges": edges, "truncated": truncated}
+        finally:
+            await rag.finalize_storages()
+
+    async def _summarize_subgraph(self, state: AgentState, query: str, graph_data: Dict[str, Any]) -> str:
+        """让 LLM 基于检索到的子图作答，只允许引用子图中真实存在的关系"""
+        max_edges = settings.archivist_graph_prompt_edges
+        edge_lines = []
+        for edge in graph_data["edges"][:max_edges]:
+            line = f"- {edge['source']} --[{edge['label']}]-- {edge['target']}"
+            if edge.get("description"):
+                line += f"：{edge['description'][:200]}"
+            edge_lines.append(line)
+        entity_lines = [
+            f"- {node['id']}（{node['type']}）：{(node.get('description') or '')[:200]}"
+            for node in graph_data["nodes"]
+            if node.get("seed")
+        ]
 
-格式要求：
-[DESCRIPTION]
-...自然语言描述...
+        prompt = f"""
+请根据以下知识图谱子图回答查询。
+查询: {query}
 
-[GRAPH_DATA]
-{{
-    "nodes": [
-        {{"id": "节点ID", "label": "节点名称", "type": "设备类型"}}
-    ],
-    "edges": [
-        {{"source": "源节点ID", "target": "目标节点ID", "label": "关系类型"}}
-    ]
-}}
+起始实体:
+{chr(10).join(entity_lines) or '无'}
+
+图谱关系（共 {len(graph_data['edges'])} 条，以下列出 {len(edge_lines)} 条）:
+{chr(10).join(edge_lines) or '无'}
+
+要求：
+1. 只能使用上面列出的关系，不要编造图谱中不存在的节点或关系
+2. 描述找到的关系和路径，必要时指出信息不足之处
+3. 直接输出自然语言描述，不要输出JSON
 """
-                
-                traversal_result_raw = await self._generate_with_llm(
-                    state=state,
-                    prompt=traversal_prompt,
-                    temperature=0.5
-                )
-                
-                # 解析结果
-                description = traversal_result_raw
-                graph_data = {"nodes": [], "edges": []}
-                
-                if "[GRAPH_DATA]" in traversal_result_raw:
-                    parts = traversal_result_raw.split("[GRAPH_DATA]")
-                    description = parts[0].replace("[DESCRIPTION]", "").strip()
-                    try:
-                        graph_json_str = parts[1].strip()
-                        graph_json_str = re.sub(r"```json|```", "", graph_json_str).strip()
-                        graph_data = json.loads(graph_json_str)
-                    except Exception as e:
-                        logger.warning(f"Failed to parse graph data: {e}")
-                
-                return {
-                    "answer": description,
-                    "content": description,
-                    "intent": intent,
-                    "graph_data": graph_data
-                }
-                
-            except Exception as e:
-                logger.warning(f"Graph traversal failed: {e}")
-                self._log_thought(state, "correction", f"图谱遍历失败: {str(e)}")
-                return self._fallback_response(query)
-        else:
-            return self._fallback_response(query)
+        self._log_thought(state, "action", "使用LLM总结图谱子图")
+        return await self._generate_with_llm(
+            state=state,
+            prompt=prompt,
+            temperature=0.3,
+            use_history=False,
+            enable_tool_calls=False,
+        )
     
     async def _historical_search(
         self,
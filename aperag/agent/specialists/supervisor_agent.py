@@ -255,9 +255,7 @@ class SupervisorAgent(BaseAgent):
         agents = agent_registry.find_by_capability(target_agent_capability)
         
         if agents and self.user_id:
-            agent = agents[0]
-            agent.user_id = self.user_id
-            agent.chat_id = self.chat_id
+            agent = agents[0].with_context(self.context)
             
             self._log_thought(
                 state,
@@ -13,7 +13,7 @@ from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from aperag.agent import agent_registry
-from aperag.agent.core.models import AgentRole, AgentState
+from aperag.agent.core.models import AgentExecutionContext, AgentRole, AgentState
 from aperag.agent.specialists.accident_deduction_agent import AccidentDeductionAgent
 from aperag.db.database import get_async_session
 
@@ -84,8 +84,11 @@ async def generate_accident_deduction(
         
         # 根据 RAG/LLM 设置配置 user_id
         effective_user_id = request.user_id if (request.enable_rag or request.enable_llm) else None
-        agent.user_id = effective_user_id
-        agent.chat_id = request.chat_id or f"accident-{request.user_id}"
+        agent = agent.with_context(
+            AgentExecutionContext(
+                user_id=effective_user_id, chat_id=request.chat_id or f"accident-{request.user_id}"
+            )
+        )
         
         # 创建状态
         state = create_agent_state("deduction", request.user_id)
@@ -120,7 +123,7 @@ async def generate_emergency_plan(
     try:
         # 获取并配置智能体
         agent = get_agent_or_raise(AgentRole.ACCIDENT_DEDUCTION, AccidentDeductionAgent)
-        setup_agent(agent, request.user_id, request.chat_id, "plan")
+        agent = setup_agent(agent, request.user_id, request.chat_id, "plan")
         
         # 创建状态
         state = create_agent_state("plan", request.user_id)
@@ -155,7 +158,7 @@ async def design_drill(
     try:
         # 获取并配置智能体
         agent = get_agent_or_raise(AgentRole.ACCIDENT_DEDUCTION, AccidentDeductionAgent)
-        setup_agent(agent, request.user_id, request.chat_id, "drill")
+        agent = setup_agent(agent, request.user_id, request.chat_id, "drill")
         
         # 创建状态
         state = create_agent_state("drill", request.user_id)
@@ -251,8 +254,7 @@ async def websocket_deduction(websocket: WebSocket):
                 })
                 continue
                 
-            agent.user_id = user_id
-            agent.chat_id = f"ws-{user_id}"
+            agent = agent.with_context(AgentExecutionContext(user_id=user_id, chat_id=f"ws-{user_id}"))
             
             # 创建状态
             state = AgentState(session_id=f"ws-{user_id}")
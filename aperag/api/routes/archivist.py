@@ -59,7 +59,7 @@ async def search_knowledge(
     try:
         # 获取并配置智能体
         agent = get_agent_or_raise(AgentRole.ARCHIVIST, ArchivistAgent)
-        setup_agent(agent, request.user_id, request.chat_id, "archivist")
+        agent = setup_agent(agent, request.user_id, request.chat_id, "archivist")
         
         # 创建状态
         state = create_agent_state("archivist", request.user_id)
@@ -96,7 +96,7 @@ async def graph_traversal(
     try:
         # 获取并配置智能体
         agent = get_agent_or_raise(AgentRole.ARCHIVIST, ArchivistAgent)
-        setup_agent(agent, request.user_id, request.chat_id, "archivist-graph")
+        agent = setup_agent(agent, request.user_id, request.chat_id, "archivist-graph")
         
         # 创建状态
         state = create_agent_state("archivist-graph", request.user_id)
@@ -128,7 +128,7 @@ async def historical_search(
     try:
         # 获取并配置智能体
         agent = get_agent_or_raise(AgentRole.ARCHIVIST, ArchivistAgent)
-        setup_agent(agent, request.user_id, request.chat_id, "archivist-history")
+        agent = setup_agent(agent, request.user_id, request.chat_id, "archivist-history")
         
         # 创建状态
         state = create_agent_state("archivist-history", request.user_id)
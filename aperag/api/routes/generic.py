@@ -62,7 +62,7 @@ def create_generic_agent_router(
         """执行智能体任务"""
         try:
             agent = get_agent_or_raise(role, agent_class)
-            setup_agent(agent, request.user_id, request.chat_id, prefix)
+            agent = setup_agent(agent, request.user_id, request.chat_id, prefix)
             state = create_agent_state(prefix, request.user_id)
             
             result = await agent.run(state, {"task": request.task})
@@ -12,7 +12,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from aperag.agent.core.models import AgentRole
+from aperag.agent.core.models import AgentExecutionContext, AgentRole
 from aperag.agent.specialists.operation_ticket_agent import OperationTicketAgent
 from aperag.db.database import get_async_session
 
@@ -68,8 +68,11 @@ async def generate_operation_ticket(
         
         # 根据 RAG/LLM 设置配置 user_id
         effective_user_id = request.user_id if (request.enable_rag or request.enable_llm) else None
-        agent.user_id = effective_user_id
-        agent.chat_id = request.chat_id or f"operation-{request.user_id}"
+        agent = agent.with_context(
+            AgentExecutionContext(
+                user_id=effective_user_id, chat_id=request.chat_id or f"operation-{request.user_id}"
+            )
+        )
         
         # 创建状态
         state = create_agent_state("operation", request.user_id)
@@ -106,7 +109,7 @@ async def review_operation_ticket(
     try:
         # 获取并配置智能体
         agent = get_agent_or_raise(AgentRole.OPERATION_TICKET, OperationTicketAgent)
-        setup_agent(agent, request.user_id, request.chat_id, "review")
+        agent = setup_agent(agent, request.user_id, request.chat_id, "review")
         
         # 创建状态
         state = create_agent_state("review", request.user_id)
@@ -57,7 +57,7 @@ async def generate_power_guarantee_plan(
     try:
         # 获取并配置智能体
         agent = get_agent_or_raise(AgentRole.POWER_GUARANTEE, PowerGuaranteeAgent)
-        setup_agent(agent, request.user_id, request.chat_id, "power-guarantee")
+        agent = setup_agent(agent, request.user_id, request.chat_id, "power-guarantee")
         
         # 创建状态
         state = create_agent_state("power-guarantee", request.user_id)
@@ -94,7 +94,7 @@ async def generate_inspection_plan(
     try:
         # 获取并配置智能体
         agent = get_agent_or_raise(AgentRole.POWER_GUARANTEE, PowerGuaranteeAgent)
-        setup_agent(agent, request.user_id, request.chat_id, "inspection")
+        agent = setup_agent(agent, request.user_id, request.chat_id, "inspection")
         
         # 创建状态
         state = create_agent_state("inspection", request.user_id)
@@ -127,7 +127,7 @@ async def prepare_resources(
     try:
         # 获取并配置智能体
         agent = get_agent_or_raise(AgentRole.POWER_GUARANTEE, PowerGuaranteeAgent)
-        setup_agent(agent, request.user_id, request.chat_id, "resources")
+        agent = setup_agent(agent, request.user_id, request.chat_id, "resources")
         
         # 创建状态
         state = create_agent_state("resources", request.user_id)
@@ -13,7 +13,7 @@ from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from aperag.agent import agent_registry
-from aperag.agent.core.models import AgentRole, AgentState
+from aperag.agent.core.models import AgentExecutionContext, AgentRole, AgentState
 from aperag.agent.specialists.supervisor_agent import SupervisorAgent
 from aperag.db.database import get_async_session
 
@@ -62,7 +62,7 @@ async def dispatch_task(
     try:
         # 获取并配置智能体
         agent = get_agent_or_raise(AgentRole.SUPERVISOR, SupervisorAgent)
-        setup_agent(agent, request.user_id, request.chat_id, "supervisor")
+        agent = setup_agent(agent, request.user_id, request.chat_id, "supervisor")
         
         # 创建状态
         state = create_agent_state("supervisor", request.user_id)
@@ -96,7 +96,7 @@ async def get_station_status(
     try:
         # 获取并配置智能体
         agent = get_agent_or_raise(AgentRole.SUPERVISOR, SupervisorAgent)
-        agent.user_id = user_id
+        agent = agent.with_context(AgentExecutionContext(user_id=user_id))
         
         # 创建状态
         state = create_agent_state("supervisor-status", user_id)
@@ -145,8 +145,7 @@ async def websocket_dispatch(websocket: WebSocket):
                 })
                 continue
                 
-            agent.user_id = user_id
-            agent.chat_id = f"ws-{user_id}"
+            agent = agent.with_context(AgentExecutionContext(user_id=user_id, chat_id=f"ws-{user_id}"))
             
             # 创建状态
             state = AgentState(session_id=f"ws-{user_id}")
@@ -12,7 +12,7 @@ from fastapi import HTTPException
 from pydantic import BaseModel, Field
 
 from aperag.agent import agent_registry
-from aperag.agent.core.models import AgentRole, AgentState
+from aperag.agent.core.models import AgentExecutionContext, AgentRole, AgentState
 
 logger = logging.getLogger(__name__)
 
@@ -117,18 +117,20 @@ def create_agent_state(prefix: str, user_id: str) -> AgentState:
     return AgentState(session_id=f"{prefix}-{user_id}")
 
 
-def setup_agent(agent, user_id: str, chat_id: Optional[str], prefix: str) -> None:
+def setup_agent(agent, user_id: str, chat_id: Optional[str], prefix: str):
     """
-    配置智能体的用户信息
+    为本次请求创建绑定了用户信息的智能体副本（不修改注册中心中的共享实例）
     
     Args:
         agent: 智能体实例
         user_id: 用户ID
         chat_id: 可选的聊天ID
         prefix: 默认chat_id的前缀
+        
+    Returns:
+        绑定了执行上下文的智能体
     """
-    agent.user_id = user_id
-    agent.chat_id = chat_id or f"{prefix}-{user_id}"
+    return agent.with_context(AgentExecutionContext(user_id=user_id, chat_id=chat_id or f"{prefix}-{user_id}"))
 
 
 def build_success_response(
@@ -66,7 +66,7 @@ async def generate_work_permit(
     try:
         # 获取并配置智能体
         agent = get_agent_or_raise(AgentRole.WORK_PERMIT, WorkPermitAgent)
-        setup_agent(agent, request.user_id, request.chat_id, "permit")
+        agent = setup_agent(agent, request.user_id, request.chat_id, "permit")
         
         # 创建状态
         state = create_agent_state("permit", request.user_id)
@@ -108,7 +108,7 @@ async def identify_hazards(
     try:
         # 获取并配置智能体
         agent = get_agent_or_raise(AgentRole.WORK_PERMIT, WorkPermitAgent)
-        setup_agent(agent, request.user_id, request.chat_id, "hazards")
+        agent = setup_agent(agent, request.user_id, request.chat_id, "hazards")
         
         # 创建状态
         state = create_agent_state("hazards", request.user_id)
@@ -149,7 +149,7 @@ async def review_work_permit(
     try:
         # 获取并配置智能体
         agent = get_agent_or_raise(AgentRole.WORK_PERMIT, WorkPermitAgent)
-        setup_agent(agent, request.user_id, request.chat_id, "review")
+        agent = setup_agent(agent, request.user_id, request.chat_id, "review")
         
         # 创建状态
         state = create_agent_state("review", request.user_id)
@@ -38,8 +38,11 @@ from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware  # noqa: E40
 from aperag.agent.agent_event_listener import agent_event_listener  # noqa: E402
 from aperag.agent.agent_session_manager_lifecycle import agent_session_manager_lifespan  # noqa: E402
 from aperag.exception_handlers import register_exception_handlers
+from aperag.llm.http_client import http_client_pool
 from aperag.llm.litellm_track import register_custom_llm_track
 from aperag.mcp import mcp_server
+from aperag.service.audit_service import audit_service
+from aperag.utils.history import wait_for_history_writes
 from aperag.views.api_key import router as api_key_router
 from aperag.views.audit import router as audit_router
 from aperag.views.auth import router as auth_router
@@ -82,11 +85,23 @@ async def combined_lifespan(app: FastAPI):
     from aperag.agent.register_agents import register_all_agents
     register_all_agents()
 
-    # Start MCP server first
-    async with mcp_app.lifespan(app):
-        # Then start Agent session manager
-        async with agent_session_manager_lifespan(app):
-            yield
+    # Start the write-behind audit log writer
+    audit_service.writer.start()
+
+    try:
+        # Start MCP server first
+        async with mcp_app.lifespan(app):
+            # Then start Agent session manager
+            async with agent_session_manager_lifespan(app):
+                yield
+    finally:
+        # Flush pending audit logs on shutdown
+        await audit_service.writer.stop()
+        # Finish the chat history writes of answers already streamed
+        await wait_for_history_writes(timeout=10)
+        # Close the keep-alive connections to model providers
+        await http_client_pool.aclose()
+        http_client_pool.close()
 
 
 # Create the main FastAPI app with combined lifespan
@@ -140,7 +140,7 @@ def create_user_message(
         metadata=metadata,
     )
 
-    return StoredChatMessage(parts=[part], files=files)
+    return StoredChatMessage(parts=[part], files=files or [])
 
 
 def create_assistant_message(
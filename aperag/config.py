@@ -120,6 +120,8 @@ class Config(BaseSettings):
     # Embedding
     embedding_max_chunks_in_batch: int = Field(
         10, alias="EMBEDDING_MAX_CHUNKS_IN_BATCH")
+    # Concurrent async embedding calls per provider and base URL, in each event loop
+    embedding_max_concurrency: int = Field(8, alias="EMBEDDING_MAX_CONCURRENCY")
 
     # Memory backend
     memory_redis_url: Optional[str] = Field(None, alias="MEMORY_REDIS_URL")
@@ -184,9 +186,130 @@ class Config(BaseSettings):
     # Register mode
     register_mode: str = Field("unlimited", alias="REGISTER_MODE")
 
+    # Global graph federated search
+    global_graph_max_concurrency: int = Field(10, alias="GLOBAL_GRAPH_MAX_CONCURRENCY")
+    global_graph_max_depth: int = Field(1, alias="GLOBAL_GRAPH_MAX_DEPTH")
+    global_graph_max_fanout: int = Field(50, alias="GLOBAL_GRAPH_MAX_FANOUT")
+    global_graph_max_nodes: int = Field(500, alias="GLOBAL_GRAPH_MAX_NODES")
+
+    # Document summary map-reduce
+    summary_map_concurrency: int = Field(4, alias="SUMMARY_MAP_CONCURRENCY")
+    # Max tokens of a document section summarized in one map call
+    summary_map_section_tokens: int = Field(2000, alias="SUMMARY_MAP_SECTION_TOKENS")
+    # Max tokens of the section summaries combined in one reduce call
+    summary_reduce_token_budget: int = Field(6000, alias="SUMMARY_REDUCE_TOKEN_BUDGET")
+
+    # Chat history kept in Redis, 0 keeps every message
+    chat_history_max_messages: int = Field(0, alias="CHAT_HISTORY_MAX_MESSAGES")
+    # Archive messages trimmed from Redis to Postgres instead of dropping them
+    chat_history_archive: bool = Field(False, alias="CHAT_HISTORY_ARCHIVE")
+    # Max tokens of chat history put into the agent memory, 0 only limits by turns
+    chat_history_context_tokens: int = Field(0, alias="CHAT_HISTORY_CONTEXT_TOKENS")
+    # Attempts of a chat history write made after a streamed answer, retried with exponential backoff
+    chat_history_write_attempts: int = Field(3, alias="CHAT_HISTORY_WRITE_ATTEMPTS")
+    # Delay in seconds before the first retry of a chat history write
+    chat_history_write_retry_delay: float = Field(0.5, alias="CHAT_HISTORY_WRITE_RETRY_DELAY")
+
+    # Serve answers from the cache of bots that enable it, false turns the cache off for every bot
+    answer_cache_enabled: bool = Field(True, alias="ANSWER_CACHE_ENABLED")
+    # Max answers cached per bot for a version of its collections, the oldest are dropped first
+    answer_cache_max_entries: int = Field(500, alias="ANSWER_CACHE_MAX_ENTRIES")
+    # Seconds the index versions of a collection are reused for answer cache keys, 0 queries them for every question
+    answer_cache_version_ttl: float = Field(30, alias="ANSWER_CACHE_VERSION_TTL")
+
+    # Trim the best retrieved document that doesn't fit the LLM context instead of dropping it
+    llm_context_trim_tail: bool = Field(True, alias="LLM_CONTEXT_TRIM_TAIL")
+
+    # Longest side in pixels of images attached to vision prompts, larger ones are downscaled, 0 keeps the size
+    vision_image_max_resolution: int = Field(1568, alias="VISION_IMAGE_MAX_RESOLUTION")
+    # Image assets larger than this aren't attached to vision prompts
+    vision_image_max_asset_bytes: int = Field(20 * 1024 * 1024, alias="VISION_IMAGE_MAX_ASSET_BYTES")
+    # Max bytes of the encoded images attached to one vision prompt, 0 means no limit
+    vision_image_byte_budget: int = Field(16 * 1024 * 1024, alias="VISION_IMAGE_BYTE_BUDGET")
+    # Max bytes of encoded images cached in each process
+    vision_image_cache_max_bytes: int = Field(64 * 1024 * 1024, alias="VISION_IMAGE_CACHE_MAX_BYTES")
+
+    # Local cross-encoder rerank models, used by providers whose custom_llm_provider is "local"
+    local_rerank_model_dir: str = Field("", alias="LOCAL_RERANK_MODEL_DIR")
+    # "torch" or "onnx"
+    local_rerank_backend: str = Field("torch", alias="LOCAL_RERANK_BACKEND")
+    # Max tokens of a query and document pair, longer documents are truncated
+    local_rerank_max_length: int = Field(512, alias="LOCAL_RERANK_MAX_LENGTH")
+    local_rerank_batch_size: int = Field(16, alias="LOCAL_RERANK_BATCH_SIZE")
+    # Max local rerank models kept loaded per process, the least recently used one is unloaded first
+    local_rerank_max_models: int = Field(2, alias="LOCAL_RERANK_MAX_MODELS")
+
+    # Keep-alive HTTP client pools for model provider calls, one per base URL and provider
+    http_pool_enabled: bool = Field(True, alias="HTTP_POOL_ENABLED")
+    http_pool_max_connections: int = Field(100, alias="HTTP_POOL_MAX_CONNECTIONS")
+    http_pool_max_keepalive_connections: int = Field(20, alias="HTTP_POOL_MAX_KEEPALIVE_CONNECTIONS")
+    # Seconds an idle connection is kept open
+    http_pool_keepalive_expiry: float = Field(60.0, alias="HTTP_POOL_KEEPALIVE_EXPIRY")
+    # Negotiate HTTP/2 with providers supporting it, needs the h2 package
+    http_pool_http2: bool = Field(True, alias="HTTP_POOL_HTTP2")
+    # Max async clients (one per event loop, base URL and provider) and OpenAI SDK clients (one per API key)
+    # kept, the least recently used ones are dropped first
+    http_pool_max_async_clients: int = Field(64, alias="HTTP_POOL_MAX_ASYNC_CLIENTS")
+    http_pool_max_openai_clients: int = Field(256, alias="HTTP_POOL_MAX_OPENAI_CLIENTS")
+
+    # Latency budget in seconds of an agent knowledge search over all its collections
+    agent_search_timeout: float = Field(10.0, alias="AGENT_SEARCH_TIMEOUT")
+    # Max collections an agent knowledge search queries at the same time
+    agent_search_concurrency: int = Field(4, alias="AGENT_SEARCH_CONCURRENCY")
+
+    # Agent MCP sessions
+    agent_session_idle_timeout: int = Field(1800, alias="AGENT_SESSION_IDLE_TIMEOUT")
+    # Sessions idle for longer than this are probed with tools/list before reuse, 0 disables the probe
+    agent_session_health_check_interval: float = Field(60.0, alias="AGENT_SESSION_HEALTH_CHECK_INTERVAL")
+    agent_session_health_check_timeout: float = Field(5.0, alias="AGENT_SESSION_HEALTH_CHECK_TIMEOUT")
+    # Keep one initialized spare session per user and MCP endpoint for new chats
+    agent_session_warm_pool: bool = Field(True, alias="AGENT_SESSION_WARM_POOL")
+
+    # Archivist agent graph traversal
+    archivist_graph_max_depth: int = Field(2, alias="ARCHIVIST_GRAPH_MAX_DEPTH")
+    archivist_graph_max_fanout: int = Field(20, alias="ARCHIVIST_GRAPH_MAX_FANOUT")
+    archivist_graph_max_nodes: int = Field(200, alias="ARCHIVIST_GRAPH_MAX_NODES")
+    archivist_graph_seed_entities: int = Field(5, alias="ARCHIVIST_GRAPH_SEED_ENTITIES")
+    # Latency budget in seconds of the traversal of one collection graph
+    archivist_graph_timeout: float = Field(15.0, alias="ARCHIVIST_GRAPH_TIMEOUT")
+    # Max relations given to the LLM to summarize the subgraph
+    archivist_graph_prompt_edges: int = Field(100, alias="ARCHIVIST_GRAPH_PROMPT_EDGES")
+
+    # Documents whose pending indexes one reconciler claims per UPDATE, and max claims per reconcile tick
+    reconciler_claim_batch_size: int = Field(500, alias="RECONCILER_CLAIM_BATCH_SIZE")
+    reconciler_max_claim_batches: int = Field(20, alias="RECONCILER_MAX_CLAIM_BATCHES")
+    # Max documents of one tenant with index tasks in progress, 0 disables the cap
+    index_tenant_max_inflight: int = Field(100, alias="INDEX_TENANT_MAX_INFLIGHT")
+    # Seconds after which an index task in progress no longer holds one of its tenant's slots
+    index_inflight_timeout: int = Field(3600, alias="INDEX_INFLIGHT_TIMEOUT")
+    # Seconds without a heartbeat after which a claimed index goes back to the reconciler, 0 disables
+    index_stale_claim_timeout: int = Field(1800, alias="INDEX_STALE_CLAIM_TIMEOUT")
+    # Seconds between the heartbeats refreshing the claims of a running index task
+    index_claim_heartbeat_interval: int = Field(300, alias="INDEX_CLAIM_HEARTBEAT_INTERVAL")
+    # Seconds finished index workflows are collected for before they trigger one reconciliation
+    index_reconcile_debounce: int = Field(5, alias="INDEX_RECONCILE_DEBOUNCE")
+    # Documents of collections with at most this many documents to index take the interactive lane
+    index_interactive_max_backlog: int = Field(5, alias="INDEX_INTERACTIVE_MAX_BACKLOG")
+    # Seconds a GRAPH task parked until the document's VISION index settles is kept in Redis
+    index_vision_dependent_ttl: int = Field(86400, alias="INDEX_VISION_DEPENDENT_TTL")
+
+    # Audit log write-behind queue
+    audit_queue_size: int = Field(10000, alias="AUDIT_QUEUE_SIZE")
+    audit_batch_size: int = Field(100, alias="AUDIT_BATCH_SIZE")
+    audit_flush_interval: float = Field(1.0, alias="AUDIT_FLUSH_INTERVAL")
+    # What to do when the audit queue is full: "drop" the entry or "block" the request until there is space
+    audit_queue_full_policy: str = Field("drop", alias="AUDIT_QUEUE_FULL_POLICY")
+
+    # Seconds provider, model and API key lookups are cached in each process, 0 disables the cache
+    provider_config_cache_ttl: int = Field(60, alias="PROVIDER_CONFIG_CACHE_TTL")
+
     # Cache
     cache_enabled: bool = Field(True, alias="CACHE_ENABLED")
     cache_ttl: int = Field(86400, alias="CACHE_TTL")
+    # Directory of the disk cache of model responses, shared by the processes of a host
+    cache_disk_dir: str = Field("/tmp/litellm_cache", alias="CACHE_DISK_DIR")
+    # Max bytes of the disk cache, least recently used entries are evicted above it
+    cache_disk_size_limit: int = Field(1024 * 1024 * 1024, alias="CACHE_DISK_SIZE_LIMIT")
 
     # Opik
     opik_api_key: str = Field("", alias="OPIK_API_KEY")
@@ -25,6 +25,7 @@ from sqlalchemy import (
     Boolean,
     Column,
     DateTime,
+    Float,
     ForeignKey,
     Index,
     Integer,
@@ -492,6 +493,22 @@ class MessageFeedback(Base):
             self.chat_id = chat
 
 
+class ChatMessageArchive(Base):
+    """Chat messages trimmed from the Redis chat history"""
+
+    __tablename__ = "chat_message_archive"
+    __table_args__ = (Index("idx_chat_message_archive_chat_time", "chat_id", "message_time"),)
+
+    id = Column(String(24), primary_key=True, default=lambda: "cma" + random_id())
+    chat_id = Column(String(24), nullable=False)
+    message_id = Column(String(256), nullable=True)
+    role = Column(String(16), nullable=True)
+    message = Column(JSON, nullable=False)  # StoredChatMessage storage dict
+    token_count = Column(Integer, nullable=False, default=0)
+    message_time = Column(Float, nullable=True)  # Timestamp of the message, used for ordering
+    gmt_created = Column(DateTime(timezone=True), default=utc_now, nullable=False)
+
+
 class ApiKey(Base):
     __tablename__ = "api_key"
 
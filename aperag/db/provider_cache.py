@@ -0,0 +1,241 @@
+# Copyright 2025 ApeCloud, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Process-wide cache of provider, model and API key lookups.
+
+Every chat turn, rerank, embedding and graph indexing call resolves the API key, base URL and
+model configuration of its provider. These rows change rarely, so the lookups are cached for
+PROVIDER_CONFIG_CACHE_TTL seconds and invalidated by the provider repository whenever a provider,
+its API key or one of its models is written. The TTL bounds how long other processes, which
+don't see the invalidation, keep serving the old values.
+
+Cached values are immutable snapshots rather than ORM objects, so they can be shared by threads
+and sessions. Missing rows are cached too, a write creating them invalidates the entry.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 4096
+
+_MISSING = object()
+
+
+@dataclass(frozen=True)
+class ProviderInfo:
+    """Cached snapshot of an LLMProvider"""
+
+    name: str
+    base_url: Optional[str]
+    user_id: Optional[str]
+    completion_dialect: Optional[str]
+    embedding_dialect: Optional[str]
+    rerank_dialect: Optional[str]
+
+    @classmethod
+    def from_model(cls, provider) -> Optional["ProviderInfo"]:
+        if provider is None:
+            return None
+        return cls(
+            name=provider.name,
+            base_url=provider.base_url,
+            user_id=provider.user_id,
+            completion_dialect=provider.completion_dialect,
+            embedding_dialect=provider.embedding_dialect,
+            rerank_dialect=provider.rerank_dialect,
+        )
+
+
+@dataclass(frozen=True)
+class ModelInfo:
+    """Cached snapshot of an LLMProviderModel"""
+
+    provider_name: str
+    api: str
+    model: str
+    custom_llm_provider: Optional[str]
+    context_window: Optional[int]
+    max_input_tokens: Optional[int]
+    max_output_tokens: Optional[int]
+    tags: Tuple[str, ...]
+
+    @classmethod
+    def from_model(cls, model) -> Optional["ModelInfo"]:
+        if model is None:
+            return None
+        return cls(
+            provider_name=model.provider_name,
+            api=str(getattr(model.api, "value", model.api)),
+            model=model.model,
+            custom_llm_provider=model.custom_llm_provider,
+            context_window=model.context_window,
+            max_input_tokens=model.max_input_tokens,
+            max_output_tokens=model.max_output_tokens,
+            tags=tuple(model.tags or ()),
+        )
+
+    def has_tag(self, tag: str) -> bool:
+        return tag in self.tags
+
+
+def _model_key(provider_name: str, api, model: str) -> Tuple:
+    # APIType members and their values must share an entry
+    return ("model", provider_name, str(getattr(api, "value", api)), model)
+
+
+class ProviderConfigCache:
+    """TTL-bounded LRU of provider lookups, keyed by (kind, provider_name, ...)"""
+
+    KINDS = ("api_key", "provider", "model")
+
+    def __init__(self, ttl: Optional[float] = None, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+        self._hits: Dict[str, int] = dict.fromkeys(self.KINDS, 0)
+        self._misses: Dict[str, int] = dict.fromkeys(self.KINDS, 0)
+
+    def _ttl_seconds(self) -> float:
+        if self._ttl is not None:
+            return self._ttl
+        from aperag.config import settings
+
+        return settings.provider_config_cache_ttl
+
+    def _get(self, key: Tuple) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self._hits[key[0]] += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self._misses[key[0]] += 1
+            return _MISSING
+
+    def _put(self, key: Tuple, value: Any) -> None:
+        ttl = self._ttl_seconds()
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    # Sync lookups, for Celery tasks and other sync code
+
+    def get_api_key(self, provider_name: str, user_id: Optional[str] = None, need_public: bool = True) -> Optional[str]:
+        """API key of a private provider of the user, or of a public provider if need_public"""
+        key = ("api_key", provider_name, user_id, need_public)
+        value = self._get(key)
+        if value is _MISSING:
+            from aperag.db.ops import db_ops
+
+            value = db_ops.query_provider_api_key(provider_name, user_id, need_public)
+            self._put(key, value)
+        return value
+
+    def get_provider(self, provider_name: str) -> Optional[ProviderInfo]:
+        key = ("provider", provider_name)
+        value = self._get(key)
+        if value is _MISSING:
+            from aperag.db.ops import db_ops
+
+            value = ProviderInfo.from_model(db_ops.query_llm_provider_by_name(provider_name))
+            self._put(key, value)
+        return value
+
+    def get_model(self, provider_name: str, api: str, model: str) -> Optional[ModelInfo]:
+        key = _model_key(provider_name, api, model)
+        value = self._get(key)
+        if value is _MISSING:
+            from aperag.db.ops import db_ops
+
+            value = ModelInfo.from_model(db_ops.query_llm_provider_model(provider_name, api, model))
+            self._put(key, value)
+        return value
+
+    # Async lookups, for request handlers and flow runners
+
+    async def aget_api_key(
+        self, provider_name: str, user_id: Optional[str] = None, need_public: bool = True
+    ) -> Optional[str]:
+        """API key of a private provider of the user, or of a public provider if need_public"""
+        key = ("api_key", provider_name, user_id, need_public)
+        value = self._get(key)
+        if value is _MISSING:
+            from aperag.db.ops import async_db_ops
+
+            value = await async_db_ops.query_provider_api_key(provider_name, user_id, need_public)
+            self._put(key, value)
+        return value
+
+    async def aget_provider(self, provider_name: str) -> Optional[ProviderInfo]:
+        key = ("provider", provider_name)
+        value = self._get(key)
+        if value is _MISSING:
+            from aperag.db.ops import async_db_ops
+
+            value = ProviderInfo.from_model(await async_db_ops.query_llm_provider_by_name(provider_name))
+            self._put(key, value)
+        return value
+
+    async def aget_model(self, provider_name: str, api: str, model: str) -> Optional[ModelInfo]:
+        key = _model_key(provider_name, api, model)
+        value = self._get(key)
+        if value is _MISSING:
+            from aperag.db.ops import async_db_ops
+
+            value = ModelInfo.from_model(await async_db_ops.query_llm_provider_model(provider_name, api, model))
+            self._put(key, value)
+        return value
+
+    def invalidate(self, provider_name: Optional[str] = None) -> None:
+        """Drop every entry of a provider, or the whole cache if provider_name is None"""
+        with self._lock:
+            if provider_name is None:
+                self._entries.clear()
+                return
+            for key in [key for key in self._entries if key[1] == provider_name]:
+                del self._entries[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits, misses = sum(self._hits.values()), sum(self._misses.values())
+            return {
+                "size": len(self._entries),
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+                "by_kind": {kind: {"hits": self._hits[kind], "misses": self._misses[kind]} for kind in self.KINDS},
+            }
+
+
+provider_config_cache = ProviderConfigCache()
+
+
+def invalidate_provider_config(provider_name: Optional[str] = None) -> None:
+    """Called after writes to providers, their API keys or their models"""
+    provider_config_cache.invalidate(provider_name)
+    logger.debug(f"Invalidated provider config cache for {provider_name or 'all providers'}")
@@ -13,7 +13,7 @@
 # limitations under the License.
 
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from sqlalchemy import and_, func, select
 
@@ -42,6 +42,42 @@ class AsyncDocumentIndexRepositoryMixin(AsyncRepositoryProtocol):
 
         return await self._execute_query(_query)
 
+    async def query_collection_index_versions(self, collection_ids: List[str]) -> Dict[str, str]:
+        """
+        Query a version of the indexes of each collection.
+
+        The version changes whenever an index of a document of the collection is created, rebuilt,
+        fails or is deleted.
+
+        Args:
+            collection_ids: Collection IDs
+
+        Returns:
+            Dict mapping each collection ID to its index version
+        """
+
+        async def _query(session):
+            stmt = (
+                select(
+                    Document.collection_id,
+                    func.count(DocumentIndex.id),
+                    func.coalesce(func.sum(DocumentIndex.version), 0),
+                    func.max(DocumentIndex.gmt_updated),
+                )
+                .join(DocumentIndex, Document.id == DocumentIndex.document_id)
+                .where(Document.collection_id.in_(collection_ids))
+                .group_by(Document.collection_id)
+            )
+            result = await session.execute(stmt)
+
+            versions = {collection_id: "0" for collection_id in collection_ids}
+            for collection_id, index_count, version_sum, last_updated in result.fetchall():
+                updated = last_updated.timestamp() if last_updated else 0
+                versions[collection_id] = f"{index_count}.{version_sum}.{updated}"
+            return versions
+
+        return await self._execute_query(_query)
+
     async def query_documents_with_failed_indexes(
         self, user_id: str, collection_id: str, index_types: Optional[List[DocumentIndexType]] = None
     ) -> List[tuple[str, List[DocumentIndexType]]]:
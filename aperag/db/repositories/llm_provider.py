@@ -22,6 +22,7 @@ from aperag.db.models import (
     ModelServiceProvider,
     ModelServiceProviderStatus,
 )
+from aperag.db.provider_cache import invalidate_provider_config
 from aperag.db.repositories.base import (
     AsyncRepositoryProtocol,
     SyncRepositoryProtocol,
@@ -117,6 +118,13 @@ class LlmProviderRepositoryMixin(SyncRepositoryProtocol):
 
 
 class AsyncLlmProviderRepositoryMixin(AsyncRepositoryProtocol):
+    async def _execute_provider_write(self, operation, provider_name: Optional[str]):
+        """Run a write of provider configuration, then drop the cached lookups of the provider"""
+        try:
+            return await self.execute_with_transaction(operation)
+        finally:
+            invalidate_provider_config(provider_name)
+
     async def query_provider_api_key(self, provider_name: str, user_id: str = None, need_public: bool = True) -> str:
         """Query provider API key with user access control using single SQL JOIN
 
@@ -200,7 +208,7 @@ class AsyncLlmProviderRepositoryMixin(AsyncRepositoryProtocol):
             await session.refresh(msp)
             return msp
 
-        return await self.execute_with_transaction(_operation)
+        return await self._execute_provider_write(_operation, name)
 
     async def delete_msp_by_name(self, name: str):
         """Physical delete model service provider by name"""
@@ -218,7 +226,7 @@ class AsyncLlmProviderRepositoryMixin(AsyncRepositoryProtocol):
                 return True
             return False
 
-        return await self.execute_with_transaction(_operation)
+        return await self._execute_provider_write(_operation, name)
 
     async def delete_msp(self, msp: ModelServiceProvider):
         """Physical delete model service provider"""
@@ -227,7 +235,7 @@ class AsyncLlmProviderRepositoryMixin(AsyncRepositoryProtocol):
             await session.delete(msp)
             await session.flush()
 
-        return await self.execute_with_transaction(_operation)
+        return await self._execute_provider_write(_operation, msp.name)
 
     async def query_msp(self, user: str = None, provider: str = None, filterDeletion: bool = True):
         async def _query(session):
@@ -273,7 +281,7 @@ class AsyncLlmProviderRepositoryMixin(AsyncRepositoryProtocol):
             await session.refresh(msp)
             return msp
 
-        return await self.execute_with_transaction(_operation)
+        return await self._execute_provider_write(_operation, msp.name)
 
     async def upsert_model_service_provider(self, user: str, name: str, api_key: str):
         """Create or update model service provider API key (legacy method)"""
@@ -370,7 +378,7 @@ class AsyncLlmProviderRepositoryMixin(AsyncRepositoryProtocol):
             await session.refresh(provider)
             return provider
 
-        return await self.execute_with_transaction(_operation)
+        return await self._execute_provider_write(_operation, name)
 
     async def update_llm_provider(
         self,
@@ -416,7 +424,7 @@ class AsyncLlmProviderRepositoryMixin(AsyncRepositoryProtocol):
 
             return provider
 
-        return await self.execute_with_transaction(_operation)
+        return await self._execute_provider_write(_operation, name)
 
     async def delete_llm_provider(self, name: str) -> Optional[LLMProvider]:
         """Soft delete LLM provider and its models"""
@@ -448,7 +456,7 @@ class AsyncLlmProviderRepositoryMixin(AsyncRepositoryProtocol):
 
             return provider
 
-        return await self.execute_with_transaction(_operation)
+        return await self._execute_provider_write(_operation, name)
 
     async def restore_llm_provider(self, name: str) -> Optional[LLMProvider]:
         """Restore a soft-deleted LLM provider"""
@@ -479,7 +487,7 @@ class AsyncLlmProviderRepositoryMixin(AsyncRepositoryProtocol):
 
             return provider
 
-        return await self.execute_with_transaction(_operation)
+        return await self._execute_provider_write(_operation, name)
 
     # LLM Provider Model Operations
     async def query_llm_provider_models(self, provider_name: str = None):
@@ -568,7 +576,7 @@ class AsyncLlmProviderRepositoryMixin(AsyncRepositoryProtocol):
             await session.refresh(model_obj)
             return model_obj
 
-        return await self.execute_with_transaction(_operation)
+        return await self._execute_provider_write(_operation, provider_name)
 
     async def update_llm_provider_model(
         self,
@@ -612,7 +620,7 @@ class AsyncLlmProviderRepositoryMixin(AsyncRepositoryProtocol):
 
             return model_obj
 
-        return await self.execute_with_transaction(_operation)
+        return await self._execute_provider_write(_operation, provider_name)
 
     async def delete_llm_provider_model(self, provider_name: str, api: str, model: str) -> Optional[LLMProviderModel]:
         """Soft delete a specific LLM provider model"""
@@ -636,7 +644,7 @@ class AsyncLlmProviderRepositoryMixin(AsyncRepositoryProtocol):
 
             return model_obj
 
-        return await self.execute_with_transaction(_operation)
+        return await self._execute_provider_write(_operation, provider_name)
 
     async def restore_llm_provider_model(self, provider_name: str, api: str, model: str) -> Optional[LLMProviderModel]:
         """Restore a soft-deleted LLM provider model"""
@@ -660,7 +668,7 @@ class AsyncLlmProviderRepositoryMixin(AsyncRepositoryProtocol):
 
             return model_obj
 
-        return await self.execute_with_transaction(_operation)
+        return await self._execute_provider_write(_operation, provider_name)
 
     async def query_available_providers_with_models(self, user_id: str = None, need_public: bool = True):
         """Query available providers with their models in a single optimized query
@@ -782,7 +790,7 @@ class AsyncLlmProviderRepositoryMixin(AsyncRepositoryProtocol):
                     model.gmt_updated = utc_now()
                     session.add(model)
 
-        return await self.execute_with_transaction(_operation)
+        return await self._execute_provider_write(_operation, None)
 
     async def add_tag_to_model(self, provider_name: str, api: str, model: str, tag: str):
         """Add tag to specific model if user can access it"""
@@ -823,7 +831,7 @@ class AsyncLlmProviderRepositoryMixin(AsyncRepositoryProtocol):
                 return True  # Return True whether tag was added or already exists
             return False
 
-        return await self.execute_with_transaction(_operation)
+        return await self._execute_provider_write(_operation, provider_name)
 
     async def find_models_by_tag_in_session(self, session, user_id: str, tag: str) -> List[LLMProviderModel]:
         """Find models with specific tag in existing session"""
@@ -21,10 +21,12 @@ It loads datasets, calls bot APIs, and generates comprehensive reports using Rag
 """
 
 import asyncio
+import hashlib
 import json
 import logging
 import math
 import os
+import time
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional
@@ -48,6 +50,109 @@ logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(level
 logger = logging.getLogger(__name__)
 
 
+class TokenBucket:
+    """Async token-bucket rate limiter shared by all concurrent API workers"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Args:
+            rate: Tokens refilled per second. A non-positive rate disables limiting.
+            capacity: Maximum burst size, defaults to max(1, rate)
+        """
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait until a token is available and consume it"""
+        if self.rate <= 0:
+            return
+
+        # Waiters queue on the lock, so tokens are handed out in FIFO order
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class EvaluationCheckpoint:
+    """Append-only JSONL checkpoint so an interrupted evaluation run can resume
+
+    Each line is either an ``answer`` entry (the bot response for one dataset row)
+    or a ``score`` entry (the Ragas metrics for one dataset row). Entries are keyed
+    by dataset index and validated against the question text on load. Failed answers
+    are recorded too, but not loaded, so a resumed run asks those questions again.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    def load(self, dataset: List[Dict[str, str]]) -> tuple[Dict[int, Dict], Dict[int, Dict]]:
+        """Load successful answers and their scores that still match the dataset"""
+        answers: Dict[int, Dict] = {}
+        scores: Dict[int, Dict] = {}
+        if not self.path.exists():
+            return answers, scores
+
+        with open(self.path, "rb+") as f:
+            # Terminate a partially written last line, so entries appended on resume start a line of their own
+            if f.seek(0, os.SEEK_END) > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    f.write(b"\n")
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A partially written last line from an interrupted run
+                    logger.warning(f"Skipping corrupted checkpoint line in {self.path}")
+                    continue
+
+                index = entry.get("index")
+                if not isinstance(index, int) or index >= len(dataset):
+                    continue
+                if entry.get("question") != dataset[index]["question"]:
+                    continue
+
+                if entry.get("type") == "answer":
+                    # Timeouts, rate limits and outages are retried instead of kept as failures
+                    if entry["result"].get("error"):
+                        continue
+                    answers[index] = entry["result"]
+                elif entry.get("type") == "score":
+                    scores[index] = entry["scores"]
+
+        # Scores are only meaningful for answers we still have
+        scores = {index: row for index, row in scores.items() if index in answers}
+        return answers, scores
+
+    def append(self, entry_type: str, index: int, question: str, payload_key: str, payload: Dict[str, Any]):
+        """Durably append one entry to the checkpoint file"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        entry = {"type": entry_type, "index": index, "question": question, payload_key: payload}
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def remove(self):
+        """Delete the checkpoint after a run completes"""
+        if self.path.exists():
+            self.path.unlink()
+
+
 class EvaluationRunner:
     """Main class for running RAG evaluations"""
 
@@ -224,8 +329,6 @@ class EvaluationRunner:
 
     async def _call_bot_api(self, bot_id: str, question: str) -> Dict[str, Any]:
         """Call bot API and get response with context"""
-        import time
-
         start_time = time.perf_counter()  # Use more precise timing
 
         try:
@@ -337,48 +440,165 @@ class EvaluationRunner:
             logger.error(f"API call error: {error_msg}")
             return {"response": "", "context": [], "error": error_msg, "response_time": response_time}
 
-    async def _process_dataset(self, bot_id: str, df: pd.DataFrame) -> List[Dict[str, Any]]:
-        """Process dataset and get bot responses"""
-        results = []
-        total = len(df)
-
-        # Get advanced settings
+    def _get_checkpoint(self, task_config: Dict[str, Any]) -> Optional[EvaluationCheckpoint]:
+        """Build the checkpoint for a task, or None if checkpointing is disabled"""
         advanced_config = self.config.get("advanced", {})
-        request_delay = advanced_config.get("request_delay", 0)
+        if not advanced_config.get("checkpoint", True):
+            return None
 
-        for idx, row in df.iterrows():
-            question = row["question"]
-            ground_truth = row["answer"]
+        checkpoint_dir = Path(advanced_config.get("checkpoint_dir") or task_config["report_dir"])
+        key = f"{task_config['task_name']}|{task_config['bot_id']}|{task_config['dataset_path']}"
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+        return EvaluationCheckpoint(checkpoint_dir / f"checkpoint_{task_config['bot_id']}_{digest}.jsonl")
+
+    def _get_rate_limit(self, advanced_config: Dict[str, Any]) -> tuple[float, Optional[float]]:
+        """Requests per second and burst of the bot API rate limit
+
+        The legacy ``request_delay`` (seconds between requests) is honoured as a rate of
+        one request per delay without bursts, unless ``requests_per_second`` is set.
+        """
+        if advanced_config.get("requests_per_second") is not None:
+            requests_per_second = float(advanced_config["requests_per_second"] or 0)
+            return requests_per_second, advanced_config.get("rate_limit_burst")
+
+        request_delay = float(advanced_config.get("request_delay", 0) or 0)
+        if request_delay < 0:
+            raise ValueError(f"advanced.request_delay must not be negative, got {request_delay}")
+        if request_delay == 0:
+            return 0.0, None
+        return 1 / request_delay, advanced_config.get("rate_limit_burst", 1)
+
+    async def _process_dataset(
+        self,
+        bot_id: str,
+        dataset: List[Dict[str, str]],
+        metrics: List[str],
+        checkpoint: Optional[EvaluationCheckpoint] = None,
+    ) -> tuple[List[Dict[str, Any]], Optional[List[Dict]]]:
+        """Get bot responses concurrently and score them with Ragas as they arrive
+
+        Questions are answered by ``max_concurrency`` workers sharing a token-bucket
+        rate limit. Completed answers are fed to a scoring worker which runs Ragas in
+        batches of ``scoring_batch_size`` while the remaining questions are still being
+        answered. Every answer and every score is written to the checkpoint, so an
+        interrupted run only redoes the work that was in flight.
+
+        Returns:
+            The answer records in dataset order, and the Ragas rows (or None if no
+            question could be scored)
+        """
+        advanced_config = self.config.get("advanced", {})
+        max_concurrency = max(1, int(advanced_config.get("max_concurrency", advanced_config.get("batch_size", 5))))
+        requests_per_second, rate_limit_burst = self._get_rate_limit(advanced_config)
+        scoring_batch_size = max(1, int(advanced_config.get("scoring_batch_size", 20)))
+
+        total = len(dataset)
+        results: List[Optional[Dict[str, Any]]] = [None] * total
+        scores: Dict[int, Dict] = {}
+
+        if checkpoint:
+            answers, scores = checkpoint.load(dataset)
+            for index, result in answers.items():
+                results[index] = result
+            if answers:
+                logger.info(
+                    f"Resuming from checkpoint {checkpoint.path}: {len(answers)}/{total} answered, {len(scores)} scored"
+                )
 
-            logger.info(f"Processing question {idx + 1}/{total}: {question[:50]}...")
+        bucket = TokenBucket(requests_per_second, rate_limit_burst)
+        pending: asyncio.Queue = asyncio.Queue()
+        for index in range(total):
+            if results[index] is None:
+                pending.put_nowait(index)
 
-            # Call bot API
-            api_result = await self._call_bot_api(bot_id, question)
+        score_queue: Optional[asyncio.Queue] = asyncio.Queue() if metrics else None
+        if score_queue is not None:
+            # Answers restored from the checkpoint that were never scored
+            for index, result in enumerate(results):
+                if result is not None and index not in scores:
+                    score_queue.put_nowait(index)
 
-            # Log response time
-            response_time = api_result.get("response_time", 0)
-            if api_result.get("error"):
-                logger.info(f"Question {idx + 1}/{total} failed in {response_time:.2f}s: {api_result.get('error')}")
-            else:
-                logger.info(f"Question {idx + 1}/{total} completed in {response_time:.2f}s")
-
-            # Build result record
-            result = {
-                "question": question,
-                "ground_truth": ground_truth,
-                "response": api_result.get("response", ""),
-                "context": api_result.get("context", []),  # Keep as parsed object/list
-                "error": api_result.get("error"),
-                "response_time": response_time,
-            }
+        completed = total - pending.qsize()
 
-            results.append(result)
-
-            # Add delay between requests if configured
-            if request_delay > 0:
-                await asyncio.sleep(request_delay)
-
-        return results
+        async def answer_worker():
+            nonlocal completed
+            while True:
+                try:
+                    index = pending.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+
+                item = dataset[index]
+                await bucket.acquire()
+                api_result = await self._call_bot_api(bot_id, item["question"])
+
+                result = {
+                    "question": item["question"],
+                    "ground_truth": item["answer"],
+                    "response": api_result.get("response", ""),
+                    "context": api_result.get("context", []),  # Keep as parsed object/list
+                    "error": api_result.get("error"),
+                    "response_time": api_result.get("response_time", 0),
+                }
+                results[index] = result
+                if checkpoint:
+                    checkpoint.append("answer", index, item["question"], "result", result)
+                if score_queue is not None:
+                    score_queue.put_nowait(index)
+
+                completed += 1
+                response_time = result["response_time"]
+                if result["error"]:
+                    logger.info(f"Question {completed}/{total} failed in {response_time:.2f}s: {result['error']}")
+                else:
+                    logger.info(f"Question {completed}/{total} completed in {response_time:.2f}s")
+
+        async def score_batch(indexes: List[int]):
+            # Failed answers are not sent to Ragas, mirroring _prepare_ragas_dataset
+            valid = [i for i in indexes if not results[i].get("error") and results[i].get("response")]
+            if not valid:
+                return
+            rows = await self._run_ragas_evaluation([results[i] for i in valid], metrics)
+            if not rows or len(rows) != len(valid):
+                logger.warning(f"Ragas returned no usable scores for a batch of {len(valid)} answers")
+                return
+            for index, row in zip(valid, rows):
+                scores[index] = row
+                if checkpoint:
+                    checkpoint.append("score", index, results[index]["question"], "scores", row)
+            logger.info(f"Scored {len(scores)}/{total} answers")
+
+        async def scoring_worker():
+            batch: List[int] = []
+            while True:
+                index = await score_queue.get()
+                if index is None:
+                    break
+                batch.append(index)
+                if len(batch) >= scoring_batch_size:
+                    await score_batch(batch)
+                    batch = []
+            if batch:
+                await score_batch(batch)
+
+        logger.info(
+            f"Answering {pending.qsize()} questions with concurrency {max_concurrency}"
+            + (f" at {requests_per_second} req/s" if requests_per_second > 0 else "")
+        )
+        scorer = asyncio.create_task(scoring_worker()) if score_queue is not None else None
+        try:
+            await asyncio.gather(*(answer_worker() for _ in range(min(max_concurrency, max(1, pending.qsize())))))
+        except BaseException:
+            # Everything finished so far is already checkpointed
+            if scorer is not None:
+                scorer.cancel()
+            raise
+        if scorer is not None:
+            score_queue.put_nowait(None)
+            await scorer
+
+        ragas_results = [scores[index] for index in range(total) if index in scores]
+        return [result for result in results if result is not None], ragas_results or None
 
     def _prepare_ragas_dataset(self, results: List[Dict]) -> Dataset:
         """Prepare dataset for Ragas evaluation"""
@@ -863,7 +1083,8 @@ Ragas (Retrieval Augmented Generation Assessment) is a framework specifically de
             logger.info("Starting Ragas evaluation...")
             if self.embeddings_for_eval is not None:
                 # Use both LLM and embeddings
-                eval_results = evaluate(
+                eval_results = await asyncio.to_thread(
+                    evaluate,
                     dataset=ragas_dataset,
                     metrics=ragas_metrics,
                     llm=self.llm_for_eval,
@@ -873,8 +1094,12 @@ Ragas (Retrieval Augmented Generation Assessment) is a framework specifically de
             else:
                 # Use only LLM, skip embedding-based metrics
                 logger.info("Using LLM-only evaluation (no embeddings available)")
-                eval_results = evaluate(
-                    dataset=ragas_dataset, metrics=ragas_metrics, llm=self.llm_for_eval, raise_exceptions=False
+                eval_results = await asyncio.to_thread(
+                    evaluate,
+                    dataset=ragas_dataset,
+                    metrics=ragas_metrics,
+                    llm=self.llm_for_eval,
+                    raise_exceptions=False,
                 )
             logger.info("Ragas evaluation completed successfully")
 
@@ -1070,43 +1295,10 @@ Ragas (Retrieval Augmented Generation Assessment) is a framework specifically de
         dataset = self._load_dataset(dataset_path, max_samples)
         logger.info(f"Loaded {len(dataset)} samples from dataset")
 
-        # Process questions
+        # Process questions, scoring answers with Ragas while the rest are still in flight
         logger.info(f"Processing {len(dataset)} questions with bot {bot_id}")
-
-        # Get advanced config for batch processing and delays
-        advanced_config = self.config.get("advanced", {})
-        batch_size = advanced_config.get("batch_size", 5)
-        request_delay = advanced_config.get("request_delay", 1)
-
-        results = []
-        for i in range(0, len(dataset), batch_size):
-            batch = dataset[i : i + batch_size]
-            batch_tasks = [self._call_bot_api(bot_id, item["question"]) for item in batch]
-            batch_results = await asyncio.gather(*batch_tasks)
-
-            for j, result in enumerate(batch_results):
-                item = batch[j]
-                results.append(
-                    {
-                        "question": item["question"],
-                        "ground_truth": item["answer"],
-                        "response": result["response"],
-                        "context": result["context"],
-                        "response_time": result.get("response_time", 0),
-                        "error": result.get("error"),
-                    }
-                )
-
-            logger.info(f"Processed {min(i + batch_size, len(dataset))}/{len(dataset)} questions")
-
-            # Add delay between batches to respect rate limits
-            if i + batch_size < len(dataset) and request_delay > 0:
-                logger.debug(f"Waiting {request_delay} seconds before next batch...")
-                await asyncio.sleep(request_delay)
-
-        # Run Ragas evaluation
-        logger.info("Running Ragas evaluation")
-        ragas_results = await self._run_ragas_evaluation(results, metrics)
+        checkpoint = self._get_checkpoint(task_config)
+        results, ragas_results = await self._process_dataset(bot_id, dataset, metrics, checkpoint)
 
         # Generate reports
         logger.info(f"Saving results to {report_dir}")
@@ -1115,6 +1307,10 @@ Ragas (Retrieval Augmented Generation Assessment) is a framework specifically de
             task_name, bot_id, dataset_path, timestamp, results, ragas_results, Path(report_dir)
         )
 
+        # Reports are written, a rerun of this task should start from scratch
+        if checkpoint and not self.config.get("advanced", {}).get("keep_checkpoint", False):
+            checkpoint.remove()
+
         logger.info(f"Evaluation task completed: {task_name}")
         return {"task_name": task_name, "results": results, "ragas_results": ragas_results}
 
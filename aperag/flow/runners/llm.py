@@ -12,7 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import base64
+import asyncio
 import json
 import logging
 import uuid
@@ -23,16 +23,19 @@ from typing import Any, Dict, List, Optional, Tuple
 from litellm import BaseModel
 from pydantic import Field
 
+from aperag.config import settings
 from aperag.db.models import APIType
 from aperag.db.ops import async_db_ops
+from aperag.db.provider_cache import provider_config_cache
 from aperag.flow.base.models import BaseNodeRunner, SystemInput, register_node_runner
 from aperag.llm.completion.completion_service import CompletionService
+from aperag.llm.completion.image_attachment import ImageAsset, ImageAttachmentLoader
 from aperag.llm.llm_error_types import InvalidConfigurationError
-from aperag.objectstore.base import get_async_object_store
+from aperag.query.context_packer import get_context_packer
 from aperag.query.query import DocumentWithScore
 from aperag.schema.view_models import Reference
 from aperag.utils.constant import DOC_QA_REFERENCES
-from aperag.utils.history import BaseChatMessageHistory
+from aperag.utils.history import BaseChatMessageHistory, write_history_in_background
 
 logger = logging.getLogger(__name__)
 
@@ -49,6 +52,9 @@ FALLBACK_MAX_CONTEXT_LENGTH = 50000
 # Max images to feed to LLM
 MAX_IMAGES_PER_QUERY = 5
 
+# Share of the input limit used for the prompt, the default tokenizer may count fewer tokens than the model's
+CONTEXT_TOKEN_SAFETY_RATIO = 0.95
+
 
 def _make_json_serializable(value: Any):
     """Recursively convert values (e.g. datetime, Decimal) into JSON-safe types."""
@@ -121,7 +127,7 @@ async def calculate_model_token_limits(
     """
     # Get model configuration to determine token limits
     try:
-        model_config = await async_db_ops.query_llm_provider_model(
+        model_config = await provider_config_cache.aget_model(
             provider_name=model_service_provider, api=APIType.COMPLETION.value, model=model_name
         )
         if model_config:
@@ -170,7 +176,7 @@ async def is_vision_model(
     model_name: str,
 ) -> bool:
     try:
-        model_config = await async_db_ops.query_llm_provider_model(
+        model_config = await provider_config_cache.aget_model(
             provider_name=model_service_provider, api=APIType.COMPLETION.value, model=model_name
         )
         if model_config:
@@ -194,6 +200,48 @@ class LLMService:
     def __init__(self, repository: LLMRepository):
         self.repository = repository
 
+    async def _load_images(self, user, image_docs: List[DocumentWithScore], references: List[Reference]) -> List[str]:
+        """Fetch the image assets of the docs as data URIs, and add a reference for each one attached"""
+        docs_with_assets = [
+            doc
+            for doc in image_docs
+            if all(doc.metadata.get(key) for key in ("asset_id", "mimetype", "collection_id", "document_id"))
+        ]
+        document_keys = list(
+            dict.fromkeys((doc.metadata["collection_id"], doc.metadata["document_id"]) for doc in docs_with_assets)
+        )
+
+        async def get_base_path(coll_id: str, doc_id: str) -> Optional[str]:
+            try:
+                doc = await async_db_ops.query_document(user=user, collection_id=coll_id, document_id=doc_id)
+            except Exception as e:
+                logger.error(f"Failed to query document {doc_id}: {e}", exc_info=True)
+                return None
+            if not doc:
+                logger.warning(f"Document not found for collection_id={coll_id}, document_id={doc_id}")
+                return None
+            return doc.object_store_base_path()
+
+        base_paths = dict(zip(document_keys, await asyncio.gather(*(get_base_path(*key) for key in document_keys))))
+
+        assets: List[ImageAsset] = []
+        asset_docs: List[DocumentWithScore] = []
+        for doc in docs_with_assets:
+            base_path = base_paths[(doc.metadata["collection_id"], doc.metadata["document_id"])]
+            if base_path:
+                assets.append(ImageAsset(f"{base_path}/assets/{doc.metadata['asset_id']}", doc.metadata["mimetype"]))
+                asset_docs.append(doc)
+
+        loaded = await ImageAttachmentLoader().load_many(
+            assets, MAX_IMAGES_PER_QUERY, byte_budget=settings.vision_image_byte_budget
+        )
+        images = []
+        for index, image_uri in loaded:
+            doc = asset_docs[index]
+            images.append(image_uri)
+            references.append(Reference(text=doc.text, image_uri=image_uri, metadata=doc.metadata, score=doc.score))
+        return images
+
     async def generate_response(
         self,
         user,
@@ -208,14 +256,14 @@ class LLMService:
         docs: Optional[List[DocumentWithScore]] = None,
     ) -> Tuple[str, Dict]:
         """Generate LLM response with given parameters"""
-        api_key = await async_db_ops.query_provider_api_key(model_service_provider, user)
+        api_key = await provider_config_cache.aget_api_key(model_service_provider, user)
         if not api_key:
             raise InvalidConfigurationError(
                 "api_key", None, f"API KEY not found for LLM Provider: {model_service_provider}"
             )
 
         try:
-            llm_provider = await async_db_ops.query_llm_provider_by_name(model_service_provider)
+            llm_provider = await provider_config_cache.aget_provider(model_service_provider)
             base_url = llm_provider.base_url
         except Exception:
             raise Exception(f"LLMProvider {model_service_provider} not found")
@@ -229,7 +277,14 @@ class LLMService:
         vision_model = await is_vision_model(model_service_provider, model_name)
 
         # Build context and references from documents
-        max_input_chars = max_input_tokens * TOKEN_TO_CHAR_RATIO
+        packer = get_context_packer()
+        prompt_overhead_tokens = packer.count_tokens(prompt_template) + packer.count_tokens(query)
+        context_budget = int(max_input_tokens * CONTEXT_TOKEN_SAFETY_RATIO) - prompt_overhead_tokens
+        if context_budget < 0:
+            raise Exception(
+                f"Prompt requires {prompt_overhead_tokens} tokens without context, which exceeds the calculated "
+                f"input limit of {max_input_tokens} tokens"
+            )
         context = ""
         references: List[Reference] = []
         image_docs: List[DocumentWithScore] = []
@@ -250,73 +305,27 @@ class LLMService:
                                 metadata += "Page: " + str(int(doc.metadata["page_idx"]) + 1) + "\n"
 
                             doc.text = f"\n------ IMAGE DESCRIPTION BEGIN ------ \n{metadata}Description:\n{doc.text}\n------ IMAGE DESCRIPTION END ------\n"
+                            # The token count from indexing doesn't cover the wrapper
+                            doc.metadata.pop("tokens", None)
                             text_docs.append(doc)
                 else:
                     text_docs.append(doc)
 
-            for doc in text_docs:
-                # Estimate final prompt length: template + query + current context + new doc
-                estimated_prompt_length = len(prompt_template) + len(query) + len(context) + len(doc.text)
-                if estimated_prompt_length > max_input_chars:
-                    break
+            packed = packer.pack(text_docs, context_budget, trim_tail=settings.llm_context_trim_tail)
+            if packed.dropped or packed.duplicates:
+                logger.info(
+                    f"Packed {len(packed.docs)} of {len(text_docs)} documents into {packed.tokens} context tokens, "
+                    f"dropped {packed.dropped}, skipped {packed.duplicates} duplicates, trimmed: {packed.trimmed}"
+                )
+            for doc in packed.docs:
                 context += doc.text
-                ref_obj = Reference(text=doc.text, metadata=doc.metadata, score=doc.score)
-                references.append(ref_obj)
+                references.append(Reference(text=doc.text, metadata=doc.metadata, score=doc.score))
 
         prompt = prompt_template.format(query=query, context=context)
-        if len(prompt) > max_input_chars:
-            raise Exception(
-                f"Prompt requires {len(prompt)} characters, which exceeds the calculated "
-                f"input limit of {max_input_chars} characters"
-            )
 
         images = []
         if vision_model and image_docs:
-            base_path_cache: Dict[Tuple[str, str], str] = {}
-            object_store = get_async_object_store()
-            for doc_with_score in image_docs:
-                asset_id = doc_with_score.metadata.get("asset_id", None)
-                mime_type = doc_with_score.metadata.get("mimetype", None)
-                coll_id = doc_with_score.metadata.get("collection_id", None)
-                doc_id = doc_with_score.metadata.get("document_id", None)
-                if not (asset_id and mime_type and coll_id and doc_id):
-                    continue
-
-                try:
-                    cache_key = (coll_id, doc_id)
-                    if cache_key in base_path_cache:
-                        base_path = base_path_cache[cache_key]
-                    else:
-                        doc = await async_db_ops.query_document(user=user, collection_id=coll_id, document_id=doc_id)
-                        if not doc:
-                            logger.warning(f"Document not found for collection_id={coll_id}, document_id={doc_id}")
-                            continue
-                        base_path = doc.object_store_base_path()
-                        base_path_cache[cache_key] = base_path
-
-                    asset_path = f"{base_path}/assets/{asset_id}"
-                    image_stream_tuple = await object_store.get(asset_path)
-                    if not image_stream_tuple:
-                        logger.warning(f"Image not found in object store at path: {asset_path}")
-                        continue
-
-                    image_stream, _ = image_stream_tuple
-                    image_bytes = b"".join([chunk async for chunk in image_stream])
-                    encoded_string = base64.b64encode(image_bytes).decode("utf-8")
-                    image_uri = f"data:{mime_type};base64,{encoded_string}"
-                    images.append(image_uri)
-                    ref_obj = Reference(
-                        text=doc_with_score.text,
-                        image_uri=image_uri,
-                        metadata=doc_with_score.metadata,
-                        score=doc_with_score.score,
-                    )
-                    references.append(ref_obj)
-
-                    if len(images) > MAX_IMAGES_PER_QUERY:
-                        break
-                except Exception as e:
-                    logger.error(f"Failed to process image asset {asset_id}: {e}", exc_info=True)
+            images = await self._load_images(user, image_docs, references)
 
         cs = CompletionService(
             custom_llm_provider, model_name, base_url, api_key, temperature, max_output_tokens, vision=vision_model
@@ -326,19 +335,24 @@ class LLMService:
         references = _make_json_serializable([ref.model_dump() for ref in references]) if references else []
 
         async def async_generator():
-            response = ""
+            chunks = []
             async for chunk in cs.agenerate_stream([], prompt, images, False):
                 if not chunk:
                     continue
                 yield chunk
-                response += chunk
+                chunks.append(chunk)
 
             if references:
                 yield DOC_QA_REFERENCES + json.dumps(references)
 
             if history:
-                await add_human_message(history, query, message_id)
-                await add_ai_message(history, query, message_id, response, references, [])
+                # Persist in the background, the stream ends and the client gets its end event right away
+                response = "".join(chunks)
+                write_history_in_background(
+                    lambda: add_human_message(history, query, message_id),
+                    lambda: add_ai_message(history, query, message_id, response, references, []),
+                    description=f"history of message {message_id}",
+                )
 
         return "", {"async_generator": async_generator}
 
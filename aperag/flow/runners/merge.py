@@ -12,18 +12,23 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
 from pydantic import BaseModel, Field
 
 from aperag.flow.base.exceptions import ValidationError
 from aperag.flow.base.models import BaseNodeRunner, SystemInput, register_node_runner
+from aperag.query.fusion import DEFAULT_RRF_K, FUSION_STRATEGIES, fuse
 from aperag.query.query import DocumentWithScore
 
 
 class MergeInput(BaseModel):
-    merge_strategy: str = Field("union", description="How to merge results")
+    merge_strategy: str = Field("union", description="How to merge results: union, rrf, minmax or zscore")
     deduplicate: bool = Field(True, description="Whether to deduplicate merged results")
+    source_weights: Optional[Dict[str, float]] = Field(
+        default=None, description="Fusion weight of each source: vector, fulltext, graph, summary and vision"
+    )
+    rrf_k: int = Field(DEFAULT_RRF_K, description="Rank constant of reciprocal rank fusion")
     vector_search_docs: Optional[List[DocumentWithScore]] = Field(
         default_factory=list, description="Vector search docs"
     )
@@ -54,24 +59,22 @@ class MergeNodeRunner(BaseNodeRunner):
         Run merge node. ui: user input; si: system input (SystemInput).
         Returns (output, system_output)
         """
-        docs_a: List[DocumentWithScore] = ui.vector_search_docs or []
-        docs_b: List[DocumentWithScore] = ui.fulltext_search_docs or []
-        docs_c: List[DocumentWithScore] = ui.graph_search_docs or []
-        docs_d: List[DocumentWithScore] = ui.summary_search_docs or []
-        docs_e: List[DocumentWithScore] = ui.vision_search_docs or []
         merge_strategy: str = ui.merge_strategy
-        deduplicate: bool = ui.deduplicate
-
-        if merge_strategy not in ["union"]:
+        if merge_strategy not in FUSION_STRATEGIES:
             raise ValidationError(f"Unknown merge strategy: {merge_strategy}")
 
-        all_docs = docs_a + docs_b + docs_c + docs_d + docs_e
-        if deduplicate:
-            seen = set()
-            unique_docs = []
-            for doc in all_docs:
-                if doc.text not in seen:
-                    seen.add(doc.text)
-                    unique_docs.append(doc)
-            return MergeOutput(docs=unique_docs), {}
-        return MergeOutput(docs=all_docs), {}
+        ranked_lists = {
+            "vector": ui.vector_search_docs or [],
+            "fulltext": ui.fulltext_search_docs or [],
+            "graph": ui.graph_search_docs or [],
+            "summary": ui.summary_search_docs or [],
+            "vision": ui.vision_search_docs or [],
+        }
+        docs = fuse(
+            ranked_lists,
+            strategy=merge_strategy,
+            weights=ui.source_weights,
+            rrf_k=ui.rrf_k,
+            deduplicate=ui.deduplicate,
+        )
+        return MergeOutput(docs=docs), {}
@@ -17,14 +17,16 @@ from typing import List, Optional, Tuple
 
 from pydantic import BaseModel, Field
 
-from aperag.db.ops import async_db_ops
+from aperag.db.provider_cache import provider_config_cache
 from aperag.flow.base.models import BaseNodeRunner, SystemInput, register_node_runner
 from aperag.llm.llm_error_types import (
     InvalidConfigurationError,
     ProviderNotFoundError,
     RerankError,
 )
+from aperag.llm.rerank.local_cross_encoder import is_local_rerank_provider
 from aperag.llm.rerank.rerank_service import RerankService
+from aperag.query.fusion import is_fused
 from aperag.query.query import DocumentWithScore
 
 logger = logging.getLogger(__name__)
@@ -126,26 +128,11 @@ class RerankNodeRunner(BaseNodeRunner):
                 "custom_llm_provider", ui.custom_llm_provider, "Custom LLM provider cannot be empty"
             )
 
-        # Get API key and base_url
-        api_key = await async_db_ops.query_provider_api_key(ui.model_service_provider, si.user)
-        if not api_key:
-            raise InvalidConfigurationError(
-                "api_key", api_key, f"API KEY not found for LLM Provider:{ui.model_service_provider}"
-            )
-
-        try:
-            llm_provider = await async_db_ops.query_llm_provider_by_name(ui.model_service_provider)
-            if not llm_provider:
-                raise ProviderNotFoundError(ui.model_service_provider, "Rerank")
-            base_url = llm_provider.base_url
-        except Exception as e:
-            logger.error(f"Failed to query LLM provider '{ui.model_service_provider}': {str(e)}")
-            raise ProviderNotFoundError(ui.model_service_provider, "Rerank") from e
-
-        if not base_url:
-            raise InvalidConfigurationError(
-                "base_url", base_url, f"Base URL not configured for provider '{ui.model_service_provider}'"
-            )
+        if is_local_rerank_provider(ui.custom_llm_provider):
+            # Local cross-encoders need neither an API key nor an endpoint
+            api_key, base_url = None, None
+        else:
+            api_key, base_url = await self._get_provider_credentials(ui, si)
 
         # Create and execute rerank service
         rerank_service = RerankService(
@@ -164,15 +151,44 @@ class RerankNodeRunner(BaseNodeRunner):
 
         return await rerank_service.async_rerank(query, docs)
 
+    async def _get_provider_credentials(self, ui: RerankInput, si: SystemInput) -> Tuple[str, str]:
+        """API key and base URL of the model service provider"""
+        api_key = await provider_config_cache.aget_api_key(ui.model_service_provider, si.user)
+        if not api_key:
+            raise InvalidConfigurationError(
+                "api_key", api_key, f"API KEY not found for LLM Provider:{ui.model_service_provider}"
+            )
+
+        try:
+            llm_provider = await provider_config_cache.aget_provider(ui.model_service_provider)
+            if not llm_provider:
+                raise ProviderNotFoundError(ui.model_service_provider, "Rerank")
+            base_url = llm_provider.base_url
+        except Exception as e:
+            logger.error(f"Failed to query LLM provider '{ui.model_service_provider}': {str(e)}")
+            raise ProviderNotFoundError(ui.model_service_provider, "Rerank") from e
+
+        if not base_url:
+            raise InvalidConfigurationError(
+                "base_url", base_url, f"Base URL not configured for provider '{ui.model_service_provider}'"
+            )
+        return api_key, base_url
+
     def _apply_fallback_strategy(self, docs: List[DocumentWithScore]) -> List[DocumentWithScore]:
         """
         Apply fallback rerank strategy:
         1. Graph search results first (better quality, typically 1 result)
         2. Sort remaining vector and fulltext results by score in descending order
+
+        Docs fused by the merge node are already ranked on a common scale and are kept as they are.
         """
         if not docs:
             return docs
 
+        if is_fused(docs):
+            logger.info(f"Applied fallback rerank strategy: kept the fused ranking of {len(docs)} results")
+            return docs
+
         graph_results = []
         other_results = []
 
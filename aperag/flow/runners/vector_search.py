@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
 import json
 import logging
 from typing import List, Optional, Tuple
@@ -24,6 +25,7 @@ from aperag.db.models import Collection
 from aperag.db.ops import async_db_ops
 from aperag.flow.base.models import BaseNodeRunner, SystemInput, register_node_runner
 from aperag.llm.embed.base_embedding import get_collection_embedding_service_sync
+from aperag.llm.embed.embedding_service import embed_query_shared
 from aperag.llm.llm_error_types import (
     EmbeddingError,
     ProviderNotFoundError,
@@ -82,15 +84,16 @@ class VectorSearchService:
 
         try:
             collection_name = generate_vector_db_collection_name(collection.id)
-            embedding_model, vector_size = get_collection_embedding_service_sync(collection)
+            embedding_model, vector_size = await asyncio.to_thread(get_collection_embedding_service_sync, collection)
             vectordb_ctx = json.loads(settings.vector_db_context)
             vectordb_ctx["collection"] = collection_name
             context_manager = ContextManager(collection_name, embedding_model, settings.vector_db_type, vectordb_ctx)
 
-            vector = embedding_model.embed_query(query)
+            vector = await embed_query_shared(embedding_model, query)
 
             # Query vector database for vector and vision indexes only (excluding summary)
-            results = context_manager.query(
+            results = await asyncio.to_thread(
+                context_manager.query,
                 query,
                 score_threshold=similarity_threshold,
                 topk=top_k,
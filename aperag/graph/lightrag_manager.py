@@ -20,7 +20,7 @@ from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 import numpy
 
 from aperag.db.models import Collection
-from aperag.db.ops import db_ops
+from aperag.db.provider_cache import provider_config_cache
 from aperag.graph.lightrag import LightRAG
 from aperag.graph.lightrag.prompt import PROMPTS
 from aperag.graph.lightrag.utils import EmbeddingFunc
@@ -30,6 +30,7 @@ from aperag.llm.llm_error_types import (
     ProviderNotFoundError,
 )
 from aperag.schema.utils import parseCollectionConfig
+from aperag.tasks.worker_loop import run_in_worker_loop
 
 logger = logging.getLogger(__name__)
 
@@ -129,37 +130,45 @@ async def create_lightrag_instance(collection: Collection) -> LightRAG:
 def process_document_for_celery(collection: Collection, content: str, doc_id: str, file_path: str) -> Dict[str, Any]:
     """
     Process a document in a synchronous context (for Celery).
-    Creates a new event loop and LightRAG instance for each call.
+    Runs on the event loop of the worker process, with a new LightRAG instance for each call.
     """
-    return _run_in_new_loop(_process_document_async(collection, content, doc_id, file_path))
+    return run_in_worker_loop(_process_document_async(collection, content, doc_id, file_path))
 
 
 def delete_document_for_celery(collection: Collection, doc_id: str) -> Dict[str, Any]:
     """
     Delete a document in a synchronous context (for Celery).
-    Creates a new event loop and LightRAG instance for each call.
+    Runs on the event loop of the worker process, with a new LightRAG instance for each call.
     """
-    return _run_in_new_loop(_delete_document_async(collection, doc_id))
+    return run_in_worker_loop(_delete_document_async(collection, doc_id))
 
 
 async def _enrich_content_with_vision_analysis(
     collection: Collection,
     doc_id: str,
-    max_wait_time: int | None = 3600,
-    check_interval: int = 2,
 ) -> str:
     """
     Enrich empty content with vision analysis text from vision index.
 
-    This function will wait for Vision index to complete if it's still in progress,
-    ensuring that Vision-to-Text content is available for knowledge graph construction.
+    The index row and the vector store are read with sync clients, so this runs in a thread
+    instead of blocking the worker event loop shared by every task of the process.
+    """
+    return await asyncio.to_thread(_read_vision_analysis, collection, doc_id)
+
+
+def _read_vision_analysis(
+    collection: Collection,
+    doc_id: str,
+) -> str:
+    """
+    Read the vision analysis text of a document from its vision index.
+
+    The index workflow only starts GRAPH indexing once the Vision index has settled (see
+    config.celery_tasks), so the Vision index is read as it is, without waiting for it.
 
     Args:
         collection: Collection object
         doc_id: Document ID
-        max_wait_time: Maximum time to wait for Vision index to complete (seconds).
-                      If None, will wait indefinitely until Vision index completes.
-        check_interval: Interval between status checks (seconds)
 
     Returns:
         Enriched content string, or empty string if no vision analysis found
@@ -171,114 +180,57 @@ async def _enrich_content_with_vision_analysis(
         from aperag.utils.utils import generate_vector_db_collection_name
         from sqlalchemy import select, and_
         import json
-        import asyncio
 
-        # Get vision index data with retry mechanism
         vision_chunks_text = []
-        waited_time = 0
-
-        vision_ready = False
-        # Wait indefinitely if max_wait_time is None, otherwise respect the timeout
-        while (max_wait_time is None or waited_time < max_wait_time) and not vision_ready:
-            for session in get_sync_session():
-                stmt = select(DocumentIndex).where(
-                    and_(
-                        DocumentIndex.document_id == doc_id,
-                        DocumentIndex.index_type == DocumentIndexType.VISION
-                    )
-                )
-                result = session.execute(stmt)
-                doc_index = result.scalar_one_or_none()
+        ctx_ids = []
 
-                if not doc_index:
-                    if waited_time == 0:
-                        logger.debug(
-                            f"No vision index found for document {doc_id}")
-                    else:
-                        logger.debug(
-                            f"Vision index not found for document {doc_id} after waiting {waited_time}s")
-                    return ""
-
-                # Check if Vision index is still in progress
-                status_str = doc_index.status.value if hasattr(
-                    doc_index.status, 'value') else str(doc_index.status)
-
-                if doc_index.status in [DocumentIndexStatus.PENDING, DocumentIndexStatus.CREATING]:
-                    # Log every 10 seconds or on first check
-                    if waited_time == 0 or waited_time % 10 == 0:
-                        if max_wait_time is None:
-                            logger.info(
-                                f"Vision index for document {doc_id} is still in progress ({status_str}), "
-                                f"waited {waited_time}s, continuing to wait indefinitely...")
-                        else:
-                            logger.info(
-                                f"Vision index for document {doc_id} is still in progress ({status_str}), "
-                                f"waited {waited_time}s / {max_wait_time}s, continuing to wait...")
-                    await asyncio.sleep(check_interval)
-                    waited_time += check_interval
-                    break  # Break inner loop to retry
-
-                # Vision index is complete (or failed/skipped)
-                logger.info(
-                    f"Vision index for document {doc_id} status check: {status_str} "
-                    f"(waited {waited_time}s)")
-
-                if status_str == DocumentIndexStatus.FAILED.value or status_str == "FAILED":
-                    logger.warning(
-                        f"Vision index for document {doc_id} failed, cannot enrich content")
-                    return ""
+        for session in get_sync_session():
+            stmt = select(DocumentIndex).where(
+                and_(
+                    DocumentIndex.document_id == doc_id,
+                    DocumentIndex.index_type == DocumentIndexType.VISION
+                )
+            )
+            result = session.execute(stmt)
+            doc_index = result.scalar_one_or_none()
 
-                # SKIPPED status doesn't exist in DocumentIndexStatus enum, but check for it anyway
-                if status_str == "SKIPPED":
-                    logger.debug(
-                        f"Vision index for document {doc_id} was skipped")
-                    return ""
+            if not doc_index:
+                logger.debug(
+                    f"No vision index found for document {doc_id}")
+                return ""
 
-                # Vision index is complete, check if it has data
-                logger.info(
-                    f"Vision index for document {doc_id} completed with status {status_str}, "
-                    f"checking for index data...")
+            status_str = doc_index.status.value if hasattr(
+                doc_index.status, 'value') else str(doc_index.status)
 
-                if not doc_index.index_data:
-                    logger.debug(
-                        f"Vision index for document {doc_id} completed but has no data")
-                    return ""
+            if doc_index.status in [DocumentIndexStatus.PENDING, DocumentIndexStatus.CREATING]:
+                logger.warning(
+                    f"Vision index for document {doc_id} is still in progress ({status_str}), "
+                    f"building graph without vision content")
+                return ""
 
-                # Vision index is complete and has data, proceed to extract content
-                try:
-                    index_data = json.loads(doc_index.index_data)
-                    ctx_ids = index_data.get("context_ids", [])
-                    logger.info(
-                        f"Vision index for document {doc_id} has {len(ctx_ids)} context IDs: {ctx_ids}")
-                except (json.JSONDecodeError, AttributeError) as e:
-                    logger.warning(
-                        f"Failed to parse vision index data for document {doc_id}: {e}")
-                    return ""
+            if doc_index.status == DocumentIndexStatus.FAILED:
+                logger.warning(
+                    f"Vision index for document {doc_id} failed, cannot enrich content")
+                return ""
 
-                if not ctx_ids:
-                    logger.debug(
-                        f"No context IDs found in vision index for document {doc_id}")
-                    return ""
+            if not doc_index.index_data:
+                logger.debug(
+                    f"Vision index for document {doc_id} has status {status_str} but no data")
+                return ""
 
-                # Mark vision as ready and break out of both loops
+            try:
+                index_data = json.loads(doc_index.index_data)
+                ctx_ids = index_data.get("context_ids", [])
                 logger.info(
-                    f"Vision index for document {doc_id} is ready, proceeding to extract vision content...")
-                vision_ready = True
-                break
-            else:
-                # If we didn't break, continue waiting
-                continue
-
-        # Check if we timed out (only if max_wait_time is set)
-        if max_wait_time is not None and waited_time >= max_wait_time:
-            logger.warning(
-                f"Timeout waiting for Vision index to complete for document {doc_id} after {max_wait_time}s")
-            return ""
+                    f"Vision index for document {doc_id} has {len(ctx_ids)} context IDs: {ctx_ids}")
+            except (json.JSONDecodeError, AttributeError) as e:
+                logger.warning(
+                    f"Failed to parse vision index data for document {doc_id}: {e}")
+                return ""
 
-        # If we got here, we should have ctx_ids from the break above
-        if 'ctx_ids' not in locals():
-            logger.warning(
-                f"Failed to get context IDs from Vision index for document {doc_id}")
+        if not ctx_ids:
+            logger.debug(
+                f"No context IDs found in vision index for document {doc_id}")
             return ""
 
         # Retrieve vision chunks from vector store
@@ -553,27 +505,6 @@ async def _delete_document_async(collection: Collection, doc_id: str) -> Dict[st
         await rag.finalize_storages()
 
 
-def _run_in_new_loop(coro: Awaitable) -> Any:
-    """Run an async function in a new event loop (for Celery compatibility)"""
-    loop = asyncio.new_event_loop()
-    try:
-        asyncio.set_event_loop(loop)
-        return loop.run_until_complete(coro)
-    finally:
-        try:
-            pending = [task for task in asyncio.all_tasks(
-                loop) if not task.done()]
-            for task in pending:
-                task.cancel()
-            if pending:
-                loop.run_until_complete(asyncio.wait(pending, timeout=1.0))
-        except Exception:
-            pass
-        finally:
-            loop.close()
-            asyncio.set_event_loop(None)
-
-
 # --- Internal Helper Functions ---
 
 
@@ -582,7 +513,7 @@ async def _gen_embed_func(
 ) -> Tuple[Callable[[list[str]], Awaitable[numpy.ndarray]], int]:
     """Generate embedding function for LightRAG"""
     try:
-        embedding_svc, dim = get_collection_embedding_service_sync(collection)
+        embedding_svc, dim = await asyncio.to_thread(get_collection_embedding_service_sync, collection)
 
         async def embed_func(texts: list[str]) -> numpy.ndarray:
             embeddings = await embedding_svc.aembed_documents(texts)
@@ -605,14 +536,14 @@ async def _gen_llm_func(collection: Collection) -> Callable[..., Awaitable[str]]
     try:
         config = parseCollectionConfig(collection.config)
         llm_provider_name = config.completion.model_service_provider
-        api_key = db_ops.query_provider_api_key(
+        api_key = await provider_config_cache.aget_api_key(
             llm_provider_name, collection.user)
         if not api_key:
             raise Exception(
                 f"API KEY not found for LLM Provider:{llm_provider_name}")
 
         # Get base_url from LLMProvider
-        llm_provider = db_ops.query_llm_provider_by_name(llm_provider_name)
+        llm_provider = await provider_config_cache.aget_provider(llm_provider_name)
         base_url = llm_provider.base_url
 
         async def llm_func(
@@ -0,0 +1,71 @@
+# Copyright 2025 ApeCloud, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+
+
+async def traverse_graph(
+    graph_storage: Any,
+    seed_ids: List[str],
+    max_depth: int,
+    max_fanout: int,
+    max_nodes: int,
+    deadline: Optional[float] = None,
+) -> Tuple[List[str], List[Tuple[str, str]], bool]:
+    """
+    在图谱存储中从种子实体出发做有界广度优先遍历（Ego-Graph）。
+
+    每一跳只调用一次 get_nodes_edges_batch，由存储后端在一次查询中返回整层邻边；
+    max_fanout 限制每个节点展开的边数，max_nodes 限制子图节点总数，
+    deadline（event loop 时间）到达后停止继续展开，None 表示不限时。
+
+    Returns:
+        (节点ID列表, 边列表, 是否因超时被截断)
+    """
+    loop = asyncio.get_running_loop()
+    visited = list(dict.fromkeys(seed_ids))
+    visited_set = set(visited)
+    frontier = list(visited)
+    edges: Dict[frozenset, Tuple[str, str]] = {}
+
+    for _ in range(max(0, max_depth)):
+        if not frontier:
+            break
+        if deadline is None:
+            nodes_edges = await graph_storage.get_nodes_edges_batch(frontier)
+        else:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return visited, list(edges.values()), True
+            try:
+                nodes_edges = await asyncio.wait_for(graph_storage.get_nodes_edges_batch(frontier), timeout=remaining)
+            except asyncio.TimeoutError:
+                return visited, list(edges.values()), True
+
+        next_frontier = []
+        for node_id in frontier:
+            for src, tgt in (nodes_edges.get(node_id) or [])[:max_fanout]:
+                neighbor = tgt if src == node_id else src
+                if neighbor not in visited_set:
+                    if len(visited_set) >= max_nodes:
+                        continue
+                    visited_set.add(neighbor)
+                    visited.append(neighbor)
+                    next_frontier.append(neighbor)
+                # 无向去重：(a, b) 与 (b, a) 视为同一条边
+                edges.setdefault(frozenset((src, tgt)), (src, tgt))
+        frontier = next_frontier
+
+    return visited, list(edges.values()), False
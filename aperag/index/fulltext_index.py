@@ -22,6 +22,7 @@ from elasticsearch import AsyncElasticsearch, Elasticsearch
 
 from aperag.config import settings
 from aperag.db.ops import db_ops
+from aperag.db.provider_cache import provider_config_cache
 from aperag.docparser.chunking import rechunk
 from aperag.index.base import BaseIndexer, IndexResult, IndexType
 from aperag.llm.completion.completion_service import CompletionService
@@ -86,6 +87,7 @@ class FulltextIndexer(BaseIndexer):
             chunk_content, title_text, chunk_metadata = self._extract_chunk_data(part)
             if not chunk_content:
                 continue
+            chunk_metadata["tokens"] = len(tokenizer(chunk_content))
 
             chunk_id = f"{document_id}_{chunk_idx}"
             self._insert_chunk(
@@ -389,7 +391,7 @@ class LLMKeywordExtractor(KeywordExtractor):
                 return None
 
             # Get provider information from database
-            llm_provider = db_ops.query_llm_provider_by_name(settings.llm_keyword_extraction_provider)
+            llm_provider = provider_config_cache.get_provider(settings.llm_keyword_extraction_provider)
             if not llm_provider:
                 logger.warning(f"LLM provider '{settings.llm_keyword_extraction_provider}' not found")
                 return None
@@ -399,9 +401,7 @@ class LLMKeywordExtractor(KeywordExtractor):
             if not user_id:
                 logger.warning("User ID not available in context for LLM keyword extraction")
                 return None
-            api_key = db_ops.query_provider_api_key(
-                settings.llm_keyword_extraction_provider, user_id=user_id, need_public=True
-            )
+            api_key = provider_config_cache.get_api_key(settings.llm_keyword_extraction_provider, user_id)
             if not api_key:
                 logger.warning(f"API key not found for provider '{settings.llm_keyword_extraction_provider}'")
                 return None
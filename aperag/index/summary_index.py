@@ -12,23 +12,40 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
+import hashlib
 import json
 import logging
-from typing import Any, List
+from typing import Any, Dict, List, Optional
 
-from aperag.config import get_vector_db_connector
+from aperag.config import get_vector_db_connector, settings
 from aperag.db.ops import db_ops
-from aperag.docparser.base import TextPart
+from aperag.docparser.base import TextPart, TitlePart
 from aperag.index.base import BaseIndexer, IndexResult, IndexType
 from aperag.llm.completion.base_completion import get_collection_completion_service_sync
 from aperag.llm.embed.base_embedding import get_collection_embedding_service_sync
 from aperag.llm.embed.embedding_utils import create_embeddings_and_store
 from aperag.llm.llm_error_types import CompletionError, InvalidConfigurationError
+from aperag.tasks.worker_loop import run_in_worker_loop
+from aperag.utils.tokenizer import get_default_tokenizer
 from aperag.utils.utils import generate_vector_db_collection_name
 
 logger = logging.getLogger(__name__)
 
 
+def _hash_text(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _get_part_text(part: Any) -> str:
+    if hasattr(part, "content") and part.content:
+        return part.content
+    if hasattr(part, "text") and part.text:
+        return part.text
+    # If part is a dict or other format, try to extract text
+    return str(part)
+
+
 class SummaryIndexer(BaseIndexer):
     """Summary index implementation using map-reduce strategy"""
 
@@ -71,8 +88,16 @@ class SummaryIndexer(BaseIndexer):
             if not document:
                 raise Exception(f"Document {document_id} not found")
 
-            # Generate summary using map-reduce strategy
-            summary = self._generate_document_summary(content, doc_parts, collection)
+            # Generate summary using map-reduce strategy, reusing the section summaries of the previous run
+            old_index_data = self._load_index_data(document_id)
+            part_summaries = {}
+            summary = self._generate_document_summary(
+                content,
+                doc_parts,
+                collection,
+                cached_summaries=old_index_data.get("part_summaries") or {},
+                part_summaries=part_summaries,
+            )
 
             if not summary:
                 return IndexResult(
@@ -124,6 +149,7 @@ class SummaryIndexer(BaseIndexer):
                 "chunk_count": len(doc_parts) if doc_parts else 0,
                 "content_length": len(content) if content else 0,
                 "summary_context_ids": summary_ctx_ids,
+                "part_summaries": part_summaries,
             }
 
             logger.info(f"Summary index created for document {document_id}")
@@ -162,24 +188,7 @@ class SummaryIndexer(BaseIndexer):
         """
         try:
             # Get existing summary index data from DocumentIndex to find old vector IDs
-            from sqlalchemy import and_, select
-
-            from aperag.config import get_sync_session
-            from aperag.db.models import DocumentIndex, DocumentIndexType
-
-            old_summary_ctx_ids = []
-            for session in get_sync_session():
-                stmt = select(DocumentIndex).where(
-                    and_(
-                        DocumentIndex.document_id == document_id, DocumentIndex.index_type == DocumentIndexType.SUMMARY
-                    )
-                )
-                result = session.execute(stmt)
-                doc_index = result.scalar_one_or_none()
-
-                if doc_index and doc_index.index_data:
-                    index_data = json.loads(doc_index.index_data)
-                    old_summary_ctx_ids = index_data.get("summary_context_ids", [])
+            old_summary_ctx_ids = self._load_index_data(document_id).get("summary_context_ids", [])
 
             # Delete old summary vectors from vector database if they exist
             if old_summary_ctx_ids:
@@ -268,7 +277,35 @@ class SummaryIndexer(BaseIndexer):
                 success=False, index_type=self.index_type, error=f"Summary index deletion failed: {str(e)}"
             )
 
-    def _generate_document_summary(self, content: str, doc_parts: List[Any], collection) -> str:
+    def _load_index_data(self, document_id: str) -> Dict[str, Any]:
+        """Load the index data of the existing summary index of a document"""
+        from sqlalchemy import and_, select
+
+        from aperag.config import get_sync_session
+        from aperag.db.models import DocumentIndex, DocumentIndexType
+
+        for session in get_sync_session():
+            stmt = select(DocumentIndex).where(
+                and_(DocumentIndex.document_id == document_id, DocumentIndex.index_type == DocumentIndexType.SUMMARY)
+            )
+            result = session.execute(stmt)
+            doc_index = result.scalar_one_or_none()
+
+            if doc_index and doc_index.index_data:
+                try:
+                    return json.loads(doc_index.index_data)
+                except json.JSONDecodeError:
+                    logger.warning(f"Invalid summary index data for document {document_id}")
+        return {}
+
+    def _generate_document_summary(
+        self,
+        content: str,
+        doc_parts: List[Any],
+        collection,
+        cached_summaries: Optional[Dict[str, str]] = None,
+        part_summaries: Optional[Dict[str, str]] = None,
+    ) -> str:
         """
         Generate document summary using map-reduce strategy
 
@@ -276,6 +313,8 @@ class SummaryIndexer(BaseIndexer):
             content: Document content
             doc_parts: Parsed document parts
             collection: Collection object
+            cached_summaries: Section summaries of a previous run, keyed by section content hash
+            part_summaries: Filled with the section summaries of this run, keyed by section content hash
 
         Returns:
             str: Generated summary
@@ -290,29 +329,23 @@ class SummaryIndexer(BaseIndexer):
             if not doc_parts or len(content) < 4000:
                 return self._summarize_text(content, completion_service)
 
-            # Map phase: summarize each chunk
-            chunk_summaries = []
-            for part in doc_parts:
-                if hasattr(part, "content") and part.content:
-                    chunk_text = part.content
-                elif hasattr(part, "text") and part.text:
-                    chunk_text = part.text
-                else:
-                    # If part is a dict or other format, try to extract text
-                    chunk_text = str(part)
-
-                if chunk_text.strip():
-                    chunk_summary = self._summarize_text(chunk_text, completion_service, is_chunk=True)
-                    if chunk_summary:
-                        chunk_summaries.append(chunk_summary)
+            count_tokens = self._get_token_counter()
+            sections = self._split_sections(doc_parts, count_tokens, settings.summary_map_section_tokens)
+
+            # Map phase: summarize each section concurrently, skipping sections summarized before
+            chunk_summaries = run_in_worker_loop(
+                self._map_sections(
+                    sections,
+                    completion_service,
+                    cached_summaries or {},
+                    part_summaries if part_summaries is not None else {},
+                )
+            )
 
             # If we have chunk summaries, reduce them
             if chunk_summaries:
-                # Combine chunk summaries
-                combined_summaries = "\n\n".join(chunk_summaries)
-
                 # Reduce phase: create final summary from chunk summaries
-                return self._reduce_summaries(combined_summaries, completion_service)
+                return run_in_worker_loop(self._reduce_tree(chunk_summaries, completion_service, count_tokens))
             else:
                 # Fallback to direct summarization
                 return self._summarize_text(content, completion_service)
@@ -321,25 +354,122 @@ class SummaryIndexer(BaseIndexer):
             logger.error(f"Failed to generate document summary: {str(e)}")
             return ""
 
-    def _summarize_text(self, text: str, completion_service, is_chunk: bool = False) -> str:
-        """
-        Summarize a single text using LLM
+    @staticmethod
+    def _get_token_counter():
+        try:
+            tokenizer = get_default_tokenizer()
+            return lambda text: len(tokenizer(text))
+        except Exception as e:
+            # Fall back to a rough estimate if the encoding can't be loaded, e.g. offline
+            logger.warning(f"Failed to load tokenizer, estimating token counts: {str(e)}")
+            return lambda text: len(text) // 3 + 1
 
-        Args:
-            text: Text to summarize
-            completion_service: Completion service instance
-            is_chunk: Whether this is a chunk summary (affects prompt)
+    @staticmethod
+    def _split_sections(doc_parts: List[Any], count_tokens, max_tokens: int) -> List[str]:
+        """
+        Group consecutive document parts into sections of at most max_tokens tokens.
 
-        Returns:
-            str: Generated summary
+        Once a section is half full, a title starts a new section. Section boundaries
+        then follow the document structure, so an edit in one chapter doesn't shift
+        the sections (and their cached summaries) of the chapters after it.
         """
-        try:
+        sections = []
+        current = []
+        current_tokens = 0
+        for part in doc_parts:
+            text = _get_part_text(part)
             if not text.strip():
-                return ""
+                continue
+            tokens = count_tokens(text)
+            if current and (
+                current_tokens + tokens > max_tokens
+                or (isinstance(part, TitlePart) and current_tokens >= max_tokens // 2)
+            ):
+                sections.append("\n\n".join(current))
+                current = []
+                current_tokens = 0
+            current.append(text)
+            current_tokens += tokens
+        if current:
+            sections.append("\n\n".join(current))
+        return sections
+
+    async def _map_sections(
+        self,
+        sections: List[str],
+        completion_service,
+        cached_summaries: Dict[str, str],
+        part_summaries: Dict[str, str],
+    ) -> List[str]:
+        """Summarize sections with bounded concurrency, keeping the section order"""
+        semaphore = asyncio.Semaphore(max(1, settings.summary_map_concurrency))
+        hits = 0
+
+        async def _summarize_section(section: str) -> str:
+            nonlocal hits
+            key = _hash_text(section)
+            summary = cached_summaries.get(key)
+            if summary:
+                hits += 1
+            else:
+                async with semaphore:
+                    summary = await self._asummarize_text(section, completion_service, is_chunk=True)
+            if summary:
+                part_summaries[key] = summary
+            return summary
+
+        summaries = await asyncio.gather(*[_summarize_section(section) for section in sections])
+        logger.info(f"Summarized {len(sections)} sections, {hits} reused from the previous summary index")
+        return [summary for summary in summaries if summary]
 
-            # Create appropriate prompt based on whether it's a chunk or full document
-            if is_chunk:
-                prompt = f"""Summarize this text chunk concisely. Requirements:
+    async def _reduce_tree(self, summaries: List[str], completion_service, count_tokens) -> str:
+        """
+        Reduce summaries level by level until they fit into a single reduce prompt.
+
+        Each level groups consecutive summaries up to the reduce token budget and
+        reduces the groups concurrently.
+        """
+        budget = settings.summary_reduce_token_budget
+        semaphore = asyncio.Semaphore(max(1, settings.summary_map_concurrency))
+
+        async def _reduce(group: List[str]) -> str:
+            if len(group) == 1:
+                return group[0]
+            async with semaphore:
+                return await self._areduce_summaries("\n\n".join(group), completion_service)
+
+        while True:
+            groups = []
+            current = []
+            current_tokens = 0
+            for summary in summaries:
+                tokens = count_tokens(summary)
+                if current and current_tokens + tokens > budget:
+                    groups.append(current)
+                    current = []
+                    current_tokens = 0
+                current.append(summary)
+                current_tokens += tokens
+            if current:
+                groups.append(current)
+
+            if len(groups) <= 1:
+                return await self._areduce_summaries("\n\n".join(summaries), completion_service)
+
+            reduced = await asyncio.gather(*[_reduce(group) for group in groups])
+            reduced = [summary for summary in reduced if summary]
+            if not reduced:
+                return ""
+            if len(reduced) >= len(summaries):
+                # Every summary exceeds the budget on its own, reducing further won't converge
+                return await self._areduce_summaries("\n\n".join(reduced), completion_service)
+            summaries = reduced
+
+    @staticmethod
+    def _build_summary_prompt(text: str, is_chunk: bool = False) -> str:
+        # Create appropriate prompt based on whether it's a chunk or full document
+        if is_chunk:
+            return f"""Summarize this text chunk concisely. Requirements:
 1. Use the same language as the original text for the summary
 2. Keep it within 1-2 sentences
 3. Extract only the most important core information
@@ -350,8 +480,7 @@ Text content:
 {text}
 
 Summary:"""
-            else:
-                prompt = f"""Generate a concise summary of this document. Requirements:
+        return f"""Generate a concise summary of this document. Requirements:
 1. Use the same language as the original text for the summary
 2. Keep it within 2-3 sentences
 3. Summarize the main topic and key insights of the document
@@ -364,15 +493,60 @@ Document content:
 
 Summary:"""
 
+    @staticmethod
+    def _build_reduce_prompt(combined_summaries: str) -> str:
+        return f"""Combine these section summaries into a comprehensive final document summary. Requirements:
+1. Use the same language as the original summaries for the final summary
+2. Keep it within 3-4 sentences
+3. Integrate the core content from all sections into a coherent overall summary
+4. Highlight the main topic and most important insights of the document
+5. Maintain logical clarity and avoid repetitive content
+6. If technical content is involved, maintain accuracy of technical terminology
+7. Output ONLY the final summary content, no additional text, explanations, or formatting
+
+Section summaries:
+{combined_summaries}
+
+Final summary:"""
+
+    def _summarize_text(self, text: str, completion_service, is_chunk: bool = False) -> str:
+        """
+        Summarize a single text using LLM
+
+        Args:
+            text: Text to summarize
+            completion_service: Completion service instance
+            is_chunk: Whether this is a chunk summary (affects prompt)
+
+        Returns:
+            str: Generated summary
+        """
+        try:
+            if not text.strip():
+                return ""
+
             # Generate summary
-            summary = completion_service.generate(history=[], prompt=prompt)
+            summary = completion_service.generate(history=[], prompt=self._build_summary_prompt(text, is_chunk))
             return summary.strip()
 
         except Exception as e:
             logger.error(f"Failed to summarize text: {str(e)}")
             return ""
 
-    def _reduce_summaries(self, combined_summaries: str, completion_service) -> str:
+    async def _asummarize_text(self, text: str, completion_service, is_chunk: bool = False) -> str:
+        """Async version of _summarize_text"""
+        try:
+            if not text.strip():
+                return ""
+
+            summary = await completion_service.agenerate(history=[], prompt=self._build_summary_prompt(text, is_chunk))
+            return summary.strip()
+
+        except Exception as e:
+            logger.error(f"Failed to summarize text: {str(e)}")
+            return ""
+
+    async def _areduce_summaries(self, combined_summaries: str, completion_service) -> str:
         """
         Reduce multiple chunk summaries into a final document summary
 
@@ -384,22 +558,9 @@ Summary:"""
             str: Final document summary
         """
         try:
-            prompt = f"""Combine these section summaries into a comprehensive final document summary. Requirements:
-1. Use the same language as the original summaries for the final summary
-2. Keep it within 3-4 sentences
-3. Integrate the core content from all sections into a coherent overall summary
-4. Highlight the main topic and most important insights of the document
-5. Maintain logical clarity and avoid repetitive content
-6. If technical content is involved, maintain accuracy of technical terminology
-7. Output ONLY the final summary content, no additional text, explanations, or formatting
-
-Section summaries:
-{combined_summaries}
-
-Final summary:"""
-
-            # Generate final summary
-            final_summary = completion_service.generate(history=[], prompt=prompt)
+            final_summary = await completion_service.agenerate(
+                history=[], prompt=self._build_reduce_prompt(combined_summaries)
+            )
             return final_summary.strip()
 
         except Exception as e:
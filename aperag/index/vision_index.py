@@ -47,7 +47,7 @@ def _get_vision_llm_completion_service(collection: Collection):
     """
     import os
     from aperag.llm.completion.completion_service import CompletionService
-    from aperag.db.ops import db_ops
+    from aperag.db.provider_cache import provider_config_cache
 
     # Check if VISION_LLM is configured via environment variables
     vision_llm_provider = os.environ.get("VISION_LLM_PROVIDER")
@@ -60,15 +60,15 @@ def _get_vision_llm_completion_service(collection: Collection):
 
     try:
         # Get provider information
-        llm_provider = db_ops.query_llm_provider_by_name(vision_llm_provider)
+        llm_provider = provider_config_cache.get_provider(vision_llm_provider)
         if not llm_provider:
             logger.warning(
                 f"Vision LLM provider '{vision_llm_provider}' not found in database")
             return None
 
         # Get API key (try user's key first, then use environment variable)
-        api_key = db_ops.query_provider_api_key(
-            vision_llm_provider, collection.user, need_public=True)
+        api_key = provider_config_cache.get_api_key(
+            vision_llm_provider, collection.user)
         if not api_key:
             api_key = vision_llm_api_key
 
@@ -84,7 +84,7 @@ def _get_vision_llm_completion_service(collection: Collection):
         max_tokens = None
         try:
             from aperag.db.models import APIType
-            model_config = db_ops.query_llm_provider_model(
+            model_config = provider_config_cache.get_model(
                 provider_name=vision_llm_provider,
                 api=APIType.COMPLETION,
                 model=vision_llm_model
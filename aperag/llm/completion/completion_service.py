@@ -16,6 +16,7 @@ from typing import Any, AsyncGenerator, Dict, List, Optional
 
 import litellm
 
+from aperag.llm.http_client import litellm_client_kwargs
 from aperag.llm.llm_error_types import (
     CompletionError,
     InvalidPromptError,
@@ -114,6 +115,7 @@ class CompletionService:
                 stream=False,
                 caching=self.caching,
                 timeout=self.timeout,
+                **litellm_client_kwargs(self.provider, self.base_url, self.api_key, is_async=True),
             )
 
             return self._extract_content_from_response(response)
@@ -145,6 +147,7 @@ class CompletionService:
                 stream=True,
                 caching=self.caching,
                 timeout=self.timeout,
+                **litellm_client_kwargs(self.provider, self.base_url, self.api_key, is_async=True),
             )
 
             # Process the raw stream and yield clean text chunks
@@ -189,6 +192,7 @@ class CompletionService:
                 stream=False,
                 caching=self.caching,
                 timeout=self.timeout,
+                **litellm_client_kwargs(self.provider, self.base_url, self.api_key, is_async=False),
             )
 
             return self._extract_content_from_response(response)
@@ -0,0 +1,204 @@
+# Copyright 2025 ApeCloud, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Loading of image assets attached to vision model prompts.
+
+Assets are fetched from the object store concurrently, downscaled to VISION_IMAGE_MAX_RESOLUTION
+and encoded as data URIs. Assets larger than VISION_IMAGE_MAX_ASSET_BYTES aren't fetched at all,
+and the encoded images of a prompt are kept within VISION_IMAGE_BYTE_BUDGET.
+
+Asset paths are content addressed (the asset id is the hash of the image), so the encoded images
+are kept in a small LRU cache for repeated questions about the same document.
+"""
+
+import asyncio
+import base64
+import io
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from aperag.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ImageAsset:
+    path: str
+    mimetype: str
+
+
+def downscale_image(data: bytes, mimetype: str, max_resolution: int) -> Tuple[bytes, str]:
+    """
+    Shrink an image so that its longest side is at most max_resolution pixels.
+
+    Images already small enough, or that Pillow can't read, are returned unchanged.
+    """
+    if max_resolution <= 0:
+        return data, mimetype
+
+    from PIL import Image
+
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            if max(image.size) <= max_resolution:
+                return data, mimetype
+            image.thumbnail((max_resolution, max_resolution), Image.Resampling.LANCZOS)
+            output = io.BytesIO()
+            if image.mode in ("RGBA", "LA", "P"):
+                # Keep transparency, and the sharp edges of line drawings, lossless
+                image.save(output, format="PNG", optimize=True)
+                return output.getvalue(), "image/png"
+            if image.mode != "RGB":
+                image = image.convert("RGB")
+            image.save(output, format="JPEG", quality=85, optimize=True)
+            return output.getvalue(), "image/jpeg"
+    except Exception as e:
+        logger.warning(f"Failed to downscale {mimetype} image, attaching it as is: {e}")
+        return data, mimetype
+
+
+class EncodedImageCache:
+    """LRU of data URIs by asset path, bounded by the total size of the URIs"""
+
+    def __init__(self, max_bytes: int):
+        self._max_bytes = max_bytes
+        self._size = 0
+        self._entries: "OrderedDict[Tuple[str, int], str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[str, int]) -> Optional[str]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: Tuple[str, int], value: str) -> None:
+        if len(value) > self._max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = value
+            self._size += len(value)
+            while self._size > self._max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+
+class ImageAttachmentLoader:
+    def __init__(
+        self,
+        object_store=None,
+        max_resolution: Optional[int] = None,
+        max_asset_bytes: Optional[int] = None,
+        cache: Optional[EncodedImageCache] = None,
+    ):
+        self._object_store = object_store
+        self._max_resolution = settings.vision_image_max_resolution if max_resolution is None else max_resolution
+        self._max_asset_bytes = settings.vision_image_max_asset_bytes if max_asset_bytes is None else max_asset_bytes
+        self._cache = cache if cache is not None else _encoded_image_cache
+
+    def _get_object_store(self):
+        if self._object_store is None:
+            from aperag.objectstore.base import get_async_object_store
+
+            self._object_store = get_async_object_store()
+        return self._object_store
+
+    async def load(self, asset: ImageAsset) -> Optional[str]:
+        """Data URI of an asset, or None if it's missing, too large or can't be read"""
+        key = (asset.path, self._max_resolution)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        try:
+            object_store = self._get_object_store()
+            if self._max_asset_bytes:
+                # Check the size first so oversized assets are never opened
+                size = await object_store.get_obj_size(asset.path)
+                if size is None:
+                    logger.warning(f"Image not found in object store at path: {asset.path}")
+                    return None
+                if size > self._max_asset_bytes:
+                    logger.warning(f"Skipping image {asset.path} of {size} bytes, the limit is {self._max_asset_bytes}")
+                    return None
+            result = await object_store.get(asset.path)
+            if not result:
+                logger.warning(f"Image not found in object store at path: {asset.path}")
+                return None
+            data = await self._read(asset.path, result[0])
+            if data is None:
+                return None
+            data, mimetype = await asyncio.to_thread(downscale_image, data, asset.mimetype, self._max_resolution)
+        except Exception as e:
+            logger.error(f"Failed to load image asset {asset.path}: {e}", exc_info=True)
+            return None
+
+        image_uri = f"data:{mimetype};base64,{base64.b64encode(data).decode('utf-8')}"
+        self._cache.put(key, image_uri)
+        return image_uri
+
+    async def _read(self, path: str, stream) -> Optional[bytes]:
+        """Read a stream up to max_asset_bytes, closing it even when reading stops early"""
+        chunks = []
+        total = 0
+        try:
+            async for chunk in stream:
+                total += len(chunk)
+                if self._max_asset_bytes and total > self._max_asset_bytes:
+                    logger.warning(f"Skipping image {path} larger than the limit of {self._max_asset_bytes} bytes")
+                    return None
+                chunks.append(chunk)
+        finally:
+            aclose = getattr(stream, "aclose", None)
+            if aclose is not None:
+                await aclose()
+        return b"".join(chunks)
+
+    async def load_many(
+        self, assets: List[ImageAsset], max_images: int, byte_budget: Optional[int] = None
+    ) -> List[Tuple[int, str]]:
+        """
+        Load up to max_images of the assets, in order, as (index in assets, data URI) pairs.
+
+        Assets are fetched max_images at a time; the next ones are only fetched to replace
+        assets that failed to load. Images that would exceed byte_budget are skipped.
+        """
+        results: List[Tuple[int, str]] = []
+        used_bytes = 0
+        position = 0
+        while len(results) < max_images and position < len(assets):
+            batch = list(range(position, min(position + max_images - len(results), len(assets))))
+            position = batch[-1] + 1
+            uris = await asyncio.gather(*(self.load(assets[i]) for i in batch))
+            for index, uri in zip(batch, uris):
+                if uri is None:
+                    continue
+                if byte_budget and used_bytes + len(uri) > byte_budget:
+                    logger.info(f"Skipping image {assets[index].path}, the images exceed {byte_budget} bytes")
+                    continue
+                results.append((index, uri))
+                used_bytes += len(uri)
+        return results
+
+
+_encoded_image_cache = EncodedImageCache(settings.vision_image_cache_max_bytes)
@@ -19,7 +19,7 @@ from threading import Lock
 
 from aperag.config import settings
 from aperag.db.models import APIType
-from aperag.db.ops import db_ops
+from aperag.db.provider_cache import provider_config_cache
 from aperag.llm.embed.embedding_service import EmbeddingService
 from aperag.llm.llm_error_types import (
     EmbeddingError,
@@ -175,12 +175,12 @@ def get_collection_embedding_service_sync(collection) -> tuple[EmbeddingService,
             "embedding.custom_llm_provider", custom_llm_provider, "Custom LLM provider cannot be empty"
         )
 
-    embedding_service_api_key = db_ops.query_provider_api_key(embedding_msp, collection.user)
+    embedding_service_api_key = provider_config_cache.get_api_key(embedding_msp, collection.user)
     if not embedding_service_api_key:
         raise InvalidConfigurationError("api_key", None, f"API KEY not found for LLM Provider: {embedding_msp}")
 
     try:
-        llm_provider = db_ops.query_llm_provider_by_name(embedding_msp)
+        llm_provider = provider_config_cache.get_provider(embedding_msp)
         if not llm_provider:
             raise ModelNotFoundError(embedding_model_name, embedding_msp, "Embedding")
         embedding_service_url = llm_provider.base_url
@@ -190,7 +190,7 @@ def get_collection_embedding_service_sync(collection) -> tuple[EmbeddingService,
 
     try:
         multimodal = False
-        model = db_ops.query_llm_provider_model(embedding_msp, APIType.EMBEDDING.value, embedding_model_name)
+        model = provider_config_cache.get_model(embedding_msp, APIType.EMBEDDING.value, embedding_model_name)
         if model:
             multimodal = model.has_tag("multimodal")
     except Exception:
@@ -16,11 +16,17 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import threading
+import weakref
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Dict, List, Sequence, Tuple
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple
 
 import litellm
 
+from aperag.config import settings
+from aperag.llm.http_client import litellm_client_kwargs
 from aperag.llm.llm_error_types import (
     BatchProcessingError,
     EmbeddingError,
@@ -30,6 +36,62 @@ from aperag.llm.llm_error_types import (
 
 logger = logging.getLogger(__name__)
 
+# In-flight and finished query embeddings shared by the searches of one request
+_shared_query_embeddings: ContextVar[Optional[Dict[tuple, asyncio.Future]]] = ContextVar(
+    "shared_query_embeddings", default=None
+)
+
+
+@contextmanager
+def shared_query_embeddings():
+    """
+    Share query embeddings between the searches started inside this block.
+
+    Searches over several collections with the same embedding model then embed the
+    query once. Tasks must be created inside the block to see the shared cache.
+    """
+    token = _shared_query_embeddings.set({})
+    try:
+        yield
+    finally:
+        _shared_query_embeddings.reset(token)
+
+
+async def embed_query_shared(embedding_model: "EmbeddingService", content: str) -> List[float]:
+    """Embed a query, reusing the embedding of an enclosing shared_query_embeddings block"""
+    cache = _shared_query_embeddings.get()
+    if cache is None:
+        return await embedding_model.aembed_query(content)
+
+    key = (embedding_model.embedding_provider, embedding_model.model, embedding_model.api_base, content)
+    future = cache.get(key)
+    if future is None:
+        future = asyncio.ensure_future(embedding_model.aembed_query(content))
+        cache[key] = future
+    # A caller giving up (e.g. on a search deadline) must not cancel the embedding for the others
+    return await asyncio.shield(future)
+
+
+# Semaphores limiting concurrent async embedding calls, per event loop, provider and base URL;
+# the semaphores of a loop are dropped with it
+ProviderSemaphores = Dict[Tuple[str, str], asyncio.Semaphore]
+_provider_semaphores: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, ProviderSemaphores] = (
+    weakref.WeakKeyDictionary()
+)
+_provider_semaphores_lock = threading.Lock()
+
+
+def _provider_semaphore(provider: Optional[str], api_base: Optional[str]) -> asyncio.Semaphore:
+    """Semaphore of a provider for the running event loop, semaphores can't be shared between loops"""
+    loop = asyncio.get_running_loop()
+    key = (provider or "", (api_base or "").rstrip("/"))
+    with _provider_semaphores_lock:
+        semaphores = _provider_semaphores.setdefault(loop, {})
+        semaphore = semaphores.get(key)
+        if semaphore is None:
+            semaphore = semaphores[key] = asyncio.Semaphore(settings.embedding_max_concurrency)
+        return semaphore
+
 
 class EmbeddingService:
     def __init__(
@@ -61,20 +123,8 @@ class EmbeddingService:
         Returns:
             List of embedding vectors in the same order as input contents
         """
-        # Validate inputs
-        if not contents:
-            raise EmptyTextError(0)
-
-        # Check for empty contents
-        empty_indices = [i for i, text in enumerate(contents) if not text or not text.strip()]
-        if empty_indices:
-            logger.warning(f"Found {len(empty_indices)} empty content at indices: {empty_indices}")
-            if len(empty_indices) == len(contents):
-                raise EmptyTextError(len(empty_indices))
-
+        clean_contents = self._clean_contents(contents)
         try:
-            # Clean contents by replacing newlines with spaces
-            clean_contents = [t.replace("\n", " ") if t and t.strip() else " " for t in contents]
             # Determine batch size (use max_chunks or process all at once if not set)
             batch_size = self.max_chunks or len(clean_contents)
 
@@ -121,7 +171,43 @@ class EmbeddingService:
             raise wrap_litellm_error(e, "embedding", self.embedding_provider, self.model) from e
 
     async def aembed_documents(self, contents: List[str]) -> List[List[float]]:
-        return await asyncio.to_thread(self.embed_documents, contents)
+        """
+        Embed multiple documents with concurrent async batches, without blocking the event loop.
+
+        At most settings.embedding_max_concurrency batches of a provider are in flight at once.
+
+        Args:
+            contents: List of documents (texts or base64-encoded images) to embed
+
+        Returns:
+            List of embedding vectors in the same order as input contents
+        """
+        clean_contents = self._clean_contents(contents)
+        try:
+            batch_size = self.max_chunks or len(clean_contents)
+            starts = range(0, len(clean_contents), batch_size)
+            batches = [clean_contents[start : start + batch_size] for start in starts]
+            batch_results = await asyncio.gather(
+                *(self._aembed_batch(batch) for batch in batches), return_exceptions=True
+            )
+
+            failed_batches = [str(result) for result in batch_results if isinstance(result, BaseException)]
+            if failed_batches:
+                logger.error(f"Batch processing failed: {failed_batches[:3]}")
+                raise BatchProcessingError(
+                    batch_size=batch_size,
+                    reason=f"Failed to process {len(failed_batches)} batches: {failed_batches[:3]} "
+                    f"contents: {contents}",
+                )
+
+            # gather keeps the order of the batches
+            return [embedding for embeddings in batch_results for embedding in embeddings]
+        except (EmptyTextError, BatchProcessingError, EmbeddingError):
+            # Re-raise our custom embedding errors
+            raise
+        except Exception as e:
+            logger.error(f"Document embedding failed: {str(e)}")
+            raise wrap_litellm_error(e, "embedding", self.embedding_provider, self.model) from e
 
     def embed_query(self, content: str) -> List[float]:
         """
@@ -146,11 +232,36 @@ class EmbeddingService:
             raise wrap_litellm_error(e, "embedding", self.embedding_provider, self.model) from e
 
     async def aembed_query(self, content: str) -> List[float]:
-        return await asyncio.to_thread(self.embed_query, content)
+        """Embed a single query content, without blocking the event loop"""
+        if not content or not content.strip():
+            raise EmptyTextError(1)
+
+        try:
+            return (await self.aembed_documents([content]))[0]
+        except (EmptyTextError, EmbeddingError):
+            # Re-raise our custom embedding errors
+            raise
+        except Exception as e:
+            logger.error(f"Query embedding failed: {str(e)}")
+            raise wrap_litellm_error(e, "embedding", self.embedding_provider, self.model) from e
 
     def is_multimodal(self) -> bool:
         return self.multimodal
 
+    def _clean_contents(self, contents: List[str]) -> List[str]:
+        """Validate contents and replace newlines with spaces, and empty contents with a space"""
+        if not contents:
+            raise EmptyTextError(0)
+
+        # Check for empty contents
+        empty_indices = [i for i, text in enumerate(contents) if not text or not text.strip()]
+        if empty_indices:
+            logger.warning(f"Found {len(empty_indices)} empty content at indices: {empty_indices}")
+            if len(empty_indices) == len(contents):
+                raise EmptyTextError(len(empty_indices))
+
+        return [t.replace("\n", " ") if t and t.strip() else " " for t in contents]
+
     def _embed_batch_with_indices(self, batch: Sequence[str], start_idx: int) -> List[Tuple[int, List[float]]]:
         """Process a batch of texts and return embeddings with their original indices."""
         try:
@@ -184,23 +295,45 @@ class EmbeddingService:
                 api_key=self.api_key,
                 input=list(batch),
                 caching=self.caching,
+                **litellm_client_kwargs(self.embedding_provider, self.api_base, self.api_key, is_async=False),
             )
+            return self._parse_embeddings(response, len(batch))
+        except Exception as e:
+            logger.error(f"Batch embedding API call failed: {str(e)}")
+            # Convert litellm errors to our custom types
+            raise wrap_litellm_error(e, "embedding", self.embedding_provider, self.model) from e
 
-            if not response or "data" not in response:
-                raise EmbeddingError(
-                    "Invalid response format from embedding API",
-                    {"provider": self.embedding_provider, "model": self.model, "batch_size": len(batch)},
+    async def _aembed_batch(self, batch: Sequence[str]) -> List[List[float]]:
+        """Embed a batch of contents using litellm.aembedding, within the concurrency limit of the provider"""
+        try:
+            async with _provider_semaphore(self.embedding_provider, self.api_base):
+                response = await litellm.aembedding(
+                    custom_llm_provider=self.embedding_provider,
+                    model=self.model,
+                    api_base=self.api_base,
+                    api_key=self.api_key,
+                    input=list(batch),
+                    caching=self.caching,
+                    **litellm_client_kwargs(self.embedding_provider, self.api_base, self.api_key, is_async=True),
                 )
-
-            embeddings = [item["embedding"] for item in response["data"]]
-
-            # Validate embedding dimensions
-            if embeddings and len(set(len(emb) for emb in embeddings)) > 1:
-                dimensions = [len(emb) for emb in embeddings]
-                logger.warning(f"Inconsistent embedding dimensions: {set(dimensions)}")
-
-            return embeddings
+            return self._parse_embeddings(response, len(batch))
         except Exception as e:
             logger.error(f"Batch embedding API call failed: {str(e)}")
             # Convert litellm errors to our custom types
             raise wrap_litellm_error(e, "embedding", self.embedding_provider, self.model) from e
+
+    def _parse_embeddings(self, response, batch_size: int) -> List[List[float]]:
+        if not response or "data" not in response:
+            raise EmbeddingError(
+                "Invalid response format from embedding API",
+                {"provider": self.embedding_provider, "model": self.model, "batch_size": batch_size},
+            )
+
+        embeddings = [item["embedding"] for item in response["data"]]
+
+        # Validate embedding dimensions
+        if embeddings and len(set(len(emb) for emb in embeddings)) > 1:
+            dimensions = [len(emb) for emb in embeddings]
+            logger.warning(f"Inconsistent embedding dimensions: {set(dimensions)}")
+
+        return embeddings
@@ -103,6 +103,8 @@ def create_embeddings_and_store(
         # 2.3 Prepare metadata for the node
         metadata = part.metadata.copy()
         metadata["source"] = metadata.get("name", "")
+        # Token count of the stored text, so the LLM node can pack context without tokenizing it
+        metadata["tokens"] = len(tokenizer(text))
         # 2.4 Create TextNode
         nodes.append(TextNode(text=text, metadata=metadata))
 
@@ -0,0 +1,248 @@
+# Copyright 2025 ApeCloud, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Process-wide keep-alive HTTP client pools for model provider calls.
+
+Completion, embedding and rerank services are created per request, so any HTTP client they
+created themselves would repeat the TCP and TLS handshakes of every call. Instead they borrow
+the clients of this module, one per (base_url, provider), which keep their connections alive
+between calls and use HTTP/2 when the h2 package is installed.
+
+Async clients are bound to the event loop they are created on: each loop (the API server's, or
+the long-lived loop of a Celery worker) gets its own clients, closed when the loop shuts down.
+Short-lived loops never shut the pool down, so async clients and the OpenAI SDK clients (one per
+API key) are kept in LRUs of HTTP_POOL_MAX_ASYNC_CLIENTS and HTTP_POOL_MAX_OPENAI_CLIENTS entries.
+
+Calls made through litellm use the pools for providers served by the OpenAI SDK, by passing an
+OpenAI client built on the pooled connection. Other providers keep using litellm's own clients.
+"""
+
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import httpx
+
+from aperag.config import settings
+
+logger = logging.getLogger(__name__)
+
+# custom_llm_provider values litellm serves with the OpenAI SDK, which accepts our client
+OPENAI_SDK_PROVIDERS = ("openai", "custom_openai")
+
+# Default timeouts of pooled clients, the services pass their own per request
+DEFAULT_TIMEOUT = httpx.Timeout(60.0, connect=10.0)
+
+_h2_available: Optional[bool] = None
+
+
+def http2_enabled() -> bool:
+    global _h2_available
+    if not settings.http_pool_http2:
+        return False
+    if _h2_available is None:
+        try:
+            import h2  # noqa: F401
+
+            _h2_available = True
+        except ImportError:
+            _h2_available = False
+    return _h2_available
+
+
+def uses_openai_sdk(provider: Optional[str]) -> bool:
+    return settings.http_pool_enabled and provider in OPENAI_SDK_PROVIDERS
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=settings.http_pool_max_connections,
+        max_keepalive_connections=settings.http_pool_max_keepalive_connections,
+        keepalive_expiry=settings.http_pool_keepalive_expiry,
+    )
+
+
+def _pool_key(base_url: Optional[str], provider: Optional[str]) -> Tuple[str, str]:
+    return ((base_url or "").rstrip("/"), provider or "")
+
+
+def _api_key_digest(api_key: Optional[str]) -> str:
+    # Don't keep API keys in plain text in the cache keys
+    return hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()
+
+
+# An async client and the event loop it is bound to
+AsyncClientEntry = Tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def _close_async_client(loop: asyncio.AbstractEventLoop, client: httpx.AsyncClient) -> None:
+    """Close an evicted async client on its own loop, a closed loop already dropped its connections"""
+    if loop.is_closed() or client.is_closed:
+        return
+    try:
+        if loop is _running_loop():
+            loop.create_task(client.aclose())
+        else:
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+    except RuntimeError:
+        # The loop was closed meanwhile
+        pass
+
+
+class HttpClientPool:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clients: Dict[Tuple[str, str], httpx.Client] = {}
+        self._async_clients: "OrderedDict[Tuple[int, str, str], AsyncClientEntry]" = OrderedDict()
+        self._openai_clients: "OrderedDict[Tuple, object]" = OrderedDict()
+
+    def _evict_async_clients(self) -> list:
+        """Drop the clients of closed loops and the least recently used ones over the cap, under the lock"""
+        evicted = [key for key, (loop, _) in self._async_clients.items() if loop.is_closed()]
+        overflow = len(self._async_clients) - len(evicted) - max(1, settings.http_pool_max_async_clients)
+        for key in self._async_clients:
+            if overflow <= 0:
+                break
+            if key not in evicted:
+                evicted.append(key)
+                overflow -= 1
+        entries = [self._async_clients.pop(key) for key in evicted]
+        if entries:
+            clients = [client for _, client in entries]
+            # The OpenAI SDK clients on the evicted connections go with them
+            for key in [
+                key for key, value in self._openai_clients.items() if key[0] == "async" and value[0] in clients
+            ]:
+                del self._openai_clients[key]
+        return entries
+
+    def _put_openai_client(self, key: Tuple, value) -> None:
+        """Cache an OpenAI SDK client, under the lock"""
+        self._openai_clients[key] = value
+        self._openai_clients.move_to_end(key)
+        # They only wrap a pooled connection, which stays open for the other clients
+        while len(self._openai_clients) > max(1, settings.http_pool_max_openai_clients):
+            self._openai_clients.popitem(last=False)
+
+    def get_client(self, base_url: Optional[str], provider: Optional[str]) -> httpx.Client:
+        """Sync client of (base_url, provider), shared by every thread of the process"""
+        key = _pool_key(base_url, provider)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None or client.is_closed:
+                client = httpx.Client(limits=_limits(), http2=http2_enabled(), timeout=DEFAULT_TIMEOUT)
+                self._clients[key] = client
+                logger.debug(f"Created HTTP client pool for {key}")
+            return client
+
+    def get_async_client(self, base_url: Optional[str], provider: Optional[str]) -> httpx.AsyncClient:
+        """Async client of (base_url, provider) for the running event loop"""
+        loop = asyncio.get_running_loop()
+        key = (id(loop),) + _pool_key(base_url, provider)
+        with self._lock:
+            entry = self._async_clients.get(key)
+            # A new loop may reuse the id of a closed one
+            if entry is not None and entry[0] is loop and not entry[1].is_closed:
+                self._async_clients.move_to_end(key)
+                return entry[1]
+
+            client = httpx.AsyncClient(limits=_limits(), http2=http2_enabled(), timeout=DEFAULT_TIMEOUT)
+            self._async_clients[key] = (loop, client)
+            self._async_clients.move_to_end(key)
+            evicted = self._evict_async_clients()
+            logger.debug(f"Created async HTTP client pool for {key[1:]}")
+        for evicted_loop, evicted_client in evicted:
+            _close_async_client(evicted_loop, evicted_client)
+        return client
+
+    def get_openai_client(self, base_url: Optional[str], provider: Optional[str], api_key: Optional[str]):
+        """OpenAI SDK client on the pooled sync connection, for litellm's client parameter"""
+        from openai import OpenAI
+
+        http_client = self.get_client(base_url, provider)
+        key = ("sync", id(http_client), base_url, _api_key_digest(api_key))
+        with self._lock:
+            client = self._openai_clients.get(key)
+            if client is None:
+                client = OpenAI(api_key=api_key, base_url=base_url, http_client=http_client)
+            self._put_openai_client(key, client)
+            return client
+
+    def get_async_openai_client(self, base_url: Optional[str], provider: Optional[str], api_key: Optional[str]):
+        """OpenAI SDK client on the pooled async connection, for litellm's client parameter"""
+        from openai import AsyncOpenAI
+
+        http_client = self.get_async_client(base_url, provider)
+        key = ("async", id(http_client), base_url, _api_key_digest(api_key))
+        with self._lock:
+            entry = self._openai_clients.get(key)
+            if entry is None or entry[0] is not http_client:
+                entry = (http_client, AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=http_client))
+            self._put_openai_client(key, entry)
+            return entry[1]
+
+    async def aclose(self) -> None:
+        """Close the async clients of the running event loop"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            keys = [key for key, (client_loop, _) in self._async_clients.items() if client_loop is loop]
+            clients = [self._async_clients.pop(key)[1] for key in keys]
+            self._openai_clients = OrderedDict(
+                (key, value)
+                for key, value in self._openai_clients.items()
+                if key[0] == "sync" or all(value[0] is not client for client in clients)
+            )
+        for client in clients:
+            await client.aclose()
+
+    def close(self) -> None:
+        """Close the sync clients"""
+        with self._lock:
+            clients, self._clients = list(self._clients.values()), {}
+            self._openai_clients = OrderedDict(
+                (key, value) for key, value in self._openai_clients.items() if key[0] != "sync"
+            )
+        for client in clients:
+            client.close()
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "clients": len(self._clients),
+                "async_clients": len(self._async_clients),
+                "openai_clients": len(self._openai_clients),
+            }
+
+
+http_client_pool = HttpClientPool()
+
+
+def litellm_client_kwargs(provider: Optional[str], base_url: Optional[str], api_key: Optional[str], is_async: bool):
+    """Extra litellm arguments making the call use the pooled connection of its provider"""
+    if not uses_openai_sdk(provider):
+        return {}
+    if is_async:
+        return {"client": http_client_pool.get_async_openai_client(base_url, provider, api_key)}
+    return {"client": http_client_pool.get_openai_client(base_url, provider, api_key)}
@@ -16,30 +16,135 @@
 LiteLLM Cache Configuration
 
 This module configures LiteLLM's built-in caching functionality with:
-- Redis cache storage
-- Custom cache key generation
-- Cache hit/miss tracking
-- Cache statistics
+- Disk (bounded in size, least recently used entries evicted first) or Redis cache storage
+- Cache keys prefixed with the namespace of the call: embedding, completion or rerank
+- Per-namespace hit/miss tracking, safe to update from thread pools and event loops
+- Cache statistics, including the size and evictions of the disk cache
 """
 
 import logging
-from typing import Any, Dict
+import threading
+from typing import Any, Dict, Mapping, Optional
 
 import litellm
+from litellm.caching.base_cache import BaseCache
+from litellm.caching.disk_cache import DiskCache
 from litellm.types.caching import LiteLLMCacheType
 
 logger = logging.getLogger(__name__)
 
-# Local in-memory statistics
-# Note: These are simple integer operations that may not be thread-safe
-# in multi-threaded environments, but are acceptable for monitoring purposes.
-# In multi-process environments (e.g., Celery prefork), each process maintains its own stats.
-_cache_stats = {
-    "hits": 0,
-    "misses": 0,
-    "added": 0,
-    "total_requests": 0,
-}
+CACHE_NAMESPACES = ("embedding", "completion", "rerank")
+OTHER_NAMESPACE = "other"
+
+_COUNTERS = ("hits", "misses", "added")
+
+# Log the hit rate of a namespace every this many hits
+_HIT_LOG_INTERVAL = 100
+
+
+class CacheStats:
+    """
+    Per-namespace cache counters of the current process.
+
+    Updates take a lock, so counts from concurrent threads and event loops are never lost.
+    In multi-process environments (e.g., Celery prefork), each process maintains its own stats.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[str, int]] = {}
+        self._evictions = 0
+        self._expired = 0
+
+    def record(self, namespace: str, counter: str, count: int = 1) -> int:
+        """Add count to a counter of a namespace and return its new value"""
+        with self._lock:
+            counters = self._counters.get(namespace)
+            if counters is None:
+                counters = self._counters[namespace] = dict.fromkeys(_COUNTERS, 0)
+            counters[counter] += count
+            return counters[counter]
+
+    def record_removed(self, evicted: int, expired: int) -> None:
+        with self._lock:
+            self._evictions += evicted
+            self._expired += expired
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "namespaces": {namespace: dict(counters) for namespace, counters in self._counters.items()},
+                "evictions": self._evictions,
+                "expired": self._expired,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._counters = {}
+            self._evictions = 0
+            self._expired = 0
+
+
+_cache_stats = CacheStats()
+
+
+def request_namespace(kwargs: Mapping[str, Any]) -> str:
+    """Namespace of a litellm call from its arguments"""
+    if "input" in kwargs:
+        return "embedding"
+    if "documents" in kwargs:
+        return "rerank"
+    if "messages" in kwargs or "prompt" in kwargs:
+        return "completion"
+    return OTHER_NAMESPACE
+
+
+def cache_namespace(kwargs: Mapping[str, Any]) -> str:
+    """Namespace of a cache lookup or write, from its cache key if given"""
+    cache_key = kwargs.get("cache_key")
+    if isinstance(cache_key, str):
+        prefix = cache_key.split(":", 1)[0]
+        if prefix in CACHE_NAMESPACES:
+            return prefix
+    return request_namespace(kwargs)
+
+
+class BoundedDiskCache(DiskCache):
+    """
+    litellm disk cache bounded to size_limit bytes, evicting the least recently used entries.
+
+    The cache directory is shared by the processes of a host. Entries are culled by the writes
+    that take the cache over its limit, so the number of evicted and expired entries is known.
+    """
+
+    def __init__(self, disk_cache_dir: str, size_limit: int, stats: CacheStats):
+        import diskcache as dc
+
+        BaseCache.__init__(self)
+        # cull_limit=0 turns off diskcache's own culling on writes, set_cache culls instead
+        self.disk_cache = dc.Cache(
+            disk_cache_dir,
+            size_limit=size_limit,
+            eviction_policy="least-recently-used",
+            cull_limit=0,
+        )
+        self.size_limit = size_limit
+        self.stats = stats
+
+    def set_cache(self, key, value, **kwargs):
+        super().set_cache(key, value, **kwargs)
+        self.cull()
+
+    def cull(self) -> None:
+        if self.disk_cache.volume() <= self.size_limit:
+            return
+        expired = self.disk_cache.expire()
+        evicted = self.disk_cache.cull()
+        self.stats.record_removed(evicted=evicted, expired=expired)
+        logger.debug(f"LiteLLM disk cache culled {evicted} entries and {expired} expired entries")
+
+    def get_size(self) -> Dict[str, int]:
+        return {"entries": len(self.disk_cache), "bytes": self.disk_cache.volume(), "size_limit": self.size_limit}
 
 
 # doc: https://docs.litellm.ai/docs/caching/all_caches#enabling-cache
@@ -51,6 +156,9 @@ def setup_litellm_cache(default_type=LiteLLMCacheType.DISK):
 
     if not settings.cache_enabled:
         return
+    # litellm keeps an existing cache, which is already set up
+    if litellm.cache is not None:
+        return
 
     litellm.enable_cache(
         type=default_type,
@@ -59,11 +167,16 @@ def setup_litellm_cache(default_type=LiteLLMCacheType.DISK):
         port=settings.redis_port,
         password=settings.redis_password,
         ttl=settings.cache_ttl,
-        disk_cache_dir="/tmp/litellm_cache",
+        disk_cache_dir=settings.cache_disk_dir,
     )
     # Setup custom cache handlers with local stats tracking
     # Note: Only setup if cache was successfully initialized
     if litellm.cache is not None:
+        if default_type == LiteLLMCacheType.DISK:
+            litellm.cache.cache.disk_cache.close()
+            size_limit = settings.cache_disk_size_limit
+            litellm.cache.cache = BoundedDiskCache(settings.cache_disk_dir, size_limit, _cache_stats)
+        setup_custom_get_cache_key()
         setup_custom_get_cache()
         setup_custom_add_cache()
         logger.info("LiteLLM cache with local statistics initialized")
@@ -74,77 +187,115 @@ def disable_litellm_cache():
 
 
 def setup_custom_get_cache_key():
+    """
+    Wraps litellm.cache.get_cache_key to prefix keys with the namespace of the call.
+    """
+    if litellm.cache is None:
+        return
+
+    original_get_cache_key = litellm.cache.get_cache_key
+
     def custom_get_cache_key(*args, **kwargs):
-        # return key to use for your cache:
-        key = (
-            kwargs.get("model", "")
-            + str(kwargs.get("messages", ""))
-            + str(kwargs.get("temperature", ""))
-            + str(kwargs.get("logit_bias", ""))
-        )
-        print("key for cache", key)
-        return key
+        key = original_get_cache_key(*args, **kwargs)
+        namespace = request_namespace(kwargs)
+        # litellm returns keys it already computed for a request, which may carry the prefix
+        if not key or key.startswith(f"{namespace}:"):
+            return key
+        return f"{namespace}:{key}"
 
-    if litellm.cache is not None:
-        litellm.cache.get_cache_key = custom_get_cache_key
+    litellm.cache.get_cache_key = custom_get_cache_key
+
+
+def _record_lookup(kwargs: Mapping[str, Any], result: Any) -> None:
+    namespace = cache_namespace(kwargs)
+    if result is None:
+        _cache_stats.record(namespace, "misses")
+        logger.debug(f"LiteLLM Cache MISS ({namespace})")
+        return
+
+    hits = _cache_stats.record(namespace, "hits")
+    logger.debug(f"LiteLLM Cache HIT ({namespace})")
+    if hits % _HIT_LOG_INTERVAL == 0:
+        stats = _cache_stats.snapshot()["namespaces"][namespace]
+        logger.info(
+            f"Cache HIT count of {namespace}: {stats['hits']}, "
+            f"hit rate: {stats['hits'] / (stats['hits'] + stats['misses']):.2%}"
+        )
 
 
 def setup_custom_add_cache():
     """
-    Wraps litellm.cache.add_cache to include local statistics for cache additions.
+    Wraps litellm.cache.add_cache and its async variants to include per-namespace statistics for cache additions.
     """
     if litellm.cache is None:
         return
 
-    # Store the original method
+    # Store the original methods
     original_add_cache = litellm.cache.add_cache
+    original_async_add_cache = litellm.cache.async_add_cache
+    original_async_add_cache_pipeline = litellm.cache.async_add_cache_pipeline
 
     def custom_add_cache(result, *args, **kwargs):
-        # Update local stats - simple increment, may not be atomic in multi-threaded env
-        global _cache_stats
-        _cache_stats["added"] += 1
+        _cache_stats.record(cache_namespace(kwargs), "added")
         logger.debug("LiteLLM Cache ADD")
-
-        # Call the original caching function
         return original_add_cache(result, *args, **kwargs)
 
-    # Replace the method
+    async def custom_async_add_cache(result, *args, **kwargs):
+        _cache_stats.record(cache_namespace(kwargs), "added")
+        logger.debug("LiteLLM Cache ADD")
+        return await original_async_add_cache(result, *args, **kwargs)
+
+    async def custom_async_add_cache_pipeline(result, *args, **kwargs):
+        # Embedding responses are cached one entry per input
+        _cache_stats.record(cache_namespace(kwargs), "added", len(getattr(result, "data", None) or [None]))
+        logger.debug("LiteLLM Cache ADD")
+        return await original_async_add_cache_pipeline(result, *args, **kwargs)
+
+    # Replace the methods
     litellm.cache.add_cache = custom_add_cache
+    litellm.cache.async_add_cache = custom_async_add_cache
+    litellm.cache.async_add_cache_pipeline = custom_async_add_cache_pipeline
 
 
 def setup_custom_get_cache():
     """
-    Wraps litellm.cache.get_cache to include local hit/miss statistics.
+    Wraps litellm.cache.get_cache and async_get_cache to include per-namespace hit/miss statistics.
     """
     if litellm.cache is None:
         return
 
-    # Store the original method
+    # Store the original methods
     original_get_cache = litellm.cache.get_cache
+    original_async_get_cache = litellm.cache.async_get_cache
 
     def custom_get_cache(*args, **kwargs):
-        # Call the original function to get the result from cache
         result = original_get_cache(*args, **kwargs)
+        _record_lookup(kwargs, result)
+        return result
 
-        # Update local stats - simple increment, may not be atomic in multi-threaded env
-        global _cache_stats
-        _cache_stats["total_requests"] += 1
-        if result is not None:
-            _cache_stats["hits"] += 1
-            logger.debug("LiteLLM Cache HIT")
-            if _cache_stats["hits"] % 100 == 0:
-                logger.info(
-                    f"Cache HIT count: {_cache_stats['hits']}, total requests: {_cache_stats['total_requests']}"
-                )
-                logger.info(f"Cache HIT rate: {_cache_stats['hits'] / _cache_stats['total_requests']:.2%}")
-        else:
-            _cache_stats["misses"] += 1
-            logger.debug("LiteLLM Cache MISS")
-
+    async def custom_async_get_cache(*args, **kwargs):
+        result = await original_async_get_cache(*args, **kwargs)
+        _record_lookup(kwargs, result)
         return result
 
-    # Replace the method
+    # Replace the methods
     litellm.cache.get_cache = custom_get_cache
+    litellm.cache.async_get_cache = custom_async_get_cache
+
+
+def _with_hit_rate(counters: Dict[str, int]) -> Dict[str, Any]:
+    stats = dict(counters)
+    stats["total_requests"] = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = round(stats["hits"] / stats["total_requests"], 4) if stats["total_requests"] else 0.0
+    return stats
+
+
+def get_cache_size() -> Optional[Dict[str, int]]:
+    """Entries and bytes of the disk cache, None for other cache types"""
+    cache = litellm.cache.cache if litellm.cache is not None else None
+    if isinstance(cache, BoundedDiskCache):
+        return cache.get_size()
+    return None
 
 
 def get_cache_stats() -> Dict[str, Any]:
@@ -152,31 +303,28 @@ def get_cache_stats() -> Dict[str, Any]:
     Get local in-memory cache statistics for the current process.
 
     Returns:
-        Dict containing cache statistics including hit rate calculation.
+        Dict containing the totals and hit rate, the counters of each namespace, and the
+        evictions and size of the disk cache.
     """
-    # Create a copy to avoid modification during read
-    stats = _cache_stats.copy()
+    snapshot = _cache_stats.snapshot()
+    namespaces = snapshot["namespaces"]
 
-    # Calculate hit rate
-    if stats["total_requests"] > 0:
-        stats["hit_rate"] = round(stats["hits"] / stats["total_requests"], 4)
-    else:
-        stats["hit_rate"] = 0.0
+    totals = {counter: sum(counters[counter] for counters in namespaces.values()) for counter in _COUNTERS}
+    stats = _with_hit_rate(totals)
+    stats["namespaces"] = {namespace: _with_hit_rate(counters) for namespace, counters in namespaces.items()}
+    stats["evictions"] = snapshot["evictions"]
+    stats["expired"] = snapshot["expired"]
 
     # Add metadata
-    stats["cache_type"] = "local_memory"
-    stats["note"] = "Process-specific stats, not thread-safe"
+    cache_type = litellm.cache.type if litellm.cache is not None else None
+    stats["cache_type"] = getattr(cache_type, "value", cache_type)
+    stats["size"] = get_cache_size()
+    stats["note"] = "Process-specific stats"
 
     return stats
 
 
 def clear_cache_stats() -> None:
     """Reset local in-memory cache statistics for the current process."""
-    global _cache_stats
-    _cache_stats = {
-        "hits": 0,
-        "misses": 0,
-        "added": 0,
-        "total_requests": 0,
-    }
+    _cache_stats.clear()
     logger.info("Local cache statistics cleared")
@@ -0,0 +1,137 @@
+# Copyright 2025 ApeCloud, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Local CPU rerank backend, for deployments without access to a rerank API.
+
+Models whose custom_llm_provider is "local" are sentence-transformers cross-encoders run in the
+API process. The model name is a directory under LOCAL_RERANK_MODEL_DIR; since it comes from
+the provider configuration, absolute paths and names leading out of that directory are rejected.
+Loaded models are kept in a per-process LRU of LOCAL_RERANK_MAX_MODELS entries; LOCAL_RERANK_BACKEND
+selects the torch or onnx backend.
+
+Requires the optional "model" dependencies (sentence-transformers).
+"""
+
+import asyncio
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import List
+
+from aperag.config import settings
+from aperag.llm.llm_error_types import InvalidConfigurationError, RerankError
+
+logger = logging.getLogger(__name__)
+
+LOCAL_RERANK_PROVIDER = "local"
+
+# Documents are cut to this many characters per token of max length before tokenization,
+# so a huge document isn't tokenized in full only to be truncated
+_CHARS_PER_TOKEN_CAP = 8
+
+
+def is_local_rerank_provider(custom_llm_provider: str) -> bool:
+    return (custom_llm_provider or "").strip().lower() == LOCAL_RERANK_PROVIDER
+
+
+def resolve_model_path(model: str) -> str:
+    """Directory of a model under LOCAL_RERANK_MODEL_DIR"""
+    model_dir = settings.local_rerank_model_dir
+    if not model_dir:
+        raise InvalidConfigurationError(
+            "LOCAL_RERANK_MODEL_DIR", model_dir, "Local rerank models need a model directory"
+        )
+    if not model or os.path.isabs(model) or ".." in model.replace("\\", "/").split("/"):
+        raise InvalidConfigurationError("model", model, "Local rerank models are named relative to the model directory")
+
+    root = os.path.realpath(model_dir)
+    path = os.path.realpath(os.path.join(root, model))
+    # Symlinks must not lead out of the model directory either
+    if os.path.commonpath([root, path]) != root or not os.path.isdir(path):
+        raise InvalidConfigurationError("model", model, f"No local rerank model {model} in {model_dir}")
+    return path
+
+
+class LocalCrossEncoder:
+    def __init__(self, model: str, max_length: int, batch_size: int, backend: str = "torch"):
+        try:
+            from sentence_transformers import CrossEncoder
+        except ImportError as e:
+            raise InvalidConfigurationError(
+                "rerank_provider",
+                LOCAL_RERANK_PROVIDER,
+                "Local rerank requires sentence-transformers, install the 'model' optional dependencies",
+            ) from e
+
+        kwargs = {"max_length": max_length, "device": "cpu"}
+        if backend and backend != "torch":
+            kwargs["backend"] = backend
+        path = resolve_model_path(model)
+        logger.info(f"Loading local rerank model {path} with {backend} backend")
+        self.model = model
+        self.max_length = max_length
+        self.batch_size = batch_size
+        self._encoder = CrossEncoder(path, **kwargs)
+        # Torch already uses every core for one batch, running requests concurrently only thrashes
+        self._lock = threading.Lock()
+
+    def score(self, query: str, texts: List[str]) -> List[float]:
+        max_chars = self.max_length * _CHARS_PER_TOKEN_CAP
+        pairs = [(query, text[:max_chars]) for text in texts]
+        with self._lock:
+            scores = self._encoder.predict(pairs, batch_size=self.batch_size, show_progress_bar=False)
+        return [float(score) for score in scores]
+
+
+_encoders: "OrderedDict[str, LocalCrossEncoder]" = OrderedDict()
+_encoders_lock = threading.Lock()
+
+
+def get_local_cross_encoder(model: str) -> LocalCrossEncoder:
+    """The cross-encoder of a model, loaded on first use and evicted when least recently used"""
+    with _encoders_lock:
+        encoder = _encoders.get(model)
+        if encoder is None:
+            # Loading under the lock keeps concurrent requests from loading the same model twice
+            encoder = LocalCrossEncoder(
+                model,
+                max_length=settings.local_rerank_max_length,
+                batch_size=settings.local_rerank_batch_size,
+                backend=settings.local_rerank_backend,
+            )
+            _encoders[model] = encoder
+        _encoders.move_to_end(model)
+        while len(_encoders) > max(1, settings.local_rerank_max_models):
+            evicted, _ = _encoders.popitem(last=False)
+            logger.info(f"Unloaded local rerank model {evicted}")
+    return encoder
+
+
+async def local_rerank(query: str, texts: List[str], model: str) -> dict:
+    """Rank texts with a local cross-encoder, in the response format of litellm.arerank"""
+    try:
+        # Loading and inference are CPU bound, keep them off the event loop
+        encoder = await asyncio.to_thread(get_local_cross_encoder, model)
+        scores = await asyncio.to_thread(encoder.score, query, texts)
+    except InvalidConfigurationError:
+        raise
+    except Exception as e:
+        raise RerankError(
+            f"Local rerank with model {model} failed: {e}", {"provider": LOCAL_RERANK_PROVIDER, "model": model}
+        ) from e
+
+    ranked = sorted(range(len(texts)), key=lambda index: scores[index], reverse=True)
+    return {"results": [{"index": index, "relevance_score": scores[index]} for index in ranked]}
@@ -19,12 +19,14 @@ from typing import List
 import httpx
 import litellm
 
+from aperag.llm.http_client import http_client_pool
 from aperag.llm.llm_error_types import (
     InvalidDocumentError,
     RerankError,
     TooManyDocumentsError,
     wrap_litellm_error,
 )
+from aperag.llm.rerank.local_cross_encoder import is_local_rerank_provider, local_rerank
 from aperag.query.query import DocumentWithScore
 
 logger = logging.getLogger(__name__)
@@ -102,6 +104,9 @@ class RerankService:
             if self.rerank_provider == "alibabacloud" or "alibabacloud" in self.rerank_provider.lower():
                 # Use Alibaba Cloud DashScope API format
                 resp = await self._call_alibabacloud_rerank_api(query, texts)
+            elif is_local_rerank_provider(self.rerank_provider):
+                # Cross-encoder running in this process
+                resp = await local_rerank(query, texts, self.model)
             else:
                 # Use litellm for other providers
                 resp = await litellm.arerank(
@@ -166,40 +171,40 @@ class RerankService:
 
     async def _call_alibabacloud_rerank_api(self, query: str, documents: List[str]) -> dict:
         try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                url = "https://dashscope.aliyuncs.com/api/v1/services/rerank/text-rerank/text-rerank"
-                headers = {"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"}
-
-                payload = {
-                    "model": self.model,
-                    "input": {"query": query, "documents": documents},
-                    "parameters": {"return_documents": False, "top_n": len(documents)},
+            url = "https://dashscope.aliyuncs.com/api/v1/services/rerank/text-rerank/text-rerank"
+            client = http_client_pool.get_async_client(url, self.rerank_provider)
+            headers = {"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"}
+
+            payload = {
+                "model": self.model,
+                "input": {"query": query, "documents": documents},
+                "parameters": {"return_documents": False, "top_n": len(documents)},
+            }
+
+            logger.debug(f"Alibaba Cloud rerank API request to {url} with {len(documents)} documents")
+
+            response = await client.post(url, headers=headers, json=payload, timeout=60.0)
+            response.raise_for_status()
+
+            result = response.json()
+
+            if "output" in result and "results" in result["output"]:
+                # Convert to litellm format
+                return {
+                    "results": [
+                        {"index": item.get("index", i), "relevance_score": item.get("relevance_score", 0.0)}
+                        for i, item in enumerate(result["output"]["results"])
+                    ]
                 }
-
-                logger.debug(f"Alibaba Cloud rerank API request to {url} with {len(documents)} documents")
-
-                response = await client.post(url, headers=headers, json=payload)
-                response.raise_for_status()
-
-                result = response.json()
-
-                if "output" in result and "results" in result["output"]:
-                    # Convert to litellm format
-                    return {
-                        "results": [
-                            {"index": item.get("index", i), "relevance_score": item.get("relevance_score", 0.0)}
-                            for i, item in enumerate(result["output"]["results"])
-                        ]
-                    }
-                else:
-                    raise RerankError(
-                        "Unexpected response format from Alibaba Cloud rerank API",
-                        {
-                            "provider": self.rerank_provider,
-                            "model": self.model,
-                            "response_keys": list(result.keys()) if isinstance(result, dict) else "non-dict",
-                        },
-                    )
+            else:
+                raise RerankError(
+                    "Unexpected response format from Alibaba Cloud rerank API",
+                    {
+                        "provider": self.rerank_provider,
+                        "model": self.model,
+                        "response_keys": list(result.keys()) if isinstance(result, dict) else "non-dict",
+                    },
+                )
 
         except httpx.HTTPStatusError as e:
             logger.error(
@@ -237,6 +242,10 @@ class RerankService:
         if not self.model:
             raise InvalidConfigurationError("model", self.model, "Model name cannot be empty")
 
+        if is_local_rerank_provider(self.rerank_provider):
+            # Local models need neither an API key nor an endpoint
+            return
+
         if not self.api_key:
             raise InvalidConfigurationError("api_key", None, "API key cannot be empty")
 
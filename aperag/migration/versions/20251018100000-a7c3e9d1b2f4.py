@@ -0,0 +1,44 @@
+"""add chat_message_archive table
+
+Revision ID: a7c3e9d1b2f4
+Revises: ef8cf2222205
+Create Date: 2025-10-18 10:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a7c3e9d1b2f4"
+down_revision: Union[str, None] = "ef8cf2222205"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "chat_message_archive",
+        sa.Column("id", sa.String(length=24), nullable=False),
+        sa.Column("chat_id", sa.String(length=24), nullable=False),
+        sa.Column("message_id", sa.String(length=256), nullable=True),
+        sa.Column("role", sa.String(length=16), nullable=True),
+        sa.Column("message", sa.JSON(), nullable=False),
+        sa.Column("token_count", sa.Integer(), nullable=False),
+        sa.Column("message_time", sa.Float(), nullable=True),
+        sa.Column("gmt_created", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "idx_chat_message_archive_chat_time", "chat_message_archive", ["chat_id", "message_time"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("idx_chat_message_archive_chat_time", table_name="chat_message_archive")
+    op.drop_table("chat_message_archive")
@@ -0,0 +1,167 @@
+# Copyright 2025 ApeCloud, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Token-accurate packing of retrieved documents into the context of an LLM prompt.
+
+Documents are taken in the order they are given, which is their priority (e.g. the rerank node
+puts graph results first, and those have no score), and each one that fits the remaining token
+budget is added, so a large document that doesn't fit doesn't stop smaller, later ones from being
+used. Duplicate texts are packed once. Optionally, the first document that didn't fit is trimmed
+into whatever budget is left instead of being dropped.
+
+Token counts come from the "tokens" metadata written at indexing time when present, so packing
+only tokenizes documents indexed before those counts existed.
+"""
+
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+
+from aperag.query.query import DocumentWithScore
+
+logger = logging.getLogger(__name__)
+
+# Don't bother trimming a document into less than this many tokens
+DEFAULT_MIN_TRIM_TOKENS = 64
+
+
+@dataclass
+class PackedContext:
+    """Documents selected for the context, in packing order"""
+
+    docs: List[DocumentWithScore] = field(default_factory=list)
+    tokens: int = 0
+    dropped: int = 0
+    duplicates: int = 0
+    trimmed: bool = False
+
+    @property
+    def text(self) -> str:
+        return "".join(doc.text for doc in self.docs)
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.split())
+
+
+class ContextPacker:
+    def __init__(
+        self,
+        encode: Optional[Callable[[str], List[int]]] = None,
+        decode: Optional[Callable[[List[int]], str]] = None,
+    ):
+        if encode is None:
+            try:
+                from aperag.utils.tokenizer import get_default_encoding
+
+                encoding = get_default_encoding()
+                encode, decode = encoding.encode, encoding.decode
+            except Exception as e:
+                # Fall back to a rough estimate if the encoding can't be loaded, e.g. offline
+                logger.warning(f"Failed to load tokenizer, estimating token counts: {e}")
+        self._encode = encode
+        self._decode = decode
+
+    def count_tokens(self, text: str) -> int:
+        if not text:
+            return 0
+        if self._encode is None:
+            return len(text) // 3 + 1
+        return len(self._encode(text))
+
+    def doc_tokens(self, doc: DocumentWithScore) -> int:
+        """Token count of a document, from its indexing metadata if available"""
+        cached = (doc.metadata or {}).get("tokens")
+        if isinstance(cached, int) and not isinstance(cached, bool) and cached >= 0:
+            return cached
+        return self.count_tokens(doc.text)
+
+    def trim(self, text: str, max_tokens: int) -> str:
+        """The longest prefix of text within max_tokens tokens"""
+        if max_tokens <= 0:
+            return ""
+        if self._encode is None or self._decode is None:
+            return text[: (max_tokens - 1) * 3]
+        tokens = self._encode(text)
+        if len(tokens) <= max_tokens:
+            return text
+        # Decoding a cut multi-byte character yields a replacement character, drop it
+        return self._decode(tokens[:max_tokens]).rstrip("�")
+
+    def pack(
+        self,
+        docs: List[DocumentWithScore],
+        max_tokens: int,
+        trim_tail: bool = True,
+        min_trim_tokens: int = DEFAULT_MIN_TRIM_TOKENS,
+    ) -> PackedContext:
+        """
+        Select the documents to put in a context of at most max_tokens tokens.
+
+        Documents are taken in the given order, the earlier ones have priority; scores are not
+        compared, so documents from different retrievers keep the order they were merged or
+        reranked in.
+        """
+        result = PackedContext()
+        ranked = [doc for doc in docs if doc.text and doc.text.strip()]
+
+        seen = set()
+        overflow: Optional[DocumentWithScore] = None
+        remaining = max_tokens
+        for doc in ranked:
+            key = _normalize(doc.text)
+            if key in seen:
+                result.duplicates += 1
+                continue
+            seen.add(key)
+
+            tokens = self.doc_tokens(doc)
+            if tokens > remaining:
+                result.dropped += 1
+                if overflow is None:
+                    overflow = doc
+                continue
+            result.docs.append(doc)
+            result.tokens += tokens
+            remaining -= tokens
+
+        if trim_tail and overflow is not None and remaining >= max(min_trim_tokens, 1):
+            text = self.trim(overflow.text, remaining)
+            tokens = self.count_tokens(text)
+            if text.strip() and tokens <= remaining:
+                metadata = dict(overflow.metadata or {})
+                metadata["tokens"] = tokens
+                metadata["trimmed"] = True
+                result.docs.append(overflow.model_copy(update={"text": text, "metadata": metadata}))
+                result.tokens += tokens
+                result.dropped -= 1
+                result.trimmed = True
+
+        return result
+
+
+_default_packer: Optional[ContextPacker] = None
+_default_packer_lock = threading.Lock()
+
+
+def get_context_packer() -> ContextPacker:
+    """Process-wide packer using the default tokenizer, which is loaded once"""
+    global _default_packer
+    if _default_packer is None:
+        with _default_packer_lock:
+            if _default_packer is None:
+                _default_packer = ContextPacker()
+    return _default_packer
@@ -0,0 +1,151 @@
+# Copyright 2025 ApeCloud, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Fusion of the ranked result lists of several retrievers into one ranking.
+
+The scores of the retrievers aren't comparable: vector search returns cosine similarities,
+fulltext search BM25 scores and graph search no score at all. The strategies below only
+compare scores within one list:
+
+- union: concatenate the lists, keeping their scores (the historical behaviour)
+- rrf: reciprocal rank fusion, sum of weight / (k + rank) over the lists of a document
+- minmax: sum of the weighted scores of each list, scaled to [0, 1]
+- zscore: sum of the weighted scores of each list, standardized to mean 0 and deviation 1
+
+Documents found by several retrievers, or several times by one, are collapsed into one, by
+chunk id or by a hash of their text. A list without scores is scored by rank.
+"""
+
+import hashlib
+import math
+from typing import Dict, List, Optional
+
+from aperag.query.query import DocumentWithScore
+
+FUSION_STRATEGIES = ("union", "rrf", "minmax", "zscore")
+
+DEFAULT_RRF_K = 60
+
+# Lines that vector indexing prepends to the chunk text, see create_embeddings_and_store()
+_PADDING_PREFIXES = ("> Hierarchy: ", "> Labels: ")
+
+
+def content_hash(text: Optional[str]) -> str:
+    """Hash of a text, ignoring case, whitespace and the paddings added for embedding"""
+    lines = [line for line in (text or "").splitlines() if not line.startswith(_PADDING_PREFIXES)]
+    normalized = " ".join(" ".join(lines).lower().split())
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+def _dedup_keys(doc: DocumentWithScore) -> List[str]:
+    keys = ["text:" + content_hash(doc.text)]
+    chunk_id = (doc.metadata or {}).get("chunk_id")
+    if chunk_id:
+        keys.append(f"chunk:{chunk_id}")
+    return keys
+
+
+def collapse_duplicates(docs: List[DocumentWithScore]) -> List[DocumentWithScore]:
+    """Keep the first of the documents sharing a chunk id or a text"""
+    seen = set()
+    result = []
+    for doc in docs:
+        keys = _dedup_keys(doc)
+        if any(key in seen for key in keys):
+            continue
+        seen.update(keys)
+        result.append(doc)
+    return result
+
+
+def _list_scores(docs: List[DocumentWithScore], strategy: str, rrf_k: int) -> List[float]:
+    if strategy == "rrf":
+        return [1.0 / (rrf_k + rank) for rank in range(1, len(docs) + 1)]
+
+    if any(doc.score is None for doc in docs):
+        scores = [float(len(docs) - rank) for rank in range(len(docs))]
+    else:
+        scores = [float(doc.score) for doc in docs]
+
+    if strategy == "minmax":
+        low, high = min(scores), max(scores)
+        if high == low:
+            return [1.0] * len(scores)
+        return [(score - low) / (high - low) for score in scores]
+
+    mean = sum(scores) / len(scores)
+    deviation = math.sqrt(sum((score - mean) ** 2 for score in scores) / len(scores))
+    if deviation == 0:
+        return [0.0] * len(scores)
+    return [(score - mean) / deviation for score in scores]
+
+
+def fuse(
+    ranked_lists: Dict[str, List[DocumentWithScore]],
+    strategy: str = "rrf",
+    weights: Optional[Dict[str, float]] = None,
+    rrf_k: int = DEFAULT_RRF_K,
+    deduplicate: bool = True,
+) -> List[DocumentWithScore]:
+    """
+    Fuse the ranked lists of each source (e.g. "vector", "fulltext") into one list.
+
+    Except for union, the returned documents are sorted by fused score, which replaces their
+    score. The retriever's score is kept in the "raw_score" metadata. Sources weigh 1 unless
+    weights says otherwise; a weight of 0 leaves the source out.
+    """
+    if strategy not in FUSION_STRATEGIES:
+        raise ValueError(f"Unknown fusion strategy: {strategy}")
+
+    if strategy == "union":
+        docs = [doc for docs in ranked_lists.values() for doc in docs]
+        return collapse_duplicates(docs) if deduplicate else docs
+
+    weights = weights or {}
+    # Per fused document: the document kept, and the best contribution of each source
+    entries: List[Dict] = []
+    index_by_key: Dict[str, int] = {}
+    for source, docs in ranked_lists.items():
+        weight = weights.get(source, 1.0)
+        if not docs or weight <= 0:
+            continue
+        for doc, score in zip(docs, _list_scores(docs, strategy, rrf_k)):
+            contribution = weight * score
+            keys = _dedup_keys(doc) if deduplicate else []
+            index = next((index_by_key[key] for key in keys if key in index_by_key), None)
+            if index is None:
+                index = len(entries)
+                entries.append({"doc": doc, "best": contribution, "sources": {}})
+            entry = entries[index]
+            if contribution > entry["best"]:
+                entry["doc"], entry["best"] = doc, contribution
+            entry["sources"][source] = max(entry["sources"].get(source, contribution), contribution)
+            for key in keys:
+                index_by_key.setdefault(key, index)
+
+    fused = []
+    for entry in entries:
+        doc = entry["doc"]
+        metadata = dict(doc.metadata or {})
+        metadata["raw_score"] = doc.score
+        metadata["fusion"] = strategy
+        fused.append(doc.model_copy(update={"score": sum(entry["sources"].values()), "metadata": metadata}))
+    fused.sort(key=lambda doc: doc.score, reverse=True)
+    return fused
+
+
+def is_fused(docs: List[DocumentWithScore]) -> bool:
+    """Whether the documents are ranked by a score-based fusion strategy"""
+    return bool(docs) and all((doc.metadata or {}).get("fusion") in FUSION_STRATEGIES[1:] for doc in docs)
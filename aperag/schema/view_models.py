@@ -451,9 +451,28 @@ class Agent(BaseModel):
     collections: Optional[list[Collection]] = None
 
 
+class AnswerCacheConfig(BaseModel):
+    """
+    Cache of the answers to repeated questions, reused until a collection of the bot is reindexed
+    """
+
+    enabled: Optional[bool] = Field(
+        False,
+        description='Whether to answer questions similar to earlier ones from the cache',
+    )
+    similarity_threshold: Optional[confloat(ge=0.0, le=1.0)] = Field(
+        0.95,
+        description='Min cosine similarity between the embeddings of a question and a cached one',
+    )
+    ttl: Optional[conint(ge=1)] = Field(
+        86400, description='Seconds an answer is cached'
+    )
+
+
 class BotConfig(BaseModel):
     agent: Optional[Agent] = None
     flow: Optional[WorkflowDefinition] = None
+    answer_cache: Optional[AnswerCacheConfig] = None
 
 
 class Bot(BaseModel):
@@ -515,6 +534,19 @@ class DebugFlowRequest(BaseModel):
     query: str
 
 
+class AnswerCacheStats(BaseModel):
+    enabled: Optional[bool] = Field(
+        None, description='Whether the answer cache is enabled for the bot'
+    )
+    entries: Optional[int] = Field(
+        None,
+        description="Number of answers cached for the current versions of the bot's collections",
+    )
+    hits: Optional[int] = None
+    misses: Optional[int] = None
+    hit_rate: Optional[float] = None
+
+
 class Chat(BaseModel):
     id: Optional[str] = None
     title: Optional[str] = None
@@ -826,6 +858,22 @@ class Chunk(BaseModel):
     metadata: Optional[dict[str, Any]] = None
 
 
+class ChunkList(BaseModel):
+    items: Optional[list[Chunk]] = None
+    next_cursor: Optional[str] = Field(
+        None, description='Cursor of the next page, null on the last page'
+    )
+    total: Optional[int] = Field(None, description='Total number of chunks of the document')
+
+
+class VisionChunkList(BaseModel):
+    items: Optional[list[VisionChunk]] = None
+    next_cursor: Optional[str] = Field(
+        None, description='Cursor of the next page, null on the last page'
+    )
+    total: Optional[int] = Field(None, description='Total number of vision index chunks of the document')
+
+
 class DocumentPreview(BaseModel):
     doc_object_path: Optional[str] = Field(
         None, description='The path to the document object.'
@@ -2337,6 +2385,27 @@ class UserQuotaList(BaseModel):
     items: list[UserQuotaInfo] = Field(
         ..., description='List of user quota information'
     )
+    next_cursor: Optional[str] = Field(
+        None,
+        description='Cursor for the next page, null when there are no more users',
+        examples=['user123'],
+    )
+
+
+class QuotaRecalculateAllResponse(BaseModel):
+    """
+    Result of recalculating quota usage for a batch of users
+    """
+
+    success: bool = Field(..., examples=[True])
+    processed_users: int = Field(
+        ..., description='Number of users recalculated in this batch', examples=[1000]
+    )
+    next_cursor: Optional[str] = Field(
+        None,
+        description='Cursor for the next batch, null when all users have been recalculated',
+        examples=['user123'],
+    )
 
 
 class QuotaUpdateRequest(BaseModel):
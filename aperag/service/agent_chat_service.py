@@ -416,37 +416,10 @@ class AgentChatService:
         self, agent_message: view_models.AgentMessage, user: str, chat_id: str, custom_system_prompt: str = None
     ):
         """Get or create chat session using AgentConfig."""
-        # Query provider details and API key from database
-        provider_info = await self.db_ops.query_llm_provider_by_name(agent_message.completion.model_service_provider)
-        if not provider_info:
-            error_msg = f"Provider '{agent_message.completion.model_service_provider}' not found in database"
-            logger.error(error_msg)
-            raise AgentConfigurationError(error_msg)
-
-        api_key = await self.db_ops.query_provider_api_key(
-            agent_message.completion.model_service_provider, user_id=user, need_public=True
+        # Resolve provider details and API keys (cached per user and provider)
+        credentials = await agent_session_manager.resolve_credentials(
+            self.db_ops, user, agent_message.completion.model_service_provider
         )
-        if not api_key:
-            error_msg = f"No API key available for provider '{agent_message.completion.model_service_provider}'"
-            logger.error(error_msg)
-            raise AgentConfigurationError(error_msg)
-
-        aperag_api_keys = await self.db_ops.query_api_keys(user, is_system=True)
-        for item in aperag_api_keys:
-            aperag_api_key = item.key
-        if not aperag_api_key:
-            # Auto-create a new system aperag API key for the user if none exists
-            logger.info(
-                f"No aperag API key found for user {user}, creating a new system key")
-            try:
-                api_key_result = await self.db_ops.create_api_key(user=user, description="aperag", is_system=True)
-                aperag_api_key = api_key_result.key
-                logger.info(
-                    f"Successfully created new system aperag API key for user {user}")
-            except Exception as e:
-                error_msg = f"Failed to create aperag API key for user {user}: {str(e)}"
-                logger.error(error_msg)
-                raise AgentConfigurationError(error_msg)
 
         # Determine system prompt: use custom if provided, otherwise use default
         system_prompt = (
@@ -459,13 +432,13 @@ class AgentChatService:
             user_id=user,
             chat_id=chat_id,
             provider_name=agent_message.completion.model_service_provider,
-            api_key=api_key,
-            base_url=provider_info.base_url,
+            api_key=credentials.api_key,
+            base_url=credentials.base_url,
             default_model=agent_message.completion.model,
             language=agent_message.language if agent_message.language else "en-US",
             instruction=system_prompt,
             server_names=["aperag"],
-            aperag_api_key=aperag_api_key,
+            aperag_api_key=credentials.aperag_api_key,
             aperag_mcp_url=os.getenv(
                 "APERAG_MCP_URL", "http://localhost:8000/mcp/"),
             temperature=0.7,
@@ -0,0 +1,454 @@
+# Copyright 2025 ApeCloud, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Per-bot cache of the answers to repeated questions.
+
+Bots that enable answer_cache in their config answer a question from the cache when it is close
+enough to one answered before: the cosine similarity of the L2-normalized query embeddings must
+reach the bot's similarity_threshold. Identical questions, up to case and whitespace, are found
+without embedding them.
+
+Answers are stored in Redis under a key derived from the bot config and the index versions of the
+collections its flow searches, so reindexing any of them, or editing the bot, starts a new cache;
+the entries of older versions are never read again and expire after the bot's TTL. Computing the
+index versions scans the index rows of the collections, so each process reuses them for
+ANSWER_CACHE_VERSION_TTL seconds; a reindex takes up to that long to start the new cache. The embeddings
+of the cached questions are kept in a separate hash, so a lookup only loads the answer it returns,
+and a sorted set orders the entries by age for eviction.
+
+The query is embedded with the embedding model of the bot's first collection, inside the caller's
+shared_query_embeddings block, so on a miss the flow's vector search reuses the embedding.
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncGenerator, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from pydantic import ValidationError
+
+from aperag.config import settings
+from aperag.db.ops import AsyncDatabaseOps, async_db_ops
+from aperag.flow.base.models import FlowInstance
+from aperag.schema import view_models
+from aperag.utils.constant import DOC_QA_REFERENCES, DOCUMENT_URLS
+from aperag.utils.history import BaseChatMessageHistory, write_history_in_background
+
+logger = logging.getLogger(__name__)
+
+ANSWER_CACHE_KEY_PREFIX = "answer_cache:"
+ANSWER_CACHE_STATS_KEY_PREFIX = "answer_cache_stats:"
+
+# Characters per chunk when streaming a cached answer
+REPLAY_CHUNK_CHARS = 64
+
+# Stores an entry and evicts the oldest ones over the limit in one step, so concurrent stores
+# never evict an entry another one just wrote.
+# KEYS: answers hash, embeddings hash, created sorted set
+# ARGV: field, answer entry, embedding entry, created, ttl, max entries
+STORE_SCRIPT = """
+redis.call("HSET", KEYS[1], ARGV[1], ARGV[2])
+redis.call("HSET", KEYS[2], ARGV[1], ARGV[3])
+redis.call("ZADD", KEYS[3], ARGV[4], ARGV[1])
+local excess = redis.call("ZCARD", KEYS[3]) - tonumber(ARGV[6])
+if excess > 0 then
+    local oldest = redis.call("ZRANGE", KEYS[3], 0, excess - 1)
+    redis.call("ZREM", KEYS[3], unpack(oldest))
+    redis.call("HDEL", KEYS[1], unpack(oldest))
+    redis.call("HDEL", KEYS[2], unpack(oldest))
+end
+for i = 1, 3 do
+    redis.call("EXPIRE", KEYS[i], ARGV[5])
+end
+return math.max(excess, 0)
+"""
+
+# Embeds a query, returns None when the bot has no embedding model
+QueryEmbedder = Callable[[str], Awaitable[Optional[List[float]]]]
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.split()).casefold()
+
+
+def flow_collection_ids(flow: FlowInstance) -> List[str]:
+    """IDs of the collections searched by the nodes of a flow"""
+    collection_ids = set()
+    for node in flow.nodes.values():
+        ids = node.input_values.get("collection_ids")
+        if isinstance(ids, list):
+            collection_ids.update(str(collection_id) for collection_id in ids if collection_id)
+    return sorted(collection_ids)
+
+
+def get_answer_cache_config(bot_config: Dict[str, Any]) -> Optional[view_models.AnswerCacheConfig]:
+    """The answer cache config of a bot, None if the cache isn't enabled for it"""
+    if not settings.answer_cache_enabled or not bot_config.get("answer_cache"):
+        return None
+    try:
+        config = view_models.AnswerCacheConfig(**bot_config["answer_cache"])
+    except (TypeError, ValidationError) as e:
+        logger.warning(f"Answer cache skipped, invalid config: {e}")
+        return None
+    return config if config.enabled else None
+
+
+def _encode_embedding(embedding: np.ndarray) -> str:
+    return base64.b64encode(embedding.astype(np.float32).tobytes()).decode("ascii")
+
+
+def _decode_embedding(data: str) -> np.ndarray:
+    return np.frombuffer(base64.b64decode(data), dtype=np.float32)
+
+
+def _normalize_embedding(embedding: List[float]) -> Optional[np.ndarray]:
+    vector = np.asarray(embedding, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else None
+
+
+def _best_match(
+    entries: Dict[Any, Any], embedding: np.ndarray, threshold: float, expires_before: float
+) -> Tuple[Any, float]:
+    """The field of the most similar unexpired embedding entry reaching the threshold, and its similarity"""
+    best, best_similarity = None, threshold
+    for name, data in entries.items():
+        entry = json.loads(data)
+        if entry["created"] <= expires_before:
+            continue
+        cached_embedding = _decode_embedding(entry["embedding"])
+        if cached_embedding.shape != embedding.shape:
+            continue
+        similarity = float(np.dot(embedding, cached_embedding))
+        if similarity >= best_similarity:
+            best, best_similarity = name, similarity
+    return best, best_similarity
+
+
+@dataclass
+class CachedAnswer:
+    query: str
+    answer: str
+    references: List[Dict[str, Any]] = field(default_factory=list)
+    urls: List[str] = field(default_factory=list)
+    similarity: float = 1.0
+
+
+@dataclass
+class AnswerCacheScope:
+    """The cache a question of a bot is looked up in and stored to"""
+
+    bot_id: str
+    key: str
+    config: view_models.AnswerCacheConfig
+    query: str
+    embed_query: QueryEmbedder
+    # Set by the lookup, to store the answer under
+    embedding: Optional[np.ndarray] = None
+
+    @property
+    def embeddings_key(self) -> str:
+        return f"{self.key}:embeddings"
+
+    @property
+    def created_key(self) -> str:
+        return f"{self.key}:created"
+
+    @property
+    def entry_field(self) -> str:
+        return hashlib.sha256(normalize_query(self.query).encode("utf-8")).hexdigest()[:32]
+
+    async def get_embedding(self) -> Optional[np.ndarray]:
+        if self.embedding is None:
+            embedding = await self.embed_query(self.query)
+            if embedding:
+                self.embedding = _normalize_embedding(embedding)
+        return self.embedding
+
+
+class AnswerCacheService:
+    def __init__(self, redis_client=None, db_ops: AsyncDatabaseOps = None):
+        self._redis_client = redis_client
+        self.db_ops = db_ops or async_db_ops
+        # Stores not finished yet, referenced so they aren't garbage collected
+        self._pending_stores: Set[asyncio.Task] = set()
+        # collection_id -> (monotonic expiry, index version)
+        self._index_versions: Dict[str, Tuple[float, str]] = {}
+
+    @property
+    def redis_client(self):
+        if self._redis_client is None:
+            from aperag.utils.history import get_async_redis_client
+
+            self._redis_client = get_async_redis_client()
+        return self._redis_client
+
+    async def _collection_index_versions(self, collection_ids: List[str]) -> Dict[str, str]:
+        """Index versions of collections, queried at most once per ANSWER_CACHE_VERSION_TTL seconds"""
+        now = time.monotonic()
+        versions = {}
+        for collection_id in collection_ids:
+            cached = self._index_versions.get(collection_id)
+            if cached and cached[0] > now:
+                versions[collection_id] = cached[1]
+        missing = [collection_id for collection_id in collection_ids if collection_id not in versions]
+        if not missing:
+            return versions
+
+        queried = await self.db_ops.query_collection_index_versions(missing)
+        ttl = settings.answer_cache_version_ttl
+        if ttl > 0:
+            # Drop expired versions, so collections asked about once don't stay cached
+            self._index_versions = {key: value for key, value in self._index_versions.items() if value[0] > now}
+            for collection_id in missing:
+                self._index_versions[collection_id] = (now + ttl, queried.get(collection_id, "0"))
+        versions.update(queried)
+        return versions
+
+    async def _cache_key(self, bot, collection_ids: List[str]) -> str:
+        versions = await self._collection_index_versions(collection_ids) if collection_ids else {}
+        signature = json.dumps({"config": bot.config, "versions": versions}, sort_keys=True)
+        digest = hashlib.sha256(signature.encode("utf-8")).hexdigest()[:32]
+        return f"{ANSWER_CACHE_KEY_PREFIX}{bot.id}:{digest}"
+
+    def _collection_query_embedder(self, user: str, collection_ids: List[str]) -> QueryEmbedder:
+        async def embed(query: str) -> Optional[List[float]]:
+            from aperag.llm.embed.base_embedding import get_collection_embedding_service_sync
+            from aperag.llm.embed.embedding_service import embed_query_shared
+
+            collections = await self.db_ops.query_collections_by_ids(user, collection_ids)
+            if not collections:
+                return None
+            collection = min(collections, key=lambda collection: collection.id)
+            embedding_model, _ = await asyncio.to_thread(get_collection_embedding_service_sync, collection)
+            return await embed_query_shared(embedding_model, query)
+
+        return embed
+
+    async def get_scope(
+        self,
+        user: str,
+        bot,
+        flow: FlowInstance,
+        query: str,
+        embed_query: Optional[QueryEmbedder] = None,
+    ) -> Optional[AnswerCacheScope]:
+        """
+        The answer cache of a question to a bot, None if the bot doesn't enable it.
+
+        Args:
+            user: User asking the question
+            bot: Bot database object
+            flow: Parsed flow of the bot
+            query: The question
+            embed_query: Embeds the question, defaults to the embedding model of the bot's first collection
+        """
+        config = get_answer_cache_config(json.loads(bot.config or "{}"))
+        if config is None or not query.strip():
+            return None
+        collection_ids = flow_collection_ids(flow)
+        try:
+            key = await self._cache_key(bot, collection_ids)
+        except Exception as e:
+            logger.warning(f"Answer cache of bot {bot.id} skipped, failed to get collection index versions: {e}")
+            return None
+        return AnswerCacheScope(
+            bot_id=bot.id,
+            key=key,
+            config=config,
+            query=query,
+            embed_query=embed_query or self._collection_query_embedder(bot.user, collection_ids),
+        )
+
+    async def _find(self, scope: AnswerCacheScope) -> Optional[CachedAnswer]:
+        exact = await self.redis_client.hget(scope.key, scope.entry_field)
+        expires_before = time.time() - scope.config.ttl
+        if exact:
+            entry = json.loads(exact)
+            if entry["created"] > expires_before:
+                return CachedAnswer(entry["query"], entry["answer"], entry["references"], entry["urls"])
+
+        embedding = await scope.get_embedding()
+        if embedding is None:
+            return None
+
+        entries = await self.redis_client.hgetall(scope.embeddings_key)
+        if not entries:
+            return None
+        # Decoding and comparing up to answer_cache_max_entries embeddings stays off the event loop
+        best, similarity = await asyncio.to_thread(
+            _best_match, entries, embedding, scope.config.similarity_threshold, expires_before
+        )
+        if best is None:
+            return None
+        data = await self.redis_client.hget(scope.key, best)
+        if not data:
+            # Evicted since the embeddings were read
+            return None
+        entry = json.loads(data)
+        return CachedAnswer(entry["query"], entry["answer"], entry["references"], entry["urls"], similarity)
+
+    async def lookup(self, scope: AnswerCacheScope) -> Optional[CachedAnswer]:
+        """Find the cached answer of the question of a scope, errors count as misses"""
+        try:
+            cached = await self._find(scope)
+        except Exception as e:
+            logger.warning(f"Answer cache lookup of bot {scope.bot_id} failed: {e}")
+            cached = None
+
+        try:
+            await self.redis_client.hincrby(
+                f"{ANSWER_CACHE_STATS_KEY_PREFIX}{scope.bot_id}", "hits" if cached else "misses", 1
+            )
+        except Exception as e:
+            logger.warning(f"Failed to count answer cache lookup of bot {scope.bot_id}: {e}")
+        if cached:
+            logger.info(f"Answer cache hit for bot {scope.bot_id}, similarity {cached.similarity:.3f}")
+        return cached
+
+    async def store(self, scope: AnswerCacheScope, answer: str, references: List[Dict], urls: List[str]) -> None:
+        embedding = await scope.get_embedding()
+        if embedding is None:
+            return
+        created = time.time()
+        entry = {
+            "query": scope.query,
+            "answer": answer,
+            "references": references,
+            "urls": urls,
+            "created": created,
+        }
+        embedding_entry = {"embedding": _encode_embedding(embedding), "created": created}
+        await self.redis_client.eval(
+            STORE_SCRIPT,
+            3,
+            scope.key,
+            scope.embeddings_key,
+            scope.created_key,
+            scope.entry_field,
+            json.dumps(entry),
+            json.dumps(embedding_entry),
+            created,
+            scope.config.ttl,
+            settings.answer_cache_max_entries,
+        )
+
+    def _store_in_background(self, scope: AnswerCacheScope, answer: str, references: List[Dict], urls: List[str]):
+        async def run():
+            try:
+                await self.store(scope, answer, references, urls)
+            except Exception as e:
+                logger.warning(f"Failed to cache answer of bot {scope.bot_id}: {e}")
+
+        task = asyncio.create_task(run())
+        self._pending_stores.add(task)
+        task.add_done_callback(self._pending_stores.discard)
+        return task
+
+    def replay(
+        self,
+        cached: CachedAnswer,
+        history: Optional[BaseChatMessageHistory] = None,
+        message_id: Optional[str] = None,
+    ) -> Callable[[], AsyncGenerator[str, None]]:
+        """
+        Async generator function streaming a cached answer like the LLM node does.
+
+        Once the answer is fully streamed it is added to the history as the AI message of message_id,
+        with its references and URLs; the question must already be in the history.
+        """
+
+        async def async_generator():
+            for start in range(0, len(cached.answer), REPLAY_CHUNK_CHARS):
+                yield cached.answer[start : start + REPLAY_CHUNK_CHARS]
+            if cached.references:
+                yield DOC_QA_REFERENCES + json.dumps(cached.references)
+            if cached.urls:
+                yield DOCUMENT_URLS + json.dumps(cached.urls)
+            if history:
+                write_history_in_background(
+                    lambda: history.add_ai_message(
+                        content=cached.answer,
+                        chat_id=history.session_id,
+                        message_id=message_id,
+                        references=cached.references,
+                        urls=cached.urls,
+                    ),
+                    description=f"history of message {message_id}",
+                )
+
+        return async_generator
+
+    def recording(
+        self, scope: AnswerCacheScope, generator_fn: Callable[[], AsyncGenerator[str, None]]
+    ) -> Callable[[], AsyncGenerator[str, None]]:
+        """Wrap the output generator function of a flow to cache the answer once it's fully streamed"""
+
+        async def async_generator():
+            chunks, references, urls = [], [], []
+            async for chunk in generator_fn():
+                yield chunk
+                try:
+                    if chunk.startswith(DOC_QA_REFERENCES):
+                        references = json.loads(chunk[len(DOC_QA_REFERENCES) :])
+                        continue
+                    if chunk.startswith(DOCUMENT_URLS):
+                        urls = json.loads(chunk[len(DOCUMENT_URLS) :])
+                        continue
+                except ValueError:
+                    logger.warning(f"Answer of bot {scope.bot_id} not cached, failed to parse {chunk[:64]}")
+                    return
+                chunks.append(chunk)
+
+            answer = "".join(chunks)
+            if answer.strip():
+                self._store_in_background(scope, answer, references, urls)
+
+        return async_generator
+
+    async def get_stats(self, bot) -> view_models.AnswerCacheStats:
+        config = get_answer_cache_config(json.loads(bot.config or "{}"))
+        stats = await self.redis_client.hgetall(f"{ANSWER_CACHE_STATS_KEY_PREFIX}{bot.id}")
+        stats = {(k.decode() if isinstance(k, bytes) else k): int(v) for k, v in stats.items()}
+        hits, misses = stats.get("hits", 0), stats.get("misses", 0)
+
+        entries = 0
+        if config is not None:
+            from aperag.flow.parser import FlowParser
+
+            flow_config = json.loads(bot.config or "{}").get("flow")
+            collection_ids = flow_collection_ids(FlowParser.parse(flow_config)) if flow_config else []
+            entries = await self.redis_client.hlen(await self._cache_key(bot, collection_ids))
+
+        return view_models.AnswerCacheStats(
+            enabled=config is not None,
+            entries=entries,
+            hits=hits,
+            misses=misses,
+            hit_rate=round(hits / (hits + misses), 4) if hits + misses else 0.0,
+        )
+
+    async def clear(self, bot_id: str) -> None:
+        """Drop the cached answers of every version of a bot, and its statistics"""
+        keys = [key async for key in self.redis_client.scan_iter(match=f"{ANSWER_CACHE_KEY_PREFIX}{bot_id}:*")]
+        await self.redis_client.delete(f"{ANSWER_CACHE_STATS_KEY_PREFIX}{bot_id}", *keys)
+
+
+answer_cache_service = AnswerCacheService()
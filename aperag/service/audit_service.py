@@ -12,26 +12,171 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
 import json
 import logging
 import re
 import uuid
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 from sqlalchemy import and_, desc, select
 
-from aperag.config import get_async_session
+from aperag.config import get_async_session, settings
 from aperag.db.models import AuditLog, AuditResource
 
 logger = logging.getLogger(__name__)
 
+# Builds the keyword arguments of AuditService.log_audit. Request/response extraction and
+# cleaning happen inside the builder, so they run in the background flusher instead of
+# on the request path.
+AuditEntryBuilder = Callable[[], Dict[str, Any]]
+
+_STOP = object()
+
+
+class AuditLogWriter:
+    """Write-behind pipeline for audit logs
+
+    Audit entries are put on a bounded in-process queue and a background task
+    batch-inserts them. When the queue is full, entries are either dropped
+    (``drop``) or the caller waits for space (``block``). Pending entries are
+    flushed on shutdown.
+    """
+
+    def __init__(
+        self,
+        audit_service: "AuditService",
+        max_queue_size: int,
+        batch_size: int,
+        flush_interval: float,
+        full_policy: str = "drop",
+    ):
+        if full_policy not in ("drop", "block"):
+            raise ValueError(f"Unsupported audit queue full policy: {full_policy}")
+        self.audit_service = audit_service
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.full_policy = full_policy
+        self.dropped_count = 0
+        self.written_count = 0
+        self.failed_count = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Start the background flusher on the running event loop"""
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._task = asyncio.create_task(self._run())
+        logger.info(
+            f"Audit log writer started (queue={self.max_queue_size}, batch={self.batch_size}, "
+            f"interval={self.flush_interval}s, policy={self.full_policy})"
+        )
+
+    async def stop(self):
+        """Flush all pending entries and stop the background flusher"""
+        if not self.running:
+            return
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+        logger.info(
+            f"Audit log writer stopped (written={self.written_count}, dropped={self.dropped_count}, "
+            f"failed={self.failed_count})"
+        )
+
+    async def submit(self, build_entry: AuditEntryBuilder) -> bool:
+        """Queue an audit entry, returns False if it was dropped"""
+        if self.full_policy == "block":
+            await self._queue.put(build_entry)
+            return True
+
+        try:
+            self._queue.put_nowait(build_entry)
+            return True
+        except asyncio.QueueFull:
+            self.dropped_count += 1
+            # Log the first drop and then every 1000th to avoid flooding the logs
+            if self.dropped_count % 1000 == 1:
+                logger.warning(f"Audit log queue is full, {self.dropped_count} entries dropped so far")
+            return False
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is _STOP:
+                break
+
+            batch = [item]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._flush(batch)
+
+        # Drain whatever is left on shutdown
+        remaining = []
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not _STOP:
+                remaining.append(item)
+        for i in range(0, len(remaining), self.batch_size):
+            await self._flush(remaining[i : i + self.batch_size])
+
+    async def _flush(self, batch: List[AuditEntryBuilder]):
+        audit_logs = []
+        for build_entry in batch:
+            try:
+                audit_logs.append(self.audit_service.build_audit_log(**build_entry()))
+            except Exception as e:
+                self.failed_count += 1
+                logger.error(f"Failed to build audit log: {e}")
+
+        if not audit_logs:
+            return
+
+        try:
+            async for session in get_async_session():
+                session.add_all(audit_logs)
+                await session.commit()
+                break  # Only process one session
+            self.written_count += len(audit_logs)
+        except Exception as e:
+            self.failed_count += len(audit_logs)
+            logger.error(f"Failed to write {len(audit_logs)} audit logs: {e}")
+
 
 class AuditService:
     """Service for handling audit logs"""
 
     def __init__(self):
         self.enabled = True
+        self.writer = AuditLogWriter(
+            self,
+            max_queue_size=settings.audit_queue_size,
+            batch_size=settings.audit_batch_size,
+            flush_interval=settings.audit_flush_interval,
+            full_policy=settings.audit_queue_full_policy,
+        )
         # Sensitive fields that should be filtered from logs
         self.sensitive_fields = {
             "password",
@@ -116,6 +261,44 @@ class AuditService:
 
         return None
 
+    def build_audit_log(
+        self,
+        user_id: Optional[str],
+        username: Optional[str],
+        resource_type: AuditResource,
+        api_name: str,
+        http_method: str,
+        path: str,
+        status_code: int,
+        start_time: int,
+        end_time: Optional[int] = None,
+        request_data: Optional[Dict[str, Any]] = None,
+        response_data: Optional[Dict[str, Any]] = None,
+        error_message: Optional[str] = None,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None,
+        request_id: Optional[str] = None,
+    ) -> AuditLog:
+        """Build an audit log row, serializing and filtering request/response data"""
+        return AuditLog(
+            id=str(uuid.uuid4()),
+            user_id=user_id,
+            username=username,
+            resource_type=resource_type,
+            api_name=api_name,
+            http_method=http_method,
+            path=path,
+            status_code=status_code,
+            start_time=start_time,
+            end_time=end_time,
+            request_data=self._safe_json_serialize(request_data),
+            response_data=self._safe_json_serialize(response_data),
+            error_message=error_message,
+            ip_address=ip_address,
+            user_agent=user_agent,
+            request_id=request_id or str(uuid.uuid4()),
+        )
+
     async def log_audit(
         self,
         user_id: Optional[str],
@@ -134,14 +317,12 @@ class AuditService:
         user_agent: Optional[str] = None,
         request_id: Optional[str] = None,
     ):
-        """Log an audit entry"""
+        """Log an audit entry immediately"""
         if not self.enabled:
             return
 
         try:
-            # Create audit log entry
-            audit_log = AuditLog(
-                id=str(uuid.uuid4()),
+            audit_log = self.build_audit_log(
                 user_id=user_id,
                 username=username,
                 resource_type=resource_type,
@@ -151,28 +332,44 @@ class AuditService:
                 status_code=status_code,
                 start_time=start_time,
                 end_time=end_time,
-                request_data=self._safe_json_serialize(request_data),
-                response_data=self._safe_json_serialize(response_data),
+                request_data=request_data,
+                response_data=response_data,
                 error_message=error_message,
                 ip_address=ip_address,
                 user_agent=user_agent,
-                request_id=request_id or str(uuid.uuid4()),
+                request_id=request_id,
             )
 
-            # Save to database with proper session management
-            async def _save_audit_log(session):
-                session.add(audit_log)
-                await session.commit()
-                return audit_log
-
             # Use get_async_session with proper session management
             async for session in get_async_session():
-                await _save_audit_log(session)
+                session.add(audit_log)
+                await session.commit()
                 break  # Only process one session
 
         except Exception as e:
             logger.error(f"Failed to log audit: {e}")
 
+    async def submit_audit(self, build_entry: AuditEntryBuilder):
+        """Log an audit entry through the write-behind queue
+
+        Falls back to a background insert when the writer is not running,
+        e.g. outside the API server lifespan.
+        """
+        if not self.enabled:
+            return
+
+        if self.writer.running:
+            await self.writer.submit(build_entry)
+            return
+
+        async def _log_now():
+            try:
+                await self.log_audit(**build_entry())
+            except Exception as e:
+                logger.error(f"Failed to log audit: {e}")
+
+        asyncio.create_task(_log_now())
+
     async def list_audit_logs(
         self,
         page: int = 1,
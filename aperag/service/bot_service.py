@@ -24,6 +24,7 @@ from aperag.exceptions import (
 )
 from aperag.schema import view_models
 from aperag.schema.view_models import Bot, BotList
+from aperag.service.answer_cache_service import answer_cache_service
 from aperag.service.quota_service import quota_service
 
 
@@ -199,6 +200,19 @@ class BotService:
 
         return None
 
+    async def get_answer_cache_stats(self, user: str, bot_id: str) -> view_models.AnswerCacheStats:
+        bot = await self.db_ops.query_bot(user, bot_id)
+        if bot is None:
+            raise ResourceNotFoundException("Bot", bot_id)
+        return await answer_cache_service.get_stats(bot)
+
+    async def clear_answer_cache(self, user: str, bot_id: str) -> None:
+        """Drop the cached answers of a bot, e.g. after its documents were corrected"""
+        bot = await self.db_ops.query_bot(user, bot_id)
+        if bot is None:
+            raise ResourceNotFoundException("Bot", bot_id)
+        await answer_cache_service.clear(bot.id)
+
 
 # Create a global service instance for easy access
 # This uses the global db_ops instance and doesn't require session management in views
@@ -27,8 +27,10 @@ from aperag.db.ops import AsyncDatabaseOps, async_db_ops
 from aperag.exceptions import ChatNotFoundException, ResourceNotFoundException
 from aperag.flow.engine import FlowEngine
 from aperag.flow.parser import FlowParser
+from aperag.llm.embed.embedding_service import shared_query_embeddings
 from aperag.schema import view_models
 from aperag.schema.view_models import Chat, ChatDetails
+from aperag.service.answer_cache_service import answer_cache_service
 from aperag.utils.constant import DOC_QA_REFERENCES, DOCUMENT_URLS
 from aperag.utils.history import (
     RedisChatMessageHistory,
@@ -333,20 +335,33 @@ class ChatService:
                 chat_id, redis_client=get_async_redis_client())
             await history.add_user_message(message, msg_id, files=files)
 
-            # Execute flow
-            _, system_outputs = await engine.execute_flow(flow, initial_data)
-            logger.info("Flow executed successfully!")
+            # Questions with attached files are answered from those files, never from the cache
+            cache_scope = None
+            if not files:
+                cache_scope = await answer_cache_service.get_scope(user, bot, flow, message)
+
+            # The cache lookup and the flow's searches embed the query once
+            with shared_query_embeddings():
+                cached = await answer_cache_service.lookup(cache_scope) if cache_scope else None
+                if cached:
+                    async_generator = answer_cache_service.replay(cached, history, msg_id)
+                else:
+                    # Execute flow
+                    _, system_outputs = await engine.execute_flow(flow, initial_data)
+                    logger.info("Flow executed successfully!")
 
-            # Find the async generator from flow outputs
-            async_generator = None
-            nodes = engine.find_end_nodes(flow)
-            for node in nodes:
-                async_generator = system_outputs[node].get("async_generator")
-                if async_generator:
-                    break
+                    # Find the async generator from flow outputs
+                    async_generator = None
+                    nodes = engine.find_end_nodes(flow)
+                    for node in nodes:
+                        async_generator = system_outputs[node].get("async_generator")
+                        if async_generator:
+                            break
 
-            if not async_generator:
-                return FrontendFormatter.format_error("No output node found")
+                    if not async_generator:
+                        return FrontendFormatter.format_error("No output node found")
+                    if cache_scope:
+                        async_generator = answer_cache_service.recording(cache_scope, async_generator)
 
             # Return streaming or non-streaming response
             if stream:
@@ -360,10 +375,8 @@ class ChatService:
                 )
             else:
                 # Collect all content for non-streaming response
-                full_content = ""
-                async for chunk in async_generator():
-                    full_content += chunk
-                return formatter.format_complete_response(msg_id or str(uuid.uuid4()), full_content)
+                chunks = [chunk async for chunk in async_generator()]
+                return formatter.format_complete_response(msg_id or str(uuid.uuid4()), "".join(chunks))
 
         except Exception as e:
             logger.exception(e)
@@ -392,6 +405,14 @@ class ChatService:
             if message.role == "human":
                 human_msg = message
 
+        # Older turns may have been trimmed from Redis into the archive
+        if (not ai_msg or not human_msg) and history.archive:
+            for message in await history.archived_messages(message_id=message_id):
+                if message.role == "ai" and not ai_msg:
+                    ai_msg = message
+                if message.role == "human" and not human_msg:
+                    human_msg = message
+
         if not ai_msg:
             raise ResourceNotFoundException("AI Message", message_id)
         if not human_msg:
@@ -513,7 +534,6 @@ class ChatService:
                         continue
 
                     # Stream response tokens
-                    full_message = ""
                     references = []
                     urls = []
 
@@ -539,7 +559,6 @@ class ChatService:
 
                         # Send streaming response
                         await websocket.send_text(success_response(message_id, chunk))
-                        full_message += chunk
 
                     # Send stop message with references and URLs
                     memory_count = 0  # You might want to implement memory counting if needed
@@ -17,6 +17,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm.attributes import flag_modified
 
 from aperag.db.ops import AsyncDatabaseOps, async_db_ops
+from aperag.db.provider_cache import invalidate_provider_config
 from aperag.exceptions import BusinessException, ErrorCode
 from aperag.schema import view_models
 
@@ -173,6 +174,8 @@ class DefaultModelService:
 
         # Execute the entire operation in a single transaction
         await self.db_ops.execute_with_transaction(_update_operation)
+        # Model tags are part of the cached model configuration
+        invalidate_provider_config()
 
         # Return updated configuration
         return await self.get_default_models(user_id)
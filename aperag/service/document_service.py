@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
 import json
 import logging
 import mimetypes
@@ -40,7 +41,14 @@ from aperag.exceptions import (
 from aperag.index.manager import document_index_manager
 from aperag.objectstore.base import get_async_object_store
 from aperag.schema import view_models
-from aperag.schema.view_models import Chunk, DocumentList, DocumentPreview, VisionChunk
+from aperag.schema.view_models import (
+    Chunk,
+    ChunkList,
+    DocumentList,
+    DocumentPreview,
+    VisionChunk,
+    VisionChunkList,
+)
 from aperag.service.marketplace_service import marketplace_service
 from aperag.utils.pagination import (
     ListParams,
@@ -52,10 +60,60 @@ from aperag.utils.pagination import (
 )
 from aperag.utils.uncompress import SUPPORTED_COMPRESSED_EXTENSIONS
 from aperag.utils.utils import calculate_file_hash, generate_vector_db_collection_name, utc_now
-from aperag.vectorstore.connector import VectorStoreConnectorAdaptor
 
 logger = logging.getLogger(__name__)
 
+# Number of chunk points fetched from the vector store per request
+CHUNK_PAGE_SIZE = 200
+MAX_CHUNK_PAGE_SIZE = 1000
+CHUNK_FIELDS = {"text", "metadata"}
+
+
+def _parse_chunk_point(point) -> Optional[tuple]:
+    """Return (text, metadata) of a vector store point, or None if it has no usable payload"""
+    if not point.payload:
+        return None
+    # In llama-index-0.10.13, the payload is stored in _node_content
+    node_content = point.payload.get("_node_content")
+    if node_content and isinstance(node_content, str):
+        try:
+            payload_data = json.loads(node_content)
+        except json.JSONDecodeError:
+            logger.warning(f"Could not parse _node_content for point {point.id}")
+            return None
+        return payload_data.get("text", ""), payload_data.get("metadata", {})
+    # Fallback for older or different data structures
+    return point.payload.get("text", ""), point.payload.get("metadata", {})
+
+
+def _parse_context_ids(index_data: str) -> List[str]:
+    """Return the ctx_ids stored in the index_data of a document index"""
+    try:
+        return json.loads(index_data).get("context_ids", []) or []
+    except (json.JSONDecodeError, AttributeError):
+        return []
+
+
+def _build_chunks(points: list, vision: bool, include: set) -> list:
+    """Turn vector store points into Chunk or VisionChunk items, skipping non-vision points of vision pages"""
+    items = []
+    for point in points:
+        parsed = _parse_chunk_point(point)
+        if parsed is None:
+            continue
+        text, metadata = parsed
+        if vision and metadata.get("index_method") != "vision_to_text":
+            continue
+        chunk_fields = {
+            "text": text if "text" in include else None,
+            "metadata": metadata if "metadata" in include else None,
+        }
+        if vision:
+            items.append(VisionChunk(id=point.id, asset_id=metadata.get("asset_id"), **chunk_fields))
+        else:
+            items.append(Chunk(id=point.id, **chunk_fields))
+    return items
+
 
 def _trigger_index_reconciliation():
     """
@@ -801,175 +859,120 @@ class DocumentService:
         _trigger_index_reconciliation()
         return result
 
-    async def get_document_chunks(self, user_id: str, collection_id: str, document_id: str) -> List[Chunk]:
-        """
-        Get all chunks of a document.
-        """
+    async def _get_chunk_ids(
+        self, user_id: Optional[str], collection_id: str, document_id: str, index_type: db_models.DocumentIndexType
+    ) -> List[str]:
+        """Get the chunk IDs (ctx_ids) of a document index, optionally checking document ownership"""
 
-        # Use database operations with proper session management
-        async def _get_document_chunks(session):
-            # 1. Get the chunk IDs (ctx_ids) from the document_index table
-            stmt = select(db_models.DocumentIndex).filter(
+        async def _query(session):
+            stmt = select(db_models.DocumentIndex.index_data).filter(
                 db_models.DocumentIndex.document_id == document_id,
-                db_models.DocumentIndex.index_type == db_models.DocumentIndexType.VECTOR,
+                db_models.DocumentIndex.index_type == index_type,
             )
+            if user_id:
+                stmt = stmt.join(db_models.Document, db_models.Document.id == db_models.DocumentIndex.document_id).filter(
+                    db_models.Document.user == user_id, db_models.Document.collection_id == collection_id
+                )
             result = await session.execute(stmt)
-            doc_index = result.scalars().first()
-
-            if not doc_index or not doc_index.index_data:
-                return []
+            return result.scalars().first()
 
-            try:
-                index_data = json.loads(doc_index.index_data)
-                ctx_ids = index_data.get("context_ids", [])
-            except (json.JSONDecodeError, AttributeError):
-                return []
-
-            if not ctx_ids:
-                return []
-
-            # 2. Retrieve chunks from Qdrant
-            try:
-                collection_name = generate_vector_db_collection_name(
-                    collection_id=collection_id)
-                ctx = json.loads(settings.vector_db_context)
-                ctx["collection"] = collection_name
-                vector_store_adaptor = VectorStoreConnectorAdaptor(
-                    settings.vector_db_type, ctx=ctx)
-                qdrant_client = vector_store_adaptor.connector.client
-
-                points = qdrant_client.retrieve(
-                    collection_name=collection_name,
-                    ids=ctx_ids,
-                    with_payload=True,
-                )
+        index_data = await self.db_ops._execute_query(_query)
+        if not index_data:
+            return []
+        # index_data holds every ctx_id of the document, parse it off the event loop
+        return await asyncio.to_thread(_parse_context_ids, index_data)
+
+    async def _retrieve_chunk_points(self, collection_id: str, ctx_ids: List[str]) -> list:
+        """Retrieve chunk points from the vector store without blocking the event loop"""
+        from aperag.vectorstore.qdrant_connector import get_async_qdrant_client
+
+        collection_name = generate_vector_db_collection_name(collection_id=collection_id)
+        client = get_async_qdrant_client(json.loads(settings.vector_db_context))
+        points = await client.retrieve(
+            collection_name=collection_name,
+            ids=ctx_ids,
+            with_payload=["_node_content", "text", "metadata"],
+            with_vectors=False,
+        )
+        # Qdrant does not guarantee the order of retrieved points, keep the document order
+        order = {str(ctx_id): i for i, ctx_id in enumerate(ctx_ids)}
+        return sorted(points, key=lambda point: order.get(str(point.id), len(order)))
 
-                # 3. Format the response
-                chunks = []
-                for point in points:
-                    if point.payload:
-                        # In llama-index-0.10.13, the payload is stored in _node_content
-                        node_content = point.payload.get("_node_content")
-                        if node_content and isinstance(node_content, str):
-                            try:
-                                payload_data = json.loads(node_content)
-                                chunks.append(
-                                    Chunk(
-                                        id=point.id,
-                                        text=payload_data.get("text", ""),
-                                        metadata=payload_data.get(
-                                            "metadata", {}),
-                                    )
-                                )
-                            except json.JSONDecodeError:
-                                logger.warning(
-                                    f"Could not parse _node_content for point {point.id}")
-                        else:
-                            # Fallback for older or different data structures
-                            chunks.append(
-                                Chunk(
-                                    id=point.id,
-                                    text=point.payload.get("text", ""),
-                                    metadata=point.payload.get("metadata", {}),
-                                )
-                            )
+    async def list_document_chunks(
+        self,
+        user_id: Optional[str],
+        collection_id: str,
+        document_id: str,
+        vision: bool = False,
+        cursor: Optional[str] = None,
+        limit: int = CHUNK_PAGE_SIZE,
+        fields: Optional[List[str]] = None,
+    ):
+        """
+        Get a page of chunks of a document.
 
-                return chunks
-            except Exception as e:
-                logger.error(
-                    f"Failed to retrieve chunks from vector store for document {document_id}: {e}", exc_info=True
-                )
-                raise HTTPException(
-                    status_code=500, detail="Failed to retrieve chunks from vector store")
+        Chunks are paged over the document's ctx_id list: ``cursor`` is the offset of the
+        first chunk of the page and ``next_cursor`` is None on the last page. ``fields``
+        limits the returned chunk fields to a subset of ``text`` and ``metadata``.
+        Vision pages only contain vision-to-text chunks, so they may hold fewer than
+        ``limit`` items.
+        """
+        limit = max(1, min(limit, MAX_CHUNK_PAGE_SIZE))
+        try:
+            offset = int(cursor) if cursor else 0
+        except ValueError:
+            offset = -1
+        if offset < 0:
+            raise invalid_param("cursor", "cursor must be the next_cursor of a previous page")
+        if fields:
+            unknown = set(fields) - CHUNK_FIELDS
+            if unknown:
+                raise invalid_param("fields", f"unsupported chunk fields: {', '.join(sorted(unknown))}")
+        include = set(fields) if fields else CHUNK_FIELDS
+
+        index_type = db_models.DocumentIndexType.VISION if vision else db_models.DocumentIndexType.VECTOR
+        ctx_ids = await self._get_chunk_ids(user_id, collection_id, document_id, index_type)
+        window = ctx_ids[offset : offset + limit]
+        next_cursor = str(offset + limit) if offset + limit < len(ctx_ids) else None
+
+        items = await self._load_chunks(collection_id, document_id, window, vision, include)
+        list_cls = VisionChunkList if vision else ChunkList
+        return list_cls(items=items, next_cursor=next_cursor, total=len(ctx_ids))
+
+    async def _load_chunks(
+        self, collection_id: str, document_id: str, ctx_ids: List[str], vision: bool, include: set = CHUNK_FIELDS
+    ) -> list:
+        """Retrieve the chunks of ctx_ids, parsing their payloads in a worker thread"""
+        if not ctx_ids:
+            return []
+        try:
+            points = await self._retrieve_chunk_points(collection_id, ctx_ids)
+        except Exception as e:
+            logger.error(f"Failed to retrieve chunks from vector store for document {document_id}: {e}", exc_info=True)
+            raise HTTPException(status_code=500, detail="Failed to retrieve chunks from vector store")
+        return await asyncio.to_thread(_build_chunks, points, vision, include)
+
+    async def _get_all_document_chunks(self, collection_id: str, document_id: str, vision: bool) -> list:
+        """Collect every chunk of a document, retrieving MAX_CHUNK_PAGE_SIZE points per request"""
+        index_type = db_models.DocumentIndexType.VISION if vision else db_models.DocumentIndexType.VECTOR
+        ctx_ids = await self._get_chunk_ids(None, collection_id, document_id, index_type)
+        items = []
+        for offset in range(0, len(ctx_ids), MAX_CHUNK_PAGE_SIZE):
+            window = ctx_ids[offset : offset + MAX_CHUNK_PAGE_SIZE]
+            items.extend(await self._load_chunks(collection_id, document_id, window, vision))
+        return items
 
-        # Execute query with proper session management
-        return await self.db_ops._execute_query(_get_document_chunks)
+    async def get_document_chunks(self, user_id: str, collection_id: str, document_id: str) -> List[Chunk]:
+        """
+        Get all chunks of a document.
+        """
+        return await self._get_all_document_chunks(collection_id, document_id, vision=False)
 
     async def get_document_vision_chunks(self, user_id: str, collection_id: str, document_id: str) -> List[VisionChunk]:
         """
         Get all vision chunks of a document.
         """
-
-        async def _get_document_vision_chunks(session):
-            # 1. Get the chunk IDs (ctx_ids) from the document_index table
-            stmt = select(db_models.DocumentIndex).filter(
-                db_models.DocumentIndex.document_id == document_id,
-                db_models.DocumentIndex.index_type == db_models.DocumentIndexType.VISION,
-            )
-            result = await session.execute(stmt)
-            doc_index = result.scalars().first()
-
-            if not doc_index or not doc_index.index_data:
-                return []
-
-            try:
-                index_data = json.loads(doc_index.index_data)
-                ctx_ids = index_data.get("context_ids", [])
-            except (json.JSONDecodeError, AttributeError):
-                return []
-
-            if not ctx_ids:
-                return []
-
-            # 2. Retrieve chunks from Qdrant
-            try:
-                collection_name = generate_vector_db_collection_name(
-                    collection_id=collection_id)
-                ctx = json.loads(settings.vector_db_context)
-                ctx["collection"] = collection_name
-                vector_store_adaptor = VectorStoreConnectorAdaptor(
-                    settings.vector_db_type, ctx=ctx)
-                qdrant_client = vector_store_adaptor.connector.client
-
-                points = qdrant_client.retrieve(
-                    collection_name=collection_name,
-                    ids=ctx_ids,
-                    with_payload=True,
-                )
-
-                # 3. Format the response
-                vision_chunks = []
-                for point in points:
-                    if point.payload:
-                        # In llama-index-0.10.13, the payload is stored in _node_content
-                        node_content = point.payload.get("_node_content")
-                        if node_content and isinstance(node_content, str):
-                            try:
-                                payload_data = json.loads(node_content)
-                                metadata = payload_data.get("metadata", {})
-                                if metadata.get("index_method") == "vision_to_text":
-                                    vision_chunks.append(
-                                        VisionChunk(
-                                            id=point.id,
-                                            asset_id=metadata.get("asset_id"),
-                                            text=payload_data.get("text", ""),
-                                            metadata=metadata,
-                                        )
-                                    )
-                            except json.JSONDecodeError:
-                                logger.warning(
-                                    f"Could not parse _node_content for point {point.id}")
-                        else:
-                            # Fallback for older or different data structures
-                            metadata = point.payload.get("metadata", {})
-                            if metadata.get("index_method") == "vision_to_text":
-                                vision_chunks.append(
-                                    VisionChunk(
-                                        id=point.id,
-                                        asset_id=metadata.get("asset_id"),
-                                        text=point.payload.get("text", ""),
-                                        metadata=metadata,
-                                    )
-                                )
-                return vision_chunks
-            except Exception as e:
-                logger.error(
-                    f"Failed to retrieve vision chunks from vector store for document {document_id}: {e}", exc_info=True
-                )
-                raise HTTPException(
-                    status_code=500, detail="Failed to retrieve vision chunks from vector store")
-
-        return await self.db_ops._execute_query(_get_document_vision_chunks)
+        return await self._get_all_document_chunks(collection_id, document_id, vision=True)
 
     async def get_document_preview(self, user_id: str, collection_id: str, document_id: str) -> DocumentPreview:
         """
@@ -993,8 +996,10 @@ class DocumentService:
                 raise DocumentNotFoundException(document_id)
 
             # 2. Get chunks
-            chunks = await self.get_document_chunks(user_id, collection_id, document_id)
-            vision_chunks = await self.get_document_vision_chunks(user_id, collection_id, document_id)
+            chunks, vision_chunks = await asyncio.gather(
+                self.get_document_chunks(user_id, collection_id, document_id),
+                self.get_document_vision_chunks(user_id, collection_id, document_id),
+            )
 
             # 3. Get markdown content
             async_obj_store = get_async_object_store()
@@ -168,62 +168,60 @@ class EvaluationExecutor:
         """
         from config.celery_tasks import process_evaluation_item_task
 
-        # Using a dedicated redis client because we are running inside asyncio.run(), which
-        # creates an event loop each time.
-        async for redis_client in RedisConnectionManager.new_async_client():
-            lock = self._get_evaluation_processing_redis_lock(evaluation_id, expire_time=60, redis_client=redis_client)
-            try:
-                if not await lock.acquire(timeout=5):
-                    logger.info(
-                        f"Could not acquire batch lock for evaluation {evaluation_id}. Another task may be running."
-                    )
+        redis_client = await RedisConnectionManager.get_async_client()
+        lock = self._get_evaluation_processing_redis_lock(evaluation_id, expire_time=60, redis_client=redis_client)
+        try:
+            if not await lock.acquire(timeout=5):
+                logger.info(
+                    f"Could not acquire batch lock for evaluation {evaluation_id}. Another task may be running."
+                )
+                return
+
+            async for session in get_async_session(self.engine):
+                evaluation = await session.get(Evaluation, evaluation_id)
+                if not evaluation or evaluation.gmt_deleted or evaluation.status != EvaluationStatus.RUNNING:
+                    logger.info(f"Evaluation {evaluation_id} is not in a runnable state. Halting.")
                     return
 
-                async for session in get_async_session(self.engine):
-                    evaluation = await session.get(Evaluation, evaluation_id)
-                    if not evaluation or evaluation.gmt_deleted or evaluation.status != EvaluationStatus.RUNNING:
-                        logger.info(f"Evaluation {evaluation_id} is not in a runnable state. Halting.")
-                        return
+                running_items_stmt = select(func.count(EvaluationItem.id)).where(
+                    EvaluationItem.evaluation_id == evaluation_id,
+                    EvaluationItem.status == EvaluationItemStatus.RUNNING,
+                )
+                running_count = (await session.execute(running_items_stmt)).scalar_one()
 
-                    running_items_stmt = select(func.count(EvaluationItem.id)).where(
-                        EvaluationItem.evaluation_id == evaluation_id,
-                        EvaluationItem.status == EvaluationItemStatus.RUNNING,
-                    )
-                    running_count = (await session.execute(running_items_stmt)).scalar_one()
-
-                    slots_available = MAX_CONCURRENT_PROCESSING_TASKS_PER_EVALUATION - running_count
-                    if slots_available <= 0:
-                        logger.debug(f"No available slots for evaluation {evaluation_id}. Concurrency full.")
-                        return
-
-                    pending_items_stmt = (
-                        select(EvaluationItem)
-                        .where(EvaluationItem.evaluation_id == evaluation_id)
-                        .where(EvaluationItem.status == EvaluationItemStatus.PENDING)
-                        .order_by(EvaluationItem.gmt_created)
-                        .limit(slots_available)
-                    )
-                    items_to_process = (await session.execute(pending_items_stmt)).scalars().all()
-
-                    if not items_to_process:
-                        if running_count == 0:
-                            logger.info(f"All items processed for evaluation {evaluation.id}. Finalizing.")
-                            await self._finalize_evaluation(session, evaluation)
-                        else:
-                            logger.debug(
-                                f"No pending items for evaluation {evaluation.id}, but {running_count} are still running."
-                            )
-                        return
-
-                    for item in items_to_process:
-                        logger.debug(f"Dispatching task for evaluation item {item.id}")
-                        process_evaluation_item_task.delay(evaluation_id, item.id)
+                slots_available = MAX_CONCURRENT_PROCESSING_TASKS_PER_EVALUATION - running_count
+                if slots_available <= 0:
+                    logger.debug(f"No available slots for evaluation {evaluation_id}. Concurrency full.")
+                    return
 
-            except Exception as e:
-                logger.exception(f"An unexpected error occurred in batch processor for evaluation {evaluation_id}: {e}")
-            finally:
-                if lock.is_locked():
-                    await lock.release()
+                pending_items_stmt = (
+                    select(EvaluationItem)
+                    .where(EvaluationItem.evaluation_id == evaluation_id)
+                    .where(EvaluationItem.status == EvaluationItemStatus.PENDING)
+                    .order_by(EvaluationItem.gmt_created)
+                    .limit(slots_available)
+                )
+                items_to_process = (await session.execute(pending_items_stmt)).scalars().all()
+
+                if not items_to_process:
+                    if running_count == 0:
+                        logger.info(f"All items processed for evaluation {evaluation.id}. Finalizing.")
+                        await self._finalize_evaluation(session, evaluation)
+                    else:
+                        logger.debug(
+                            f"No pending items for evaluation {evaluation.id}, but {running_count} are still running."
+                        )
+                    return
+
+                for item in items_to_process:
+                    logger.debug(f"Dispatching task for evaluation item {item.id}")
+                    process_evaluation_item_task.delay(evaluation_id, item.id)
+
+        except Exception as e:
+            logger.exception(f"An unexpected error occurred in batch processor for evaluation {evaluation_id}: {e}")
+        finally:
+            if lock.is_locked():
+                await lock.release()
 
     async def process_evaluation_item(self, evaluation_id: str, item_id: str):
         """
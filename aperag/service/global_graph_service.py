@@ -1,7 +1,7 @@
 import asyncio
 import logging
 from collections import Counter
-from typing import Any, Dict, List, Optional, TYPE_CHECKING
+from typing import Any, AsyncGenerator, Dict, List, Optional, TYPE_CHECKING
 
 
 
@@ -14,6 +14,7 @@ from aperag.schema.view_models import (
     GraphHierarchyEdge,
     GraphHierarchyNode,
 )
+from aperag.graph.traversal import traverse_graph
 from aperag.service.collection_service import CollectionService, collection_service
 from aperag.service.document_service import DocumentService, document_service
 
@@ -30,6 +31,15 @@ def _status_value(raw_status: Any) -> str:
     return getattr(raw_status, "value", str(raw_status))
 
 
+def _normalize_document_id(raw_value: Any) -> Optional[str]:
+    if not raw_value:
+        return None
+    if isinstance(raw_value, str):
+        parts = raw_value.split("/")
+        return parts[-1] if parts else raw_value
+    return str(raw_value)
+
+
 class GlobalGraphService:
     """
     全局图谱服务：负责跨 Collection 的联邦搜索与聚合。
@@ -612,17 +622,101 @@ class GlobalGraphService:
             )
             return []
 
+    async def _search_collection_graph(self, collection, query: str, top_k: int) -> Dict[str, Any]:
+        """在单个 Collection 中进行实体语义检索，并批量展开其 Ego-Graph"""
+        from aperag.config import settings
+        from aperag.graph import lightrag_manager
 
-    async def federated_graph_search(
+        rag = await lightrag_manager.create_lightrag_instance(collection)
+        try:
+            # A. 语义搜索实体 (Vector Search)
+            # rag.entities_vdb.query 接受文本 query，内部会自动 embed
+            similar_entities = await rag.entities_vdb.query(query, top_k=top_k)
+            logger.debug(f"Found {len(similar_entities)} entities for {collection.id}")
+            if not similar_entities:
+                return {"nodes": [], "edges": []}
+
+            nodes_map = {}
+            edges_list = []
+            for entity_data in similar_entities:
+                e_name = entity_data["entity_name"]
+                doc_ref = _normalize_document_id(entity_data.get("document_id") or entity_data.get("source_id"))
+
+                # 添加中心节点，使用 entity_name 作为 ID，允许前端自动合并
+                nodes_map[e_name] = {
+                    "id": e_name,  # Shared ID for visual merging
+                    "label": e_name,
+                    "type": "entity",
+                    "value": entity_data.get("distance", 1.0) * 10,  # Visualization size
+                    "metadata": {
+                        "workspace": collection.title,  # Show collection name
+                        "collection_id": str(collection.id),
+                        "collection_name": collection.title,
+                        "description": entity_data.get("content", "")[:100] + "...",
+                        "source_id": entity_data.get("source_id"),
+                        "document_id": doc_ref,
+                        "match_score": entity_data.get("distance"),
+                        "match_type": "entity",
+                    },
+                }
+
+                if doc_ref:
+                    edges_list.append(
+                        {
+                            "source": f"doc_{doc_ref}",
+                            "target": e_name,
+                            "id": f"doc_{doc_ref}_{e_name}_match",
+                            "label": "extracted",
+                            "type": "EXTRACTED_FROM",
+                            "workspace": collection.title,
+                        }
+                    )
+
+            # B. 一次批量调用获取所有匹配实体的子图 (Ego-Graph)
+            _, ego_edges, _ = await traverse_graph(
+                rag.chunk_entity_relation_graph,
+                list(nodes_map.keys()),
+                max_depth=settings.global_graph_max_depth,
+                max_fanout=settings.global_graph_max_fanout,
+                max_nodes=settings.global_graph_max_nodes,
+            )
+            for src, tgt in ego_edges:
+                edges_list.append(
+                    {
+                        "source": src,
+                        "target": tgt,
+                        "id": f"{src}_{tgt}",
+                        "label": "related",  # 简化，实际需查询边属性
+                        "workspace": collection.title,
+                    }
+                )
+                # 确保 source/target 都在 nodes_map 中 (作为占位符)
+                for endpoint in (src, tgt):
+                    if endpoint not in nodes_map:
+                        nodes_map[endpoint] = {
+                            "id": endpoint,
+                            "label": endpoint,
+                            "type": "entity",
+                            "metadata": {"workspace": collection.title, "collection_id": str(collection.id)},
+                        }
+
+            return {"nodes": list(nodes_map.values()), "edges": edges_list}
+        finally:
+            await rag.finalize_storages()
+
+    async def federated_graph_search_stream(
         self, user, query: str, top_k: int = 20
-    ) -> Dict[str, Any]:
+    ) -> AsyncGenerator[Dict[str, Any], None]:
         """
-        执行全局联邦图谱搜索（结构化数据）。
-        用于前端 Global Graph Explorer 的可视化展示。
+        执行全局联邦图谱搜索，并按 Collection 完成顺序流式返回结果。
+
+        依次产出以下事件：
+        - {"event": "collection", ...}: 单个 Collection 的子图（nodes/edges），完成一个推送一个
+        - {"event": "done", ...}: 聚合后的完整图谱与匹配信息（collections/documents/entities）
         """
-        from aperag.graph import lightrag_manager
-        from aperag.schema.utils import parseCollectionConfig
+        from aperag.config import settings
         from aperag.db.ops import async_db_ops
+        from aperag.schema.utils import parseCollectionConfig
 
         logger.info(f"Starting federated graph structure search for query: {query}")
 
@@ -634,12 +728,7 @@ class GlobalGraphService:
 
         active_collections = []
         for col in collections:
-            # Check status
-            status_value = getattr(col, "status", "")
-            if hasattr(status_value, "value"):
-                status_value = status_value.value
-            
-            if str(status_value).upper() != "ACTIVE":
+            if _status_value(getattr(col, "status", "")).upper() != "ACTIVE":
                 continue
 
             try:
@@ -650,147 +739,64 @@ class GlobalGraphService:
                 logger.debug(f"Skipping collection {col.id} due to config error: {e}")
 
         if not active_collections:
-            return {"nodes": [], "edges": [], "matches": {"collections": [], "documents": [], "entities": []}}
+            yield {
+                "event": "done",
+                "nodes": [],
+                "edges": [],
+                "matches": {"collections": [], "documents": [], "entities": []},
+            }
+            return
 
         collection_lookup = {str(col.id): col for col in active_collections}
 
-        def _normalize_document_id(raw_value: Any) -> Optional[str]:
-            if not raw_value:
-                return None
-            if isinstance(raw_value, str):
-                parts = raw_value.split("/")
-                return parts[-1] if parts else raw_value
-            return str(raw_value)
-
-        # 2. 并发执行子图查询
-        # 限制并发数防止数据库过载
-        semaphore = asyncio.Semaphore(10)
+        # 2. 并发执行子图查询，限制并发数防止数据库过载
+        semaphore = asyncio.Semaphore(settings.global_graph_max_concurrency)
 
         async def _search_single_graph(collection):
             async with semaphore:
                 try:
-                    logger.info(f"DEBUG: Processing collection {collection.id} ({collection.title})")
-                    rag = await lightrag_manager.create_lightrag_instance(collection)
-                    logger.info(f"DEBUG: Created RAG instance for {collection.id}")
-                    
-                    try:
-                        # A. 语义搜索实体 (Vector Search)
-                        # rag.entities_vdb.query 接受文本 query，内部会自动 embed
-                        logger.info(f"DEBUG: Querying entities for {collection.id}")
-                        similar_entities = await rag.entities_vdb.query(query, top_k=top_k)
-                        logger.info(f"DEBUG: Found {len(similar_entities)} entities for {collection.id}")
-                        
-                        if not similar_entities:
-                            return {"nodes": [], "edges": []}
-
-                        # B. 获取这些实体的子图 (Ego-Graph)
-                        nodes_map = {}
-                        edges_list = []
-                        
-                        # 优化：批量获取或并行获取
-                        for entity_data in similar_entities:
-                            e_name = entity_data['entity_name']
-                            doc_ref = _normalize_document_id(
-                                entity_data.get('document_id') or entity_data.get('source_id')
-                            )
-                            
-                            # 添加中心节点
-                            # 使用 entity_name 作为 ID，允许前端自动合并
-                            
-                            nodes_map[e_name] = {
-                                "id": e_name, # Shared ID for visual merging
-                                "label": e_name,
-                                "type": "entity",
-                                "value": entity_data.get('distance', 1.0) * 10, # Visualization size
-                                "metadata": {
-                                    "workspace": collection.title, # Show collection name
-                                    "collection_id": str(collection.id),
-                                    "collection_name": collection.title,
-                                    "description": entity_data.get('content', '')[:100] + "...",
-                                    "source_id": entity_data.get('source_id'),
-                                    "document_id": doc_ref,
-                                    "match_score": entity_data.get('distance'),
-                                    "match_type": "entity",
-                                }
-                            }
-
-                            # 获取邻边
-                            # 注意：lightrag graph storage 接口可能不同
-                            if hasattr(rag.chunk_entity_relation_graph, 'get_node_edges'):
-                                node_edges = await rag.chunk_entity_relation_graph.get_node_edges(e_name)
-                                if node_edges:
-                                    for src, tgt in node_edges:
-                                        edge_id = f"{src}_{tgt}"
-                                        edges_list.append({
-                                            "source": src,
-                                            "target": tgt,
-                                            "id": edge_id,
-                                            "label": "related", # 简化，实际需查询边属性
-                                            "workspace": collection.title
-                                        })
-                                        
-                                        # 确保 source/target 都在 nodes_map 中 (作为占位符)
-                                        if src not in nodes_map:
-                                            nodes_map[src] = {"id": src, "label": src, "type": "entity", "metadata": {"workspace": collection.title}}
-                                        if tgt not in nodes_map:
-                                            nodes_map[tgt] = {
-                                                "id": tgt,
-                                                "label": tgt,
-                                                "type": "entity",
-                                                "metadata": {"workspace": collection.title, "collection_id": str(collection.id)},
-                                            }
-
-                            if doc_ref:
-                                doc_edge_id = f"doc_{doc_ref}_{e_name}_match"
-                                edges_list.append(
-                                    {
-                                        "source": f"doc_{doc_ref}",
-                                        "target": e_name,
-                                        "id": doc_edge_id,
-                                        "label": "extracted",
-                                        "type": "EXTRACTED_FROM",
-                                        "workspace": collection.title,
-                                    }
-                                )
-
-                        return {"nodes": list(nodes_map.values()), "edges": edges_list}
-                    finally:
-                        await rag.finalize_storages()
-
+                    result = await self._search_collection_graph(collection, query, top_k)
                 except Exception as e:
                     logger.warning(f"Graph search failed for {collection.title}: {e}")
-                    return {"nodes": [], "edges": []}
-
-        tasks = [_search_single_graph(col) for col in active_collections]
-        results = await asyncio.gather(*tasks)
-
-        # 3. 聚合结果
-        aggregated_nodes = {}
-        aggregated_edges = []
-
-        for res in results:
-            # 合并节点
-            for node in res['nodes']:
-                nid = node['id']
-                if nid not in aggregated_nodes:
-                    aggregated_nodes[nid] = node
-                    # Initialize source_collections
-                    aggregated_nodes[nid]['source_collections'] = [node['metadata']['workspace']]
-                else:
-                    # 节点已存在（跨库共现实体），合并信息
-                    if node['metadata']['workspace'] not in aggregated_nodes[nid]['source_collections']:
-                        aggregated_nodes[nid]['source_collections'].append(node['metadata']['workspace'])
-                    # 可以合并描述等
+                    result = {"nodes": [], "edges": []}
+                return collection, result
+
+        # 3. 按完成顺序推送并聚合结果
+        aggregated_nodes: Dict[str, Dict[str, Any]] = {}
+        aggregated_edges: Dict[str, Dict[str, Any]] = {}
 
-            # 合并边
-            aggregated_edges.extend(res['edges'])
+        tasks = [asyncio.create_task(_search_single_graph(col)) for col in active_collections]
+        try:
+            for completed in asyncio.as_completed(tasks):
+                collection, res = await completed
+
+                for node in res["nodes"]:
+                    nid = node["id"]
+                    workspace = node["metadata"]["workspace"]
+                    if nid not in aggregated_nodes:
+                        aggregated_nodes[nid] = node
+                        aggregated_nodes[nid]["source_collections"] = [workspace]
+                    elif workspace not in aggregated_nodes[nid]["source_collections"]:
+                        # 节点已存在（跨库共现实体），合并来源信息
+                        aggregated_nodes[nid]["source_collections"].append(workspace)
+
+                # 简单去重边
+                for edge in res["edges"]:
+                    aggregated_edges[f"{edge['source']}_{edge['target']}_{edge.get('type', '')}"] = edge
+
+                yield {
+                    "event": "collection",
+                    "collection_id": str(collection.id),
+                    "collection_name": collection.title,
+                    "nodes": res["nodes"],
+                    "edges": res["edges"],
+                }
+        finally:
+            for task in tasks:
+                task.cancel()
 
-        # 转换回列表
         final_nodes = list(aggregated_nodes.values())
-        
-        # 简单去重边
-        unique_edges = {f"{e['source']}_{e['target']}_{e.get('type', '')}": e for e in aggregated_edges}.values()
-        unique_edges_list = list(unique_edges)
+        unique_edges_list = list(aggregated_edges.values())
 
         entity_matches: List[Dict[str, Any]] = []
         for node in final_nodes:
@@ -860,8 +866,9 @@ class GlobalGraphService:
             len(matched_documents),
             len(entity_matches),
         )
-        
-        return {
+
+        yield {
+            "event": "done",
             "nodes": final_nodes,
             "edges": unique_edges_list,
             "matches": {
@@ -871,6 +878,22 @@ class GlobalGraphService:
             },
         }
 
+    async def federated_graph_search(
+        self, user, query: str, top_k: int = 20
+    ) -> Dict[str, Any]:
+        """
+        执行全局联邦图谱搜索（结构化数据）。
+        用于前端 Global Graph Explorer 的可视化展示。
+        """
+        result: Dict[str, Any] = {}
+        async for event in self.federated_graph_search_stream(user, query, top_k):
+            if event["event"] == "done":
+                result = event
+        return {
+            "nodes": result.get("nodes", []),
+            "edges": result.get("edges", []),
+            "matches": result.get("matches", {"collections": [], "documents": [], "entities": []}),
+        }
 
 global_graph_service = GlobalGraphService(
     collection_service=collection_service,
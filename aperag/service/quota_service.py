@@ -17,13 +17,19 @@ Quota service for managing user quotas and usage tracking.
 """
 
 import logging
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 from aperag.db.ops import AsyncDatabaseOps, async_db_ops
 from aperag.exceptions import QuotaExceededException
 
 logger = logging.getLogger(__name__)
 
+# Quota keys whose usage can be recalculated from resource tables
+RECALCULATED_QUOTA_TYPES = ("max_collection_count", "max_document_count", "max_bot_count")
+
+# Users per page of the admin quota listing when no limit is given
+DEFAULT_QUOTA_PAGE_SIZE = 100
+
 
 class QuotaService:
     """Service for managing user quotas."""
@@ -55,56 +61,90 @@ class QuotaService:
 
         return await self.db_ops._execute_query(_query)
 
-    async def get_all_users_quotas(self, search_term: str = None) -> List[Dict]:
-        """Get quotas for all users (admin only)."""
+    async def list_users_quotas(
+        self, search_term: str = None, cursor: Optional[str] = None, limit: Optional[int] = None
+    ) -> Dict[str, any]:
+        """List quotas for users ordered by user ID (admin only).
+
+        Users and their quotas are loaded with a single outer join. Pages are keyset
+        paginated on the user ID: pass the returned ``next_cursor`` to get the next page.
+        Pages hold DEFAULT_QUOTA_PAGE_SIZE users unless a limit is given.
+        """
+        limit = limit or DEFAULT_QUOTA_PAGE_SIZE
 
         async def _query(session):
             from sqlalchemy import or_, select
 
             from aperag.db.models import User, UserQuota
 
-            # Build query for users
-            stmt = select(User).where(User.gmt_deleted.is_(None))
+            # Page over users first so the limit applies to users, not joined quota rows
+            users_stmt = select(User.id, User.username, User.email, User.role).where(User.gmt_deleted.is_(None))
 
             # Add search filter if provided
             if search_term and search_term.strip():
                 search_value = search_term.strip()
-                stmt = stmt.where(
+                users_stmt = users_stmt.where(
                     or_(User.username == search_value, User.email == search_value, User.id == search_value)
                 )
+            if cursor:
+                users_stmt = users_stmt.where(User.id > cursor)
+            # Fetch one extra user to know whether there is a next page
+            users_stmt = users_stmt.order_by(User.id).limit(limit + 1)
+            users = users_stmt.subquery()
 
+            stmt = (
+                select(
+                    users.c.id,
+                    users.c.username,
+                    users.c.email,
+                    users.c.role,
+                    UserQuota.key,
+                    UserQuota.quota_limit,
+                    UserQuota.current_usage,
+                )
+                .outerjoin(UserQuota, UserQuota.user == users.c.id)
+                .order_by(users.c.id)
+            )
             result = await session.execute(stmt)
-            users = result.scalars().unique().all()
-
-            result_list = []
-            for user in users:
-                # Get quotas for this user
-                quota_stmt = select(UserQuota).where(UserQuota.user == user.id)
-                quota_result = await session.execute(quota_stmt)
-                quotas = quota_result.scalars().all()
-
-                quota_dict = {}
-                for quota in quotas:
-                    quota_dict[quota.key] = {
-                        "quota_limit": quota.quota_limit,
-                        "current_usage": quota.current_usage,
-                        "remaining": max(0, quota.quota_limit - quota.current_usage),
-                    }
 
-                result_list.append(
-                    {
-                        "user_id": user.id,
-                        "username": user.username,
-                        "email": user.email,
-                        "role": user.role,
-                        "quotas": quota_dict,
+            user_map = {}
+            for row in result.all():
+                user_quota = user_map.get(row.id)
+                if user_quota is None:
+                    user_quota = user_map[row.id] = {
+                        "user_id": row.id,
+                        "username": row.username,
+                        "email": row.email,
+                        "role": row.role,
+                        "quotas": {},
                     }
-                )
+                if row.key is not None:
+                    user_quota["quotas"][row.key] = {
+                        "quota_limit": row.quota_limit,
+                        "current_usage": row.current_usage,
+                        "remaining": max(0, row.quota_limit - row.current_usage),
+                    }
+
+            items = list(user_map.values())
+            next_cursor = None
+            if len(items) > limit:
+                items = items[:limit]
+                next_cursor = items[-1]["user_id"]
 
-            return result_list
+            return {"items": items, "next_cursor": next_cursor}
 
         return await self.db_ops._execute_query(_query)
 
+    async def get_all_users_quotas(self, search_term: str = None) -> List[Dict]:
+        """Get quotas for all users (admin only), one page of users at a time."""
+        items, cursor = [], None
+        while True:
+            page = await self.list_users_quotas(search_term=search_term, cursor=cursor)
+            items.extend(page["items"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                return items
+
     async def update_user_quota(self, user_id: str, quota_updates: Dict[str, int]) -> Dict[str, any]:
         """Update quota limits for a user (supports both single and batch updates)."""
 
@@ -153,61 +193,114 @@ class QuotaService:
 
         return await self.db_ops.execute_with_transaction(_operation)
 
+    async def _calculate_usage(self, session, user_ids: List[str]) -> Dict[str, Dict[str, int]]:
+        """Calculate actual resource usage for a set of users with one grouped query per resource."""
+        from sqlalchemy import func, select
+
+        from aperag.db.models import Bot, Collection, Document
+
+        usage_data = {user_id: {quota_type: 0 for quota_type in RECALCULATED_QUOTA_TYPES} for user_id in user_ids}
+        if not user_ids:
+            return usage_data
+
+        # Collection count
+        stmt = (
+            select(Collection.user, func.count())
+            .where(Collection.user.in_(user_ids), Collection.status != "DELETED")
+            .group_by(Collection.user)
+        )
+        for user_id, count in (await session.execute(stmt)).all():
+            usage_data[user_id]["max_collection_count"] = count
+
+        # Total document count across all collections
+        stmt = (
+            select(Collection.user, func.count(Document.id))
+            .select_from(Document.__table__.join(Collection.__table__, Document.collection_id == Collection.id))
+            .where(Collection.user.in_(user_ids), Document.status != "DELETED", Collection.status != "DELETED")
+            .group_by(Collection.user)
+        )
+        for user_id, count in (await session.execute(stmt)).all():
+            usage_data[user_id]["max_document_count"] = count
+
+        # Bot count (exclude system default bot)
+        stmt = (
+            select(Bot.user, func.count())
+            .where(
+                Bot.user.in_(user_ids),
+                Bot.gmt_deleted.is_(None),
+                Bot.title != "Default Agent Bot",  # Exclude system default bot
+            )
+            .group_by(Bot.user)
+        )
+        for user_id, count in (await session.execute(stmt)).all():
+            usage_data[user_id]["max_bot_count"] = count
+
+        return usage_data
+
+    async def _apply_usage(self, session, usage_data: Dict[str, Dict[str, int]]) -> None:
+        """Write recalculated usage to existing quota rows in a single executemany UPDATE."""
+        from sqlalchemy import bindparam, update
+
+        from aperag.db.models import UserQuota
+        from aperag.utils.utils import utc_now
+
+        params = [
+            {"b_user": user_id, "b_key": quota_type, "b_usage": usage}
+            for user_id, usages in usage_data.items()
+            for quota_type, usage in usages.items()
+        ]
+        if not params:
+            return
+
+        # Core table UPDATE so the parameter list is sent as a plain executemany
+        quota_table = UserQuota.__table__
+        stmt = (
+            update(quota_table)
+            .where(quota_table.c.user == bindparam("b_user"), quota_table.c.key == bindparam("b_key"))
+            .values(current_usage=bindparam("b_usage"), gmt_updated=utc_now())
+        )
+        await session.execute(stmt, params)
+
     async def recalculate_user_usage(self, user_id: str) -> Dict[str, int]:
         """Recalculate actual usage for all quotas of a user."""
 
         async def _operation(session):
-            from sqlalchemy import func, select
+            usage_data = await self._calculate_usage(session, [user_id])
+            await self._apply_usage(session, usage_data)
+            await session.flush()
+            return usage_data[user_id]
 
-            from aperag.db.models import Bot, Collection, Document, UserQuota
-            from aperag.utils.utils import utc_now
+        return await self.db_ops.execute_with_transaction(_operation)
 
-            # Calculate actual usage
-            usage_data = {}
+    async def recalculate_all_users_usage(self, cursor: Optional[str] = None, batch_size: int = 1000) -> Dict[str, any]:
+        """Recalculate usage for a batch of users ordered by user ID (admin only).
 
-            # Collection count
-            stmt = (
-                select(func.count())
-                .select_from(Collection)
-                .where(Collection.user == user_id, Collection.status != "DELETED")
-            )
-            collection_count = await session.scalar(stmt)
-            usage_data["max_collection_count"] = collection_count
+        Each batch costs a handful of queries regardless of its size: one to page
+        over users, one grouped count per resource type and one executemany UPDATE.
+        Returns the number of users processed and the cursor of the next batch,
+        which is None once every user has been recalculated.
+        """
 
-            # Total document count across all collections
-            stmt = (
-                select(func.count(Document.id))
-                .select_from(Document.__table__.join(Collection.__table__, Document.collection_id == Collection.id))
-                .where(Collection.user == user_id, Document.status != "DELETED", Collection.status != "DELETED")
-            )
-            total_document_count = await session.scalar(stmt)
-            usage_data["max_document_count"] = total_document_count
+        async def _operation(session):
+            from sqlalchemy import select
 
-            # Bot count (exclude system default bot)
-            stmt = (
-                select(func.count())
-                .select_from(Bot)
-                .where(
-                    Bot.user == user_id,
-                    Bot.gmt_deleted.is_(None),
-                    Bot.title != "Default Agent Bot",  # Exclude system default bot
-                )
-            )
-            bot_count = await session.scalar(stmt)
-            usage_data["max_bot_count"] = bot_count
+            from aperag.db.models import User
 
-            # Update quotas with recalculated usage
-            for quota_type, actual_usage in usage_data.items():
-                stmt = select(UserQuota).where(UserQuota.user == user_id, UserQuota.key == quota_type)
-                result = await session.execute(stmt)
-                quota = result.scalars().first()
+            stmt = select(User.id).where(User.gmt_deleted.is_(None))
+            if cursor:
+                stmt = stmt.where(User.id > cursor)
+            stmt = stmt.order_by(User.id).limit(batch_size + 1)
+            user_ids = list((await session.execute(stmt)).scalars().all())
 
-                if quota:
-                    quota.current_usage = actual_usage
-                    quota.gmt_updated = utc_now()
+            next_cursor = None
+            if len(user_ids) > batch_size:
+                user_ids = user_ids[:batch_size]
+                next_cursor = user_ids[-1]
 
+            usage_data = await self._calculate_usage(session, user_ids)
+            await self._apply_usage(session, usage_data)
             await session.flush()
-            return usage_data
+            return {"processed_users": len(user_ids), "next_cursor": next_cursor}
 
         return await self.db_ops.execute_with_transaction(_operation)
 
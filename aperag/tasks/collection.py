@@ -14,9 +14,8 @@
 
 import logging
 from datetime import timedelta
-from typing import Any
+from typing import Any, Dict
 
-from asgiref.sync import Dict, async_to_sync
 from sqlalchemy import and_, select
 from sqlalchemy.orm import Session
 
@@ -30,6 +29,7 @@ from aperag.llm.embed.base_embedding import get_collection_embedding_service_syn
 from aperag.objectstore.base import get_object_store
 from aperag.schema.utils import parseCollectionConfig
 from aperag.tasks.models import TaskResult
+from aperag.tasks.worker_loop import run_in_worker_loop
 from aperag.utils.utils import (
     generate_fulltext_index_name,
     generate_vector_db_collection_name,
@@ -182,7 +182,7 @@ class CollectionTask:
             await rag.finalize_storages()
 
         # Execute async deletion
-        async_to_sync(_delete_lightrag)()
+        run_in_worker_loop(_delete_lightrag())
 
         return deletion_stats
 
@@ -16,7 +16,7 @@ import logging
 
 from aperag.db.models import DocumentIndexType
 from aperag.tasks.models import IndexTaskResult, LocalDocumentInfo, ParsedDocumentData
-from aperag.tasks.utils import parse_document_content
+from aperag.tasks.utils import is_retryable_task_error, parse_document_content
 
 logger = logging.getLogger(__name__)
 
@@ -173,7 +173,9 @@ class DocumentIndexTask:
         except Exception as e:
             error_msg = f"Failed to create {index_type} index: {str(e)}"
             logger.error(f"Document {document_id}: {error_msg}")
-            return IndexTaskResult.failed_result(index_type=index_type, document_id=document_id, error=error_msg)
+            return IndexTaskResult.failed_result(
+                index_type=index_type, document_id=document_id, error=error_msg, retryable=is_retryable_task_error(e)
+            )
 
     def delete_index(self, document_id: str, index_type: str) -> IndexTaskResult:
         """
@@ -242,7 +244,9 @@ class DocumentIndexTask:
         except Exception as e:
             error_msg = f"Failed to delete {index_type} index: {str(e)}"
             logger.error(error_msg, exc_info=True)
-            return IndexTaskResult.failed_result(index_type=index_type, document_id=document_id, error=error_msg)
+            return IndexTaskResult.failed_result(
+                index_type=index_type, document_id=document_id, error=error_msg, retryable=is_retryable_task_error(e)
+            )
 
     def update_index(self, document_id: str, index_type: str, parsed_data: ParsedDocumentData) -> IndexTaskResult:
         """
@@ -363,7 +367,9 @@ class DocumentIndexTask:
         except Exception as e:
             error_msg = f"Failed to update {index_type} index: {str(e)}"
             logger.error(error_msg, exc_info=True)
-            return IndexTaskResult.failed_result(index_type=index_type, document_id=document_id, error=error_msg)
+            return IndexTaskResult.failed_result(
+                index_type=index_type, document_id=document_id, error=error_msg, retryable=is_retryable_task_error(e)
+            )
 
 
 document_index_task = DocumentIndexTask()
@@ -144,6 +144,8 @@ class IndexTaskResult:
     data: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
     message: Optional[str] = None
+    # Whether retrying the failed operation can succeed
+    retryable: bool = True
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -154,6 +156,7 @@ class IndexTaskResult:
             "data": self.data,
             "error": self.error,
             "message": self.message,
+            "retryable": self.retryable,
         }
 
     @classmethod
@@ -166,6 +169,7 @@ class IndexTaskResult:
             data=data.get("data"),
             error=data.get("error"),
             message=data.get("message"),
+            retryable=data.get("retryable", True),
         )
 
     @classmethod
@@ -182,8 +186,15 @@ class IndexTaskResult:
         )
 
     @classmethod
-    def failed_result(cls, index_type: str, document_id: str, error: str) -> "IndexTaskResult":
-        return cls(status=TaskStatus.FAILED, index_type=index_type, document_id=document_id, success=False, error=error)
+    def failed_result(cls, index_type: str, document_id: str, error: str, retryable: bool = True) -> "IndexTaskResult":
+        return cls(
+            status=TaskStatus.FAILED,
+            index_type=index_type,
+            document_id=document_id,
+            success=False,
+            error=error,
+            retryable=retryable,
+        )
 
 
 @dataclass
@@ -0,0 +1,68 @@
+# Copyright 2025 ApeCloud, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Celery queue layout for document index tasks.
+
+Bulk work is split by index type so that slow GRAPH tasks never sit in front of cheap
+VECTOR or FULLTEXT tasks, and interactive uploads get a lane of their own:
+
+- ``index_parse``: parsing of bulk documents
+- ``index_<type>``: bulk index tasks of one index type, e.g. ``index_graph``
+- ``index_interactive``: parsing and indexing of documents from collections with a small backlog
+
+Per-type concurrency caps are applied by running dedicated workers, e.g.
+``celery -A config.celery worker -Q index_graph --concurrency=2``.
+"""
+
+from typing import List, Optional
+
+from aperag.db.models import DocumentIndexType
+
+DEFAULT_QUEUE = "celery"
+INTERACTIVE_QUEUE = "index_interactive"
+PARSE_QUEUE = "index_parse"
+
+
+class IndexLane:
+    """Scheduling lane of a document index workflow"""
+
+    INTERACTIVE = "interactive"
+    BULK = "bulk"
+
+
+def index_queue(index_type: str, lane: Optional[str] = None) -> str:
+    """Queue of an index task of the given type"""
+    if lane == IndexLane.INTERACTIVE:
+        return INTERACTIVE_QUEUE
+    return f"index_{str(index_type).lower()}"
+
+
+def parse_queue(lane: Optional[str] = None) -> str:
+    """Queue of a document parse task"""
+    if lane == IndexLane.INTERACTIVE:
+        return INTERACTIVE_QUEUE
+    return PARSE_QUEUE
+
+
+def workflow_queue(lane: Optional[str] = None) -> str:
+    """Queue of the lightweight orchestration tasks of a workflow"""
+    if lane == IndexLane.INTERACTIVE:
+        return INTERACTIVE_QUEUE
+    return DEFAULT_QUEUE
+
+
+def all_index_queues() -> List[str]:
+    """All queues index tasks can be routed to, interactive lane first"""
+    return [INTERACTIVE_QUEUE, PARSE_QUEUE] + [index_queue(index_type.value) for index_type in DocumentIndexType]
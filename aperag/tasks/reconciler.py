@@ -13,12 +13,16 @@
 # limitations under the License.
 
 import logging
-from typing import List, Optional
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Dict, List, Optional, Set
 
-from sqlalchemy import and_, or_, select, update
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, case, distinct, func, or_, select, update
+from sqlalchemy.orm import Session, aliased
 
-from aperag.config import get_sync_session
+from aperag.config import get_sync_session, settings
 from aperag.db.models import (
     Collection,
     CollectionStatus,
@@ -31,6 +35,7 @@ from aperag.db.models import (
     DocumentStatus,
 )
 from aperag.schema.utils import parseCollectionConfig
+from aperag.tasks.queues import IndexLane
 from aperag.tasks.scheduler import TaskScheduler, create_task_scheduler
 from aperag.utils.constant import IndexAction
 from aperag.utils.utils import utc_now
@@ -46,168 +51,303 @@ class DocumentIndexReconciler:
 
     def reconcile_all(self):
         """
-        Main reconciliation loop - scan indexes and reconcile differences
-        Groups operations by document and index type for atomic processing
+        Main reconciliation loop - claim pending indexes in batches and schedule their tasks
+        Groups operations by document and index type so each document gets one task per operation
         """
-        # Get all indexes that need reconciliation
+        batch_size = settings.reconciler_claim_batch_size
+        successful_docs = 0
+        failed_docs = 0
+
+        # Claims whose task was never scheduled or whose worker died go back to the queue
         for session in get_sync_session():
-            operations = self._get_indexes_needing_reconciliation(session)
+            self._release_stale_claims(session)
+            session.commit()
 
-        logger.info(f"Found {len(operations)} documents need to be reconciled")
+        for _ in range(settings.reconciler_max_claim_batches):
+            # Commit the claim before scheduling so tasks never see uncommitted index states
+            for session in get_sync_session():
+                claimed_indexes = self._claim_pending_indexes(session, batch_size)
+                session.commit()
 
-        # Process each document with its own transaction
-        successful_docs = 0
-        failed_docs = 0
-        for document_id, doc_operations in operations.items():
-            try:
-                self._reconcile_single_document(document_id, doc_operations)
-                successful_docs += 1
-            except Exception as e:
-                failed_docs += 1
-                logger.error(f"Failed to reconcile document {document_id}: {e}", exc_info=True)
-                # Continue processing other documents - don't let one failure stop everything
+                operations = defaultdict(list)
+                for claimed_index in claimed_indexes:
+                    operations[claimed_index["document_id"]].append(claimed_index)
+                try:
+                    lanes = self._select_lanes(session, list(operations))
+                except Exception as e:
+                    # Lanes only affect queueing, fall back to the bulk lane
+                    logger.warning(f"Failed to select scheduling lanes: {e}")
+                    lanes = {}
+
+            failed_index_ids = []
+            batch_failed_docs = 0
+            for document_id, doc_claimed_indexes in operations.items():
+                try:
+                    self._reconcile_document_operations(document_id, doc_claimed_indexes, lanes.get(document_id))
+                    successful_docs += 1
+                except Exception as e:
+                    batch_failed_docs += 1
+                    failed_index_ids.extend(claimed_index["index_id"] for claimed_index in doc_claimed_indexes)
+                    logger.error(f"Failed to reconcile document {document_id}: {e}", exc_info=True)
+                    # Continue processing other documents - don't let one failure stop everything
+
+            # Indexes whose tasks could not be scheduled go back to the next reconciliation
+            if failed_index_ids:
+                for session in get_sync_session():
+                    self._release_indexes(session, failed_index_ids)
+                    session.commit()
+            failed_docs += batch_failed_docs
+
+            # Stop early when the batch was not full, or when nothing could be scheduled (e.g. broker is down)
+            if len(operations) < batch_size or batch_failed_docs == len(operations):
+                break
 
         logger.info(f"Reconciliation completed: {successful_docs} successful, {failed_docs} failed")
 
-    def _get_indexes_needing_reconciliation(self, session: Session) -> List[DocumentIndex]:
+    def _claim_pending_indexes(self, session: Session, batch_size: int) -> List[dict]:
         """
-        Get all indexes that need reconciliation without modifying their state.
-        State modifications will happen in individual document transactions.
+        Claim the indexes of up to batch_size documents in a single UPDATE ... RETURNING.
+
+        Documents are taken round-robin across tenants and, within a tenant, across its collections
+        (oldest first within a collection), so a bulk import does not starve everyone else. A tenant
+        never has more than INDEX_TENANT_MAX_INFLIGHT documents in progress; the rest of its backlog
+        waits in the database instead of in front of other tenants in the broker queues. Index rows
+        are locked with FOR UPDATE SKIP LOCKED, so concurrent reconcilers claim disjoint sets instead
+        of waiting on each other. All claimable indexes of a document are claimed together unless
+        another reconciler holds some of them.
         """
-        from collections import defaultdict
-
-        operations = defaultdict(lambda: {IndexAction.CREATE: [], IndexAction.UPDATE: [], IndexAction.DELETE: []})
-
-        conditions = {
-            IndexAction.CREATE: and_(
-                DocumentIndex.status == DocumentIndexStatus.PENDING,
-                DocumentIndex.observed_version < DocumentIndex.version,
-                DocumentIndex.version == 1,
-            ),
-            IndexAction.UPDATE: and_(
-                DocumentIndex.status == DocumentIndexStatus.PENDING,
-                DocumentIndex.observed_version < DocumentIndex.version,
-                DocumentIndex.version > 1,
-            ),
-            IndexAction.DELETE: and_(
-                DocumentIndex.status == DocumentIndexStatus.DELETING,
-            ),
-        }
-
-        for action, condition in conditions.items():
-            stmt = select(DocumentIndex).where(condition)
-            result = session.execute(stmt)
-            indexes = result.scalars().all()
-            for index in indexes:
-                operations[index.document_id][action].append(index)
 
-        return operations
+        def claimable(index):
+            return or_(
+                and_(
+                    index.status == DocumentIndexStatus.PENDING,
+                    index.observed_version < index.version,
+                ),
+                index.status == DocumentIndexStatus.DELETING,
+            )
 
-    def _reconcile_single_document(self, document_id: str, operations: dict):
-        """
-        Reconcile operations for a single document within its own transaction
-        """
-        for session in get_sync_session():
-            # Collect indexes for this document that need claiming
-            indexes_to_claim = []
+        # Aliases keep the subqueries from being correlated with the updated table
+        candidate = aliased(DocumentIndex, name="candidate_index")
+        locked = aliased(DocumentIndex, name="locked_index")
+
+        pending_since = func.min(candidate.gmt_updated)
+        pending_documents = (
+            select(
+                candidate.document_id,
+                Document.user.label("tenant"),
+                pending_since.label("pending_since"),
+                func.row_number()
+                .over(partition_by=Document.collection_id, order_by=pending_since)
+                .label("collection_rank"),
+            )
+            .outerjoin(Document, Document.id == candidate.document_id)
+            .where(claimable(candidate))
+            .group_by(candidate.document_id, Document.collection_id, Document.user)
+            .subquery("pending_documents")
+        )
+        tenant_rank = func.row_number().over(
+            partition_by=pending_documents.c.tenant,
+            order_by=[pending_documents.c.collection_rank, pending_documents.c.pending_since],
+        )
+        ranked_documents = select(
+            pending_documents.c.document_id,
+            pending_documents.c.tenant,
+            pending_documents.c.pending_since,
+            tenant_rank.label("tenant_rank"),
+        ).subquery("ranked_documents")
+
+        candidate_documents = select(ranked_documents.c.document_id)
+        max_inflight = settings.index_tenant_max_inflight
+        if max_inflight > 0:
+            inflight = self._inflight_documents_by_tenant()
+            candidate_documents = candidate_documents.outerjoin(
+                inflight, inflight.c.tenant == ranked_documents.c.tenant
+            ).where(ranked_documents.c.tenant_rank + func.coalesce(inflight.c.documents, 0) <= max_inflight)
+        candidate_documents = candidate_documents.order_by(
+            ranked_documents.c.tenant_rank, ranked_documents.c.pending_since
+        ).limit(batch_size)
+
+        claimable_indexes = (
+            select(locked.id)
+            .where(locked.document_id.in_(candidate_documents.scalar_subquery()), claimable(locked))
+            .with_for_update(skip_locked=True)
+        )
 
-            for action, doc_indexes in operations.items():
-                for doc_index in doc_indexes:
-                    indexes_to_claim.append((doc_index.id, doc_index.index_type, action))
+        now = utc_now()
+        claim_stmt = (
+            update(DocumentIndex)
+            .where(DocumentIndex.id.in_(claimable_indexes.scalar_subquery()), claimable(DocumentIndex))
+            .values(
+                status=case(
+                    (DocumentIndex.status == DocumentIndexStatus.DELETING, DocumentIndexStatus.DELETION_IN_PROGRESS),
+                    else_=DocumentIndexStatus.CREATING,
+                ),
+                gmt_updated=now,
+                gmt_last_reconciled=now,
+            )
+            .returning(
+                DocumentIndex.id,
+                DocumentIndex.document_id,
+                DocumentIndex.index_type,
+                DocumentIndex.status,
+                DocumentIndex.version,
+            )
+            .execution_options(synchronize_session=False)
+        )
 
-            # Atomically claim the indexes for this document
-            claimed_indexes = self._claim_document_indexes(session, document_id, indexes_to_claim)
+        try:
+            rows = session.execute(claim_stmt).all()
+        except Exception as e:
+            logger.error(f"Failed to claim pending indexes: {e}")
+            session.rollback()
+            return []
 
-            if claimed_indexes:
-                # Schedule tasks for successfully claimed indexes
-                self._reconcile_document_operations(document_id, claimed_indexes)
-                session.commit()
+        claimed_indexes = []
+        for row in rows:
+            if row.status == DocumentIndexStatus.DELETION_IN_PROGRESS:
+                action = IndexAction.DELETE
+            elif row.version == 1:
+                action = IndexAction.CREATE
             else:
-                # Some indexes couldn't be claimed (likely already being processed), skip this document
-                logger.debug(f"Skipping document {document_id} - indexes already being processed")
+                action = IndexAction.UPDATE
+            claimed_indexes.append(
+                {
+                    "index_id": row.id,
+                    "document_id": row.document_id,
+                    "index_type": row.index_type,
+                    "action": action,
+                    "target_version": row.version if action != IndexAction.DELETE else None,
+                }
+            )
 
-    def _claim_document_indexes(self, session: Session, document_id: str, indexes_to_claim: List[tuple]) -> List[dict]:
-        """
-        Atomically claim indexes for a document by updating their state.
-        Returns list of successfully claimed indexes with their details.
+        logger.info(
+            f"Claimed {len(claimed_indexes)} indexes of {len({i['document_id'] for i in claimed_indexes})} documents"
+        )
+        return claimed_indexes
+
+    def _inflight_documents_by_tenant(self):
+        """Subquery of the number of documents each tenant has index tasks in progress for"""
+        running = aliased(DocumentIndex, name="running_index")
+        # Claims older than this are considered lost (e.g. the worker died) and don't hold a slot
+        started_after = utc_now() - timedelta(seconds=settings.index_inflight_timeout)
+        return (
+            select(Document.user.label("tenant"), func.count(distinct(running.document_id)).label("documents"))
+            .join(Document, Document.id == running.document_id)
+            .where(
+                running.status.in_([DocumentIndexStatus.CREATING, DocumentIndexStatus.DELETION_IN_PROGRESS]),
+                running.gmt_updated > started_after,
+            )
+            .group_by(Document.user)
+            .subquery("inflight_documents")
+        )
+
+    def _select_lanes(self, session: Session, document_ids: List[str]) -> Dict[str, str]:
         """
-        claimed_indexes = []
+        Pick the scheduling lane of claimed documents.
 
-        try:
-            for index_id, index_type, action in indexes_to_claim:
-                if action in [IndexAction.CREATE, IndexAction.UPDATE]:
-                    target_state = DocumentIndexStatus.CREATING
-                elif action == IndexAction.DELETE:
-                    target_state = DocumentIndexStatus.DELETION_IN_PROGRESS
-                else:
-                    continue
-
-                # Get the current index record to extract version info
-                stmt = select(DocumentIndex).where(DocumentIndex.id == index_id)
-                result = session.execute(stmt)
-                current_index = result.scalar_one_or_none()
-
-                if not current_index:
-                    continue
-
-                # Build appropriate claiming conditions based on operation type
-                if action == IndexAction.CREATE:
-                    claiming_conditions = [
-                        DocumentIndex.id == index_id,
-                        DocumentIndex.status == DocumentIndexStatus.PENDING,
-                        DocumentIndex.observed_version < DocumentIndex.version,
-                        DocumentIndex.version == 1,
-                    ]
-                elif action == IndexAction.UPDATE:
-                    claiming_conditions = [
-                        DocumentIndex.id == index_id,
-                        DocumentIndex.status == DocumentIndexStatus.PENDING,
-                        DocumentIndex.observed_version < DocumentIndex.version,
-                        DocumentIndex.version > 1,
-                    ]
-                elif action == IndexAction.DELETE:
-                    claiming_conditions = [
-                        DocumentIndex.id == index_id,
-                        DocumentIndex.status == DocumentIndexStatus.DELETING,
+        Documents of collections with a small backlog (e.g. a single upload) take the interactive
+        lane, so they don't queue behind bulk imports.
+        """
+        if not document_ids:
+            return {}
+
+        backlog_index = aliased(DocumentIndex, name="backlog_index")
+        claimed_collections = select(Document.collection_id).where(Document.id.in_(document_ids))
+        backlog = (
+            select(Document.collection_id, func.count(distinct(backlog_index.document_id)).label("documents"))
+            .join(backlog_index, backlog_index.document_id == Document.id)
+            .where(
+                Document.collection_id.in_(claimed_collections),
+                backlog_index.status.in_(
+                    [
+                        DocumentIndexStatus.PENDING,
+                        DocumentIndexStatus.CREATING,
+                        DocumentIndexStatus.DELETING,
+                        DocumentIndexStatus.DELETION_IN_PROGRESS,
                     ]
+                ),
+            )
+            .group_by(Document.collection_id)
+            .subquery("collection_backlog")
+        )
+        stmt = (
+            select(Document.id, backlog.c.documents)
+            .join(backlog, backlog.c.collection_id == Document.collection_id)
+            .where(Document.id.in_(document_ids))
+        )
 
-                # Try to claim this specific index
-                update_stmt = (
-                    update(DocumentIndex)
-                    .where(and_(*claiming_conditions))
-                    .values(status=target_state, gmt_updated=utc_now(), gmt_last_reconciled=utc_now())
-                )
+        max_backlog = settings.index_interactive_max_backlog
+        lanes = {document_id: IndexLane.BULK for document_id in document_ids}
+        for document_id, backlog_documents in session.execute(stmt).all():
+            if backlog_documents <= max_backlog:
+                lanes[document_id] = IndexLane.INTERACTIVE
+        return lanes
+
+    def _release_indexes(self, session: Session, index_ids: List[int]):
+        """Give claimed indexes back to the next reconciliation by restoring their previous state"""
+        release_stmt = (
+            update(DocumentIndex)
+            .where(DocumentIndex.id.in_(index_ids))
+            .values(
+                status=case(
+                    (DocumentIndex.status == DocumentIndexStatus.DELETION_IN_PROGRESS, DocumentIndexStatus.DELETING),
+                    else_=DocumentIndexStatus.PENDING,
+                ),
+                gmt_updated=utc_now(),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        session.execute(release_stmt)
 
-                result = session.execute(update_stmt)
-                if result.rowcount > 0:
-                    # Successfully claimed this index
-                    claimed_indexes.append(
-                        {
-                            "index_id": index_id,
-                            "document_id": document_id,
-                            "index_type": index_type,
-                            "action": action,
-                            "target_version": current_index.version
-                            if action in [IndexAction.CREATE, IndexAction.UPDATE]
-                            else None,
-                        }
-                    )
-                    logger.debug(f"Claimed index {index_id} for document {document_id} ({action})")
-                else:
-                    logger.debug(f"Could not claim index {index_id} for document {document_id}")
+    def _release_stale_claims(self, session: Session):
+        """
+        Release claims without a heartbeat for INDEX_STALE_CLAIM_TIMEOUT, e.g. when the reconciler died before
+        scheduling or the worker died while running the task.
 
-            session.flush()  # Ensure changes are visible
-            return claimed_indexes
+        Running index tasks refresh their claims (see IndexTaskCallbacks.on_index_heartbeat). GRAPH tasks parked
+        until the VISION index of their document settles don't run, their claims are kept while they are parked.
+        """
+        timeout = settings.index_stale_claim_timeout
+        if timeout <= 0:
+            return
+        claimed_before = utc_now() - timedelta(seconds=timeout)
+        stale_stmt = select(DocumentIndex.id, DocumentIndex.document_id, DocumentIndex.index_type).where(
+            DocumentIndex.status.in_([DocumentIndexStatus.CREATING, DocumentIndexStatus.DELETION_IN_PROGRESS]),
+            DocumentIndex.gmt_updated <= claimed_before,
+        )
+        try:
+            stale = session.execute(stale_stmt.with_for_update(skip_locked=True)).all()
+            parked = self._parked_documents(
+                [row.document_id for row in stale if row.index_type == DocumentIndexType.GRAPH]
+            )
+            stale_ids = [
+                row.id for row in stale if not (row.index_type == DocumentIndexType.GRAPH and row.document_id in parked)
+            ]
+            if stale_ids:
+                self._release_indexes(session, stale_ids)
+                logger.warning(f"Released {len(stale_ids)} index claims without a heartbeat for {timeout}s")
         except Exception as e:
-            logger.error(f"Failed to claim indexes for document {document_id}: {e}")
-            return []
+            logger.error(f"Failed to release stale index claims: {e}")
+            session.rollback()
 
-    def _reconcile_document_operations(self, document_id: str, claimed_indexes: List[dict]):
+    @staticmethod
+    def _parked_documents(document_ids: List[str]) -> Set[str]:
+        """Documents with GRAPH tasks parked until their VISION index settles"""
+        if not document_ids:
+            return set()
+        from aperag.tasks.vision_dependency import get_vision_dependent_store
+
+        try:
+            return get_vision_dependent_store().parked_documents(document_ids)
+        except Exception as e:
+            # Releasing a parked claim would schedule its task twice, keep them all until the next reconciliation
+            logger.warning(f"Failed to check the tasks waiting for VISION indexes: {e}")
+            return set(document_ids)
+
+    def _reconcile_document_operations(self, document_id: str, claimed_indexes: List[dict], lane: Optional[str] = None):
         """
         Reconcile operations for a single document, batching same operation types together
         """
-        from collections import defaultdict
-
         # Group by operation type to batch operations
         operations_by_type = defaultdict(list)
         for claimed_index in claimed_indexes:
@@ -229,7 +369,7 @@ class DocumentIndexReconciler:
                     context[f"{index_type}_version"] = target_version
 
             self.task_scheduler.schedule_create_index(
-                document_id=document_id, index_types=create_types, context=context
+                document_id=document_id, index_types=create_types, context=context, lane=lane
             )
             logger.info(f"Scheduled create task for document {document_id}, types: {create_types}")
 
@@ -248,7 +388,7 @@ class DocumentIndexReconciler:
                     context[f"{index_type}_version"] = target_version
 
             self.task_scheduler.schedule_update_index(
-                document_id=document_id, index_types=update_types, context=context
+                document_id=document_id, index_types=update_types, context=context, lane=lane
             )
             logger.info(f"Scheduled update task for document {document_id}, types: {update_types}")
 
@@ -257,7 +397,7 @@ class DocumentIndexReconciler:
             delete_indexes = operations_by_type[IndexAction.DELETE]
             delete_types = [claimed_index["index_type"] for claimed_index in delete_indexes]
 
-            self.task_scheduler.schedule_delete_index(document_id=document_id, index_types=delete_types)
+            self.task_scheduler.schedule_delete_index(document_id=document_id, index_types=delete_types, lane=lane)
             logger.info(f"Scheduled delete task for document {document_id}, types: {delete_types}")
 
 
@@ -314,6 +454,22 @@ class IndexTaskCallbacks:
                 )
                 session.rollback()
 
+    @staticmethod
+    def on_index_heartbeat(document_id: str, index_type: str):
+        """Called while an index task runs, so its claim is not taken for stale"""
+        for session in get_sync_session():
+            session.execute(
+                update(DocumentIndex)
+                .where(
+                    DocumentIndex.document_id == document_id,
+                    DocumentIndex.index_type == DocumentIndexType(index_type),
+                    DocumentIndex.status.in_([DocumentIndexStatus.CREATING, DocumentIndexStatus.DELETION_IN_PROGRESS]),
+                )
+                .values(gmt_updated=utc_now())
+                .execution_options(synchronize_session=False)
+            )
+            session.commit()
+
     @staticmethod
     def on_index_failed(document_id: str, index_type: str, error_message: str):
         """Called when index operation fails"""
@@ -652,6 +808,33 @@ class CollectionGCReconciler:
 # Global instances
 index_reconciler = DocumentIndexReconciler()
 index_task_callbacks = IndexTaskCallbacks()
+
 collection_summary_reconciler = CollectionSummaryReconciler()
 collection_summary_callbacks = CollectionSummaryCallbacks()
 collection_gc_reconciler = CollectionGCReconciler()
+
+
+@contextmanager
+def index_claim_heartbeat(document_id: str, index_type: str):
+    """
+    Refresh the claim of an index every INDEX_CLAIM_HEARTBEAT_INTERVAL seconds while the block runs,
+    starting right away, so builds longer than INDEX_STALE_CLAIM_TIMEOUT are not scheduled twice.
+    """
+    stopped = threading.Event()
+
+    def beat():
+        while True:
+            try:
+                index_task_callbacks.on_index_heartbeat(document_id, index_type)
+            except Exception as e:
+                logger.warning(f"Failed to refresh the claim of {index_type} index of document {document_id}: {e}")
+            if stopped.wait(settings.index_claim_heartbeat_interval):
+                return
+
+    thread = threading.Thread(target=beat, name=f"index-heartbeat-{document_id}-{index_type}", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stopped.set()
+        thread.join()
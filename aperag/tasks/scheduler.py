@@ -41,7 +41,7 @@ class TaskScheduler(ABC):
             document_id: Document ID to process
             index_types: List of index types (vector, fulltext, graph)
             context: Task context including version info
-            **kwargs: Additional arguments
+            **kwargs: Additional arguments, e.g. lane (aperag.tasks.queues.IndexLane)
 
         Returns:
             Task ID for tracking
@@ -57,7 +57,7 @@ class TaskScheduler(ABC):
             document_id: Document ID to process
             index_types: List of index types (vector, fulltext, graph)
             context: Task context including version info
-            **kwargs: Additional arguments
+            **kwargs: Additional arguments, e.g. lane (aperag.tasks.queues.IndexLane)
 
         Returns:
             Task ID for tracking
@@ -73,7 +73,7 @@ class TaskScheduler(ABC):
             document_id: Document ID to process
             index_types: List of index types (vector, fulltext, graph)
             context: Task context including version info
-            **kwargs: Additional arguments
+            **kwargs: Additional arguments, e.g. lane (aperag.tasks.queues.IndexLane)
 
         Returns:
             Task ID for tracking
@@ -112,7 +112,9 @@ class CeleryTaskScheduler(TaskScheduler):
 
         try:
             # Execute workflow and return AsyncResult ID (not calling .get())
-            workflow_result = create_document_indexes_workflow(document_id, index_types, context)
+            workflow_result = create_document_indexes_workflow(
+                document_id, index_types, context, lane=kwargs.get("lane")
+            )
             workflow_id = workflow_result.id  # Use .id instead of .get('workflow_id')
             logger.debug(
                 f"Scheduled create indexes workflow {workflow_id} for document {document_id} with types {index_types}"
@@ -128,7 +130,9 @@ class CeleryTaskScheduler(TaskScheduler):
 
         try:
             # Execute workflow and return AsyncResult ID (not calling .get())
-            workflow_result = update_document_indexes_workflow(document_id, index_types, context)
+            workflow_result = update_document_indexes_workflow(
+                document_id, index_types, context, lane=kwargs.get("lane")
+            )
             workflow_id = workflow_result.id  # Use .id instead of .get('workflow_id')
             logger.debug(
                 f"Scheduled update indexes workflow {workflow_id} for document {document_id} with types {index_types}"
@@ -144,7 +148,7 @@ class CeleryTaskScheduler(TaskScheduler):
 
         try:
             # Execute workflow and return AsyncResult ID
-            workflow_result = delete_document_indexes_workflow(document_id, index_types)
+            workflow_result = delete_document_indexes_workflow(document_id, index_types, lane=kwargs.get("lane"))
             workflow_id = workflow_result.id
             logger.debug(
                 f"Scheduled delete indexes workflow {workflow_id} for document {document_id} with types {index_types}"
@@ -14,15 +14,65 @@
 
 # Configuration constants
 import json
+import random
 from typing import Any, List, Tuple
 
-from aperag.exceptions import CollectionNotFoundException, DocumentNotFoundException
+from aperag.exceptions import BusinessException, CollectionNotFoundException, DocumentNotFoundException
 
 
 class TaskConfig:
     RETRY_COUNTDOWN_COLLECTION = 60
     RETRY_MAX_RETRIES_COLLECTION = 2
 
+    RETRY_MAX_RETRIES_INDEX = 3
+    # Exponential backoff of index task retries: base * 2^retries seconds, capped, with jitter
+    RETRY_BACKOFF_BASE_INDEX = 30
+    RETRY_BACKOFF_MAX_INDEX = 600
+
+
+class PermanentTaskError(Exception):
+    """Raised by a task whose failure a retry cannot fix, so it fails without retrying"""
+
+
+# HTTP statuses of upstream services worth retrying, every other 4xx is a permanent failure
+_RETRYABLE_HTTP_STATUSES = {408, 409, 425, 429}
+
+
+def is_retryable_task_error(error: BaseException) -> bool:
+    """
+    Classify a task failure as retryable (transient) or permanent.
+
+    Missing resources, bad input and configuration or authentication errors are permanent.
+    Connection problems, timeouts, rate limits and 5xx responses are transient. Errors that
+    can't be classified are retried, the retry count bounds the cost of guessing wrong.
+    """
+    from aperag.llm.llm_error_types import LLMError, is_retryable_error
+
+    if isinstance(error, PermanentTaskError):
+        return False
+    if isinstance(error, LLMError):
+        return is_retryable_error(error)
+    if isinstance(error, (BusinessException, ValueError, TypeError, KeyError, NotImplementedError, FileNotFoundError)):
+        return False
+    if isinstance(error, (ConnectionError, TimeoutError, OSError)):
+        return True
+
+    status_code = getattr(error, "status_code", None)
+    if isinstance(status_code, int):
+        return status_code >= 500 or status_code in _RETRYABLE_HTTP_STATUSES
+    return True
+
+
+def retry_countdown(retries: int, error: BaseException = None) -> int:
+    """Seconds to wait before the next retry of an index task"""
+    backoff = min(TaskConfig.RETRY_BACKOFF_MAX_INDEX, TaskConfig.RETRY_BACKOFF_BASE_INDEX * 2**retries)
+    # Jitter keeps the retries of a failed batch from hitting the upstream service all at once
+    countdown = int(backoff * random.uniform(0.5, 1.0))
+    retry_after = getattr(error, "retry_after", None)
+    if isinstance(retry_after, (int, float)):
+        countdown = max(countdown, int(retry_after))
+    return countdown
+
 
 def parse_document_content(document, collection) -> Tuple[str, List[Any], Any]:
     """Parse document content for indexing (shared across all index types)"""
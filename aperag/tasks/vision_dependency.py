@@ -0,0 +1,150 @@
+# Copyright 2025 ApeCloud, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Tasks waiting for the VISION index of a document.
+
+GRAPH indexing reads the Vision-to-Text content of a document, so it has to start after the
+VISION index has settled. Instead of a worker polling the VISION index row, a GRAPH task started
+while VISION is in progress parks itself here as a serialized Celery signature holding only the
+document id, and the VISION task dispatches it once it succeeds, fails for good or is skipped.
+"""
+
+import json
+import logging
+import threading
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from typing import Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+VISION_DEPENDENTS_KEY_PREFIX = "vision_dependents"
+
+
+class VisionDependentStore(ABC):
+    """Signatures of tasks waiting for the VISION index of a document"""
+
+    @abstractmethod
+    def add(self, document_id: str, signature: dict) -> None:
+        """Park a signature until the VISION index of the document settles"""
+
+    @abstractmethod
+    def pop_all(self, document_id: str) -> List[dict]:
+        """Atomically take every signature parked for the document"""
+
+    @abstractmethod
+    def parked_documents(self, document_ids: List[str]) -> Set[str]:
+        """The documents among document_ids that have signatures parked"""
+
+
+class RedisVisionDependentStore(VisionDependentStore):
+    """Parks signatures in a Redis list per document, shared by every worker"""
+
+    def __init__(self, ttl: Optional[int] = None):
+        self._ttl = ttl
+
+    def _key(self, document_id: str) -> str:
+        return f"{VISION_DEPENDENTS_KEY_PREFIX}:{document_id}"
+
+    def _ttl_seconds(self) -> int:
+        if self._ttl is not None:
+            return self._ttl
+        from aperag.config import settings
+
+        return settings.index_vision_dependent_ttl
+
+    def add(self, document_id: str, signature: dict) -> None:
+        from aperag.db.redis_manager import get_sync_redis_client
+
+        key = self._key(document_id)
+        pipe = get_sync_redis_client().pipeline(transaction=True)
+        pipe.rpush(key, json.dumps(signature))
+        pipe.expire(key, self._ttl_seconds())
+        pipe.execute()
+
+    def pop_all(self, document_id: str) -> List[dict]:
+        from aperag.db.redis_manager import get_sync_redis_client
+
+        key = self._key(document_id)
+        pipe = get_sync_redis_client().pipeline(transaction=True)
+        pipe.lrange(key, 0, -1)
+        pipe.delete(key)
+        items, _ = pipe.execute()
+        return [json.loads(item) for item in items]
+
+    def parked_documents(self, document_ids: List[str]) -> Set[str]:
+        from aperag.db.redis_manager import get_sync_redis_client
+
+        pipe = get_sync_redis_client().pipeline(transaction=False)
+        for document_id in document_ids:
+            pipe.exists(self._key(document_id))
+        return {document_id for document_id, exists in zip(document_ids, pipe.execute()) if exists}
+
+
+class InMemoryVisionDependentStore(VisionDependentStore):
+    """Process-local store, for tests and single-process setups"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._dependents: Dict[str, List[dict]] = defaultdict(list)
+
+    def add(self, document_id: str, signature: dict) -> None:
+        # Round-trip through JSON like the Redis store, so tests see what workers would
+        with self._lock:
+            self._dependents[document_id].append(json.loads(json.dumps(signature)))
+
+    def pop_all(self, document_id: str) -> List[dict]:
+        with self._lock:
+            return self._dependents.pop(document_id, [])
+
+    def parked_documents(self, document_ids: List[str]) -> Set[str]:
+        with self._lock:
+            return {document_id for document_id in document_ids if self._dependents.get(document_id)}
+
+
+_store: Optional[VisionDependentStore] = None
+
+
+def get_vision_dependent_store() -> VisionDependentStore:
+    global _store
+    if _store is None:
+        _store = RedisVisionDependentStore()
+    return _store
+
+
+def set_vision_dependent_store(store: Optional[VisionDependentStore]) -> None:
+    """Replace the store, None restores the Redis store on next use"""
+    global _store
+    _store = store
+
+
+def is_vision_in_progress(document_id: str) -> bool:
+    """Whether the document has a VISION index that is still pending or being built"""
+    from sqlalchemy import and_, select
+
+    from aperag.config import get_sync_session
+    from aperag.db.models import DocumentIndex, DocumentIndexStatus, DocumentIndexType
+
+    for session in get_sync_session():
+        status = session.execute(
+            select(DocumentIndex.status).where(
+                and_(
+                    DocumentIndex.document_id == document_id,
+                    DocumentIndex.index_type == DocumentIndexType.VISION,
+                )
+            )
+        ).scalar_one_or_none()
+        return status in (DocumentIndexStatus.PENDING, DocumentIndexStatus.CREATING)
+    return False
@@ -0,0 +1,152 @@
+# Copyright 2025 ApeCloud, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Long-lived asyncio event loop of a Celery worker process.
+
+Celery tasks are synchronous. Running the coroutines of each task in a new event loop means that
+every loop-bound client (the async SQLAlchemy engine, the async Redis pool, httpx clients) has to
+reconnect for every task. Instead each worker process runs a single loop in a background thread
+for its whole life, and tasks submit their coroutines to it with ``run_in_worker_loop``, so those
+pools are created once per process and closed when the process shuts down.
+
+With the threads pool every worker thread submits to this one loop, so coroutines run on it must
+not block: sync database or vector store calls go through ``asyncio.to_thread``, like the LightRAG
+storages do.
+"""
+
+import asyncio
+import atexit
+import logging
+import os
+import threading
+from typing import Any, Awaitable, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_thread: Optional[threading.Thread] = None
+_pid: Optional[int] = None
+_shutdown_hooks: List[Callable[[], Awaitable[Any]]] = []
+
+
+def start_worker_loop() -> asyncio.AbstractEventLoop:
+    """Start the event loop of this process, if it isn't running yet, and return it"""
+    global _loop, _thread, _pid
+
+    with _lock:
+        # A loop inherited through fork has no thread running it in this process
+        if _loop is not None and _pid == os.getpid() and _thread.is_alive():
+            return _loop
+
+        loop = asyncio.new_event_loop()
+        ready = threading.Event()
+
+        def run():
+            asyncio.set_event_loop(loop)
+            loop.call_soon(ready.set)
+            loop.run_forever()
+
+        thread = threading.Thread(target=run, name="worker-event-loop", daemon=True)
+        thread.start()
+        ready.wait()
+
+        _loop, _thread, _pid = loop, thread, os.getpid()
+        logger.info(f"Started worker event loop in process {_pid}")
+        return loop
+
+
+def run_in_worker_loop(coro: Awaitable, timeout: Optional[float] = None) -> Any:
+    """
+    Run a coroutine on the event loop of this process and wait for its result.
+
+    Must not be called from a coroutine running on that loop, it would wait for itself.
+    """
+    loop = start_worker_loop()
+    if threading.current_thread() is _thread:
+        coro.close()
+        raise RuntimeError("run_in_worker_loop() can't be called from the worker event loop")
+
+    future = asyncio.run_coroutine_threadsafe(coro, loop)
+    try:
+        return future.result(timeout)
+    except BaseException:
+        # Task time limits and timeouts interrupt the wait, don't leave the coroutine running
+        future.cancel()
+        raise
+
+
+def on_worker_loop_shutdown(hook: Callable[[], Awaitable[Any]]) -> None:
+    """Register a coroutine function run on the loop before it stops, e.g. to close a pool"""
+    _shutdown_hooks.append(hook)
+
+
+def stop_worker_loop(timeout: float = 10) -> None:
+    """Run the shutdown hooks, then stop the event loop of this process"""
+    global _loop, _thread, _pid
+
+    with _lock:
+        loop, thread = _loop, _thread
+        if loop is None or _pid != os.getpid():
+            return
+        _loop, _thread, _pid = None, None, None
+
+    async def shutdown():
+        for hook in reversed(_shutdown_hooks):
+            try:
+                await hook()
+            except Exception as e:
+                logger.warning(f"Worker event loop shutdown hook {hook} failed: {e}")
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    try:
+        asyncio.run_coroutine_threadsafe(shutdown(), loop).result(timeout)
+    except Exception as e:
+        logger.warning(f"Failed to shut down worker event loop cleanly: {e}")
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout)
+        if not thread.is_alive():
+            loop.close()
+        logger.info(f"Stopped worker event loop in process {os.getpid()}")
+
+
+async def _close_async_engine():
+    from aperag.config import async_engine
+
+    await async_engine.dispose()
+
+
+async def _close_redis_pools():
+    from aperag.db.redis_manager import RedisConnectionManager
+
+    await RedisConnectionManager.close()
+
+
+async def _close_http_clients():
+    from aperag.llm.http_client import http_client_pool
+
+    await http_client_pool.aclose()
+    http_client_pool.close()
+
+
+on_worker_loop_shutdown(_close_async_engine)
+on_worker_loop_shutdown(_close_redis_pools)
+on_worker_loop_shutdown(_close_http_clients)
+# Processes that never get the worker shutdown signal (solo pool, scripts) still close their pools
+atexit.register(stop_worker_loop)
@@ -197,11 +197,15 @@ async def _log_audit_async(
     start_time_ms: int,
     end_time_ms: int,
     status_code: int,
-    request_data: dict,
-    response_data: dict,
+    kwargs: dict,
+    response: Any = None,
     error_message: str = None,
 ):
-    """Log audit information asynchronously"""
+    """Queue audit information for the background audit writer
+
+    Only cheap request attributes are captured here. Extracting and cleaning the
+    request/response data is deferred to the writer so it stays off the response path.
+    """
     try:
         # Get user info from request state
         user_id = getattr(request.state, "user_id", None)
@@ -209,18 +213,27 @@ async def _log_audit_async(
 
         # Extract client info
         ip_address, user_agent = _extract_client_info(request)
+        http_method = request.method
+        path = request.url.path
 
-        # Log audit in background
-        import asyncio
+        def build_entry() -> Dict[str, Any]:
+            try:
+                request_data = _extract_request_data_from_args(request, kwargs)
+            except Exception:
+                request_data = {"method": http_method, "path": path}
+
+            if error_message is None:
+                response_data = _extract_response_data(response)
+            else:
+                response_data = {"error": error_message}
 
-        asyncio.create_task(
-            audit_service.log_audit(
+            return dict(
                 user_id=user_id,
                 username=username,
                 resource_type=resource_type,
                 api_name=api_name,
-                http_method=request.method,
-                path=request.url.path,
+                http_method=http_method,
+                path=path,
                 status_code=status_code,
                 start_time=start_time_ms,
                 end_time=end_time_ms,
@@ -230,7 +243,8 @@ async def _log_audit_async(
                 ip_address=ip_address,
                 user_agent=user_agent,
             )
-        )
+
+        await audit_service.submit_audit(build_entry)
     except Exception as audit_error:
         logger.error(f"Failed to log audit: {audit_error}")
 
@@ -273,13 +287,7 @@ def audit(resource_type: str, api_name: str = None):
                 # Record end time
                 end_time_ms = int(time.time() * 1000)
 
-                # Extract request data from function arguments (after parsing)
-                request_data = _extract_request_data_from_args(request, kwargs)
-
-                # Extract response data
-                response_data = _extract_response_data(response)
-
-                # Log audit asynchronously
+                # Log audit asynchronously, request/response data is extracted by the writer
                 await _log_audit_async(
                     request=request,
                     resource_type=resource_type,
@@ -287,8 +295,8 @@ def audit(resource_type: str, api_name: str = None):
                     start_time_ms=start_time_ms,
                     end_time_ms=end_time_ms,
                     status_code=200,  # Success
-                    request_data=request_data,
-                    response_data=response_data,
+                    kwargs=kwargs,
+                    response=response,
                     error_message=None,
                 )
 
@@ -298,12 +306,6 @@ def audit(resource_type: str, api_name: str = None):
                 # Record end time for error case
                 end_time_ms = int(time.time() * 1000)
 
-                # Extract request data if possible
-                try:
-                    request_data = _extract_request_data_from_args(request, kwargs)
-                except Exception:
-                    request_data = {"method": request.method, "path": request.url.path}
-
                 # Log audit for error case
                 await _log_audit_async(
                     request=request,
@@ -312,8 +314,7 @@ def audit(resource_type: str, api_name: str = None):
                     start_time_ms=start_time_ms,
                     end_time_ms=end_time_ms,
                     status_code=500,  # Error
-                    request_data=request_data,
-                    response_data={"error": str(e)},
+                    kwargs=kwargs,
                     error_message=str(e),
                 )
 
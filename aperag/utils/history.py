@@ -12,13 +12,14 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
 import json
 import logging
 import time
 from abc import ABC, abstractmethod
 from datetime import date, datetime
 from decimal import Decimal
-from typing import Any, Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
 
 from aperag.chat.history import (
     StoredChatMessage,
@@ -30,6 +31,27 @@ from aperag.chat.history import (
 
 logger = logging.getLogger(__name__)
 
+# Number of entries read per Redis round trip when reading a window of the history
+HISTORY_PAGE_SIZE = 20
+
+_token_counter = None
+
+
+def count_message_tokens(message: StoredChatMessage) -> int:
+    """Count the tokens of the content of a message"""
+    global _token_counter
+    if _token_counter is None:
+        try:
+            from aperag.utils.tokenizer import get_default_tokenizer
+
+            tokenizer = get_default_tokenizer()
+            _token_counter = lambda text: len(tokenizer(text))  # noqa: E731
+        except Exception as e:
+            # Fall back to a rough estimate if the encoding can't be loaded, e.g. offline
+            logger.warning(f"Failed to load tokenizer, estimating token counts: {e}")
+            _token_counter = lambda text: len(text) // 3 + 1  # noqa: E731
+    return sum(_token_counter(part.content) for part in message.parts if part.content)
+
 
 class BaseChatMessageHistory(ABC):
     """Abstract base class for storing chat message history.
@@ -112,7 +134,16 @@ class RedisChatMessageHistory:
         key_prefix: str = "message_store:",
         ttl: Optional[int] = None,
         redis_client=None,
+        max_messages: Optional[int] = None,
+        archive: Optional[bool] = None,
     ):
+        """
+        Args:
+            max_messages: Number of most recent messages kept in Redis, older messages are
+                trimmed. Defaults to settings.chat_history_max_messages, 0 keeps everything.
+            archive: Whether trimmed messages are archived to Postgres instead of dropped.
+                Defaults to settings.chat_history_archive.
+        """
         try:
             import redis.asyncio as redis
         except ImportError:
@@ -128,32 +159,184 @@ class RedisChatMessageHistory:
         self.key_prefix = key_prefix
         self.ttl = ttl
 
+        if max_messages is None or archive is None:
+            from aperag.config import settings
+
+            if max_messages is None:
+                max_messages = settings.chat_history_max_messages
+            if archive is None:
+                archive = settings.chat_history_archive
+        self.max_messages = max_messages
+        self.archive = archive
+
     @property
     def key(self) -> str:
         """Construct the record key to use"""
         return self.key_prefix + self.session_id
 
+    def _parse_entry(self, raw: bytes) -> Optional[tuple]:
+        """Parse a Redis list entry into (message, token_count)"""
+        try:
+            item = json.loads(raw.decode("utf-8"))
+            # Entries written before token counts were stored don't have one
+            token_count = item.pop("token_count", None)
+            message = storage_dict_to_message(item)
+        except Exception as e:
+            logger.warning(f"Failed to parse message in history for {self.session_id}: {e}")
+            return None
+        if token_count is None:
+            token_count = count_message_tokens(message)
+        return message, token_count
+
     @property
     async def messages(self) -> List[StoredChatMessage]:
         """Retrieve the messages from Redis as StoredChatMessage objects"""
         _items = await self.redis_client.lrange(self.key, 0, -1)
-        items = [json.loads(m.decode("utf-8")) for m in _items[::-1]]  # Reverse to get chronological order
         messages = []
-        for item in items:
-            try:
-                message = storage_dict_to_message(item)
-                messages.append(message)
-            except Exception as e:
-                logger.warning(f"Failed to parse message in history for {self.session_id}: {e}")
-                continue
+        for raw in _items[::-1]:  # Reverse to get chronological order
+            parsed = self._parse_entry(raw)
+            if parsed:
+                messages.append(parsed[0])
         return messages
 
+    async def get_recent_messages(
+        self, limit: Optional[int] = None, max_tokens: Optional[int] = None
+    ) -> List[StoredChatMessage]:
+        """
+        Retrieve the most recent messages in chronological order.
+
+        Only the newest entries are read from Redis, page by page, until the window is full.
+
+        Args:
+            limit: Maximum number of messages
+            max_tokens: Maximum total token count of the messages
+
+        Returns:
+            The most recent messages that fit both limits
+        """
+        if limit is not None and limit <= 0:
+            return []
+
+        recent = []
+        total_tokens = 0
+        start = 0
+        while True:
+            stop = start + HISTORY_PAGE_SIZE - 1
+            if limit is not None:
+                stop = min(stop, start + limit - len(recent) - 1)
+            _items = await self.redis_client.lrange(self.key, start, stop)
+            for raw in _items:
+                parsed = self._parse_entry(raw)
+                if not parsed:
+                    continue
+                message, token_count = parsed
+                if max_tokens is not None and total_tokens + token_count > max_tokens:
+                    return recent[::-1]
+                recent.append(message)
+                total_tokens += token_count
+                if limit is not None and len(recent) >= limit:
+                    return recent[::-1]
+            if len(_items) < stop - start + 1:
+                return recent[::-1]
+            start = stop + 1
+
     async def add_stored_message(self, message: StoredChatMessage) -> None:
         """Add a StoredChatMessage directly to Redis"""
-        message_json = json.dumps(message_to_storage_dict(message))
-        await self.redis_client.lpush(self.key, message_json)
-        if self.ttl:
-            await self.redis_client.expire(self.key, self.ttl)
+        item = message_to_storage_dict(message)
+        # Store the token count with the entry so windowed reads don't need to re-tokenize
+        item["token_count"] = count_message_tokens(message)
+        # Push and expire in one transaction, so a failed write leaves nothing behind and can be retried
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            pipe.lpush(self.key, json.dumps(item))
+            if self.ttl:
+                pipe.expire(self.key, self.ttl)
+            length = (await pipe.execute())[0]
+        # Trim in batches so that not every message pays for a trim
+        if self.max_messages and length >= self.max_messages + HISTORY_PAGE_SIZE:
+            try:
+                await self.trim()
+            except Exception as e:
+                # The message is stored and the next write trims again, raising would make callers retry the push
+                logger.warning(f"Failed to trim history of {self.session_id}: {e}")
+
+    async def trim(self) -> int:
+        """
+        Trim the history down to the most recent max_messages messages.
+
+        Trimmed messages are archived to Postgres if archiving is enabled, otherwise dropped.
+
+        Returns:
+            Number of trimmed messages
+        """
+        if not self.max_messages:
+            return 0
+        # Read and trim in one transaction, messages pushed meanwhile are never trimmed unread
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            pipe.lrange(self.key, self.max_messages, -1)
+            pipe.ltrim(self.key, 0, self.max_messages - 1)
+            trimmed, _ = await pipe.execute()
+        if not trimmed:
+            return 0
+
+        if self.archive:
+            try:
+                await self._archive_entries(trimmed)
+            except Exception as e:
+                logger.error(f"Failed to archive {len(trimmed)} messages of {self.session_id}: {e}")
+                # Put the messages back at the old end of the list to retry on the next trim
+                await self.redis_client.rpush(self.key, *trimmed)
+                return 0
+        logger.debug(f"Trimmed {len(trimmed)} messages from history of {self.session_id}")
+        return len(trimmed)
+
+    async def _archive_entries(self, entries: List[bytes]) -> None:
+        from aperag.config import get_async_session
+        from aperag.db.models import ChatMessageArchive
+
+        archived = []
+        for raw in entries:
+            parsed = self._parse_entry(raw)
+            if not parsed:
+                continue
+            message, token_count = parsed
+            archived.append(
+                ChatMessageArchive(
+                    chat_id=self.session_id,
+                    message_id=message.message_id,
+                    role=message.role,
+                    message=message_to_storage_dict(message),
+                    token_count=token_count,
+                    message_time=message.timestamp,
+                )
+            )
+        if not archived:
+            return
+        async for session in get_async_session():
+            session.add_all(archived)
+            await session.commit()
+            break  # Only process one session
+
+    async def archived_messages(self, message_id: Optional[str] = None) -> List[StoredChatMessage]:
+        """Retrieve the messages archived to Postgres in chronological order, optionally only those of message_id"""
+        from sqlalchemy import select
+
+        from aperag.config import get_async_session
+        from aperag.db.models import ChatMessageArchive
+
+        async for session in get_async_session():
+            stmt = select(ChatMessageArchive.message).where(ChatMessageArchive.chat_id == self.session_id)
+            if message_id is not None:
+                stmt = stmt.where(ChatMessageArchive.message_id == message_id)
+            stmt = stmt.order_by(ChatMessageArchive.message_time, ChatMessageArchive.gmt_created)
+            result = await session.execute(stmt)
+            messages = []
+            for item in result.scalars().all():
+                try:
+                    messages.append(storage_dict_to_message(item))
+                except Exception as e:
+                    logger.warning(f"Failed to parse archived message for {self.session_id}: {e}")
+            return messages
+        return []
 
     async def add_user_message(self, message: str, message_id: str, files: List[Dict[str, Any]] = None) -> None:
         """Add a user message using new format"""
@@ -190,8 +373,18 @@ class RedisChatMessageHistory:
         await self.add_stored_message(stored_message)
 
     async def clear(self) -> None:
-        """Clear session memory from Redis"""
+        """Clear session memory from Redis and the archive"""
         await self.redis_client.delete(self.key)
+        if self.archive:
+            from sqlalchemy import delete
+
+            from aperag.config import get_async_session
+            from aperag.db.models import ChatMessageArchive
+
+            async for session in get_async_session():
+                await session.execute(delete(ChatMessageArchive).where(ChatMessageArchive.chat_id == self.session_id))
+                await session.commit()
+                break  # Only process one session
 
     async def release_redis(self):
         await self.redis_client.close(close_connection_pool=True)
@@ -212,6 +405,8 @@ async def query_chat_messages(user: str, chat_id: str):
         # Get all stored messages (each StoredChatMessage represents one conversation turn)
         chat_history = RedisChatMessageHistory(chat_id, redis_client=get_async_redis_client())
         stored_messages = await chat_history.messages
+        if chat_history.archive:
+            stored_messages = await chat_history.archived_messages() + stored_messages
 
         if not stored_messages:
             return []
@@ -244,6 +439,56 @@ async def query_chat_messages(user: str, chat_id: str):
         return []
 
 
+# Background history writes not finished yet, referenced so they aren't garbage collected
+_pending_writes: Set[asyncio.Task] = set()
+
+
+async def _write_with_retry(write: Callable[[], Awaitable[None]], description: str) -> bool:
+    from aperag.config import settings
+
+    attempts = max(1, settings.chat_history_write_attempts)
+    for attempt in range(1, attempts + 1):
+        try:
+            await write()
+            return True
+        except Exception as e:
+            if attempt == attempts:
+                logger.error(f"Failed to write {description} after {attempts} attempts: {e}")
+                return False
+            delay = settings.chat_history_write_retry_delay * 2 ** (attempt - 1)
+            logger.warning(f"Failed to write {description}, retrying in {delay:.1f}s: {e}")
+            await asyncio.sleep(delay)
+    return False
+
+
+def write_history_in_background(*writes: Callable[[], Awaitable[None]], description: str) -> asyncio.Task:
+    """
+    Run history writes in order in a background task, so a streamed answer can end without waiting for them.
+
+    Each write is retried on failure; the writes after one that keeps failing are skipped, so a turn is never
+    stored without its question.
+    """
+
+    async def run():
+        for write in writes:
+            if not await _write_with_retry(write, description):
+                return
+
+    task = asyncio.create_task(run())
+    _pending_writes.add(task)
+    task.add_done_callback(_pending_writes.discard)
+    return task
+
+
+async def wait_for_history_writes(timeout: Optional[float] = None) -> None:
+    """Wait for the background history writes of the running process, e.g. on shutdown"""
+    if not _pending_writes:
+        return
+    _, pending = await asyncio.wait(set(_pending_writes), timeout=timeout)
+    if pending:
+        logger.warning(f"{len(pending)} chat history writes didn't finish in {timeout}s")
+
+
 def _serialize(obj: Any):
     """Convert common non-JSON types (datetime, Decimal, pydantic objects) to JSON-safe primitives."""
     if obj is None:
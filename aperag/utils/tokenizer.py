@@ -18,6 +18,9 @@ from typing import Callable, List
 import tiktoken
 
 
+def get_default_encoding() -> tiktoken.Encoding:
+    return tiktoken.get_encoding(os.environ.get("DEFAULT_ENCODING_MODEL", "cl100k_base"))
+
+
 def get_default_tokenizer() -> Callable[[str], List[int]]:
-    encoding = tiktoken.get_encoding(os.environ.get("DEFAULT_ENCODING_MODEL", "cl100k_base"))
-    return encoding.encode
+    return get_default_encoding().encode
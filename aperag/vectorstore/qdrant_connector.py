@@ -13,6 +13,40 @@ from aperag.vectorstore.base import VectorStoreConnector
 
 logger = logging.getLogger(__name__)
 
+_async_clients: Dict[tuple, qdrant_client.AsyncQdrantClient] = {}
+
+
+def get_async_qdrant_client(ctx: Dict[str, Any]) -> qdrant_client.AsyncQdrantClient:
+    """Return a process-wide AsyncQdrantClient for the connection described by ctx.
+
+    Unlike QdrantVectorStoreConnector, this does not build a llama-index store, so it is
+    cheap to call from request handlers that only need to read points.
+    """
+    url = ctx.get("url", "http://localhost")
+    key = (
+        url,
+        ctx.get("port", 6333),
+        ctx.get("grpc_port", 6334),
+        ctx.get("prefer_grpc", False),
+        ctx.get("https", False),
+        ctx.get("timeout", 300),
+    )
+    client = _async_clients.get(key)
+    if client is None:
+        if url == ":memory:":
+            client = qdrant_client.AsyncQdrantClient(":memory:")
+        else:
+            client = qdrant_client.AsyncQdrantClient(
+                url=url,
+                port=key[1],
+                grpc_port=key[2],
+                prefer_grpc=key[3],
+                https=key[4],
+                timeout=key[5],
+            )
+        _async_clients[key] = client
+    return client
+
 
 class QdrantVectorStoreConnector(VectorStoreConnector):
     def __init__(self, ctx: Dict[str, Any], **kwargs: Any) -> None:
@@ -74,3 +74,17 @@ async def debug_flow_stream_view(
     user: User = Depends(required_user),
 ):
     return await flow_service_global.debug_flow_stream(str(user.id), bot_id, debug)
+
+
+@router.get("/bots/{bot_id}/answer-cache")
+async def get_answer_cache_view(
+    request: Request, bot_id: str, user: User = Depends(required_user)
+) -> view_models.AnswerCacheStats:
+    return await bot_service.get_answer_cache_stats(str(user.id), bot_id)
+
+
+@router.delete("/bots/{bot_id}/answer-cache")
+@audit(resource_type="bot", api_name="ClearAnswerCache")
+async def clear_answer_cache_view(request: Request, bot_id: str, user: User = Depends(required_user)):
+    await bot_service.clear_answer_cache(str(user.id), bot_id)
+    return Response(status_code=204)
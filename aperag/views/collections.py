@@ -13,7 +13,7 @@
 # limitations under the License.
 
 import logging
-from typing import List
+from typing import List, Optional
 
 from fastapi import APIRouter, Body, Depends, File, HTTPException, Query, Request, Response, UploadFile
 
@@ -304,6 +304,42 @@ async def get_document_preview(
     return await document_service.get_document_preview(str(user.id), collection_id, document_id)
 
 
+@router.get(
+    "/collections/{collection_id}/documents/{document_id}/chunks",
+    tags=["documents"],
+    operation_id="list_document_chunks",
+)
+async def list_document_chunks(
+    collection_id: str,
+    document_id: str,
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(200, ge=1, le=1000),
+    fields: Optional[List[str]] = Query(None),
+    user: User = Depends(required_user),
+) -> view_models.ChunkList:
+    return await document_service.list_document_chunks(
+        str(user.id), collection_id, document_id, cursor=cursor, limit=limit, fields=fields
+    )
+
+
+@router.get(
+    "/collections/{collection_id}/documents/{document_id}/vision_chunks",
+    tags=["documents"],
+    operation_id="list_document_vision_chunks",
+)
+async def list_document_vision_chunks(
+    collection_id: str,
+    document_id: str,
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(200, ge=1, le=1000),
+    fields: Optional[List[str]] = Query(None),
+    user: User = Depends(required_user),
+) -> view_models.VisionChunkList:
+    return await document_service.list_document_chunks(
+        str(user.id), collection_id, document_id, vision=True, cursor=cursor, limit=limit, fields=fields
+    )
+
+
 @router.get(
     "/collections/{collection_id}/documents/{document_id}/object",
     tags=["documents"],
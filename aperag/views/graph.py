@@ -12,10 +12,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import json
 import logging
 from typing import Any, Dict, Optional
 
 from fastapi import APIRouter, Body, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
 
 from aperag.db.models import User
 from aperag.exceptions import CollectionNotFoundException
@@ -200,6 +202,26 @@ async def global_graph_search_view(
         raise HTTPException(status_code=500, detail=f"Global search failed: {str(e)}")
 
 
+@router.post("/graphs/search/global/stream", tags=["graph"])
+async def global_graph_search_stream_view(
+    request: Request,
+    query: str = Body(..., embed=True),
+    top_k: int = Body(100, embed=True),
+    user: User = Depends(required_user),
+) -> StreamingResponse:
+    """Stream federated graph search results per collection as Server-Sent Events"""
+
+    async def event_stream():
+        try:
+            async for event in global_graph_service.federated_graph_search_stream(user=user, query=query, top_k=top_k):
+                yield f"data: {json.dumps(event, ensure_ascii=False, default=str)}\n\n"
+        except Exception as e:
+            logger.error(f"Global graph search stream failed: {str(e)}", exc_info=True)
+            yield f"data: {json.dumps({'event': 'error', 'message': str(e)}, ensure_ascii=False)}\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
 @router.post("/graphs/hierarchy/global", tags=["graph"])
 async def global_graph_hierarchy_view(
     request: Request,
@@ -17,7 +17,7 @@ import logging
 from fastapi import APIRouter, Depends, HTTPException, Request
 
 from aperag.db.models import User
-from aperag.db.ops import async_db_ops
+from aperag.db.provider_cache import provider_config_cache
 from aperag.llm.embed.embedding_service import EmbeddingService
 from aperag.llm.llm_error_types import (
     EmbeddingError,
@@ -28,6 +28,7 @@ from aperag.llm.llm_error_types import (
     RerankError,
     TooManyDocumentsError,
 )
+from aperag.llm.rerank.local_cross_encoder import is_local_rerank_provider
 from aperag.llm.rerank.rerank_service import RerankService
 from aperag.query.query import DocumentWithScore
 from aperag.schema.view_models import (
@@ -74,7 +75,7 @@ async def create_embeddings(http_request: Request, request: EmbeddingRequest, us
         )
 
         # Generate embeddings
-        embeddings = embedding_service.embed_documents(input_texts)
+        embeddings = await embedding_service.aembed_documents(input_texts)
 
         # Calculate token usage (approximation)
         total_tokens = sum(len(text.split()) for text in input_texts)
@@ -122,17 +123,21 @@ async def _get_provider_info(provider: str, model: str, user_id: str, api_type:
     """
     try:
         # 1. Get LLM provider configuration
-        llm_provider = await async_db_ops.query_llm_provider_by_name(provider)
+        llm_provider = await provider_config_cache.aget_provider(provider)
         if not llm_provider:
             raise ProviderNotFoundError(provider, api_type)
 
         # 2. Get model configuration for embedding API
-        llm_model = await async_db_ops.query_llm_provider_model(provider_name=provider, api=api_type, model=model)
+        llm_model = await provider_config_cache.aget_model(provider_name=provider, api=api_type, model=model)
         if not llm_model:
             raise ModelNotFoundError(model, provider, api_type)
 
+        if api_type == "rerank" and is_local_rerank_provider(llm_model.custom_llm_provider):
+            # Local cross-encoders need neither an API key nor an endpoint
+            return {"api_key": None, "base_url": None, "custom_llm_provider": llm_model.custom_llm_provider}
+
         # 3. Get user's API key from MSP
-        api_key = await async_db_ops.query_provider_api_key(provider, user_id)
+        api_key = await provider_config_cache.aget_api_key(provider, user_id)
         if not api_key:
             raise InvalidConfigurationError("api_key", None, f"API KEY not found for LLM Provider: {provider}")
 
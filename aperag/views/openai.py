@@ -41,10 +41,8 @@ async def openai_chat_completions_view(request: Request, user: User = Depends(re
                 media_type="text/event-stream",
             )
         else:
-            full_content = ""
-            async for chunk in async_generator():
-                full_content += chunk
-            return formatter.format_complete_response(api_request.msg_id, full_content)
+            chunks = [chunk async for chunk in async_generator()]
+            return formatter.format_complete_response(api_request.msg_id, "".join(chunks))
     except Exception as e:
         logger.exception(e)
         return OpenAIFormatter.format_error(str(e))
@@ -21,6 +21,7 @@ from fastapi.security import HTTPBearer
 from aperag.db.models import Role, User
 from aperag.schema.view_models import (
     QuotaInfo,
+    QuotaRecalculateAllResponse,
     QuotaUpdateRequest,
     QuotaUpdateResponse,
     SystemDefaultQuotas,
@@ -56,19 +57,21 @@ def _convert_quota_dict_to_list(quota_dict: dict) -> List[QuotaInfo]:
 async def get_quotas(
     user_id: str = Query(None, description="User ID to get quotas for (admin only, defaults to current user)"),
     search: str = Query(None, description="Search term for username, email, or user ID (admin only)"),
+    cursor: str = Query(None, description="Return users after this user ID (admin only)"),
+    limit: int = Query(None, ge=1, le=1000, description="Maximum number of users per page (admin only)"),
     current_user: User = Depends(required_user),
 ):
     """Get quota information for the current user or specific user (admin only)"""
     try:
-        if search:
-            # Admin only - search for users
+        if search or cursor or limit:
+            # Admin only - search or page through users
             if current_user.role != Role.ADMIN:
                 raise HTTPException(status_code=403, detail="Admin access required")
 
-            # Use the search functionality to find users
-            all_user_quotas = await quota_service.get_all_users_quotas(search_term=search)
+            page = await quota_service.list_users_quotas(search_term=search, cursor=cursor, limit=limit)
+            all_user_quotas = page["items"]
 
-            if not all_user_quotas:
+            if search and not all_user_quotas:
                 raise HTTPException(status_code=404, detail="User not found")
 
             # If multiple results, return list for user to choose
@@ -84,7 +87,7 @@ async def get_quotas(
                         quotas=quota_list,
                     )
                 )
-            return UserQuotaList(items=items)
+            return UserQuotaList(items=items, next_cursor=page["next_cursor"])
         elif user_id:
             # Admin only - get specific user's quotas
             if current_user.role != Role.ADMIN:
@@ -166,6 +169,27 @@ async def update_quota(user_id: str, request: QuotaUpdateRequest, current_user:
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
+@router.post("/quotas/recalculate", response_model=QuotaRecalculateAllResponse)
+async def recalculate_all_quota_usage(
+    cursor: str = Query(None, description="Recalculate users after this user ID"),
+    batch_size: int = Query(1000, ge=1, le=5000, description="Number of users to recalculate in this batch"),
+    current_user: User = Depends(required_user),
+):
+    """Recalculate current usage for a batch of users (admin only)"""
+    try:
+        if current_user.role != Role.ADMIN:
+            raise HTTPException(status_code=403, detail="Admin access required")
+
+        result = await quota_service.recalculate_all_users_usage(cursor=cursor, batch_size=batch_size)
+        return QuotaRecalculateAllResponse(success=True, **result)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error recalculating quota usage for all users: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
 @router.post("/quotas/{user_id}/recalculate")
 async def recalculate_quota_usage(user_id: str, current_user: User = Depends(required_user)):
     """Recalculate and update current usage for all quota types for a user (admin only)"""
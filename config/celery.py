@@ -16,7 +16,11 @@ from logging.config import dictConfig
 
 from celery import Celery
 from celery.signals import worker_process_init, worker_process_shutdown
+from kombu import Queue
+
 from aperag.config import settings
+from aperag.tasks.queues import DEFAULT_QUEUE, all_index_queues
+from aperag.tasks.worker_loop import start_worker_loop, stop_worker_loop
 
 # Create celery app instance
 app = Celery("aperag")
@@ -41,6 +45,11 @@ app.conf.update(
     worker_task_log_format='[%(asctime)s: %(levelname)s/%(processName)s] %(name)s - %(message)s',
     # Let our custom logging configuration handle the root logger
     worker_hijack_root_logger=True,
+    # Workers started without -Q consume the default queue and every index queue
+    task_queues=[Queue(name) for name in [DEFAULT_QUEUE] + all_index_queues()],
+    task_default_queue=DEFAULT_QUEUE,
+    # Don't let a worker hoard bulk messages while interactive ones are waiting
+    worker_prefetch_multiplier=1,
 )
 
 app.conf.beat_schedule = {
@@ -126,11 +135,13 @@ def setup_worker(**kwargs):
     """Setup logging and other worker initialization"""
     # Configure logging for this worker process
     dictConfig(CELERY_LOGGING_CONFIG)
+    # One event loop for the life of the process, so async connection pools are reused across tasks
+    start_worker_loop()
 
 @worker_process_shutdown.connect
 def shutdown_worker(**kwargs):
-    """Additional worker cleanup if needed"""
-    pass
+    """Close the connection pools of this worker process and stop its event loop"""
+    stop_worker_loop()
 
 if __name__ == "__main__":
     app.start()
@@ -92,17 +92,18 @@ print(f"Success: {status.success}")
 
 Each task has built-in retry mechanisms:
 - **Max retries**: 3 attempts for most tasks
-- **Retry countdown**: 60 seconds between retries
+- **Classified retries**: only transient failures (connection errors, timeouts, rate limits, 5xx) are
+  retried, permanent ones (missing documents, bad input, auth errors) fail immediately
+- **Retry countdown**: exponential backoff with jitter, honoring the provider's retry-after
 - **Exception handling**: Detailed logging and error callbacks
 - **Failure notifications**: Integration with index_task_callbacks for status updates
 """
 
 import json
 import logging
-from contextlib import asynccontextmanager
 from typing import Any, List
 
-from celery import Task, chain, chord, current_app, group
+from celery import Task, chain, chord, current_app, group, signature
 
 from aperag.tasks.collection import collection_task
 from aperag.tasks.document import document_index_task
@@ -112,12 +113,19 @@ from aperag.tasks.models import (
     TaskStatus,
     WorkflowResult,
 )
-from aperag.tasks.utils import TaskConfig
+from aperag.tasks.queues import index_queue, parse_queue, workflow_queue
+from aperag.tasks.reconciler import index_claim_heartbeat
+from aperag.tasks.utils import PermanentTaskError, TaskConfig, is_retryable_task_error, retry_countdown
+from aperag.tasks.vision_dependency import get_vision_dependent_store, is_vision_in_progress
+from aperag.tasks.worker_loop import run_in_worker_loop
 from aperag.utils.constant import IndexAction
 from config.celery import app
 
 logger = logging.getLogger()
 
+# Redis key held while a triggered index reconciliation is waiting to run
+RECONCILE_TRIGGER_LOCK_KEY = "aperag:index_reconcile_trigger"
+
 
 def _validate_task_relevance(document_id: str, index_type: str, target_version: int, expected_status: "DocumentIndexStatus"):
     """
@@ -202,6 +210,18 @@ class BaseIndexTask(Task):
             logger.warning(
                 f"Failed to execute index deletion callback for {index_type} of {document_id}: {e}", exc_info=True)
 
+    def _retry_or_fail(self, exc: Exception, document_id: str, index_types: List[str], error_msg: str):
+        """Retry a transient failure with backoff, mark the indexes failed once retrying is pointless"""
+        if is_retryable_task_error(exc) and self.request.retries < self.max_retries:
+            countdown = retry_countdown(self.request.retries, exc)
+            logger.info(
+                f"Retrying {self.name} for document {document_id} in {countdown}s "
+                f"(attempt {self.request.retries + 1}/{self.max_retries})")
+            raise self.retry(exc=exc, countdown=countdown)
+
+        self._handle_index_failure(document_id, index_types, error_msg)
+        raise exc
+
     def _handle_index_failure(self, document_id: str, index_types: List[str], error_msg: str):
         try:
             from aperag.tasks.reconciler import index_task_callbacks
@@ -214,11 +234,103 @@ class BaseIndexTask(Task):
         except Exception as e:
             logger.warning(
                 f"Failed to execute index failure callback for {document_id}: {e}", exc_info=True)
+        self._release_vision_dependents(document_id, index_types)
+        _trigger_capped_reconciliation()
+
+    def _release_vision_dependents(self, document_id: str, index_types: List[str]):
+        """Dispatch the tasks parked until the VISION index settles, once a VISION task is done"""
+        if "VISION" in index_types:
+            release_vision_dependents(document_id)
+
+    def _defer_until_vision(self, document_id: str, index_type: str, context: dict) -> dict:
+        """
+        Park this task until the VISION index settles, instead of holding the worker waiting for it.
+
+        Only the document id is parked, the released task parses the document again instead of keeping
+        the parsed content in Redis. It skips the VISION check, so it runs even if the VISION status
+        write failed after the VISION task released it.
+        """
+        replay = self.signature((document_id, index_type, None, context), {"vision_settled": True})
+        queue = (self.request.delivery_info or {}).get("routing_key")
+        if queue:
+            replay.set(queue=queue)
+        park_vision_dependent(document_id, replay)
+
+        # VISION may have settled while the task was being parked, nothing would release it then
+        if not is_vision_in_progress(document_id):
+            release_vision_dependents(document_id)
+
+        logger.info(f"Deferred {self.name} for document {document_id} until its VISION index settles")
+        return {"status": "deferred", "reason": "vision_in_progress"}
+
+def _trigger_capped_reconciliation():
+    """
+    Let the reconciler claim more work once a document's indexes are done.
+
+    With INDEX_TENANT_MAX_INFLIGHT set, the reconciler leaves a tenant's backlog pending while its
+    slots are taken, so every finished workflow has to free a slot by triggering the next claim.
+    Triggers are debounced: the first one schedules a reconciliation INDEX_RECONCILE_DEBOUNCE seconds
+    later and holds a Redis lock as long, every workflow finishing meanwhile is covered by that run.
+    """
+    from aperag.config import settings
+
+    if settings.index_tenant_max_inflight <= 0:
+        return
+    debounce = settings.index_reconcile_debounce
+    if debounce > 0:
+        try:
+            from aperag.db.redis_manager import get_sync_redis_client
+
+            if not get_sync_redis_client().set(RECONCILE_TRIGGER_LOCK_KEY, 1, nx=True, ex=debounce):
+                return
+        except Exception as e:
+            # Without the lock a few extra reconciliations are harmless, a missed one is not
+            logger.warning(f"Failed to take the index reconciliation trigger lock: {e}")
+    try:
+        # A trigger still queued when the next one may fire is redundant
+        reconcile_indexes_task.apply_async(countdown=debounce, expires=2 * debounce + 60)
+    except Exception as e:
+        logger.warning(f"Failed to trigger index reconciliation: {e}")
+
+
+def _load_parsed_data(document_id: str, parsed_data_dict: dict) -> ParsedDocumentData:
+    """Structured parse result of a document, parsed again when the task was parked without it"""
+    if parsed_data_dict is None:
+        return document_index_task.parse_document(document_id)
+    return ParsedDocumentData.from_dict(parsed_data_dict)
+
+
+def park_vision_dependent(document_id: str, dependent) -> None:
+    """Park a signature until the VISION index of the document succeeds, fails or is skipped"""
+    get_vision_dependent_store().add(document_id, dict(dependent))
+
+
+def release_vision_dependents(document_id: str) -> int:
+    """Dispatch every signature parked for the document, returns how many were dispatched"""
+    try:
+        dependents = get_vision_dependent_store().pop_all(document_id)
+    except Exception as e:
+        logger.warning(f"Failed to take the tasks waiting for VISION index of {document_id}: {e}", exc_info=True)
+        return 0
+
+    for dependent in dependents:
+        signature(dependent, app=app).apply_async()
+        # The claim of the released task stays fresh while it waits in the queue
+        index_type = dependent["args"][1]
+        try:
+            from aperag.tasks.reconciler import index_task_callbacks
+
+            index_task_callbacks.on_index_heartbeat(document_id, index_type)
+        except Exception as e:
+            logger.warning(f"Failed to refresh the claim of {index_type} index of document {document_id}: {e}")
+    if dependents:
+        logger.info(f"Dispatched {len(dependents)} task(s) waiting for VISION index of {document_id}")
+    return len(dependents)
 
 # ========== Core Document Processing Tasks ==========
 
 
-@current_app.task(bind=True, base=BaseIndexTask, autoretry_for=(Exception,), retry_kwargs={'max_retries': 3, 'countdown': 60})
+@current_app.task(bind=True, base=BaseIndexTask, max_retries=TaskConfig.RETRY_MAX_RETRIES_INDEX)
 def parse_document_task(self, document_id: str, index_types: List[str]) -> dict:
     """
     Parse document content task
@@ -237,24 +349,22 @@ def parse_document_task(self, document_id: str, index_types: List[str]) -> dict:
     except Exception as e:
         error_msg = f"Failed to parse document {document_id}: {str(e)}"
         logger.error(error_msg, exc_info=True)
-
-        # Only mark as failed if all retries are exhausted
-        if self.request.retries >= self.max_retries:
-            self._handle_index_failure(document_id, index_types, error_msg)
-
-        raise
+        self._retry_or_fail(e, document_id, index_types, error_msg)
 
 
-@current_app.task(bind=True, base=BaseIndexTask, autoretry_for=(Exception,), retry_kwargs={'max_retries': 3, 'countdown': 60})
-def create_index_task(self, document_id: str, index_type: str, parsed_data_dict: dict, context: dict = None) -> dict:
+@current_app.task(bind=True, base=BaseIndexTask, max_retries=TaskConfig.RETRY_MAX_RETRIES_INDEX)
+def create_index_task(
+    self, document_id: str, index_type: str, parsed_data_dict: dict, context: dict = None, vision_settled: bool = False
+) -> dict:
     """
     Create a single index for a document with distributed locking
 
     Args:
         document_id: Document ID to process
         index_type: Type of index to create ('vector', 'fulltext', 'graph')
-        parsed_data_dict: Serialized ParsedDocumentData from parse_document_task
+        parsed_data_dict: Serialized ParsedDocumentData from parse_document_task, None to parse the document again
         context: Task context including index version
+        vision_settled: Set on tasks released after the VISION index settled, skips waiting for it
 
     Returns:
         Serialized IndexTaskResult
@@ -275,41 +385,41 @@ def create_index_task(self, document_id: str, index_type: str, parsed_data_dict:
         skip_reason = _validate_task_relevance(
             document_id, index_type, target_version, DocumentIndexStatus.CREATING)
         if skip_reason:
+            self._release_vision_dependents(document_id, [index_type])
             return skip_reason
 
-        # Convert dict back to structured data
-        parsed_data = ParsedDocumentData.from_dict(parsed_data_dict)
+        # GRAPH reads the Vision-to-Text content, it can't start before VISION settles
+        if index_type == DocumentIndexType.GRAPH.value and not vision_settled and is_vision_in_progress(document_id):
+            return self._defer_until_vision(document_id, index_type, context)
 
-        # Execute index creation
-        result = document_index_task.create_index(
-            document_id, index_type, parsed_data)
+        # Execute index creation, keeping the claim alive while it runs
+        with index_claim_heartbeat(document_id, index_type):
+            parsed_data = _load_parsed_data(document_id, parsed_data_dict)
+            result = document_index_task.create_index(
+                document_id, index_type, parsed_data)
 
         # Check if the operation failed and raise exception to trigger retry
         if not result.success:
             error_msg = f"Failed to create {index_type} index for document {document_id}: {result.error}"
             logger.error(error_msg)
-            raise Exception(error_msg)
+            raise Exception(error_msg) if result.retryable else PermanentTaskError(error_msg)
 
         # Handle success callback with version validation
         logger.info(
             f"Successfully created {index_type} index for document {document_id} (v{target_version})")
         self._handle_index_success(
             document_id, index_type, target_version, result.data)
+        self._release_vision_dependents(document_id, [index_type])
 
         return result.to_dict()
 
     except Exception as e:
         error_msg = f"Failed to create {index_type} index for document {document_id}: {str(e)}"
         logger.error(error_msg, exc_info=True)
-
-        # Only mark as failed if all retries are exhausted
-        if self.request.retries >= self.max_retries:
-            self._handle_index_failure(document_id, [index_type], error_msg)
-
-        raise
+        self._retry_or_fail(e, document_id, [index_type], error_msg)
 
 
-@current_app.task(bind=True, base=BaseIndexTask, autoretry_for=(Exception,), retry_kwargs={'max_retries': 3, 'countdown': 60})
+@current_app.task(bind=True, base=BaseIndexTask, max_retries=TaskConfig.RETRY_MAX_RETRIES_INDEX)
 def delete_index_task(self, document_id: str, index_type: str) -> dict:
     """
     Delete a single index for a document
@@ -353,14 +463,15 @@ def delete_index_task(self, document_id: str, index_type: str) -> dict:
 
             break
 
-        # Execute index deletion
-        result = document_index_task.delete_index(document_id, index_type)
+        # Execute index deletion, keeping the claim alive while it runs
+        with index_claim_heartbeat(document_id, index_type):
+            result = document_index_task.delete_index(document_id, index_type)
 
         # Check if the operation failed and raise exception to trigger retry
         if not result.success:
             error_msg = f"Failed to delete {index_type} index for document {document_id}: {result.error}"
             logger.error(error_msg)
-            raise Exception(error_msg)
+            raise Exception(error_msg) if result.retryable else PermanentTaskError(error_msg)
 
         # Handle success callback
         logger.info(
@@ -372,24 +483,22 @@ def delete_index_task(self, document_id: str, index_type: str) -> dict:
     except Exception as e:
         error_msg = f"Failed to delete {index_type} index for document {document_id}: {str(e)}"
         logger.error(error_msg, exc_info=True)
-
-        # Only mark as failed if all retries are exhausted
-        if self.request.retries >= self.max_retries:
-            self._handle_index_failure(document_id, [index_type], error_msg)
-
-        raise
+        self._retry_or_fail(e, document_id, [index_type], error_msg)
 
 
-@current_app.task(bind=True, base=BaseIndexTask, autoretry_for=(Exception,), retry_kwargs={'max_retries': 3, 'countdown': 60})
-def update_index_task(self, document_id: str, index_type: str, parsed_data_dict: dict, context: dict = None) -> dict:
+@current_app.task(bind=True, base=BaseIndexTask, max_retries=TaskConfig.RETRY_MAX_RETRIES_INDEX)
+def update_index_task(
+    self, document_id: str, index_type: str, parsed_data_dict: dict, context: dict = None, vision_settled: bool = False
+) -> dict:
     """
     Update a single index for a document with distributed locking
 
     Args:
         document_id: Document ID to process
         index_type: Type of index to update ('vector', 'fulltext', 'graph')
-        parsed_data_dict: Serialized ParsedDocumentData from parse_document_task
+        parsed_data_dict: Serialized ParsedDocumentData from parse_document_task, None to parse the document again
         context: Task context including index version
+        vision_settled: Set on tasks released after the VISION index settled, skips waiting for it
 
     Returns:
         Serialized IndexTaskResult
@@ -410,144 +519,93 @@ def update_index_task(self, document_id: str, index_type: str, parsed_data_dict:
         skip_reason = _validate_task_relevance(
             document_id, index_type, target_version, DocumentIndexStatus.CREATING)
         if skip_reason:
+            self._release_vision_dependents(document_id, [index_type])
             return skip_reason
 
-        # Convert dict back to structured data
-        parsed_data = ParsedDocumentData.from_dict(parsed_data_dict)
+        # GRAPH reads the Vision-to-Text content, it can't start before VISION settles
+        if index_type == DocumentIndexType.GRAPH.value and not vision_settled and is_vision_in_progress(document_id):
+            return self._defer_until_vision(document_id, index_type, context)
 
-        # Execute index update
-        result = document_index_task.update_index(
-            document_id, index_type, parsed_data)
+        # Execute index update, keeping the claim alive while it runs
+        with index_claim_heartbeat(document_id, index_type):
+            parsed_data = _load_parsed_data(document_id, parsed_data_dict)
+            result = document_index_task.update_index(
+                document_id, index_type, parsed_data)
 
         # Check if the operation failed and raise exception to trigger retry
         if not result.success:
             error_msg = f"Failed to update {index_type} index for document {document_id}: {result.error}"
             logger.error(error_msg)
-            raise Exception(error_msg)
+            raise Exception(error_msg) if result.retryable else PermanentTaskError(error_msg)
 
         # Handle success callback with version validation
         logger.info(
             f"Successfully updated {index_type} index for document {document_id} (v{target_version})")
         self._handle_index_success(
             document_id, index_type, target_version, result.data)
+        self._release_vision_dependents(document_id, [index_type])
 
         return result.to_dict()
 
     except Exception as e:
         error_msg = f"Failed to update {index_type} index for document {document_id}: {str(e)}"
         logger.error(error_msg, exc_info=True)
+        self._retry_or_fail(e, document_id, [index_type], error_msg)
 
-        # Only mark as failed if all retries are exhausted
-        if self.request.retries >= self.max_retries:
-            self._handle_index_failure(document_id, [index_type], error_msg)
-
-        raise
 
+# ========== Helper Functions for Workflow Orchestration ==========
 
-# ========== Helper Tasks for Workflow Orchestration ==========
-
-@current_app.task(bind=True, name='aperag.trigger_chord_after_vision')
-def trigger_chord_after_vision(self, vision_result, document_id: str, other_index_types: List[str], parsed_data_dict: dict, context: dict, all_index_types: List[str]):
-    """Helper task to trigger chord after VISION completes, ignoring vision result"""
-    from celery import chord, group
-    from aperag.tasks.reconciler import IndexAction
-
-    # Create the chord for parallel index creation
-    other_index_tasks = group([
-        create_index_task.s(
-            document_id, index_type, parsed_data_dict, context)
-        for index_type in other_index_types
-    ])
+def _index_workflow(index_task, document_id: str, operation: str, index_types: List[str], parsed_data_dict: dict, context: dict, lane: str = None):
+    """
+    Build the chord running the index tasks of a document in parallel, then the completion notification.
 
-    workflow_chord = chord(
-        other_index_tasks,
+    A GRAPH task that starts while VISION is in progress parks itself until VISION settles (see
+    BaseIndexTask._defer_until_vision), so nothing is parked before the chord is actually sent.
+    """
+    return chord(
+        group([
+            index_task.s(document_id, index_type, parsed_data_dict, context).set(
+                queue=index_queue(index_type, lane))
+            for index_type in index_types
+        ]),
         notify_workflow_complete.s(
-            document_id, IndexAction.CREATE, all_index_types)
+            document_id, operation, index_types).set(queue=workflow_queue(lane))
     )
 
-    # Trigger the chord
-    workflow_chord.apply_async()
-    return {'status': 'chord_triggered'}
-
 
 # ========== Dynamic Workflow Orchestration Tasks ==========
 
 @current_app.task(bind=True)
-def trigger_create_indexes_workflow(self, parsed_data_dict: dict, document_id: str, index_types: List[str], context: dict = None) -> Any:
+def trigger_create_indexes_workflow(self, parsed_data_dict: dict, document_id: str, index_types: List[str], context: dict = None, lane: str = None) -> Any:
     """
     Dynamic orchestration task for index creation workflow.
 
     This task acts as a fan-out point, receiving parsed document data and dynamically
     creating parallel index creation tasks based on the actual parsed content.
 
-    To ensure GRAPH index can use Vision-to-Text content, VISION index is created first,
-    then other indexes (including GRAPH) are created in parallel.
+    To ensure GRAPH index can use Vision-to-Text content, GRAPH is parked until the VISION
+    index succeeds or fails, while the other indexes are created in parallel with VISION.
 
     Args:
         parsed_data_dict: Serialized ParsedDocumentData from parse_document_task
         document_id: Document ID to process
         index_types: List of index types to create
+        lane: Scheduling lane (see aperag.tasks.queues), selects the queues of the index tasks
 
     Returns:
         Chord signature for parallel index creation + completion notification
     """
     try:
-        from celery import group, chain, chord
-
         logger.info(
             f"Triggering index creation for document {document_id} with types: {index_types}")
 
-        # Separate VISION from other index types
-        # VISION should complete before GRAPH to ensure vision-to-text content is available
-        vision_index_type = "VISION"
-        other_index_types = [
-            idx_type for idx_type in index_types if idx_type != vision_index_type]
-
-        if vision_index_type in index_types:
-            # Create VISION index first
-            vision_task = create_index_task.s(
-                document_id, vision_index_type, parsed_data_dict, context)
-
-            if other_index_types:
-                # After VISION completes, create other indexes in parallel
-                other_index_tasks = group([
-                    create_index_task.s(
-                        document_id, index_type, parsed_data_dict, context)
-                    for index_type in other_index_types
-                ])
-
-                # Chain: VISION -> (other indexes in parallel) -> notification
-                # Use helper task to trigger chord after VISION completes without passing the result
-                workflow_chain = chain(
-                    vision_task,
-                    trigger_chord_after_vision.s(
-                        document_id, other_index_types, parsed_data_dict, context, index_types)
-                )
-            else:
-                # Only VISION index
-                workflow_chain = chain(
-                    vision_task,
-                    notify_workflow_complete.s(
-                        document_id, IndexAction.CREATE, index_types)
-                )
-        else:
-            # No VISION index, create all indexes in parallel (original behavior)
-            parallel_index_tasks = group([
-                create_index_task.s(document_id, index_type,
-                                    parsed_data_dict, context)
-                for index_type in index_types
-            ])
-
-            workflow_chain = chord(
-                parallel_index_tasks,
-                notify_workflow_complete.s(
-                    document_id, IndexAction.CREATE, index_types)
-            )
+        workflow_chord = _index_workflow(
+            create_index_task, document_id, IndexAction.CREATE, index_types, parsed_data_dict, context, lane)
 
         # Execute the workflow
-        workflow_chain.apply_async()
+        workflow_chord.apply_async()
 
-        return workflow_chain
+        return workflow_chord
 
     except Exception as e:
         error_msg = f"Failed to trigger create indexes workflow: {str(e)}"
@@ -556,13 +614,14 @@ def trigger_create_indexes_workflow(self, parsed_data_dict: dict, document_id: s
 
 
 @current_app.task(bind=True)
-def trigger_delete_indexes_workflow(self, document_id: str, index_types: List[str]) -> Any:
+def trigger_delete_indexes_workflow(self, document_id: str, index_types: List[str], lane: str = None) -> Any:
     """
     Dynamic orchestration task for index deletion workflow.
 
     Args:
         document_id: Document ID to process
         index_types: List of index types to delete
+        lane: Scheduling lane (see aperag.tasks.queues), selects the task queues
 
     Returns:
         Chord signature for parallel index deletion + completion notification
@@ -573,7 +632,7 @@ def trigger_delete_indexes_workflow(self, document_id: str, index_types: List[st
 
         # Create parallel index deletion tasks
         parallel_delete_tasks = group([
-            delete_index_task.s(document_id, index_type)
+            delete_index_task.s(document_id, index_type).set(queue=index_queue(index_type, lane))
             for index_type in index_types
         ])
 
@@ -581,7 +640,7 @@ def trigger_delete_indexes_workflow(self, document_id: str, index_types: List[st
         workflow_chord = chord(
             parallel_delete_tasks,
             notify_workflow_complete.s(
-                document_id, IndexAction.DELETE, index_types)
+                document_id, IndexAction.DELETE, index_types).set(queue=workflow_queue(lane))
         )
 
         # Execute the chord
@@ -596,7 +655,7 @@ def trigger_delete_indexes_workflow(self, document_id: str, index_types: List[st
 
 
 @current_app.task(bind=True)
-def trigger_update_indexes_workflow(self, parsed_data_dict: dict, document_id: str, index_types: List[str], context: dict = None) -> Any:
+def trigger_update_indexes_workflow(self, parsed_data_dict: dict, document_id: str, index_types: List[str], context: dict = None, lane: str = None) -> Any:
     """
     Dynamic orchestration task for index update workflow.
 
@@ -604,6 +663,7 @@ def trigger_update_indexes_workflow(self, parsed_data_dict: dict, document_id: s
         parsed_data_dict: Serialized ParsedDocumentData from parse_document_task
         document_id: Document ID to process
         index_types: List of index types to update
+        lane: Scheduling lane (see aperag.tasks.queues), selects the task queues
 
     Returns:
         Chord signature for parallel index update + completion notification
@@ -612,19 +672,9 @@ def trigger_update_indexes_workflow(self, parsed_data_dict: dict, document_id: s
         logger.info(
             f"Triggering parallel index update for document {document_id} with types: {index_types}")
 
-        # Create parallel index update tasks
-        parallel_update_tasks = group([
-            update_index_task.s(document_id, index_type,
-                                parsed_data_dict, context)
-            for index_type in index_types
-        ])
-
-        # Create chord: parallel tasks + completion notification
-        workflow_chord = chord(
-            parallel_update_tasks,
-            notify_workflow_complete.s(
-                document_id, IndexAction.UPDATE, index_types)
-        )
+        # Create chord: parallel tasks + completion notification, GRAPH waits for VISION
+        workflow_chord = _index_workflow(
+            update_index_task, document_id, IndexAction.UPDATE, index_types, parsed_data_dict, context, lane)
 
         chord_async_result = workflow_chord.apply_async()
 
@@ -658,7 +708,9 @@ def notify_workflow_complete(self, index_results: List[dict], document_id: str,
             f"Workflow {operation} completed for document {document_id}")
         logger.info(f"Index results: {index_results}")
 
-        # Analyze results
+        # Analyze results, GRAPH tasks parked until VISION settles report their status themselves
+        deferred_tasks = [r for r in index_results if isinstance(r, dict) and r.get("status") == "deferred"]
+        index_results = [r for r in index_results if r not in deferred_tasks]
         successful_tasks = []
         failed_tasks = []
 
@@ -672,6 +724,8 @@ def notify_workflow_complete(self, index_results: List[dict], document_id: str,
             except Exception as e:
                 failed_tasks.append(f"unknown: {str(e)}")
 
+        _trigger_capped_reconciliation()
+
         # Determine overall status
         if not failed_tasks:
             status = TaskStatus.SUCCESS
@@ -695,7 +749,7 @@ def notify_workflow_complete(self, index_results: List[dict], document_id: str,
             message=status_message,
             successful_indexes=successful_tasks,
             failed_indexes=[f.split(':')[0] for f in failed_tasks],
-            total_indexes=len(index_types),
+            total_indexes=len(index_types) - len(deferred_tasks),
             index_results=[IndexTaskResult.from_dict(r) for r in index_results]
         )
 
@@ -723,7 +777,7 @@ def notify_workflow_complete(self, index_results: List[dict], document_id: str,
 
 # ========== Workflow Entry Point Functions ==========
 
-def create_document_indexes_workflow(document_id: str, index_types: List[str], context: dict = None):
+def create_document_indexes_workflow(document_id: str, index_types: List[str], context: dict = None, lane: str = None):
     """
     Create indexes for a document using dynamic workflow orchestration.
 
@@ -735,6 +789,7 @@ def create_document_indexes_workflow(document_id: str, index_types: List[str], c
     Args:
         document_id: Document ID to process
         index_types: List of index types to create
+        lane: Scheduling lane (see aperag.tasks.queues), selects the task queues
 
     Returns:
         AsyncResult for the workflow chain
@@ -743,8 +798,8 @@ def create_document_indexes_workflow(document_id: str, index_types: List[str], c
         f"Starting create indexes workflow for document {document_id} with types: {index_types}")
     # Create the workflow chain: parse -> dynamic trigger
     workflow_chain = chain(
-        parse_document_task.s(document_id, index_types),
-        trigger_create_indexes_workflow.s(document_id, index_types, context)
+        parse_document_task.s(document_id, index_types).set(queue=parse_queue(lane)),
+        trigger_create_indexes_workflow.s(document_id, index_types, context, lane).set(queue=workflow_queue(lane))
     )
 
     # Submit the workflow
@@ -755,13 +810,14 @@ def create_document_indexes_workflow(document_id: str, index_types: List[str], c
     return workflow_result
 
 
-def delete_document_indexes_workflow(document_id: str, index_types: List[str]):
+def delete_document_indexes_workflow(document_id: str, index_types: List[str], lane: str = None):
     """
     Delete indexes for a document using dynamic workflow orchestration.
 
     Args:
         document_id: Document ID to process
         index_types: List of index types to delete
+        lane: Scheduling lane (see aperag.tasks.queues), selects the task queues
 
     Returns:
         AsyncResult for the workflow
@@ -770,15 +826,15 @@ def delete_document_indexes_workflow(document_id: str, index_types: List[str]):
         f"Starting delete indexes workflow for document {document_id} with types: {index_types}")
 
     # For deletion, we don't need parsing, so we directly trigger the delete workflow
-    workflow_result = trigger_delete_indexes_workflow.delay(
-        document_id, index_types)
+    workflow_result = trigger_delete_indexes_workflow.apply_async(
+        (document_id, index_types, lane), queue=workflow_queue(lane))
     logger.info(
         f"Delete indexes workflow submitted for document {document_id}, workflow ID: {workflow_result.id}")
 
     return workflow_result
 
 
-def update_document_indexes_workflow(document_id: str, index_types: List[str], context: dict = None):
+def update_document_indexes_workflow(document_id: str, index_types: List[str], context: dict = None, lane: str = None):
     """
     Update indexes for a document using dynamic workflow orchestration.
 
@@ -790,6 +846,7 @@ def update_document_indexes_workflow(document_id: str, index_types: List[str], c
     Args:
         document_id: Document ID to process
         index_types: List of index types to update
+        lane: Scheduling lane (see aperag.tasks.queues), selects the task queues
 
     Returns:
         AsyncResult for the workflow chain
@@ -799,8 +856,8 @@ def update_document_indexes_workflow(document_id: str, index_types: List[str], c
 
     # Create the workflow chain: parse -> dynamic trigger
     workflow_chain = chain(
-        parse_document_task.s(document_id, index_types),
-        trigger_update_indexes_workflow.s(document_id, index_types, context)
+        parse_document_task.s(document_id, index_types).set(queue=parse_queue(lane)),
+        trigger_update_indexes_workflow.s(document_id, index_types, context, lane).set(queue=workflow_queue(lane))
     )
 
     # Submit the workflow
@@ -961,22 +1018,8 @@ def cleanup_expired_documents_task():
 
 # ========== Evaluation Tasks ==========
 
-# By default, get_async_session() uses a global AsyncEngine object.
-# Since we also use asyncio.run() to execute async functions, old connections
-# in the AsyncEngine connection pool cannot work in the new event loop,
-# which will raise an exception like "xxx attached to a different loop".
-# Therefore, using a dedicated AsyncEngine to avoid issues from connection reuse.
-
-
-@asynccontextmanager
-async def _new_async_engine():
-    from aperag.config import new_async_engine
-
-    engine = new_async_engine()
-    try:
-        yield engine
-    finally:
-        await engine.dispose()
+# Evaluation tasks run on the event loop of the worker process (see aperag.tasks.worker_loop),
+# so they share the global AsyncEngine and its connection pool across tasks.
 
 
 @current_app.task
@@ -984,14 +1027,13 @@ def reconcile_evaluations_task():
     """Periodic task to reconcile evaluations."""
     try:
         async def execute():
+            from aperag.config import async_engine
             from aperag.service.evaluation_service import EvaluationExecutor
 
-            async with _new_async_engine() as engine:
-                executor = EvaluationExecutor(engine)
-                await executor.schedule_evaluations()
+            executor = EvaluationExecutor(async_engine)
+            await executor.schedule_evaluations()
 
-        import asyncio
-        asyncio.run(execute())
+        run_in_worker_loop(execute())
 
         return {"success": True}
     except Exception as e:
@@ -1004,14 +1046,13 @@ def initialize_evaluation_task(self, evaluation_id: str) -> Any:
     """Task to initialize a specific evaluation."""
     try:
         async def execute():
+            from aperag.config import async_engine
             from aperag.service.evaluation_service import EvaluationExecutor
 
-            async with _new_async_engine() as engine:
-                executor = EvaluationExecutor(engine)
-                await executor.initialize_evaluation(evaluation_id)
+            executor = EvaluationExecutor(async_engine)
+            await executor.initialize_evaluation(evaluation_id)
 
-        import asyncio
-        asyncio.run(execute())
+        run_in_worker_loop(execute())
 
         return {"success": True, "evaluation_id": evaluation_id}
     except Exception as e:
@@ -1025,14 +1066,13 @@ def process_evaluation_batch_task(self, evaluation_id: str) -> Any:
     """Task to process a batch of items for an evaluation."""
     try:
         async def execute():
+            from aperag.config import async_engine
             from aperag.service.evaluation_service import EvaluationExecutor
 
-            async with _new_async_engine() as engine:
-                executor = EvaluationExecutor(engine)
-                await executor.process_evaluation_batch(evaluation_id)
+            executor = EvaluationExecutor(async_engine)
+            await executor.process_evaluation_batch(evaluation_id)
 
-        import asyncio
-        asyncio.run(execute())
+        run_in_worker_loop(execute())
 
         return {"success": True, "evaluation_id": evaluation_id}
     except Exception as e:
@@ -1046,14 +1086,13 @@ def process_evaluation_item_task(self, evaluation_id: str, item_id: str) -> Any:
     """Task to process a single evaluation item."""
     try:
         async def execute():
+            from aperag.config import async_engine
             from aperag.service.evaluation_service import EvaluationExecutor
 
-            async with _new_async_engine() as engine:
-                executor = EvaluationExecutor(engine)
-                await executor.process_evaluation_item(evaluation_id, item_id)
+            executor = EvaluationExecutor(async_engine)
+            await executor.process_evaluation_item(evaluation_id, item_id)
 
-        import asyncio
-        asyncio.run(execute())
+        run_in_worker_loop(execute())
 
         return {"success": True, "item_id": item_id}
     except Exception as e:
@@ -8,4 +8,11 @@ if [ -z "${LOCAL_QUEUE_NAME}" ]; then
     export LOCAL_QUEUE_NAME="localhost"
 fi
 
-exec celery -A config.celery worker -l INFO --concurrency=16 -Q ${LOCAL_QUEUE_NAME},celery --pool=threads
+# Index queues consumed by this worker, set CELERY_INDEX_QUEUES to run dedicated workers per index type.
+# Defaults to every index queue, as laid out in aperag/tasks/queues.py
+if [ -z "${CELERY_INDEX_QUEUES:-}" ]; then
+    CELERY_INDEX_QUEUES=$(python3 -c "from aperag.tasks.queues import all_index_queues; print(','.join(all_index_queues()))")
+fi
+export CELERY_INDEX_QUEUES
+
+exec celery -A config.celery worker -l INFO --concurrency=16 -Q ${LOCAL_QUEUE_NAME},celery,${CELERY_INDEX_QUEUES} --pool=threads
@@ -0,0 +1,107 @@
+# Copyright 2025 ApeCloud, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+
+from aperag.flow.base.exceptions import ValidationError
+from aperag.flow.runners.merge import MergeInput, MergeNodeRunner
+from aperag.flow.runners.rerank import RerankNodeRunner
+from aperag.query.fusion import fuse, is_fused
+from aperag.query.query import DocumentWithScore
+
+
+def doc(text, score=None, **metadata):
+    return DocumentWithScore(text=text, score=score, metadata=metadata)
+
+
+def texts(docs):
+    return [d.text for d in docs]
+
+
+def test_rrf_ignores_score_scales():
+    fused = fuse(
+        {
+            "vector": [doc("a", 0.9), doc("b", 0.8)],
+            "fulltext": [doc("c", 25.0), doc("b", 12.0)],
+        },
+        strategy="rrf",
+    )
+
+    # b is found by both retrievers, c only outscores it on an unrelated scale
+    assert texts(fused) == ["b", "a", "c"]
+    assert fused[0].score == pytest.approx(1 / 62 + 1 / 62)
+    assert fused[0].metadata["raw_score"] == 0.8
+    assert is_fused(fused)
+
+
+def test_minmax_and_zscore_normalize_each_list():
+    ranked_lists = {
+        "vector": [doc("a", 0.9), doc("b", 0.5), doc("x", 0.1)],
+        "fulltext": [doc("c", 30.0), doc("d", 20.0), doc("y", 10.0)],
+    }
+
+    minmax = fuse(ranked_lists, strategy="minmax")
+    assert [d.score for d in minmax[:2]] == [1.0, 1.0]
+    assert {d.text: d.score for d in minmax}["b"] == pytest.approx(0.5)
+
+    zscore = fuse(ranked_lists, strategy="zscore")
+    assert {d.text: d.score for d in zscore}["a"] == pytest.approx({d.text: d.score for d in zscore}["c"])
+
+
+def test_weights_and_unscored_lists():
+    fused = fuse(
+        {
+            "vector": [doc("a", 0.9), doc("b", 0.2)],
+            "graph": [doc("graph context")],
+        },
+        strategy="minmax",
+        weights={"vector": 0.5},
+    )
+
+    assert texts(fused) == ["graph context", "a", "b"]
+    assert fused[1].score == pytest.approx(0.5)
+    assert fuse({"vector": [doc("a", 0.9)]}, strategy="rrf", weights={"vector": 0}) == []
+
+
+def test_near_duplicates_are_collapsed():
+    fused = fuse(
+        {
+            "vector": [doc("> Hierarchy: Manual > Safety\n\nKeep  the door\nclosed.", 0.9)],
+            "fulltext": [doc("keep the door closed.", 10.0, chunk_id="1_0"), doc("other text", 5.0, chunk_id="1_0")],
+        },
+        strategy="rrf",
+    )
+
+    assert len(fused) == 1
+    assert fused[0].score == pytest.approx(2 / 61)
+
+    union = fuse({"vector": [doc("a b", 0.9)], "fulltext": [doc("A  b", 3.0)]}, strategy="union")
+    assert union == [doc("a b", 0.9)]
+    assert len(fuse({"vector": [doc("a", 0.9)], "fulltext": [doc("a", 3.0)]}, "rrf", deduplicate=False)) == 2
+
+
+@pytest.mark.asyncio
+async def test_merge_node_fuses_and_rerank_fallback_keeps_the_ranking():
+    ui = MergeInput(
+        merge_strategy="rrf",
+        vector_search_docs=[doc("a", 0.9, recall_type="vector_search"), doc("b", 0.8, recall_type="vector_search")],
+        fulltext_search_docs=[doc("c", 25.0, recall_type="fulltext_search"), doc("b", 12.0)],
+    )
+    output, _ = await MergeNodeRunner().run(ui, None)
+    assert texts(output.docs) == ["b", "a", "c"]
+
+    assert texts(RerankNodeRunner()._apply_fallback_strategy(output.docs)) == ["b", "a", "c"]
+
+    with pytest.raises(ValidationError):
+        await MergeNodeRunner().run(MergeInput(merge_strategy="intersection"), None)
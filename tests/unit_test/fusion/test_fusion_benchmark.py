@@ -0,0 +1,88 @@
+# Copyright 2025 ApeCloud, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Offline benchmark of the fusion strategies over ranked_lists.json.
+
+The fixture holds the ranked lists of vector, fulltext and graph search of a set of queries with
+graded relevance labels. Each strategy is compared with the rerank node's fallback, which puts
+graph results first and sorts the others by raw score.
+"""
+
+import json
+import math
+from pathlib import Path
+from typing import Dict, List
+
+import pytest
+
+from aperag.flow.runners.rerank import RerankNodeRunner
+from aperag.query.fusion import fuse
+from aperag.query.query import DocumentWithScore
+
+FIXTURE = Path(__file__).parent / "ranked_lists.json"
+
+CUTOFF = 5
+
+
+def load_queries():
+    with open(FIXTURE) as f:
+        queries = json.load(f)["queries"]
+    for query in queries:
+        query["lists"] = {
+            source: [
+                DocumentWithScore(text=text, score=score, metadata={"recall_type": f"{source}_search"})
+                for text, score in ranked
+            ]
+            for source, ranked in query["lists"].items()
+        }
+    return queries
+
+
+def ndcg(ranking: List[str], relevance: Dict[str, int], cutoff: int = CUTOFF) -> float:
+    dcg = sum(relevance.get(text, 0) / math.log2(rank + 2) for rank, text in enumerate(ranking[:cutoff]))
+    ideal = sorted(relevance.values(), reverse=True)[:cutoff]
+    idcg = sum(gain / math.log2(rank + 2) for rank, gain in enumerate(ideal))
+    return dcg / idcg if idcg else 0.0
+
+
+def reciprocal_rank(ranking: List[str], relevance: Dict[str, int]) -> float:
+    return next((1.0 / (rank + 1) for rank, text in enumerate(ranking) if relevance.get(text, 0) > 1), 0.0)
+
+
+def evaluate(rank_fn) -> Dict[str, float]:
+    queries = load_queries()
+    rankings = [[doc.text for doc in rank_fn(query["lists"])] for query in queries]
+    return {
+        f"ndcg@{CUTOFF}": sum(ndcg(r, q["relevance"]) for r, q in zip(rankings, queries)) / len(queries),
+        "mrr": sum(reciprocal_rank(r, q["relevance"]) for r, q in zip(rankings, queries)) / len(queries),
+    }
+
+
+def fallback_ranking(ranked_lists):
+    docs = fuse(ranked_lists, strategy="union")
+    return RerankNodeRunner()._apply_fallback_strategy(docs)
+
+
+@pytest.fixture(scope="module")
+def baseline():
+    return evaluate(fallback_ranking)
+
+
+@pytest.mark.parametrize("strategy", ["rrf", "minmax", "zscore"])
+def test_fusion_beats_raw_score_sorting(baseline, strategy):
+    metrics = evaluate(lambda ranked_lists: fuse(ranked_lists, strategy=strategy))
+
+    assert metrics[f"ndcg@{CUTOFF}"] > baseline[f"ndcg@{CUTOFF}"], (metrics, baseline)
+    assert metrics["mrr"] >= baseline["mrr"], (metrics, baseline)
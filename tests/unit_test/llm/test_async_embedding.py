@@ -0,0 +1,161 @@
+# Copyright 2025 ApeCloud, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import gc
+import json
+import threading
+import time
+import weakref
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import litellm
+import pytest
+
+from aperag.config import settings
+from aperag.llm.embed.embedding_service import EmbeddingService, _provider_semaphore, _provider_semaphores
+from aperag.llm.http_client import http_client_pool
+from aperag.llm.llm_error_types import BatchProcessingError
+
+# Seconds the mock provider takes to answer
+DELAY = 0.05
+
+
+class MockEmbeddingHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        server = self.server
+        with server.lock:
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        if server.gate is not None:
+            server.gate.wait(timeout=10)
+        else:
+            time.sleep(DELAY)
+        with server.lock:
+            server.in_flight -= 1
+
+        inputs = request["input"]
+        if any(text == "fail" for text in inputs):
+            self.send_response(400)
+            body = json.dumps({"error": {"message": "bad input", "type": "invalid_request_error"}}).encode()
+        else:
+            self.send_response(200)
+            data = [
+                {"object": "embedding", "index": i, "embedding": [float(len(text)), 1.0]}
+                for i, text in enumerate(inputs)
+            ]
+            body = json.dumps(
+                {"object": "list", "data": data, "model": "mock", "usage": {"prompt_tokens": 1, "total_tokens": 1}}
+            ).encode()
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def mock_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockEmbeddingHandler)
+    server.lock = threading.Lock()
+    server.in_flight = 0
+    server.max_in_flight = 0
+    # When set, requests wait for the gate to open instead of sleeping DELAY
+    server.gate = None
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+    server.shutdown()
+    server.server_close()
+
+
+def make_service(base_url, max_chunks=1):
+    return EmbeddingService("openai", "mock", base_url, "sk-1", max_chunks, caching=False)
+
+
+@pytest.mark.asyncio
+async def test_batches_are_embedded_concurrently_in_order(mock_server, monkeypatch):
+    server, base_url = mock_server
+    monkeypatch.setattr(settings, "embedding_max_concurrency", 3)
+    texts = ["a" * n for n in range(1, 10)]
+
+    embeddings = await make_service(base_url).aembed_documents(texts)
+    await http_client_pool.aclose()
+
+    assert [embedding[0] for embedding in embeddings] == [float(n) for n in range(1, 10)]
+    assert server.max_in_flight == 3
+
+
+@pytest.mark.asyncio
+async def test_embedding_does_not_block_the_event_loop(mock_server, monkeypatch):
+    server, base_url = mock_server
+
+    def sync_embedding(*args, **kwargs):
+        raise AssertionError("async embedding must not use litellm.embedding")
+
+    monkeypatch.setattr(litellm, "embedding", sync_embedding)
+    monkeypatch.setattr(settings, "embedding_max_concurrency", 10)
+    service = make_service(base_url)
+    # The first call sets up litellm and the client pool
+    await service.aembed_query("warm up")
+
+    # The requests are held by the server until the gate opens, which only this event loop does:
+    # a blocking call would keep the loop from ever seeing all of them in flight
+    server.gate = threading.Event()
+    embedding = asyncio.gather(*(service.aembed_query(f"query {i}") for i in range(10)))
+
+    async def all_in_flight():
+        while server.in_flight < 10:
+            await asyncio.sleep(0.001)
+
+    try:
+        await asyncio.wait_for(all_in_flight(), timeout=10)
+    finally:
+        server.gate.set()
+    vectors = await embedding
+    await http_client_pool.aclose()
+
+    assert len(vectors) == 10
+    assert server.max_in_flight == 10
+
+
+def test_semaphores_are_dropped_with_their_event_loop():
+    async def get_semaphore():
+        return _provider_semaphore("openai", "http://localhost/v1/")
+
+    loop = asyncio.new_event_loop()
+    semaphore = loop.run_until_complete(get_semaphore())
+    assert loop.run_until_complete(get_semaphore()) is semaphore
+    assert _provider_semaphores[loop] == {("openai", "http://localhost/v1"): semaphore}
+
+    loop.close()
+    loop_ref = weakref.ref(loop)
+    del loop
+    gc.collect()
+    assert loop_ref() is None
+
+
+@pytest.mark.asyncio
+async def test_failed_batches_raise_batch_processing_error(mock_server):
+    _, base_url = mock_server
+
+    with pytest.raises(BatchProcessingError):
+        await make_service(base_url).aembed_documents(["fine", "fail"])
+    await http_client_pool.aclose()
@@ -0,0 +1,197 @@
+# Copyright 2025 ApeCloud, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from aperag.config import settings
+from aperag.llm.completion.completion_service import CompletionService
+from aperag.llm.http_client import HttpClientPool, litellm_client_kwargs
+
+COMPLETION = {
+    "id": "chatcmpl-1",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "mock-model",
+    "choices": [{"index": 0, "message": {"role": "assistant", "content": "pong"}, "finish_reason": "stop"}],
+    "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+}
+
+
+class MockProviderHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.server.connections.add(self.client_address)
+        body = json.dumps(COMPLETION).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def mock_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockProviderHandler)
+    server.connections = set()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = HttpClientPool()
+    monkeypatch.setattr("aperag.llm.http_client.http_client_pool", pool)
+    yield pool
+    pool.close()
+
+
+@pytest.mark.asyncio
+async def test_back_to_back_calls_reuse_one_connection(mock_server, pool):
+    server, base_url = mock_server
+
+    for _ in range(20):
+        async with httpx.AsyncClient() as client:
+            await client.post(f"{base_url}/chat/completions", json={})
+    fresh_connections = len(server.connections)
+    server.connections.clear()
+
+    for _ in range(20):
+        await pool.get_async_client(base_url, "openai").post(f"{base_url}/chat/completions", json={})
+    await pool.aclose()
+
+    # Every call without the pool paid for a new connection, the pooled calls shared one
+    assert fresh_connections == 20
+    assert len(server.connections) == 1
+
+
+def test_clients_are_shared_per_base_url_and_provider(pool):
+    client = pool.get_client("http://a/v1/", "openai")
+
+    assert pool.get_client("http://a/v1", "openai") is client
+    assert pool.get_client("http://b/v1", "openai") is not client
+    assert pool.get_client("http://a/v1", "jina_ai") is not client
+
+    pool.close()
+    assert client.is_closed
+    assert pool.get_client("http://a/v1", "openai") is not client
+
+
+def run_in_new_loop(coro):
+    """Run a coroutine on a new event loop and close it, whatever asyncio.run is patched to"""
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+def test_async_clients_are_bound_to_their_loop(pool):
+    async def get():
+        return pool.get_async_client("http://a/v1", "openai")
+
+    async def get_twice():
+        return await get(), await get()
+
+    first, again = run_in_new_loop(get_twice())
+    assert first is again
+    assert run_in_new_loop(get()) is not first
+
+
+def test_clients_of_short_lived_loops_are_dropped(pool):
+    async def get():
+        return pool.get_async_client("http://a/v1", "openai")
+
+    stale = run_in_new_loop(get())
+    assert pool.get_stats()["async_clients"] == 1
+
+    loop = asyncio.new_event_loop()
+    try:
+        client = loop.run_until_complete(get())
+        # The client of the closed loop is gone, only the running loop's is left
+        assert pool.get_stats()["async_clients"] == 1
+        assert not client.is_closed
+    finally:
+        loop.run_until_complete(pool.aclose())
+        loop.close()
+    assert stale is not client
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_async_clients_are_closed(pool, monkeypatch):
+    monkeypatch.setattr(settings, "http_pool_max_async_clients", 2)
+    first = pool.get_async_client("http://a/v1", "openai")
+    second = pool.get_async_client("http://b/v1", "openai")
+    assert pool.get_async_client("http://a/v1", "openai") is first
+
+    pool.get_async_client("http://c/v1", "openai")
+    await asyncio.sleep(0)
+
+    assert second.is_closed and not first.is_closed
+    assert pool.get_stats()["async_clients"] == 2
+    await pool.aclose()
+
+
+@pytest.mark.asyncio
+async def test_openai_clients_per_api_key_are_bounded(pool, monkeypatch):
+    monkeypatch.setattr(settings, "http_pool_max_openai_clients", 2)
+    http_client = pool.get_async_client("http://a/v1", "openai")
+    clients = [pool.get_async_openai_client("http://a/v1", "openai", f"sk-{i}") for i in range(3)]
+
+    assert pool.get_stats()["openai_clients"] == 2
+    assert pool.get_async_openai_client("http://a/v1", "openai", "sk-2") is clients[2]
+    assert pool.get_async_openai_client("http://a/v1", "openai", "sk-0") is not clients[0]
+    # The evicted SDK clients only wrapped the pooled connection, which stays open
+    assert not http_client.is_closed
+    await pool.aclose()
+
+
+@pytest.mark.asyncio
+async def test_openai_sdk_providers_get_pooled_clients(pool):
+    kwargs = litellm_client_kwargs("openai", "http://a/v1", "sk-1", is_async=True)
+    assert kwargs["client"]._client is pool.get_async_client("http://a/v1", "openai")
+    assert litellm_client_kwargs("openai", "http://a/v1", "sk-1", is_async=True)["client"] is kwargs["client"]
+    assert litellm_client_kwargs("openai", "http://a/v1", "sk-2", is_async=True)["client"] is not kwargs["client"]
+
+    assert litellm_client_kwargs("anthropic", "http://a/v1", "sk-1", is_async=True) == {}
+    await pool.aclose()
+
+
+@pytest.mark.asyncio
+async def test_completion_service_uses_the_pool(mock_server, pool):
+    server, base_url = mock_server
+    service = CompletionService("openai", "mock-model", base_url, "sk-1", caching=False)
+
+    for _ in range(3):
+        assert await service.agenerate([], "ping") == "pong"
+    await pool.aclose()
+    # The sync path, used by Celery tasks, has its own pooled connection
+    for _ in range(3):
+        assert service.generate([], "ping") == "pong"
+
+    assert len(server.connections) == 2
@@ -0,0 +1,111 @@
+# Copyright 2025 ApeCloud, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+
+import litellm
+import pytest
+from litellm.types.caching import LiteLLMCacheType
+
+from aperag.config import settings
+from aperag.llm import litellm_cache
+
+MESSAGES = [{"role": "user", "content": "What trips the breaker?"}]
+RESPONSE = '{"text": "An overload"}'
+
+
+def setup_cache(cache_type):
+    # Replace the cache set up when aperag.llm was imported
+    litellm_cache.disable_litellm_cache()
+    litellm_cache.setup_litellm_cache(default_type=cache_type)
+    litellm_cache.clear_cache_stats()
+    return litellm.cache
+
+
+@pytest.fixture
+def local_cache():
+    yield setup_cache(LiteLLMCacheType.LOCAL)
+    litellm_cache.disable_litellm_cache()
+    litellm_cache.clear_cache_stats()
+
+
+def test_keys_are_prefixed_with_the_namespace(local_cache):
+    assert local_cache.get_cache_key(model="m", input="a").startswith("embedding:")
+    assert local_cache.get_cache_key(model="m", messages=MESSAGES).startswith("completion:")
+    assert local_cache.get_cache_key(model="m", query="q", documents=["d"]).startswith("rerank:")
+
+
+@pytest.mark.asyncio
+async def test_stats_are_kept_per_namespace(local_cache):
+    local_cache.add_cache(RESPONSE, model="m", messages=MESSAGES)
+    assert local_cache.get_cache(model="m", messages=MESSAGES) is not None
+    assert local_cache.get_cache(model="m", messages=[{"role": "user", "content": "other"}]) is None
+
+    # Async embedding lookups are made per input with only the cache key
+    key = local_cache.get_cache_key(model="m", input="a")
+    await local_cache.async_add_cache(RESPONSE, cache_key=key, model="m", input="a")
+    assert await local_cache.async_get_cache(cache_key=key) is not None
+
+    stats = litellm_cache.get_cache_stats()
+    assert stats["namespaces"]["completion"] == {
+        "hits": 1,
+        "misses": 1,
+        "added": 1,
+        "total_requests": 2,
+        "hit_rate": 0.5,
+    }
+    assert stats["namespaces"]["embedding"]["hits"] == 1
+    assert stats["namespaces"]["embedding"]["added"] == 1
+    assert (stats["hits"], stats["misses"], stats["added"]) == (2, 1, 2)
+
+
+def test_concurrent_updates_are_not_lost(local_cache):
+    local_cache.add_cache(RESPONSE, model="m", messages=MESSAGES)
+
+    def lookups():
+        for _ in range(500):
+            local_cache.get_cache(model="m", messages=MESSAGES)
+
+    threads = [threading.Thread(target=lookups) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert litellm_cache.get_cache_stats()["namespaces"]["completion"]["hits"] == 8 * 500
+
+
+def test_disk_cache_evicts_least_recently_used(tmp_path, monkeypatch):
+    pytest.importorskip("diskcache")
+    monkeypatch.setattr(settings, "cache_disk_dir", str(tmp_path))
+    monkeypatch.setattr(settings, "cache_disk_size_limit", 128 * 1024)
+    cache = setup_cache(LiteLLMCacheType.DISK)
+    try:
+        embedding = '"' + "x" * 2048 + '"'
+        cache.add_cache(embedding, model="m", input="first")
+        for i in range(200):
+            # Keep the first entry recently used
+            assert cache.get_cache(model="m", input="first") is not None
+            cache.add_cache(embedding, model="m", input=f"text {i}")
+
+        stats = litellm_cache.get_cache_stats()
+        assert stats["cache_type"] == "disk"
+        assert stats["evictions"] > 0
+        assert stats["size"]["bytes"] <= 128 * 1024
+        assert stats["size"]["entries"] < 200
+        assert cache.get_cache(model="m", input="text 0") is None
+        assert cache.get_cache(model="m", input="text 199") is not None
+    finally:
+        litellm_cache.disable_litellm_cache()
+        litellm_cache.clear_cache_stats()
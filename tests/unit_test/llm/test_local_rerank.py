@@ -0,0 +1,141 @@
+# Copyright 2025 ApeCloud, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections import OrderedDict
+
+import pytest
+
+from aperag.config import settings
+from aperag.llm.llm_error_types import InvalidConfigurationError
+from aperag.llm.rerank import local_cross_encoder
+from aperag.llm.rerank.rerank_service import RerankService
+from aperag.query.query import DocumentWithScore
+
+
+class KeywordEncoder:
+    """Scores a text by the number of query words in it"""
+
+    def __init__(self):
+        self.calls = []
+
+    def score(self, query, texts):
+        self.calls.append(texts)
+        return [float(sum(word in text for word in query.split())) for text in texts]
+
+
+@pytest.fixture
+def encoders(monkeypatch):
+    encoders = OrderedDict()
+    monkeypatch.setattr(local_cross_encoder, "_encoders", encoders)
+    return encoders
+
+
+@pytest.mark.asyncio
+async def test_local_provider_needs_no_credentials(encoders):
+    encoders["tiny"] = KeywordEncoder()
+    service = RerankService("local", "tiny", rerank_service_url=None, rerank_service_api_key=None)
+    service.validate_configuration()
+
+    docs = [DocumentWithScore(text=text) for text in ["red", "blue green", "green"]]
+    reranked = await service.async_rerank("blue green", docs)
+
+    assert [doc.text for doc in reranked] == ["blue green", "green", "red"]
+
+
+@pytest.mark.asyncio
+async def test_model_is_loaded_once_per_process(encoders, monkeypatch):
+    loaded = []
+
+    def load(model, **kwargs):
+        loaded.append(model)
+        return KeywordEncoder()
+
+    monkeypatch.setattr(local_cross_encoder, "LocalCrossEncoder", load)
+    for _ in range(3):
+        await local_cross_encoder.local_rerank("q", ["a", "b"], "tiny")
+
+    assert loaded == ["tiny"]
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_model_is_unloaded(encoders, monkeypatch):
+    monkeypatch.setattr(settings, "local_rerank_max_models", 2)
+    loaded = []
+
+    def load(model, **kwargs):
+        loaded.append(model)
+        return KeywordEncoder()
+
+    monkeypatch.setattr(local_cross_encoder, "LocalCrossEncoder", load)
+    for model in ["a", "b", "a", "c", "a", "b"]:
+        await local_cross_encoder.local_rerank("q", ["x"], model)
+
+    assert loaded == ["a", "b", "c", "b"]
+    assert list(encoders) == ["a", "b"]
+
+
+@pytest.mark.parametrize("model", ["/etc", "../outside", "nested/../../outside", "escape", "missing", ""])
+def test_models_outside_the_model_dir_are_rejected(monkeypatch, tmp_path, model):
+    model_dir = tmp_path / "models"
+    (model_dir / "nested").mkdir(parents=True)
+    (tmp_path / "outside").mkdir()
+    (model_dir / "escape").symlink_to(tmp_path / "outside")
+    monkeypatch.setattr(settings, "local_rerank_model_dir", str(model_dir))
+
+    with pytest.raises(InvalidConfigurationError):
+        local_cross_encoder.resolve_model_path(model)
+    assert local_cross_encoder.resolve_model_path("nested") == str((model_dir / "nested").resolve())
+
+    monkeypatch.setattr(settings, "local_rerank_model_dir", "")
+    with pytest.raises(InvalidConfigurationError):
+        local_cross_encoder.resolve_model_path("nested")
+
+
+def make_tiny_cross_encoder(path):
+    """A randomly initialized one layer BERT cross-encoder, built without any download"""
+    from transformers import BertConfig, BertForSequenceClassification, BertTokenizer
+
+    path.mkdir()
+    words = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", "the", "breaker", "trips", "on", "overload", "door"]
+    (path / "vocab.txt").write_text("\n".join(words))
+    BertTokenizer(str(path / "vocab.txt")).save_pretrained(str(path))
+    config = BertConfig(
+        vocab_size=len(words),
+        hidden_size=16,
+        num_hidden_layers=1,
+        num_attention_heads=2,
+        intermediate_size=32,
+        max_position_embeddings=64,
+        num_labels=1,
+    )
+    BertForSequenceClassification(config).save_pretrained(str(path))
+
+
+@pytest.mark.asyncio
+async def test_cross_encoder_runs_on_cpu_offline(encoders, monkeypatch, tmp_path):
+    pytest.importorskip("sentence_transformers")
+    monkeypatch.setenv("HF_HUB_OFFLINE", "1")
+    make_tiny_cross_encoder(tmp_path / "tiny-bert")
+    monkeypatch.setattr(settings, "local_rerank_model_dir", str(tmp_path))
+    monkeypatch.setattr(settings, "local_rerank_max_length", 32)
+    monkeypatch.setattr(settings, "local_rerank_batch_size", 2)
+
+    texts = ["the breaker trips on overload", "the door", "overload " * 500, "breaker"]
+    response = await local_cross_encoder.local_rerank("breaker overload", texts, "tiny-bert")
+
+    results = response["results"]
+    assert sorted(item["index"] for item in results) == [0, 1, 2, 3]
+    scores = [item["relevance_score"] for item in results]
+    assert scores == sorted(scores, reverse=True)
+    assert list(encoders) == ["tiny-bert"]
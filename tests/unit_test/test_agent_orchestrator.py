@@ -0,0 +1,81 @@
+# Copyright 2025 ApeCloud, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+
+import pytest
+
+from aperag.agent.agent_orchestrator import AgentOrchestrator
+from aperag.agent.core.base import BaseAgent
+from aperag.agent.core.models import AgentExecutionContext, AgentRole
+
+
+class EchoAgent(BaseAgent):
+    """Reports the context it sees before and after yielding to other requests"""
+
+    async def _execute(self, state, input_data):
+        before = (self.user_id, self.chat_id)
+        await asyncio.sleep(0.01)
+        after = (self.user_id, self.chat_id)
+        return {"before": before, "after": after, "session_id": state.session_id}
+
+
+class FakeRegistry:
+    def __init__(self, agent):
+        self.agent = agent
+
+    def get_agent(self, role):
+        return self.agent
+
+
+@pytest.fixture
+def shared_agent():
+    return EchoAgent(role=AgentRole.ARCHIVIST, name="echo", description="echo")
+
+
+@pytest.fixture
+def orchestrator(shared_agent):
+    orchestrator = AgentOrchestrator()
+    orchestrator.registry = FakeRegistry(shared_agent)
+    return orchestrator
+
+
+def test_with_context_returns_isolated_copy(shared_agent):
+    bound = shared_agent.with_context(AgentExecutionContext(user_id="u1", chat_id="c1"))
+
+    assert bound is not shared_agent
+    assert (bound.user_id, bound.chat_id) == ("u1", "c1")
+    assert shared_agent.user_id is None and shared_agent.chat_id is None
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_do_not_leak_context(orchestrator, shared_agent):
+    assignments = [({"id": f"t{i}", "name": f"task {i}", "description": "d"}, AgentRole.ARCHIVIST) for i in range(3)]
+
+    async def run_for(user):
+        context = AgentExecutionContext(user_id=user, chat_id=f"chat-{user}")
+        return user, await orchestrator._execute_parallel(assignments, context)
+
+    outcomes = await asyncio.gather(*(run_for(f"user{i}") for i in range(20)))
+
+    for user, results in outcomes:
+        for item in results:
+            result = item["result"]
+            expected = (user, f"chat-{user}-{item['subtask_id']}")
+            assert result["before"] == expected
+            assert result["after"] == expected
+            assert result["session_id"] == expected[1]
+
+    assert shared_agent.user_id is None
+    assert shared_agent.chat_id is None
@@ -0,0 +1,81 @@
+# Copyright 2025 ApeCloud, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+
+import pytest
+
+from aperag.agent.core.base import BaseAgent
+from aperag.agent.core.models import AgentRole, AgentState
+from aperag.config import settings
+
+
+class SearchAgent(BaseAgent):
+    """Searches fake collections; collections named "slow..." never answer"""
+
+    def __init__(self):
+        super().__init__(role=AgentRole.ARCHIVIST, name="search", description="search", user_id="user1")
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.cancelled = []
+
+    async def _execute(self, state, input_data):
+        return {}
+
+    async def _search_collection(self, collection_id, query, top_k):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if collection_id.startswith("slow"):
+                await asyncio.Event().wait()
+            await asyncio.sleep(0.01)
+            return [{"content": f"from {collection_id}", "score": len(collection_id), "metadata": {}}]
+        except asyncio.CancelledError:
+            self.cancelled.append(collection_id)
+            raise
+        finally:
+            self.in_flight -= 1
+
+    async def _rerank_documents(self, query, documents):
+        return sorted(documents, key=lambda doc: doc["score"], reverse=True)
+
+
+def documents_of(results):
+    return [doc["content"] for doc in results[0]["result"]["documents"]]
+
+
+@pytest.mark.asyncio
+async def test_collections_past_the_budget_are_skipped():
+    agent = SearchAgent()
+    state = AgentState(session_id="s1")
+
+    results = await agent._search_knowledge(state, "query", collection_ids=["fast", "slow"], timeout=0.5)
+    await asyncio.sleep(0)
+
+    assert documents_of(results) == ["from fast"]
+    assert agent.cancelled == ["slow"]
+    skipped = [step.detail for step in state.thinking_stream if step.detail and "skipped_collections" in step.detail]
+    assert skipped == [{"timeout": 0.5, "skipped_collections": ["slow"]}]
+
+
+@pytest.mark.asyncio
+async def test_collection_searches_are_capped(monkeypatch):
+    monkeypatch.setattr(settings, "agent_search_concurrency", 2)
+    agent = SearchAgent()
+    collection_ids = [f"col{i}" for i in range(5)]
+
+    results = await agent._search_knowledge(AgentState(session_id="s1"), "query", collection_ids, top_k=10)
+
+    assert sorted(documents_of(results)) == [f"from {collection_id}" for collection_id in collection_ids]
+    assert agent.max_in_flight == 2
@@ -0,0 +1,180 @@
+# Copyright 2025 ApeCloud, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+import aperag.db.ops as ops_module
+from aperag.agent import agent_session_manager as manager
+from aperag.agent.agent_config import AgentConfig
+from aperag.db.provider_cache import ProviderConfigCache
+
+
+class FakeAgent:
+    def __init__(self, name, healthy=True):
+        self.name = name
+        self.healthy = healthy
+        self.list_calls = 0
+
+    async def list_tools(self):
+        self.list_calls += 1
+        if not self.healthy:
+            raise ConnectionError("connection closed")
+        return SimpleNamespace(tools=[SimpleNamespace(name="search_collection")])
+
+
+@pytest.fixture(autouse=True)
+def fake_sessions(monkeypatch):
+    initialized = []
+
+    async def initialize(self):
+        self.agent = FakeAgent(self._agent_name())
+        self.llm = SimpleNamespace(name=self.agent.name, logger=None)
+        self._ready = True
+        initialized.append(self)
+
+    async def cleanup(self):
+        self._ready = False
+
+    monkeypatch.setattr(manager.ChatSession, "initialize", initialize)
+    monkeypatch.setattr(manager.ChatSession, "_cleanup", cleanup)
+    yield initialized
+    manager._chat_sessions.clear()
+    manager._warm_sessions.clear()
+    manager._tool_manifests.clear()
+
+
+def make_config(chat_id):
+    return AgentConfig(
+        user_id="user1",
+        chat_id=chat_id,
+        provider_name="openai",
+        api_key="sk",
+        base_url="http://llm",
+        default_model="gpt",
+        aperag_api_key="ak",
+        aperag_mcp_url="http://mcp",
+        server_names=["aperag"],
+    )
+
+
+@pytest.mark.asyncio
+async def test_new_chat_takes_warm_session(fake_sessions):
+    first = await manager.get_or_create_session(make_config("chat1"))
+    await asyncio.sleep(0)  # let the warm-up task run
+
+    assert len(manager._warm_sessions) == 1
+    second = await manager.get_or_create_session(make_config("chat2"))
+
+    assert second is not first
+    assert second.config.chat_id == "chat2"
+    # The warm session is renamed after the chat it is handed out to
+    assert second.agent.name == second.llm.name == "aperag_agent_user1_chat2_openai"
+    assert second.llm.logger.session_id == "chat2"
+    # The replacement warm-up is referenced until it finishes
+    assert len([task for task in manager._warm_up_tasks if not task.done()]) == 1
+    await asyncio.gather(*manager._warm_up_tasks)
+    await asyncio.sleep(0)
+    assert not manager._warm_up_tasks
+    assert await manager.get_or_create_session(make_config("chat1")) is first
+
+
+@pytest.mark.asyncio
+async def test_unhealthy_session_is_reconnected(monkeypatch, fake_sessions):
+    monkeypatch.setattr(manager.settings, "agent_session_warm_pool", False)
+    session = await manager.get_or_create_session(make_config("chat1"))
+    session.agent.healthy = False
+    # Idle past the health check interval but well within the idle timeout
+    idle = manager.settings.agent_session_health_check_interval + 1
+    assert idle < manager.settings.agent_session_idle_timeout
+    session.last_used = session.last_checked = time.time() - idle
+
+    reconnected = await manager.get_or_create_session(make_config("chat1"))
+
+    assert session.agent.list_calls == 1
+    assert reconnected is not session
+    assert not session._ready
+    assert len(fake_sessions) == 2
+
+
+@pytest.mark.asyncio
+async def test_tool_manifest_is_cached(monkeypatch):
+    monkeypatch.setattr(manager.settings, "agent_session_warm_pool", False)
+    session = await manager.get_or_create_session(make_config("chat1"))
+
+    assert await manager.get_tool_manifest(session) == ["search_collection"]
+    assert await manager.get_tool_manifest(session) == ["search_collection"]
+    assert session.agent.list_calls == 1
+
+    manager.invalidate_tool_manifest(user_id="user1")
+    await manager.get_tool_manifest(session)
+    assert session.agent.list_calls == 2
+
+
+@pytest.mark.asyncio
+async def test_tool_manifest_is_kept_across_new_sessions(fake_sessions):
+    first = await manager.get_or_create_session(make_config("chat1"))
+    assert await manager.get_tool_manifest(first) == ["search_collection"]
+    await asyncio.gather(*manager._warm_up_tasks)
+
+    # The new chat takes the warm session without probing it, and its first message lists no tools
+    second = await manager.get_or_create_session(make_config("chat2"))
+    assert await manager.get_tool_manifest(second) == ["search_collection"]
+    await asyncio.gather(*manager._warm_up_tasks)
+    assert [session.agent.list_calls for session in fake_sessions] == [1, 0, 0]
+
+    # A health check listing different tools replaces the manifest
+    third = fake_sessions[2]
+    third.agent.list_tools = AsyncMock(return_value=[SimpleNamespace(name="web_search")])
+    assert await third.check_health(1)
+    assert await manager.get_tool_manifest(second) == ["web_search"]
+
+
+@pytest.mark.asyncio
+async def test_credentials_use_the_provider_config_cache(monkeypatch):
+    async_db_ops = MagicMock()
+    async_db_ops.query_llm_provider_by_name = AsyncMock(
+        return_value=SimpleNamespace(
+            name="openai",
+            base_url="http://llm",
+            user_id="public",
+            completion_dialect="openai",
+            embedding_dialect="openai",
+            rerank_dialect="jina_ai",
+        )
+    )
+    async_db_ops.query_provider_api_key = AsyncMock(return_value="sk")
+    monkeypatch.setattr(ops_module, "async_db_ops", async_db_ops)
+    cache = ProviderConfigCache(ttl=60)
+    monkeypatch.setattr(manager, "provider_config_cache", cache)
+
+    class FakeDbOps:
+        async def query_api_keys(self, user, is_system=False):
+            return [SimpleNamespace(key="ak")]
+
+    credentials = await manager.resolve_credentials(FakeDbOps(), "user1", "openai")
+    assert credentials == manager.AgentCredentials(api_key="sk", base_url="http://llm", aperag_api_key="ak")
+
+    await manager.resolve_credentials(FakeDbOps(), "user1", "openai")
+    assert async_db_ops.query_llm_provider_by_name.await_count == 1
+    async_db_ops.query_provider_api_key.assert_awaited_once_with("openai", "user1", True)
+
+    # Provider writes invalidate the shared cache
+    cache.invalidate("openai")
+    await manager.resolve_credentials(FakeDbOps(), "user1", "openai")
+    assert async_db_ops.query_llm_provider_by_name.await_count == 2
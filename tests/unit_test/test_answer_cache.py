@@ -0,0 +1,337 @@
+# Copyright 2025 ApeCloud, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import fnmatch
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from aperag.config import settings
+from aperag.flow.base.models import Edge, FlowInstance, NodeInstance
+from aperag.service import answer_cache_service as answer_cache_module
+from aperag.service.answer_cache_service import STORE_SCRIPT, AnswerCacheService, CachedAnswer
+from aperag.utils.constant import DOC_QA_REFERENCES, DOCUMENT_URLS
+from aperag.utils.history import wait_for_history_writes
+
+VOCABULARY = ["how", "do", "i", "reset", "the", "breaker", "door", "trips", "on", "overload", "my"]
+
+
+class FakeRedis:
+    """Minimal async Redis hash implementation, running STORE_SCRIPT as a sorted set of creation times"""
+
+    def __init__(self):
+        self.hashes = {}
+        self.sorted_sets = {}
+        self.ttls = {}
+        self.hgetall_keys = []
+
+    async def eval(self, script, numkeys, *keys_and_args):
+        assert script == STORE_SCRIPT and numkeys == 3
+        answers, embeddings, created_set = keys_and_args[:3]
+        name, entry, embedding_entry, created, ttl, max_entries = keys_and_args[3:]
+        self.hashes.setdefault(answers, {})[name] = entry
+        self.hashes.setdefault(embeddings, {})[name] = embedding_entry
+        scores = self.sorted_sets.setdefault(created_set, {})
+        scores[name] = created
+        excess = len(scores) - max_entries
+        for oldest in sorted(scores, key=scores.get)[: max(excess, 0)]:
+            for key in (answers, embeddings):
+                self.hashes[key].pop(oldest)
+            scores.pop(oldest)
+        for key in (answers, embeddings, created_set):
+            self.ttls[key] = ttl
+        return max(excess, 0)
+
+    async def hget(self, key, name):
+        return self.hashes.get(key, {}).get(name)
+
+    async def hset(self, key, name, value):
+        self.hashes.setdefault(key, {})[name] = value
+        return 1
+
+    async def hgetall(self, key):
+        self.hgetall_keys.append(key)
+        return dict(self.hashes.get(key, {}))
+
+    async def hlen(self, key):
+        return len(self.hashes.get(key, {}))
+
+    async def hdel(self, key, *names):
+        for name in names:
+            self.hashes.get(key, {}).pop(name, None)
+        return len(names)
+
+    async def hincrby(self, key, name, amount):
+        values = self.hashes.setdefault(key, {})
+        values[name] = int(values.get(name, 0)) + amount
+        return values[name]
+
+    async def expire(self, key, ttl):
+        self.ttls[key] = ttl
+        return True
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.hashes.pop(key, None)
+            self.sorted_sets.pop(key, None)
+        return len(keys)
+
+    async def scan_iter(self, match):
+        for key in [*self.hashes, *self.sorted_sets]:
+            if fnmatch.fnmatch(key, match):
+                yield key
+
+
+class FakeHistory:
+    session_id = "chat1"
+
+    def __init__(self):
+        self.ai_messages = []
+
+    async def add_ai_message(self, content, chat_id, message_id=None, references=None, urls=None, **kwargs):
+        self.ai_messages.append((content, chat_id, message_id, references, urls))
+
+
+class FakeDbOps:
+    def __init__(self):
+        self.versions = {"col1": "3.3.1700000000.0"}
+        self.version_queries = 0
+
+    async def query_collection_index_versions(self, collection_ids):
+        self.version_queries += 1
+        return {collection_id: self.versions.get(collection_id, "0") for collection_id in collection_ids}
+
+
+class BagOfWordsEmbedder:
+    """Embeds a query as the counts of the vocabulary words in it"""
+
+    def __init__(self):
+        self.calls = []
+
+    async def __call__(self, query):
+        self.calls.append(query)
+        words = query.lower().replace("?", "").split()
+        return [float(words.count(word)) for word in VOCABULARY]
+
+
+FLOW_CONFIG = {
+    "nodes": [
+        {"id": "vector_search", "type": "vector_search", "data": {"input": {"values": {"collection_ids": ["col1"]}}}},
+        {"id": "llm", "type": "llm", "data": {"input": {"values": {"model_name": "m"}}}},
+    ],
+    "edges": [{"source": "vector_search", "target": "llm"}],
+}
+
+FLOW = FlowInstance(
+    name="rag",
+    title="RAG",
+    nodes={
+        "vector_search": NodeInstance("vector_search", "vector_search", input_values={"collection_ids": ["col1"]}),
+        "llm": NodeInstance("llm", "llm", input_values={"model_name": "m"}),
+    },
+    edges=[Edge(source="vector_search", target="llm")],
+)
+
+
+def make_bot(threshold=0.9, ttl=3600):
+    config = {
+        "flow": FLOW_CONFIG,
+        "answer_cache": {"enabled": True, "similarity_threshold": threshold, "ttl": ttl},
+    }
+    return SimpleNamespace(id="bot1", user="user1", config=json.dumps(config))
+
+
+@pytest.fixture
+def service():
+    return AnswerCacheService(redis_client=FakeRedis(), db_ops=FakeDbOps())
+
+
+@pytest.fixture
+def embedder():
+    return BagOfWordsEmbedder()
+
+
+async def collect(generator_fn):
+    return [chunk async for chunk in generator_fn()]
+
+
+async def answer(service, scope, text, references=None):
+    async def flow_output():
+        yield text[:5]
+        yield text[5:]
+        if references:
+            yield DOC_QA_REFERENCES + json.dumps(references)
+
+    await collect(service.recording(scope, flow_output))
+    await asyncio.gather(*service._pending_stores)
+
+
+@pytest.mark.asyncio
+async def test_bots_without_answer_cache_get_no_scope(service, embedder):
+    bot = SimpleNamespace(id="bot1", user="user1", config=json.dumps({"flow": {}}))
+    assert await service.get_scope("user1", bot, FLOW, "How do I reset the breaker?", embedder) is None
+
+    disabled = make_bot()
+    disabled.config = json.dumps({"answer_cache": {"enabled": False}})
+    assert await service.get_scope("user1", disabled, FLOW, "How do I reset the breaker?", embedder) is None
+
+    invalid = make_bot()
+    invalid.config = json.dumps({"answer_cache": {"enabled": True, "similarity_threshold": "high"}})
+    assert await service.get_scope("user1", invalid, FLOW, "How do I reset the breaker?", embedder) is None
+
+
+@pytest.mark.asyncio
+async def test_recorded_answer_is_replayed_for_the_same_question(service, embedder):
+    bot = make_bot()
+    scope = await service.get_scope("user1", bot, FLOW, "How do I reset the breaker?", embedder)
+    assert await service.lookup(scope) is None
+
+    references = [{"text": "Press the reset button", "metadata": {}}]
+    await answer(service, scope, "Press the reset button.", references)
+
+    scope = await service.get_scope("user1", bot, FLOW, "  how do I RESET the breaker? ", embedder)
+    calls = len(embedder.calls)
+    cached = await service.lookup(scope)
+    assert cached.answer == "Press the reset button."
+    # Identical questions are found without embedding them
+    assert len(embedder.calls) == calls
+
+    chunks = await collect(service.replay(cached))
+    assert "".join(chunks[:-1]) == "Press the reset button."
+    assert chunks[-1] == DOC_QA_REFERENCES + json.dumps(references)
+
+
+@pytest.mark.asyncio
+async def test_similar_questions_hit_above_the_threshold(service, embedder):
+    bot = make_bot(threshold=0.8)
+    scope = await service.get_scope("user1", bot, FLOW, "how do i reset the breaker", embedder)
+    await service.lookup(scope)
+    await answer(service, scope, "Press the reset button.")
+
+    similar = await service.get_scope("user1", bot, FLOW, "how do i reset my breaker", embedder)
+    service.redis_client.hgetall_keys.clear()
+    cached = await service.lookup(similar)
+    assert cached.answer == "Press the reset button."
+    assert cached.similarity == pytest.approx(5 / 6)
+    # Only the embeddings are scanned, the answer is loaded by its field
+    assert service.redis_client.hgetall_keys == [similar.embeddings_key]
+
+    different = await service.get_scope("user1", bot, FLOW, "the door trips on overload", embedder)
+    assert await service.lookup(different) is None
+
+
+@pytest.mark.asyncio
+async def test_reindexing_a_collection_starts_a_new_cache(service, embedder, monkeypatch):
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(answer_cache_module, "time", SimpleNamespace(time=time.time, monotonic=lambda: clock.now))
+    monkeypatch.setattr(settings, "answer_cache_version_ttl", 30)
+    bot = make_bot()
+    scope = await service.get_scope("user1", bot, FLOW, "how do i reset the breaker", embedder)
+    await answer(service, scope, "Press the reset button.")
+
+    service.db_ops.versions["col1"] = "3.4.1700000100.0"
+    # The index versions are reused for a while instead of being computed for every question
+    scope = await service.get_scope("user1", bot, FLOW, "how do i reset the breaker", embedder)
+    assert (await service.lookup(scope)).answer == "Press the reset button."
+    assert service.db_ops.version_queries == 1
+
+    clock.now += 31
+    scope = await service.get_scope("user1", bot, FLOW, "how do i reset the breaker", embedder)
+    assert await service.lookup(scope) is None
+    assert service.db_ops.version_queries == 2
+
+
+@pytest.mark.asyncio
+async def test_expired_answers_are_not_returned(service, embedder, monkeypatch):
+    bot = make_bot(ttl=60)
+    scope = await service.get_scope("user1", bot, FLOW, "how do i reset the breaker", embedder)
+    await answer(service, scope, "Press the reset button.")
+    assert service.redis_client.ttls[scope.key] == 60
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 61)
+    assert await service.lookup(scope) is None
+
+
+@pytest.mark.asyncio
+async def test_unfinished_answers_are_not_cached(service, embedder):
+    bot = make_bot()
+    scope = await service.get_scope("user1", bot, FLOW, "how do i reset the breaker", embedder)
+
+    async def flow_output():
+        yield "Press the"
+        raise RuntimeError("provider disconnected")
+
+    with pytest.raises(RuntimeError):
+        await collect(service.recording(scope, flow_output))
+    assert not service._pending_stores
+    assert await service.lookup(scope) is None
+
+
+@pytest.mark.asyncio
+async def test_oldest_answers_are_evicted(service, embedder, monkeypatch):
+    monkeypatch.setattr(settings, "answer_cache_max_entries", 2)
+    bot = make_bot()
+    for question in ["how do i reset the breaker", "the door trips", "my breaker trips on overload"]:
+        scope = await service.get_scope("user1", bot, FLOW, question, embedder)
+        await answer(service, scope, f"Answer to {question}")
+
+    entries = [json.loads(entry)["query"] for entry in service.redis_client.hashes[scope.key].values()]
+    assert sorted(entries) == ["my breaker trips on overload", "the door trips"]
+    assert service.redis_client.hashes[scope.embeddings_key].keys() == service.redis_client.hashes[scope.key].keys()
+    assert service.redis_client.sorted_sets[scope.created_key].keys() == service.redis_client.hashes[scope.key].keys()
+
+
+@pytest.mark.asyncio
+async def test_stats_and_clear(service, embedder):
+    pytest.importorskip("jsonref")
+    bot = make_bot()
+    scope = await service.get_scope("user1", bot, FLOW, "how do i reset the breaker", embedder)
+    await service.lookup(scope)
+    await answer(service, scope, "Press the reset button.")
+    await service.lookup(scope)
+    await service.lookup(scope)
+
+    stats = await service.get_stats(bot)
+    assert (stats.enabled, stats.entries, stats.hits, stats.misses) == (True, 1, 2, 1)
+    assert stats.hit_rate == pytest.approx(0.6667)
+
+    await service.clear(bot.id)
+    stats = await service.get_stats(bot)
+    assert (stats.entries, stats.hits, stats.misses) == (0, 0, 0)
+    assert await service.lookup(scope) is None
+
+
+@pytest.mark.asyncio
+async def test_replay_includes_document_urls(service):
+    cached = CachedAnswer("q", "a" * 100, urls=["https://example.com/manual.pdf"])
+    chunks = await collect(service.replay(cached))
+    assert chunks == ["a" * 64, "a" * 36, DOCUMENT_URLS + json.dumps(["https://example.com/manual.pdf"])]
+
+
+@pytest.mark.asyncio
+async def test_replayed_answer_is_added_to_the_history(service):
+    history = FakeHistory()
+    references = [{"text": "Press the reset button", "metadata": {}}]
+    cached = CachedAnswer("q", "Press the reset button.", references, ["https://example.com/manual.pdf"])
+
+    await collect(service.replay(cached, history, "msg1"))
+    await wait_for_history_writes()
+
+    assert history.ai_messages == [
+        ("Press the reset button.", "chat1", "msg1", references, ["https://example.com/manual.pdf"])
+    ]
@@ -0,0 +1,105 @@
+# Copyright 2025 ApeCloud, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+
+import pytest
+
+from aperag.service import audit_service as audit_service_module
+from aperag.service.audit_service import AuditLogWriter, AuditService
+
+
+class FakeSession:
+    def __init__(self, batches):
+        self.batches = batches
+
+    def add_all(self, rows):
+        self.batches.append(list(rows))
+
+    async def commit(self):
+        pass
+
+
+@pytest.fixture
+def written_batches(monkeypatch):
+    batches = []
+
+    async def fake_get_async_session():
+        yield FakeSession(batches)
+
+    monkeypatch.setattr(audit_service_module, "get_async_session", fake_get_async_session)
+    return batches
+
+
+def _entry(api_name):
+    def build():
+        return dict(
+            user_id="user1",
+            username="alice",
+            resource_type=None,
+            api_name=api_name,
+            http_method="POST",
+            path="/api/v1/collections",
+            status_code=200,
+            start_time=1,
+            end_time=2,
+            request_data={"title": "demo", "api_key": "sk-123"},
+            response_data={"id": "col1"},
+        )
+
+    return build
+
+
+@pytest.mark.asyncio
+async def test_writer_batches_entries(written_batches):
+    writer = AuditLogWriter(AuditService(), max_queue_size=100, batch_size=3, flush_interval=5)
+    writer.start()
+    for i in range(7):
+        assert await writer.submit(_entry(f"api{i}"))
+    await writer.stop()
+
+    assert [len(batch) for batch in written_batches] == [3, 3, 1]
+    assert writer.written_count == 7
+    row = written_batches[0][0]
+    assert row.api_name == "api0"
+    assert "***FILTERED***" in row.request_data
+
+
+@pytest.mark.asyncio
+async def test_writer_flushes_partial_batch_after_interval(written_batches):
+    writer = AuditLogWriter(AuditService(), max_queue_size=100, batch_size=50, flush_interval=0.05)
+    writer.start()
+    await writer.submit(_entry("api"))
+    await asyncio.sleep(0.2)
+
+    assert [len(batch) for batch in written_batches] == [1]
+    await writer.stop()
+
+
+@pytest.mark.asyncio
+async def test_drop_policy_when_queue_is_full(written_batches):
+    writer = AuditLogWriter(AuditService(), max_queue_size=2, batch_size=10, flush_interval=5, full_policy="drop")
+    writer.start()
+    # The flusher has not had a chance to run, so the third entry overflows the queue
+    results = [await writer.submit(_entry(f"api{i}")) for i in range(3)]
+    await writer.stop()
+
+    assert results == [True, True, False]
+    assert writer.dropped_count == 1
+    assert sum(len(batch) for batch in written_batches) == 2
+
+
+def test_invalid_policy_is_rejected():
+    with pytest.raises(ValueError):
+        AuditLogWriter(AuditService(), max_queue_size=1, batch_size=1, flush_interval=1, full_policy="spill")
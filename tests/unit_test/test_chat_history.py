@@ -0,0 +1,232 @@
+# Copyright 2025 ApeCloud, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from aperag import config
+from aperag.db.models import ChatMessageArchive
+from aperag.service import chat_service as chat_service_module
+from aperag.service.chat_service import ChatService
+from aperag.utils import history as history_module
+from aperag.utils.history import RedisChatMessageHistory
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+    def lpush(self, key, *values):
+        self.commands.append(("lpush", key, *values))
+        return self
+
+    def expire(self, key, ttl):
+        self.commands.append(("expire", key, ttl))
+        return self
+
+    def lrange(self, key, start, stop):
+        self.commands.append(("lrange", key, start, stop))
+        return self
+
+    def ltrim(self, key, start, stop):
+        self.commands.append(("ltrim", key, start, stop))
+        return self
+
+    async def execute(self):
+        self.redis.transactions.append([name for name, *_ in self.commands])
+        return [await getattr(self.redis, name)(*args) for name, *args in self.commands]
+
+
+class FakeRedis:
+    """Minimal async Redis list implementation that records lrange calls"""
+
+    def __init__(self):
+        self.lists = {}
+        self.lrange_calls = []
+        self.transactions = []
+
+    def _slice(self, items, start, stop):
+        stop = len(items) - 1 if stop == -1 else stop
+        return items[start : stop + 1]
+
+    async def lpush(self, key, *values):
+        items = self.lists.setdefault(key, [])
+        for value in values:
+            items.insert(0, value.encode("utf-8") if isinstance(value, str) else value)
+        return len(items)
+
+    async def rpush(self, key, *values):
+        self.lists.setdefault(key, []).extend(values)
+        return len(self.lists[key])
+
+    async def lrange(self, key, start, stop):
+        self.lrange_calls.append((start, stop))
+        return self._slice(self.lists.get(key, []), start, stop)
+
+    async def ltrim(self, key, start, stop):
+        self.lists[key] = self._slice(self.lists.get(key, []), start, stop)
+        return True
+
+    async def expire(self, key, ttl):
+        return True
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+@pytest.fixture(autouse=True)
+def word_tokens(monkeypatch):
+    # Count words instead of loading a tokenizer
+    monkeypatch.setattr(history_module, "_token_counter", lambda text: len(text.split()))
+
+
+@pytest.fixture
+async def archive_db(monkeypatch):
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(ChatMessageArchive.__table__.create)
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def get_async_session():
+        async with factory() as session:
+            yield session
+
+    monkeypatch.setattr(config, "get_async_session", get_async_session)
+    yield
+    await engine.dispose()
+
+
+async def make_history(count, **kwargs):
+    history = RedisChatMessageHistory("chat1", redis_client=FakeRedis(), max_messages=0, archive=False, **kwargs)
+    for i in range(count):
+        await history.add_user_message(f"message {i} " + "word " * 8, f"msg{i}")
+    return history
+
+
+@pytest.mark.asyncio
+async def test_entries_store_token_count():
+    history = await make_history(1)
+    entry = json.loads(history.redis_client.lists[history.key][0])
+    assert entry["token_count"] == 10
+
+
+@pytest.mark.asyncio
+async def test_recent_messages_by_limit_reads_only_the_window():
+    history = await make_history(100)
+    history.redis_client.lrange_calls.clear()
+
+    recent = await history.get_recent_messages(limit=4)
+
+    assert [m.message_id for m in recent] == ["msg96", "msg97", "msg98", "msg99"]
+    assert history.redis_client.lrange_calls == [(0, 3)]
+
+
+@pytest.mark.asyncio
+async def test_recent_messages_by_token_budget():
+    history = await make_history(100)
+
+    recent = await history.get_recent_messages(max_tokens=35)
+
+    # Each message is 10 tokens
+    assert [m.message_id for m in recent] == ["msg97", "msg98", "msg99"]
+
+
+@pytest.mark.asyncio
+async def test_recent_messages_read_legacy_entries_without_token_count():
+    history = await make_history(0)
+    legacy = history_module.message_to_storage_dict(
+        history_module.create_user_message(content="one two three", chat_id="chat1", message_id="old")
+    )
+    await history.redis_client.lpush(history.key, json.dumps(legacy))
+
+    recent = await history.get_recent_messages(max_tokens=3)
+
+    assert [m.message_id for m in recent] == ["old"]
+
+
+@pytest.mark.asyncio
+async def test_trim_keeps_newest_messages():
+    history = await make_history(0)
+    history.max_messages = 10
+    for i in range(history_module.HISTORY_PAGE_SIZE + 10):
+        await history.add_user_message(f"message {i}", f"msg{i}")
+
+    messages = await history.messages
+    assert len(messages) == 10
+    assert messages[-1].message_id == f"msg{history_module.HISTORY_PAGE_SIZE + 9}"
+
+
+@pytest.mark.asyncio
+async def test_push_and_expire_are_one_transaction_without_the_trim(monkeypatch):
+    history = await make_history(0, ttl=60)
+    history.max_messages = 1
+
+    async def trim():
+        raise ConnectionError("redis unavailable")
+
+    monkeypatch.setattr(history, "trim", trim)
+    for i in range(history_module.HISTORY_PAGE_SIZE + 1):
+        await history.add_user_message(f"message {i}", f"msg{i}")
+
+    # A failed trim doesn't fail the write, which would make the caller push the message again
+    assert history.redis_client.transactions[-1] == ["lpush", "expire"]
+    assert len(await history.messages) == history_module.HISTORY_PAGE_SIZE + 1
+
+
+@pytest.mark.asyncio
+async def test_trimmed_messages_are_archived(archive_db):
+    history = await make_history(5)
+    history.max_messages, history.archive = 2, True
+
+    assert await history.trim() == 3
+    assert [m.message_id for m in await history.messages] == ["msg3", "msg4"]
+    assert [m.message_id for m in await history.archived_messages()] == ["msg0", "msg1", "msg2"]
+    assert [m.message_id for m in await history.archived_messages(message_id="msg1")] == ["msg1"]
+
+
+class FeedbackDbOps:
+    def __init__(self):
+        self.feedbacks = []
+
+    async def set_message_feedback_state(self, **kwargs):
+        self.feedbacks.append(kwargs)
+        return kwargs
+
+
+@pytest.mark.asyncio
+async def test_feedback_on_archived_message(archive_db, monkeypatch):
+    history = await make_history(0)
+    for i in range(3):
+        await history.add_user_message(f"question {i}", f"msg{i}")
+        await history.add_ai_message(f"answer {i}", "chat1", message_id=f"msg{i}")
+    history.max_messages, history.archive = 2, True
+    await history.trim()
+    monkeypatch.setattr(chat_service_module, "RedisChatMessageHistory", lambda *args, **kwargs: history)
+    monkeypatch.setattr(chat_service_module, "get_async_redis_client", lambda: None)
+    service = ChatService.__new__(ChatService)
+    service.db_ops = FeedbackDbOps()
+
+    result = await service.feedback_message("user1", "chat1", "msg0", feedback_type="good")
+
+    assert result["action"] == "upserted"
+    assert (result["feedback"]["question"], result["feedback"]["original_answer"]) == ("question 0", "answer 0")
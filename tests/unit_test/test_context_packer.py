@@ -0,0 +1,123 @@
+# Copyright 2025 ApeCloud, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from aperag.query.context_packer import ContextPacker
+from aperag.query.query import DocumentWithScore
+
+
+def make_doc(words: int, score=None, word="w", **metadata) -> DocumentWithScore:
+    return DocumentWithScore(text=" ".join([word] * words) + " ", score=score, metadata=metadata)
+
+
+@pytest.fixture
+def packer():
+    # One token per word
+    encode = MagicMock(side_effect=lambda text: text.split())
+    return ContextPacker(encode=encode, decode=lambda tokens: " ".join(tokens))
+
+
+def test_packs_in_order_and_skips_docs_that_dont_fit(packer):
+    docs = [
+        make_doc(80, score=0.9, word="best"),
+        make_doc(50, score=0.5, word="big"),
+        make_doc(30, score=0.2, word="low"),
+        make_doc(10, score=0.1, word="small"),
+    ]
+
+    packed = packer.pack(docs, 100, trim_tail=False)
+
+    assert [doc.text.split()[0] for doc in packed.docs] == ["best", "small"]
+    assert packed.tokens == 90
+    assert packed.dropped == 2
+
+
+def test_unscored_graph_context_keeps_its_priority(packer):
+    # The rerank node puts the graph context, which has no score, before the scored chunks
+    docs = [
+        make_doc(60, word="graph", recall_type="graph_search"),
+        make_doc(30, score=0.9, word="vector"),
+        make_doc(30, score=0.8, word="fulltext"),
+    ]
+
+    packed = packer.pack(docs, 100, min_trim_tokens=1)
+
+    assert [doc.text.split()[0] for doc in packed.docs] == ["graph", "vector", "fulltext"]
+    assert packed.docs[0].text == docs[0].text
+    assert packed.docs[2].metadata["trimmed"]
+    assert packed.dropped == 0
+
+
+def test_duplicates_are_packed_once(packer):
+    docs = [make_doc(10, score=0.9), DocumentWithScore(text="  w w w w w\nw w w w w", score=0.5, metadata={})]
+
+    packed = packer.pack(docs, 100)
+
+    assert len(packed.docs) == 1
+    assert packed.duplicates == 1
+
+
+def test_cached_token_counts_are_used(packer):
+    docs = [
+        make_doc(10, score=0.9, word="a", tokens=10),
+        make_doc(10, score=0.5, word="b", tokens=10),
+        make_doc(10, score=0.1, word="c"),
+    ]
+
+    packed = packer.pack(docs, 100)
+
+    assert packed.tokens == 30
+    # Only the document indexed without a count is tokenized
+    assert packer._encode.call_count == 1
+
+
+def test_tail_document_is_trimmed_into_the_remaining_budget(packer):
+    docs = [make_doc(70, score=0.9, word="head"), make_doc(100, score=0.5, word="tail", tokens=100)]
+
+    packed = packer.pack(docs, 150, min_trim_tokens=16)
+
+    assert packed.trimmed
+    assert packed.tokens == 150
+    assert packed.dropped == 0
+    tail = packed.docs[-1]
+    assert tail.text.split() == ["tail"] * 80
+    assert tail.metadata == {"tokens": 80, "trimmed": True}
+    # The retrieved document itself is left untouched
+    assert docs[1].metadata == {"tokens": 100}
+
+
+def test_small_remainders_are_not_trimmed_into(packer):
+    docs = [make_doc(90, score=0.9), make_doc(100, score=0.5, word="tail")]
+
+    packed = packer.pack(docs, 100, min_trim_tokens=16)
+
+    assert not packed.trimmed
+    assert packed.dropped == 1
+    assert len(packed.docs) == 1
+
+
+def test_estimates_without_a_tokenizer(monkeypatch):
+    def offline():
+        raise ConnectionError("can't download the encoding")
+
+    monkeypatch.setattr("aperag.utils.tokenizer.get_default_encoding", offline)
+    packer = ContextPacker()
+
+    packed = packer.pack([make_doc(200, score=1.0)], 50, min_trim_tokens=1)
+
+    assert packed.trimmed
+    assert packer.count_tokens(packed.docs[0].text) <= 50
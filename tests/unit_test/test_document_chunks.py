@@ -0,0 +1,117 @@
+# Copyright 2025 ApeCloud, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from aperag.exceptions import BusinessException
+from aperag.service import document_service as document_service_module
+from aperag.service.document_service import DocumentService
+
+
+class FakeDbOps:
+    """Returns the index_data of the queried document index"""
+
+    def __init__(self, index_data):
+        self.index_data = index_data
+
+    async def _execute_query(self, query_func):
+        return self.index_data
+
+
+def make_point(i, vision=False):
+    metadata = {"index_method": "vision_to_text", "asset_id": f"asset{i}"} if vision else {"page": i}
+    return SimpleNamespace(
+        id=f"c{i}", payload={"_node_content": json.dumps({"text": f"chunk {i}", "metadata": metadata})}
+    )
+
+
+def make_service(count, vision_ids=()):
+    service = DocumentService.__new__(DocumentService)
+    service.db_ops = FakeDbOps(json.dumps({"context_ids": [f"c{i}" for i in range(count)]}))
+    service.retrieved = []
+
+    async def retrieve_chunk_points(collection_id, ctx_ids):
+        service.retrieved.append(ctx_ids)
+        return [make_point(int(ctx_id[1:]), vision=ctx_id in vision_ids) for ctx_id in ctx_ids]
+
+    service._retrieve_chunk_points = retrieve_chunk_points
+    return service
+
+
+@pytest.mark.asyncio
+async def test_chunks_are_paged_by_cursor():
+    service = make_service(5)
+
+    page = await service.list_document_chunks("user1", "col1", "doc1", limit=2)
+    assert [chunk.id for chunk in page.items] == ["c0", "c1"]
+    assert (page.next_cursor, page.total) == ("2", 5)
+    assert page.items[0].text == "chunk 0" and page.items[0].metadata == {"page": 0}
+
+    page = await service.list_document_chunks("user1", "col1", "doc1", cursor="4", limit=2)
+    assert [chunk.id for chunk in page.items] == ["c4"]
+    assert page.next_cursor is None
+    # Only the requested window is retrieved from the vector store
+    assert service.retrieved == [["c0", "c1"], ["c4"]]
+
+
+@pytest.mark.asyncio
+async def test_chunk_fields_and_invalid_parameters():
+    service = make_service(3)
+
+    page = await service.list_document_chunks("user1", "col1", "doc1", fields=["text"])
+    assert [(chunk.text, chunk.metadata) for chunk in page.items] == [
+        ("chunk 0", None),
+        ("chunk 1", None),
+        ("chunk 2", None),
+    ]
+
+    with pytest.raises(BusinessException):
+        await service.list_document_chunks("user1", "col1", "doc1", fields=["vector"])
+    with pytest.raises(BusinessException):
+        await service.list_document_chunks("user1", "col1", "doc1", cursor="abc")
+    with pytest.raises(BusinessException):
+        await service.list_document_chunks("user1", "col1", "doc1", cursor="-5")
+
+
+@pytest.mark.asyncio
+async def test_vision_pages_only_hold_vision_chunks():
+    service = make_service(4, vision_ids={"c1", "c3"})
+
+    page = await service.list_document_chunks("user1", "col1", "doc1", vision=True, limit=3)
+    assert [(chunk.id, chunk.asset_id) for chunk in page.items] == [("c1", "asset1")]
+    assert (page.next_cursor, page.total) == ("3", 4)
+
+
+@pytest.mark.asyncio
+async def test_all_chunks_are_retrieved_in_windows(monkeypatch):
+    monkeypatch.setattr(document_service_module, "MAX_CHUNK_PAGE_SIZE", 2)
+    service = make_service(5)
+
+    chunks = await service.get_document_chunks("user1", "col1", "doc1")
+    assert [chunk.id for chunk in chunks] == ["c0", "c1", "c2", "c3", "c4"]
+    assert service.retrieved == [["c0", "c1"], ["c2", "c3"], ["c4"]]
+
+
+@pytest.mark.asyncio
+async def test_documents_without_index_have_no_chunks():
+    service = make_service(0)
+    service.db_ops = FakeDbOps(None)
+
+    page = await service.list_document_chunks("user1", "col1", "doc1")
+    assert (page.items, page.next_cursor, page.total) == ([], None, 0)
+    assert await service.get_document_vision_chunks("user1", "col1", "doc1") == []
+    assert service.retrieved == []
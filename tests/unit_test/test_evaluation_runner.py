@@ -0,0 +1,169 @@
+# Copyright 2025 ApeCloud, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("ragas")
+pytest.importorskip("langchain_openai")
+
+from aperag.evaluation import run  # noqa: E402
+from aperag.evaluation.run import EvaluationCheckpoint, EvaluationRunner  # noqa: E402
+
+
+class FakeClock:
+    """Monotonic clock that only moves when the rate limiter sleeps"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.now += seconds
+
+
+def make_runner(advanced):
+    runner = EvaluationRunner.__new__(EvaluationRunner)
+    runner.config = {"advanced": advanced}
+    return runner
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(run.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(run.asyncio, "sleep", clock.sleep)
+    return clock
+
+
+def test_request_delay_becomes_a_rate_without_bursts():
+    assert make_runner({"request_delay": 2})._get_rate_limit({"request_delay": 2}) == (0.5, 1)
+    assert make_runner({})._get_rate_limit({"request_delay": 0}) == (0.0, None)
+    # requests_per_second takes precedence over the legacy delay
+    assert make_runner({})._get_rate_limit({"request_delay": 2, "requests_per_second": 4}) == (4.0, None)
+
+    with pytest.raises(ValueError):
+        make_runner({})._get_rate_limit({"request_delay": -1})
+
+
+@pytest.mark.asyncio
+async def test_requests_are_spaced_by_request_delay(clock):
+    runner = make_runner({"request_delay": 2, "max_concurrency": 3, "checkpoint": False})
+    called_at = []
+
+    async def call_bot_api(bot_id, question):
+        called_at.append(clock.now)
+        return {"response": f"answer to {question}", "context": [], "response_time": 0}
+
+    runner._call_bot_api = call_bot_api
+    dataset = [{"question": f"q{i}", "answer": f"a{i}"} for i in range(4)]
+
+    results, scores = await runner._process_dataset("bot1", dataset, metrics=[])
+
+    assert [result["question"] for result in results] == ["q0", "q1", "q2", "q3"]
+    assert scores is None
+    assert called_at == pytest.approx([0, 2, 4, 6])
+
+
+def make_dataset(count):
+    return [{"question": f"q{i}", "answer": f"a{i}"} for i in range(count)]
+
+
+def write_checkpoint(path, entries):
+    with open(path, "w", encoding="utf-8") as f:
+        for entry in entries:
+            f.write(json.dumps(entry) + "\n")
+        # The last line of an interrupted run may be cut short
+        f.write('{"type": "answer", "index": 3, "que')
+
+
+def answer_entry(index, error=None):
+    result = {
+        "question": f"q{index}",
+        "ground_truth": f"a{index}",
+        "response": "" if error else f"answer to q{index}",
+        "context": [],
+        "error": error,
+        "response_time": 0,
+    }
+    return {"type": "answer", "index": index, "question": f"q{index}", "result": result}
+
+
+@pytest.mark.asyncio
+async def test_resume_retries_failed_answers_and_scores_the_rest(tmp_path):
+    runner = make_runner({"scoring_batch_size": 10})
+    checkpoint = EvaluationCheckpoint(tmp_path / "checkpoint.jsonl")
+    write_checkpoint(
+        checkpoint.path,
+        [
+            answer_entry(0),
+            {"type": "score", "index": 0, "question": "q0", "scores": {"faithfulness": 0.5}},
+            answer_entry(1),
+            answer_entry(2, error="HTTP error 429: rate limited"),
+        ],
+    )
+    asked, scored = [], []
+
+    async def call_bot_api(bot_id, question):
+        asked.append(question)
+        return {"response": f"answer to {question}", "context": [], "response_time": 0}
+
+    async def run_ragas_evaluation(results, metrics):
+        scored.append([result["question"] for result in results])
+        return [{"faithfulness": 1.0} for _ in results]
+
+    runner._call_bot_api = call_bot_api
+    runner._run_ragas_evaluation = run_ragas_evaluation
+
+    results, scores = await runner._process_dataset("bot1", make_dataset(4), ["faithfulness"], checkpoint)
+
+    assert sorted(asked) == ["q2", "q3"]
+    assert [result["error"] for result in results] == [None] * 4
+    # q0 keeps its checkpointed score, q1 was answered but never scored
+    assert sorted(sum(scored, [])) == ["q1", "q2", "q3"]
+    assert scores == [{"faithfulness": 0.5}] + [{"faithfulness": 1.0}] * 3
+
+    answers, checkpointed_scores = checkpoint.load(make_dataset(4))
+    assert sorted(answers) == [0, 1, 2, 3]
+    assert sorted(checkpointed_scores) == [0, 1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_scoring_starts_before_all_questions_are_answered():
+    runner = make_runner({"max_concurrency": 1, "scoring_batch_size": 1, "checkpoint": False})
+    first_scored = asyncio.Event()
+
+    async def call_bot_api(bot_id, question):
+        if question == "q2":
+            # Only answered once the scorer has taken an earlier answer
+            await first_scored.wait()
+        return {"response": f"answer to {question}", "context": [], "response_time": 0}
+
+    async def run_ragas_evaluation(results, metrics):
+        first_scored.set()
+        return [{"faithfulness": 1.0} for _ in results]
+
+    runner._call_bot_api = call_bot_api
+    runner._run_ragas_evaluation = run_ragas_evaluation
+
+    results, scores = await asyncio.wait_for(
+        runner._process_dataset("bot1", make_dataset(3), ["faithfulness"]), timeout=10
+    )
+
+    assert len(results) == 3
+    assert scores == [{"faithfulness": 1.0}] * 3
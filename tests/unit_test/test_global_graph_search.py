@@ -0,0 +1,148 @@
+# Copyright 2025 ApeCloud, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import aperag.db.ops as ops_module
+from aperag.service.global_graph_service import GlobalGraphService
+from aperag.views import graph as graph_views
+
+USER = SimpleNamespace(id="user1")
+
+
+class FakeDbOps:
+    def __init__(self, collections):
+        self.collections = collections
+
+    async def query_collections(self, user_ids):
+        return self.collections
+
+
+class FakeDocumentService:
+    async def search_documents_by_name(self, user_id, query, limit, collection_ids):
+        return [SimpleNamespace(id="doc1", name="breaker manual.pdf", collection_id="col2", status="COMPLETE")]
+
+
+def make_collection(collection_id, title):
+    return SimpleNamespace(
+        id=collection_id,
+        title=title,
+        description="",
+        status="ACTIVE",
+        config=json.dumps({"enable_knowledge_graph": True}),
+    )
+
+
+def collection_graph(collection):
+    """One entity shared by every collection, linked to one entity of its own"""
+    metadata = {"workspace": collection.title, "collection_id": collection.id, "collection_name": collection.title}
+    return {
+        "nodes": [{"id": "Breaker", "label": "Breaker", "type": "entity", "metadata": metadata}],
+        "edges": [{"source": "Breaker", "target": f"T-{collection.id}", "type": "related"}],
+    }
+
+
+@pytest.fixture
+def service(monkeypatch):
+    collections = [
+        make_collection("col1", "Substation A"),
+        make_collection("col2", "Breaker Manuals"),
+        make_collection("col3", "Broken"),
+    ]
+    monkeypatch.setattr(ops_module, "async_db_ops", FakeDbOps(collections))
+    return GlobalGraphService(collection_service=None, document_service=FakeDocumentService())
+
+
+@pytest.mark.asyncio
+async def test_each_collection_is_streamed_then_the_merged_graph(service):
+    slow_collection_released = asyncio.Event()
+
+    async def search_collection_graph(collection, query, top_k):
+        if collection.id == "col3":
+            raise RuntimeError("graph storage unavailable")
+        if collection.id == "col2":
+            await slow_collection_released.wait()
+        return collection_graph(collection)
+
+    service._search_collection_graph = search_collection_graph
+
+    events = []
+    async for event in service.federated_graph_search_stream(USER, "breaker"):
+        events.append(event)
+        if len(events) == 2:
+            # The slow collection only answers once both others were streamed
+            slow_collection_released.set()
+
+    assert [event["event"] for event in events] == ["collection", "collection", "collection", "done"]
+    streamed = {event["collection_id"]: event for event in events[:3]}
+    assert {events[0]["collection_id"], events[1]["collection_id"]} == {"col1", "col3"}
+    assert events[2]["collection_id"] == "col2"
+    # A failing collection is streamed empty instead of failing the search
+    assert streamed["col3"]["nodes"] == [] and streamed["col3"]["edges"] == []
+
+    done = events[-1]
+    assert [node["id"] for node in done["nodes"]] == ["Breaker"]
+    assert done["nodes"][0]["source_collections"] == ["Substation A", "Breaker Manuals"]
+    assert sorted(edge["target"] for edge in done["edges"]) == ["T-col1", "T-col2"]
+    assert [match["id"] for match in done["matches"]["collections"]] == ["col2"]
+    assert [match["id"] for match in done["matches"]["documents"]] == ["doc1"]
+    assert done["matches"]["documents"][0]["collection_name"] == "Breaker Manuals"
+
+
+@pytest.mark.asyncio
+async def test_searches_are_cancelled_when_the_client_disconnects(service):
+    cancelled = []
+
+    async def search_collection_graph(collection, query, top_k):
+        if collection.id != "col1":
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                cancelled.append(collection.id)
+                raise
+        return collection_graph(collection)
+
+    service._search_collection_graph = search_collection_graph
+
+    stream = service.federated_graph_search_stream(USER, "breaker")
+    first = await stream.__anext__()
+    assert first["collection_id"] == "col1"
+
+    await stream.aclose()
+    await asyncio.sleep(0)
+    assert sorted(cancelled) == ["col2", "col3"]
+
+
+@pytest.mark.asyncio
+async def test_stream_view_sends_events_and_errors_as_sse(monkeypatch):
+    class FailingService:
+        async def federated_graph_search_stream(self, user, query, top_k):
+            yield {"event": "collection", "collection_id": "col1", "nodes": [], "edges": []}
+            raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(graph_views, "global_graph_service", FailingService())
+
+    response = await graph_views.global_graph_search_stream_view(request=None, query="breaker", top_k=5, user=USER)
+    messages = [message async for message in response.body_iterator]
+
+    assert response.media_type == "text/event-stream"
+    assert [json.loads(message.removeprefix("data: ")) for message in messages] == [
+        {"event": "collection", "collection_id": "col1", "nodes": [], "edges": []},
+        {"event": "error", "message": "database unavailable"},
+    ]
+    assert all(message.endswith("\n\n") for message in messages)
@@ -0,0 +1,102 @@
+# Copyright 2025 ApeCloud, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+
+import pytest
+
+from aperag.graph.traversal import traverse_graph
+
+
+class FakeGraphStorage:
+    """Graph storage stub over {node_id: [(src, tgt), ...]} that records every batch call"""
+
+    def __init__(self, node_edges, delay=0.0):
+        self.node_edges = node_edges
+        self.delay = delay
+        self.batch_calls = []
+
+    async def get_nodes_edges_batch(self, node_ids):
+        self.batch_calls.append(list(node_ids))
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return {node_id: list(self.node_edges.get(node_id, [])) for node_id in node_ids}
+
+    async def get_node_edges(self, node_id):
+        raise AssertionError("ego-graph expansion must not fetch edges node by node")
+
+
+# T1 - B1 - L1 - S1, T1 - B2
+SUBSTATION = {
+    "T1": [("T1", "B1"), ("T1", "B2")],
+    "B1": [("B1", "T1"), ("B1", "L1")],
+    "B2": [("B2", "T1")],
+    "L1": [("L1", "B1"), ("L1", "S1")],
+    "S1": [("S1", "L1")],
+}
+
+
+@pytest.mark.asyncio
+async def test_single_hop_uses_one_batch_call():
+    storage = FakeGraphStorage({"A": [("A", "B"), ("C", "A")], "B": [("A", "B"), ("B", "D")]})
+
+    nodes, edges, truncated = await traverse_graph(storage, ["A", "B"], max_depth=1, max_fanout=10, max_nodes=100)
+
+    assert storage.batch_calls == [["A", "B"]]
+    assert nodes == ["A", "B", "C", "D"]
+    # (A, B) is reported by both endpoints but returned once
+    assert sorted(edges) == [("A", "B"), ("B", "D"), ("C", "A")]
+    assert not truncated
+
+
+@pytest.mark.asyncio
+async def test_depth_expands_one_batch_per_level():
+    storage = FakeGraphStorage(SUBSTATION)
+
+    nodes, edges, _ = await traverse_graph(storage, ["T1"], max_depth=2, max_fanout=10, max_nodes=100)
+
+    assert storage.batch_calls == [["T1"], ["B1", "B2"]]
+    assert set(nodes) == {"T1", "B1", "B2", "L1"}
+    assert {frozenset(e) for e in edges} == {frozenset(("T1", "B1")), frozenset(("T1", "B2")), frozenset(("B1", "L1"))}
+
+
+@pytest.mark.asyncio
+async def test_fanout_and_node_caps():
+    storage = FakeGraphStorage({"A": [("A", "B"), ("A", "C"), ("A", "D"), ("A", "E")]})
+
+    _, edges, _ = await traverse_graph(storage, ["A"], max_depth=1, max_fanout=3, max_nodes=100)
+    assert len(edges) == 3
+
+    nodes, edges, _ = await traverse_graph(storage, ["A"], max_depth=1, max_fanout=10, max_nodes=3)
+    # The seed plus two neighbours fill the node budget
+    assert nodes == ["A", "B", "C"]
+    assert sorted(edges) == [("A", "B"), ("A", "C")]
+
+    nodes, _, _ = await traverse_graph(FakeGraphStorage(SUBSTATION), ["T1"], max_depth=3, max_fanout=1, max_nodes=100)
+    # B1's only expanded edge leads back to T1
+    assert nodes == ["T1", "B1"]
+
+
+@pytest.mark.asyncio
+async def test_traversal_stops_at_deadline():
+    storage = FakeGraphStorage(SUBSTATION, delay=0.5)
+    deadline = asyncio.get_running_loop().time() + 0.05
+
+    nodes, edges, truncated = await traverse_graph(
+        storage, ["T1"], max_depth=3, max_fanout=10, max_nodes=100, deadline=deadline
+    )
+
+    assert truncated
+    assert nodes == ["T1"]
+    assert edges == []
@@ -0,0 +1,168 @@
+# Copyright 2025 ApeCloud, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import base64
+import io
+
+import pytest
+from PIL import Image
+
+from aperag.llm.completion.image_attachment import (
+    EncodedImageCache,
+    ImageAsset,
+    ImageAttachmentLoader,
+    downscale_image,
+)
+
+
+def make_png(width: int, height: int, mode: str = "RGB") -> bytes:
+    output = io.BytesIO()
+    Image.new(mode, (width, height), "white").save(output, format="PNG")
+    return output.getvalue()
+
+
+def decode_uri(uri: str) -> Image.Image:
+    return Image.open(io.BytesIO(base64.b64decode(uri.split(",", 1)[1])))
+
+
+class FakeObjectStore:
+    def __init__(self, objects):
+        self.objects = objects
+        self.gets = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.open_streams = 0
+
+    async def get_obj_size(self, path):
+        data = self.objects.get(path)
+        return None if data is None else len(data)
+
+    async def get(self, path):
+        self.gets.append(path)
+        if path not in self.objects:
+            return None
+        data = self.objects[path]
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+
+        self.open_streams += 1
+
+        async def stream():
+            try:
+                yield data
+            finally:
+                self.open_streams -= 1
+
+        return stream(), len(data)
+
+
+def make_loader(store, **kwargs):
+    kwargs.setdefault("max_resolution", 64)
+    kwargs.setdefault("max_asset_bytes", 10 * 1024 * 1024)
+    return ImageAttachmentLoader(store, cache=EncodedImageCache(1024 * 1024), **kwargs)
+
+
+def test_large_images_are_downscaled():
+    data, mimetype = downscale_image(make_png(400, 100), "image/png", 64)
+    assert mimetype == "image/jpeg"
+    assert Image.open(io.BytesIO(data)).size == (64, 16)
+
+    data, mimetype = downscale_image(make_png(400, 100, "RGBA"), "image/png", 64)
+    assert mimetype == "image/png"
+
+    small = make_png(32, 32)
+    assert downscale_image(small, "image/png", 64) == (small, "image/png")
+    assert downscale_image(b"not an image", "image/svg+xml", 64) == (b"not an image", "image/svg+xml")
+
+
+@pytest.mark.asyncio
+async def test_assets_are_fetched_concurrently_up_to_the_limit():
+    store = FakeObjectStore({f"a/{i}": make_png(200, 200) for i in range(8)})
+    assets = [ImageAsset(f"a/{i}", "image/png") for i in range(8)]
+
+    loaded = await make_loader(store).load_many(assets, max_images=5)
+
+    assert [index for index, _ in loaded] == [0, 1, 2, 3, 4]
+    assert store.max_in_flight == 5
+    assert len(store.gets) == 5
+    assert decode_uri(loaded[0][1]).size == (64, 64)
+
+
+@pytest.mark.asyncio
+async def test_missing_and_oversized_assets_are_replaced_by_the_next_ones():
+    store = FakeObjectStore({"a/0": make_png(10, 10), "a/2": make_png(2000, 2000), "a/3": make_png(10, 10)})
+    assets = [ImageAsset(f"a/{i}", "image/png") for i in range(4)]
+
+    loaded = await make_loader(store, max_asset_bytes=len(make_png(10, 10))).load_many(assets, max_images=2)
+
+    assert [index for index, _ in loaded] == [0, 3]
+    # The oversized asset is skipped by its size, without being opened
+    assert "a/2" not in store.gets
+    assert store.open_streams == 0
+
+
+@pytest.mark.asyncio
+async def test_assets_that_grow_past_the_limit_are_closed():
+    store = FakeObjectStore({"a/0": make_png(10, 10)})
+    loader = make_loader(store, max_asset_bytes=len(make_png(10, 10)))
+
+    async def get_obj_size(path):
+        # The object was replaced with a larger one after its size was checked
+        store.objects[path] = make_png(2000, 2000)
+        return len(make_png(10, 10))
+
+    store.get_obj_size = get_obj_size
+
+    assert await loader.load(ImageAsset("a/0", "image/png")) is None
+    assert store.open_streams == 0
+
+
+@pytest.mark.asyncio
+async def test_byte_budget_skips_images():
+    store = FakeObjectStore({"a/0": make_png(10, 10), "a/1": make_png(10, 10)})
+    assets = [ImageAsset(f"a/{i}", "image/png") for i in range(2)]
+    loader = make_loader(store)
+    size = len(await loader.load(assets[0]))
+
+    loaded = await loader.load_many(assets, max_images=5, byte_budget=size + 1)
+
+    assert [index for index, _ in loaded] == [0]
+
+
+@pytest.mark.asyncio
+async def test_encoded_images_are_cached():
+    store = FakeObjectStore({"a/0": make_png(200, 200)})
+    loader = make_loader(store)
+
+    first = await loader.load(ImageAsset("a/0", "image/png"))
+    second = await loader.load(ImageAsset("a/0", "image/png"))
+
+    assert first == second
+    assert store.gets == ["a/0"]
+
+
+def test_cache_is_bounded_by_size():
+    cache = EncodedImageCache(max_bytes=10)
+    cache.put(("a", 1), "12345")
+    cache.put(("b", 1), "12345")
+    cache.get(("a", 1))
+    cache.put(("c", 1), "12345")
+
+    assert cache.get(("a", 1)) == "12345"
+    assert cache.get(("b", 1)) is None
+    cache.put(("d", 1), "x" * 11)
+    assert cache.get(("d", 1)) is None
@@ -0,0 +1,143 @@
+# Copyright 2025 ApeCloud, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from aperag.config import settings
+from aperag.flow.runners import llm as llm_module
+from aperag.query.context_packer import ContextPacker
+from aperag.utils.history import wait_for_history_writes
+
+
+class SlowHistory:
+    """History whose writes wait until `writable` is set and fail the first `failures` times"""
+
+    session_id = "chat1"
+
+    def __init__(self, failures=0, writable=True):
+        self.failures = failures
+        self.attempts = 0
+        self.messages = []
+        self.writable = asyncio.Event()
+        if writable:
+            self.writable.set()
+
+    async def _write(self, message):
+        self.attempts += 1
+        await self.writable.wait()
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("redis unavailable")
+        self.messages.append(message)
+
+    async def add_user_message(self, message, message_id):
+        await self._write(("human", message_id, message))
+
+    async def add_ai_message(self, content, message_id, references, **kwargs):
+        await self._write(("ai", message_id, content, references))
+
+
+class FakeCompletionService:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    async def agenerate_stream(self, history, prompt, images, memory):
+        for token in ["The ", "breaker ", "", "trips."]:
+            yield token
+
+
+@pytest.fixture(autouse=True)
+def fake_provider(monkeypatch):
+    async def get_api_key(provider, user):
+        return "sk-1"
+
+    async def get_provider(provider):
+        return SimpleNamespace(base_url="http://provider/v1")
+
+    async def token_limits(**kwargs):
+        return 4000, 500
+
+    async def not_vision(*args):
+        return False
+
+    monkeypatch.setattr(llm_module.provider_config_cache, "aget_api_key", get_api_key)
+    monkeypatch.setattr(llm_module.provider_config_cache, "aget_provider", get_provider)
+    monkeypatch.setattr(llm_module, "calculate_model_token_limits", token_limits)
+    monkeypatch.setattr(llm_module, "is_vision_model", not_vision)
+    monkeypatch.setattr(llm_module, "CompletionService", FakeCompletionService)
+    monkeypatch.setattr(llm_module, "get_context_packer", lambda: ContextPacker(str.split, " ".join))
+    monkeypatch.setattr(settings, "chat_history_write_retry_delay", 0.01)
+
+
+async def stream_answer(history):
+    service = llm_module.LLMService(llm_module.LLMRepository())
+    _, outputs = await service.generate_response(
+        user="user1",
+        query="Why does it trip?",
+        message_id="msg1",
+        history=history,
+        model_service_provider="openai",
+        model_name="gpt",
+        custom_llm_provider="openai",
+        prompt_template="{context}\n{query}",
+        temperature=0.1,
+    )
+    chunks = []
+    async for chunk in outputs["async_generator"]():
+        chunks.append(chunk)
+    return chunks
+
+
+@pytest.mark.asyncio
+async def test_stream_ends_before_history_is_written():
+    history = SlowHistory(writable=False)
+
+    # The writes can't finish yet, a stream waiting for them would never end
+    chunks = await asyncio.wait_for(stream_answer(history), timeout=5)
+
+    assert "".join(chunks) == "The breaker trips."
+    assert history.messages == []
+
+    history.writable.set()
+    await wait_for_history_writes(timeout=5)
+    assert history.messages == [
+        ("human", "msg1", "Why does it trip?"),
+        ("ai", "msg1", "The breaker trips.", []),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_failed_writes_are_retried():
+    history = SlowHistory(failures=1)
+
+    await stream_answer(history)
+    await wait_for_history_writes(timeout=5)
+
+    assert history.attempts == 3
+    assert [message[0] for message in history.messages] == ["human", "ai"]
+
+
+@pytest.mark.asyncio
+async def test_answer_is_not_stored_without_its_question(monkeypatch):
+    monkeypatch.setattr(settings, "chat_history_write_attempts", 2)
+    history = SlowHistory(failures=2)
+
+    await stream_answer(history)
+    await wait_for_history_writes(timeout=5)
+
+    assert history.attempts == 2
+    assert history.messages == []
@@ -0,0 +1,180 @@
+# Copyright 2025 ApeCloud, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+import aperag.db.ops as ops_module
+from aperag.config import settings
+from aperag.db.models import APIType
+from aperag.db.provider_cache import ProviderConfigCache
+from aperag.index import fulltext_index
+
+
+def make_model(**overrides):
+    fields = dict(
+        provider_name="openai",
+        api=APIType.COMPLETION,
+        model="gpt-4o",
+        custom_llm_provider="openai",
+        context_window=128000,
+        max_input_tokens=None,
+        max_output_tokens=4096,
+        tags=["vision"],
+    )
+    fields.update(overrides)
+    return SimpleNamespace(**fields)
+
+
+@pytest.fixture
+def db_ops(monkeypatch):
+    db_ops = MagicMock()
+    db_ops.query_provider_api_key.return_value = "sk-1"
+    db_ops.query_llm_provider_by_name.return_value = SimpleNamespace(
+        name="openai",
+        base_url="https://api.openai.com/v1",
+        user_id="public",
+        completion_dialect="anthropic",
+        embedding_dialect="openai",
+        rerank_dialect="jina_ai",
+    )
+    db_ops.query_llm_provider_model.return_value = make_model()
+    monkeypatch.setattr(ops_module, "db_ops", db_ops)
+    return db_ops
+
+
+@pytest.fixture
+def async_db_ops(monkeypatch):
+    async_db_ops = MagicMock()
+    async_db_ops.query_provider_api_key = AsyncMock(return_value="sk-1")
+    async_db_ops.query_llm_provider_model = AsyncMock(return_value=make_model())
+    monkeypatch.setattr(ops_module, "async_db_ops", async_db_ops)
+    return async_db_ops
+
+
+def test_lookups_are_cached_and_counted(db_ops):
+    cache = ProviderConfigCache(ttl=60)
+
+    for _ in range(3):
+        assert cache.get_api_key("openai", "user1") == "sk-1"
+        assert cache.get_provider("openai").base_url == "https://api.openai.com/v1"
+        assert cache.get_model("openai", APIType.COMPLETION.value, "gpt-4o").has_tag("vision")
+
+    assert db_ops.query_provider_api_key.call_count == 1
+    assert db_ops.query_llm_provider_by_name.call_count == 1
+    assert db_ops.query_llm_provider_model.call_count == 1
+
+    stats = cache.get_stats()
+    assert stats["hits"] == 6
+    assert stats["misses"] == 3
+    assert stats["by_kind"]["api_key"] == {"hits": 2, "misses": 1}
+
+
+def test_api_type_members_and_values_share_entries(db_ops):
+    cache = ProviderConfigCache(ttl=60)
+
+    cache.get_model("openai", APIType.COMPLETION, "gpt-4o")
+    cache.get_model("openai", "completion", "gpt-4o")
+
+    assert db_ops.query_llm_provider_model.call_count == 1
+
+
+def test_public_and_private_api_keys_are_cached_apart(db_ops):
+    cache = ProviderConfigCache(ttl=60)
+
+    cache.get_api_key("openai", "user1")
+    db_ops.query_provider_api_key.return_value = None
+    assert cache.get_api_key("openai", "user1", need_public=False) is None
+    assert cache.get_api_key("openai", "user1") == "sk-1"
+
+    assert [c.args for c in db_ops.query_provider_api_key.call_args_list] == [
+        ("openai", "user1", True),
+        ("openai", "user1", False),
+    ]
+
+
+def test_keyword_extractor_uses_the_cached_provider_dialect(db_ops, monkeypatch):
+    monkeypatch.setattr(fulltext_index, "provider_config_cache", ProviderConfigCache(ttl=60))
+    monkeypatch.setattr(settings, "llm_keyword_extraction_provider", "openai")
+    monkeypatch.setattr(settings, "llm_keyword_extraction_model", "claude")
+
+    service = fulltext_index.LLMKeywordExtractor({"user_id": "user1"}).completion_service
+
+    assert (service.provider, service.base_url, service.api_key) == ("anthropic", "https://api.openai.com/v1", "sk-1")
+    assert fulltext_index.LLMKeywordExtractor({"user_id": "user1"}).completion_service.provider == "anthropic"
+    assert db_ops.query_llm_provider_by_name.call_count == 1
+
+
+def test_missing_rows_are_cached(db_ops):
+    db_ops.query_llm_provider_model.return_value = None
+    cache = ProviderConfigCache(ttl=60)
+
+    assert cache.get_model("openai", "completion", "unknown") is None
+    assert cache.get_model("openai", "completion", "unknown") is None
+
+    assert db_ops.query_llm_provider_model.call_count == 1
+
+
+def test_invalidate_drops_only_the_provider(db_ops):
+    cache = ProviderConfigCache(ttl=60)
+    cache.get_api_key("openai", "user1")
+    cache.get_api_key("jina", "user1")
+
+    cache.invalidate("openai")
+    db_ops.query_provider_api_key.return_value = "sk-2"
+
+    assert cache.get_api_key("openai", "user1") == "sk-2"
+    assert cache.get_api_key("jina", "user1") == "sk-1"
+    assert db_ops.query_provider_api_key.call_count == 3
+
+
+def test_entries_expire_and_zero_ttl_disables_the_cache(db_ops, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("aperag.db.provider_cache.time.monotonic", lambda: now[0])
+    cache = ProviderConfigCache(ttl=60)
+    cache.get_provider("openai")
+    now[0] += 61
+    cache.get_provider("openai")
+    assert db_ops.query_llm_provider_by_name.call_count == 2
+
+    disabled = ProviderConfigCache(ttl=0)
+    disabled.get_provider("openai")
+    disabled.get_provider("openai")
+    assert db_ops.query_llm_provider_by_name.call_count == 4
+
+
+def test_size_is_bounded(db_ops):
+    cache = ProviderConfigCache(ttl=60, max_entries=2)
+    for user_id in ("user1", "user2", "user3"):
+        cache.get_api_key("openai", user_id)
+
+    assert cache.get_stats()["size"] == 2
+    cache.get_api_key("openai", "user1")
+    assert db_ops.query_provider_api_key.call_count == 4
+
+
+@pytest.mark.asyncio
+async def test_async_lookups_share_the_cache(async_db_ops, db_ops):
+    cache = ProviderConfigCache(ttl=60)
+
+    assert await cache.aget_api_key("openai", "user1") == "sk-1"
+    assert cache.get_api_key("openai", "user1") == "sk-1"
+    model = await cache.aget_model("openai", "completion", "gpt-4o")
+    assert model.context_window == 128000
+    assert model.custom_llm_provider == "openai"
+
+    assert async_db_ops.query_provider_api_key.await_count == 1
+    assert db_ops.query_provider_api_key.call_count == 0
@@ -0,0 +1,140 @@
+# Copyright 2025 ApeCloud, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from aperag.db.models import (
+    Bot,
+    BotStatus,
+    Collection,
+    CollectionStatus,
+    CollectionType,
+    Document,
+    DocumentStatus,
+    Role,
+    User,
+    UserQuota,
+)
+from aperag.service import quota_service as quota_service_module
+from aperag.service.quota_service import QuotaService
+
+
+class SessionOps:
+    """The part of AsyncDatabaseOps used by QuotaService, on an in-memory SQLite database"""
+
+    def __init__(self, factory):
+        self.factory = factory
+
+    async def _execute_query(self, query_func):
+        async with self.factory() as session:
+            return await query_func(session)
+
+    async def execute_with_transaction(self, operation):
+        async with self.factory() as session:
+            async with session.begin():
+                return await operation(session)
+
+
+@pytest.fixture
+async def session_factory():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        for model in (User, UserQuota, Collection, Document, Bot):
+            await conn.run_sync(model.__table__.create)
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest.fixture
+async def service(session_factory):
+    async with session_factory() as session, session.begin():
+        for i in range(5):
+            user_id = f"user{i}"
+            session.add(
+                User(id=user_id, username=f"name{i}", email=f"{i}@example.com", role=Role.RW, hashed_password="x")
+            )
+            session.add(UserQuota(user=user_id, key="max_collection_count", quota_limit=10, current_usage=7))
+            session.add(UserQuota(user=user_id, key="max_document_count", quota_limit=100, current_usage=7))
+            session.add(UserQuota(user=user_id, key="max_bot_count", quota_limit=5, current_usage=7))
+    return QuotaService(db_ops=SessionOps(session_factory))
+
+
+@pytest.mark.asyncio
+async def test_listing_is_paged_by_default(service, monkeypatch):
+    monkeypatch.setattr(quota_service_module, "DEFAULT_QUOTA_PAGE_SIZE", 2)
+
+    page = await service.list_users_quotas()
+    assert [item["user_id"] for item in page["items"]] == ["user0", "user1"]
+    assert page["next_cursor"] == "user1"
+    assert page["items"][0]["quotas"]["max_collection_count"] == {"quota_limit": 10, "current_usage": 7, "remaining": 3}
+
+    page = await service.list_users_quotas(cursor=page["next_cursor"], limit=10)
+    assert [item["user_id"] for item in page["items"]] == ["user2", "user3", "user4"]
+    assert page["next_cursor"] is None
+
+
+@pytest.mark.asyncio
+async def test_get_all_users_quotas_walks_every_page(service, monkeypatch):
+    monkeypatch.setattr(quota_service_module, "DEFAULT_QUOTA_PAGE_SIZE", 2)
+
+    items = await service.get_all_users_quotas()
+    assert [item["user_id"] for item in items] == [f"user{i}" for i in range(5)]
+    assert [item["user_id"] for item in await service.get_all_users_quotas(search_term="name3")] == ["user3"]
+
+
+@pytest.mark.asyncio
+async def test_recalculate_usage_in_batches(service, session_factory):
+    async with session_factory() as session, session.begin():
+        session.add(
+            Collection(
+                id="col1",
+                title="c",
+                user="user1",
+                status=CollectionStatus.ACTIVE,
+                type=CollectionType.DOCUMENT,
+                config="{}",
+            )
+        )
+        session.add(
+            Collection(
+                id="col2",
+                title="c",
+                user="user1",
+                status=CollectionStatus.DELETED,
+                type=CollectionType.DOCUMENT,
+                config="{}",
+            )
+        )
+        for i in range(3):
+            session.add(
+                Document(
+                    id=f"doc{i}", name="d", user="user1", collection_id="col1", status=DocumentStatus.COMPLETE, size=1
+                )
+            )
+        session.add(Bot(id="bot1", user="user1", title="b", status=BotStatus.ACTIVE, config="{}"))
+        session.add(Bot(id="bot2", user="user1", title="Default Agent Bot", status=BotStatus.ACTIVE, config="{}"))
+
+    result = await service.recalculate_all_users_usage(batch_size=3)
+    assert result == {"processed_users": 3, "next_cursor": "user2"}
+    result = await service.recalculate_all_users_usage(cursor=result["next_cursor"], batch_size=3)
+    assert result == {"processed_users": 2, "next_cursor": None}
+
+    quotas = {item["user_id"]: item["quotas"] for item in await service.get_all_users_quotas()}
+    assert {key: quota["current_usage"] for key, quota in quotas["user1"].items()} == {
+        "max_collection_count": 1,
+        "max_document_count": 3,
+        "max_bot_count": 1,
+    }
+    assert all(quota["current_usage"] == 0 for quota in quotas["user4"].values())
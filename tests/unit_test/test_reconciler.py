@@ -0,0 +1,322 @@
+# Copyright 2025 ApeCloud, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine, select, update
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import sessionmaker
+
+from aperag.db.models import Document, DocumentIndex, DocumentIndexStatus, DocumentIndexType, DocumentStatus
+from aperag.tasks import reconciler as reconciler_module
+from aperag.tasks import vision_dependency
+from aperag.tasks.queues import IndexLane
+from aperag.tasks.reconciler import DocumentIndexReconciler
+from aperag.tasks.vision_dependency import InMemoryVisionDependentStore
+from aperag.utils.constant import IndexAction
+
+
+class RecordingScheduler:
+    def __init__(self, fail_documents=()):
+        self.calls = []
+        self.lanes = {}
+        self.fail_documents = set(fail_documents)
+
+    def _record(self, action, document_id, index_types, lane):
+        if document_id in self.fail_documents:
+            raise RuntimeError("broker unavailable")
+        self.calls.append((action, document_id, sorted(index_types)))
+        self.lanes[document_id] = lane
+
+    def schedule_create_index(self, document_id, index_types, context=None, lane=None):
+        self._record(IndexAction.CREATE, document_id, index_types, lane)
+
+    def schedule_update_index(self, document_id, index_types, context=None, lane=None):
+        self._record(IndexAction.UPDATE, document_id, index_types, lane)
+
+    def schedule_delete_index(self, document_id, index_types, lane=None):
+        self._record(IndexAction.DELETE, document_id, index_types, lane)
+
+
+@pytest.fixture
+def session_factory(monkeypatch):
+    monkeypatch.setattr(reconciler_module.settings, "index_tenant_max_inflight", 0)
+    monkeypatch.setattr(reconciler_module.settings, "index_interactive_max_backlog", 1)
+    engine = create_engine("sqlite://")
+    Document.__table__.create(engine)
+    DocumentIndex.__table__.create(engine)
+    factory = sessionmaker(bind=engine)
+
+    def get_sync_session():
+        with factory() as session:
+            yield session
+
+    monkeypatch.setattr(reconciler_module, "get_sync_session", get_sync_session)
+    return factory
+
+
+class CapturingSession:
+    """Records executed statements instead of running them"""
+
+    def __init__(self):
+        self.statements = []
+
+    def execute(self, stmt):
+        self.statements.append(stmt)
+        return self
+
+    def all(self):
+        return []
+
+
+def add_document(session, document_id, collection_id, minutes_ago, indexes, user="u"):
+    since = datetime.now(timezone.utc) - timedelta(minutes=minutes_ago)
+    session.add(
+        Document(
+            id=document_id,
+            name=document_id,
+            user=user,
+            collection_id=collection_id,
+            status=DocumentStatus.PENDING,
+            size=1,
+        )
+    )
+    for index_type, status, version in indexes:
+        session.add(
+            DocumentIndex(
+                document_id=document_id,
+                index_type=index_type,
+                status=status,
+                version=version,
+                observed_version=0 if status == DocumentIndexStatus.PENDING else version,
+                gmt_updated=since,
+            )
+        )
+
+
+def test_claims_whole_documents_fairly_across_collections(session_factory):
+    with session_factory() as session:
+        # col1 has a large backlog that is older than the single col2 document
+        for i in range(3):
+            add_document(
+                session,
+                f"doc1{i}",
+                "col1",
+                100 - i,
+                [
+                    (DocumentIndexType.VECTOR, DocumentIndexStatus.PENDING, 1),
+                    (DocumentIndexType.FULLTEXT, DocumentIndexStatus.PENDING, 1),
+                ],
+            )
+        add_document(session, "doc20", "col2", 1, [(DocumentIndexType.VECTOR, DocumentIndexStatus.PENDING, 2)])
+        session.commit()
+
+        claimed = DocumentIndexReconciler(task_scheduler=RecordingScheduler())._claim_pending_indexes(session, 2)
+        session.commit()
+
+        claimed_documents = {item["document_id"]: item for item in claimed}
+        assert set(claimed_documents) == {"doc10", "doc20"}
+        assert len(claimed) == 3
+        assert claimed_documents["doc20"]["action"] == IndexAction.UPDATE
+        assert claimed_documents["doc20"]["target_version"] == 2
+
+        statuses = dict(session.execute(select(DocumentIndex.document_id, DocumentIndex.status)).all())
+        assert statuses["doc10"] == DocumentIndexStatus.CREATING
+        assert statuses["doc11"] == DocumentIndexStatus.PENDING
+
+
+def test_reconcile_all_schedules_in_batches_and_releases_failures(session_factory, monkeypatch):
+    monkeypatch.setattr(reconciler_module.settings, "reconciler_claim_batch_size", 2)
+    monkeypatch.setattr(reconciler_module.settings, "reconciler_max_claim_batches", 10)
+    with session_factory() as session:
+        for i in range(3):
+            add_document(
+                session, f"doc{i}", "col1", 10 - i, [(DocumentIndexType.VECTOR, DocumentIndexStatus.PENDING, 1)]
+            )
+        add_document(session, "gone", "col1", 1, [(DocumentIndexType.VECTOR, DocumentIndexStatus.DELETING, 1)])
+        session.commit()
+
+    scheduler = RecordingScheduler(fail_documents={"doc2"})
+    DocumentIndexReconciler(task_scheduler=scheduler).reconcile_all()
+
+    assert (IndexAction.DELETE, "gone", [DocumentIndexType.VECTOR]) in scheduler.calls
+    assert {call[1] for call in scheduler.calls} == {"doc0", "doc1", "gone"}
+
+    with session_factory() as session:
+        statuses = dict(session.execute(select(DocumentIndex.document_id, DocumentIndex.status)).all())
+    assert statuses["gone"] == DocumentIndexStatus.DELETION_IN_PROGRESS
+    assert statuses["doc0"] == DocumentIndexStatus.CREATING
+    # Scheduling failed, so the index is left for the next reconciliation
+    assert statuses["doc2"] == DocumentIndexStatus.PENDING
+
+
+def test_tenant_inflight_cap_leaves_backlog_pending(session_factory, monkeypatch):
+    monkeypatch.setattr(reconciler_module.settings, "index_tenant_max_inflight", 2)
+    with session_factory() as session:
+        for i in range(4):
+            add_document(
+                session,
+                f"bulk{i}",
+                "col1",
+                100 - i,
+                [(DocumentIndexType.VECTOR, DocumentIndexStatus.PENDING, 1)],
+                user="bulk",
+            )
+        add_document(
+            session, "single", "col2", 1, [(DocumentIndexType.VECTOR, DocumentIndexStatus.PENDING, 1)], user="other"
+        )
+        session.commit()
+
+        reconciler = DocumentIndexReconciler(task_scheduler=RecordingScheduler())
+        first = {item["document_id"] for item in reconciler._claim_pending_indexes(session, 10)}
+        session.commit()
+        # The bulk tenant's slots are all taken, so nothing more is claimed until one is freed
+        second = reconciler._claim_pending_indexes(session, 10)
+        session.commit()
+
+    assert first == {"bulk0", "bulk1", "single"}
+    assert second == []
+
+
+def test_small_collection_backlog_takes_interactive_lane(session_factory):
+    with session_factory() as session:
+        for i in range(3):
+            add_document(
+                session, f"bulk{i}", "col1", 10 - i, [(DocumentIndexType.GRAPH, DocumentIndexStatus.PENDING, 1)]
+            )
+        add_document(session, "single", "col2", 1, [(DocumentIndexType.VECTOR, DocumentIndexStatus.PENDING, 1)])
+        session.commit()
+
+    scheduler = RecordingScheduler()
+    DocumentIndexReconciler(task_scheduler=scheduler).reconcile_all()
+
+    assert scheduler.lanes == {
+        "bulk0": IndexLane.BULK,
+        "bulk1": IndexLane.BULK,
+        "bulk2": IndexLane.BULK,
+        "single": IndexLane.INTERACTIVE,
+    }
+
+
+def test_claim_compiles_for_postgres(monkeypatch):
+    monkeypatch.setattr(reconciler_module.settings, "index_tenant_max_inflight", 2)
+    session = CapturingSession()
+
+    assert DocumentIndexReconciler(task_scheduler=RecordingScheduler())._claim_pending_indexes(session, 10) == []
+
+    sql = str(session.statements[0].compile(dialect=postgresql.dialect()))
+    assert "FOR UPDATE SKIP LOCKED" in sql
+    assert "row_number() OVER (PARTITION BY document.collection_id ORDER BY min(candidate_index.gmt_updated))" in sql
+    assert "row_number() OVER (PARTITION BY pending_documents.tenant ORDER BY" in sql
+    assert "RETURNING document_index.id" in sql
+
+
+def test_stale_claims_are_released(session_factory, monkeypatch):
+    monkeypatch.setattr(reconciler_module.settings, "index_stale_claim_timeout", 600)
+    with session_factory() as session:
+        # Claimed an hour ago, but the reconciler died before scheduling the task
+        add_document(session, "lost", "col1", 60, [(DocumentIndexType.VECTOR, DocumentIndexStatus.CREATING, 1)])
+        add_document(session, "busy", "col1", 1, [(DocumentIndexType.VECTOR, DocumentIndexStatus.CREATING, 1)])
+        # A claimed index has not observed its version yet
+        session.execute(update(DocumentIndex).values(observed_version=0))
+        session.commit()
+
+    scheduler = RecordingScheduler()
+    DocumentIndexReconciler(task_scheduler=scheduler).reconcile_all()
+
+    assert scheduler.calls == [(IndexAction.CREATE, "lost", [DocumentIndexType.VECTOR])]
+    with session_factory() as session:
+        statuses = dict(session.execute(select(DocumentIndex.document_id, DocumentIndex.status)).all())
+    assert statuses == {"lost": DocumentIndexStatus.CREATING, "busy": DocumentIndexStatus.CREATING}
+
+
+def test_running_and_parked_claims_are_kept(session_factory, monkeypatch):
+    monkeypatch.setattr(reconciler_module.settings, "index_stale_claim_timeout", 600)
+    store = InMemoryVisionDependentStore()
+    monkeypatch.setattr(vision_dependency, "_store", store)
+    with session_factory() as session:
+        # A GRAPH build running for an hour, and a GRAPH task parked for an hour until VISION settles
+        add_document(session, "long", "col1", 60, [(DocumentIndexType.GRAPH, DocumentIndexStatus.CREATING, 1)])
+        add_document(
+            session,
+            "parked",
+            "col1",
+            60,
+            [
+                (DocumentIndexType.GRAPH, DocumentIndexStatus.CREATING, 1),
+                (DocumentIndexType.VECTOR, DocumentIndexStatus.CREATING, 1),
+            ],
+        )
+        session.execute(update(DocumentIndex).values(observed_version=0))
+        session.commit()
+    store.add("parked", {"task": "create_index_task", "args": ["parked", "GRAPH", None, {}]})
+    reconciler_module.index_task_callbacks.on_index_heartbeat("long", "GRAPH")
+
+    scheduler = RecordingScheduler()
+    DocumentIndexReconciler(task_scheduler=scheduler).reconcile_all()
+
+    # Only the VECTOR claim of the parked document had no task left
+    assert scheduler.calls == [(IndexAction.CREATE, "parked", [DocumentIndexType.VECTOR])]
+
+
+def test_claim_heartbeat_beats_until_the_task_ends(monkeypatch):
+    monkeypatch.setattr(reconciler_module.settings, "index_claim_heartbeat_interval", 0.01)
+    beats = []
+    beating = threading.Event()
+
+    def on_index_heartbeat(document_id, index_type):
+        beats.append((document_id, index_type))
+        if len(beats) == 3:
+            beating.set()
+
+    monkeypatch.setattr(reconciler_module.index_task_callbacks, "on_index_heartbeat", on_index_heartbeat)
+    with reconciler_module.index_claim_heartbeat("doc1", "GRAPH"):
+        assert beating.wait(timeout=10)
+    count = len(beats)
+    assert set(beats) == {("doc1", "GRAPH")}
+    # The heartbeat thread is joined when the task ends
+    assert len(beats) == count
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        return True
+
+
+def test_completion_triggers_are_debounced(monkeypatch):
+    import config.celery_tasks as celery_tasks
+    from aperag.db import redis_manager
+
+    monkeypatch.setattr(reconciler_module.settings, "index_reconcile_debounce", 5)
+    redis = FakeRedis()
+    monkeypatch.setattr(redis_manager, "get_sync_redis_client", lambda: redis)
+    scheduled = []
+    monkeypatch.setattr(celery_tasks.reconcile_indexes_task, "apply_async", lambda **options: scheduled.append(options))
+
+    for _ in range(3):
+        celery_tasks._trigger_capped_reconciliation()
+    # One delayed reconciliation covers every workflow finished within the window
+    assert scheduled == [{"countdown": 5, "expires": 70}]
+
+    redis.values.clear()
+    celery_tasks._trigger_capped_reconciliation()
+    assert len(scheduled) == 2
@@ -0,0 +1,88 @@
+# Copyright 2025 ApeCloud, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from unittest.mock import patch
+
+import pytest
+
+from aperag.docparser.base import TextPart, TitlePart
+from aperag.index.summary_index import SummaryIndexer, _hash_text
+
+
+def count_words(text):
+    return len(text.split())
+
+
+class FakeCompletionService:
+    """Completion service stub that records prompts"""
+
+    def __init__(self):
+        self.prompts = []
+
+    async def agenerate(self, history, prompt, images=None, memory=False):
+        self.prompts.append(prompt)
+        if prompt.startswith("Combine"):
+            return "reduced"
+        return "summary"
+
+
+def test_split_sections_respects_budget_and_titles():
+    parts = [
+        TitlePart(content="Chapter one", level=1),
+        TextPart(content="a " * 6),
+        TitlePart(content="Chapter two", level=1),
+        TextPart(content="b " * 3),
+        TextPart(content="c " * 8),
+    ]
+    sections = SummaryIndexer._split_sections(parts, count_words, 10)
+
+    assert sections[0].startswith("Chapter one")
+    assert sections[1].startswith("Chapter two")
+    assert all(count_words(section) <= 10 for section in sections)
+    assert len(sections) == 3
+
+
+@pytest.mark.asyncio
+async def test_map_sections_reuses_cached_summaries():
+    indexer = SummaryIndexer()
+    completion = FakeCompletionService()
+    sections = ["first section", "second section"]
+    cached = {_hash_text("first section"): "cached summary"}
+    part_summaries = {}
+
+    summaries = await indexer._map_sections(sections, completion, cached, part_summaries)
+
+    assert summaries == ["cached summary", "summary"]
+    assert len(completion.prompts) == 1
+    assert "second section" in completion.prompts[0]
+    assert set(part_summaries) == {_hash_text(section) for section in sections}
+
+
+@pytest.mark.asyncio
+async def test_reduce_tree_keeps_prompts_within_budget():
+    indexer = SummaryIndexer()
+    completion = FakeCompletionService()
+    summaries = [f"summary number {i} of the document" for i in range(20)]
+
+    with patch("aperag.index.summary_index.settings") as settings:
+        settings.summary_reduce_token_budget = 30
+        settings.summary_map_concurrency = 4
+        result = await indexer._reduce_tree(summaries, completion, count_words)
+
+    assert result == "reduced"
+    # 20 summaries of 6 words don't fit into one 30-word reduce prompt, so there is more than one level
+    assert len(completion.prompts) > 1
+    for prompt in completion.prompts:
+        combined = prompt.split("Section summaries:\n", 1)[1].rsplit("\n\nFinal summary:", 1)[0]
+        assert count_words(combined) <= 30
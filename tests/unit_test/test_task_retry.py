@@ -0,0 +1,66 @@
+# Copyright 2025 ApeCloud, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+
+from aperag.exceptions import DocumentNotFoundException
+from aperag.llm.llm_error_types import AuthenticationError, RateLimitError
+from aperag.tasks.utils import PermanentTaskError, TaskConfig, is_retryable_task_error, retry_countdown
+
+
+class HTTPStatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        DocumentNotFoundException("doc1"),
+        ValueError("unsupported file format"),
+        FileNotFoundError("object missing"),
+        PermanentTaskError("index failed"),
+        AuthenticationError("openai"),
+        HTTPStatusError(404),
+    ],
+)
+def test_permanent_errors_are_not_retried(error):
+    assert not is_retryable_task_error(error)
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        ConnectionError("connection reset"),
+        TimeoutError("read timed out"),
+        RateLimitError("openai", retry_after=30),
+        HTTPStatusError(503),
+        HTTPStatusError(429),
+        Exception("unclassified failure"),
+    ],
+)
+def test_transient_errors_are_retried(error):
+    assert is_retryable_task_error(error)
+
+
+def test_retry_countdown_backs_off_exponentially_with_cap():
+    first = retry_countdown(0)
+    assert TaskConfig.RETRY_BACKOFF_BASE_INDEX // 2 <= first <= TaskConfig.RETRY_BACKOFF_BASE_INDEX
+    assert retry_countdown(2) >= TaskConfig.RETRY_BACKOFF_BASE_INDEX * 2
+    assert retry_countdown(20) <= TaskConfig.RETRY_BACKOFF_MAX_INDEX
+
+
+def test_retry_countdown_honors_retry_after():
+    assert retry_countdown(0, RateLimitError("openai", retry_after=500)) >= 500
@@ -0,0 +1,167 @@
+# Copyright 2025 ApeCloud, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+import time
+
+import pytest
+from celery.contrib.testing.worker import start_worker
+
+import config.celery_tasks as celery_tasks
+from aperag.tasks import reconciler
+from aperag.tasks.models import IndexTaskResult, LocalDocumentInfo, ParsedDocumentData
+from aperag.tasks.vision_dependency import InMemoryVisionDependentStore, set_vision_dependent_store
+from config.celery import app
+
+DOCUMENT_ID = "doc1"
+WAIT_TIMEOUT = 30
+
+
+class FakeIndexer:
+    """Stands in for document_index_task, VISION blocks until the test lets it finish"""
+
+    def __init__(self, vision_succeeds: bool):
+        self.vision_succeeds = vision_succeeds
+        self.vision_in_progress = True
+        self.finish_vision = threading.Event()
+        self.started = {}
+
+    def started_event(self, index_type: str) -> threading.Event:
+        return self.started.setdefault(index_type, threading.Event())
+
+    def create_index(self, document_id, index_type, parsed_data):
+        self.started_event(index_type).set()
+        if index_type != "VISION":
+            return IndexTaskResult.success_result(index_type, document_id)
+
+        assert self.finish_vision.wait(WAIT_TIMEOUT)
+        self.vision_in_progress = False
+        if self.vision_succeeds:
+            return IndexTaskResult.success_result(index_type, document_id)
+        return IndexTaskResult.failed_result(
+            index_type, document_id, "vision model rejected the image", retryable=False
+        )
+
+
+@pytest.fixture
+def store():
+    store = InMemoryVisionDependentStore()
+    set_vision_dependent_store(store)
+    yield store
+    set_vision_dependent_store(None)
+
+
+@pytest.fixture
+def celery_worker():
+    app.conf.update(broker_url="memory://", result_backend="cache+memory://", task_always_eager=False)
+    with start_worker(app, pool="threads", concurrency=4, perform_ping_check=False, shutdown_timeout=WAIT_TIMEOUT):
+        yield
+
+
+def _patch_tasks(monkeypatch, indexer: FakeIndexer):
+    monkeypatch.setattr(celery_tasks, "_validate_task_relevance", lambda *args: None)
+    monkeypatch.setattr(celery_tasks, "_trigger_capped_reconciliation", lambda: None)
+    monkeypatch.setattr(celery_tasks, "is_vision_in_progress", lambda document_id: indexer.vision_in_progress)
+    monkeypatch.setattr(celery_tasks.document_index_task, "create_index", indexer.create_index)
+    monkeypatch.setattr(
+        celery_tasks.document_index_task,
+        "parse_document",
+        lambda document_id: ParsedDocumentData.from_dict(_parsed_data_dict()),
+    )
+    monkeypatch.setattr(celery_tasks.BaseIndexTask, "_handle_index_success", lambda self, *args: None)
+    monkeypatch.setattr(reconciler.index_task_callbacks, "on_index_failed", lambda *args: None)
+    monkeypatch.setattr(reconciler.index_task_callbacks, "on_index_heartbeat", lambda *args: None)
+
+
+def _wait_for(predicate) -> bool:
+    deadline = time.monotonic() + WAIT_TIMEOUT
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def _parsed_data_dict() -> dict:
+    return ParsedDocumentData(
+        document_id=DOCUMENT_ID,
+        collection_id="col1",
+        content="text",
+        doc_parts=[],
+        file_path="doc1.pdf",
+        local_doc_info=LocalDocumentInfo(path="/tmp/doc1.pdf"),
+    ).to_dict()
+
+
+@pytest.mark.parametrize("vision_succeeds", [True, False])
+def test_graph_is_enqueued_once_vision_settles(monkeypatch, store, celery_worker, vision_succeeds):
+    indexer = FakeIndexer(vision_succeeds)
+    _patch_tasks(monkeypatch, indexer)
+
+    celery_tasks.trigger_create_indexes_workflow.delay(
+        _parsed_data_dict(), DOCUMENT_ID, ["VECTOR", "VISION", "GRAPH"], {}
+    )
+
+    # VECTOR doesn't wait for VISION, GRAPH is parked instead of occupying a worker
+    assert indexer.started_event("VISION").wait(WAIT_TIMEOUT)
+    assert indexer.started_event("VECTOR").wait(WAIT_TIMEOUT)
+    assert _wait_for(lambda: len(store._dependents[DOCUMENT_ID]) == 1)
+    assert not indexer.started_event("GRAPH").is_set()
+    # Only the document id is parked, not its parsed content
+    assert store._dependents[DOCUMENT_ID][0]["args"][:3] == [DOCUMENT_ID, "GRAPH", None]
+
+    indexer.finish_vision.set()
+
+    assert indexer.started_event("GRAPH").wait(WAIT_TIMEOUT)
+    assert store.pop_all(DOCUMENT_ID) == []
+
+
+def test_graph_runs_right_away_without_vision(monkeypatch, store, celery_worker):
+    indexer = FakeIndexer(vision_succeeds=True)
+    indexer.vision_in_progress = False
+    _patch_tasks(monkeypatch, indexer)
+
+    celery_tasks.trigger_create_indexes_workflow.delay(_parsed_data_dict(), DOCUMENT_ID, ["VECTOR", "GRAPH"], {})
+
+    assert indexer.started_event("GRAPH").wait(WAIT_TIMEOUT)
+    assert store.pop_all(DOCUMENT_ID) == []
+
+
+def test_graph_started_during_vision_is_deferred(monkeypatch, store, celery_worker):
+    indexer = FakeIndexer(vision_succeeds=True)
+    _patch_tasks(monkeypatch, indexer)
+
+    result = celery_tasks.create_index_task.delay(DOCUMENT_ID, "GRAPH", _parsed_data_dict(), {})
+
+    assert result.get(timeout=WAIT_TIMEOUT) == {"status": "deferred", "reason": "vision_in_progress"}
+    assert not indexer.started_event("GRAPH").is_set()
+
+    indexer.vision_in_progress = False
+    celery_tasks.release_vision_dependents(DOCUMENT_ID)
+
+    assert indexer.started_event("GRAPH").wait(WAIT_TIMEOUT)
+
+
+def test_released_graph_does_not_wait_for_vision_again(monkeypatch, store, celery_worker):
+    indexer = FakeIndexer(vision_succeeds=True)
+    _patch_tasks(monkeypatch, indexer)
+
+    celery_tasks.create_index_task.delay(DOCUMENT_ID, "GRAPH", _parsed_data_dict(), {})
+    assert _wait_for(lambda: len(store._dependents[DOCUMENT_ID]) == 1)
+
+    # e.g. the VISION status write failed, the released task must not park itself again
+    celery_tasks.release_vision_dependents(DOCUMENT_ID)
+
+    assert indexer.started_event("GRAPH").wait(WAIT_TIMEOUT)
+    assert store.pop_all(DOCUMENT_ID) == []
@@ -0,0 +1,112 @@
+# Copyright 2025 ApeCloud, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import threading
+
+import pytest
+
+from aperag.graph import lightrag_manager
+from aperag.tasks import worker_loop
+
+
+@pytest.fixture
+def loop_hooks(monkeypatch):
+    # Keep the pool-closing hooks of the application out of these tests
+    hooks = []
+    monkeypatch.setattr(worker_loop, "_shutdown_hooks", hooks)
+    yield hooks
+    worker_loop.stop_worker_loop()
+
+
+def test_tasks_share_one_loop_and_its_pools(loop_hooks):
+    pools = {}
+
+    async def get_pool():
+        loop = asyncio.get_running_loop()
+        # A loop-bound client, created on first use like the async engine or the Redis pool
+        if loop not in pools:
+            pools[loop] = asyncio.Queue()
+        return pools[loop]
+
+    first = worker_loop.run_in_worker_loop(get_pool())
+    second = worker_loop.run_in_worker_loop(get_pool())
+
+    assert first is second
+    assert len(pools) == 1
+
+
+def test_exceptions_are_raised_in_the_caller(loop_hooks):
+    async def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError, match="boom"):
+        worker_loop.run_in_worker_loop(fail())
+
+    assert worker_loop.run_in_worker_loop(asyncio.sleep(0, result="still running")) == "still running"
+
+
+def test_timeout_cancels_the_coroutine(loop_hooks):
+    cancelled = []
+
+    async def hang():
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    with pytest.raises(TimeoutError):
+        worker_loop.run_in_worker_loop(hang(), timeout=0.1)
+
+    worker_loop.run_in_worker_loop(asyncio.sleep(0.05))
+    assert cancelled == [True]
+
+
+def test_calling_from_the_loop_itself_is_refused(loop_hooks):
+    async def nested():
+        return worker_loop.run_in_worker_loop(asyncio.sleep(0))
+
+    with pytest.raises(RuntimeError):
+        worker_loop.run_in_worker_loop(nested())
+
+
+def test_stop_runs_shutdown_hooks_on_the_loop(loop_hooks):
+    closed = []
+
+    async def close_pool():
+        closed.append(asyncio.get_running_loop())
+
+    worker_loop.on_worker_loop_shutdown(close_pool)
+    loop = worker_loop.start_worker_loop()
+    worker_loop.stop_worker_loop()
+
+    assert closed == [loop]
+    assert loop.is_closed()
+    assert worker_loop.start_worker_loop() is not loop
+
+
+def test_vision_analysis_is_read_off_the_loop(loop_hooks, monkeypatch):
+    threads = []
+
+    def read_vision_analysis(collection, doc_id):
+        threads.append(threading.current_thread())
+        return "vision text"
+
+    monkeypatch.setattr(lightrag_manager, "_read_vision_analysis", read_vision_analysis)
+
+    coro = lightrag_manager._enrich_content_with_vision_analysis(None, "doc1")
+    assert worker_loop.run_in_worker_loop(coro) == "vision text"
+    # The sync reads must not hold the loop shared by every worker thread
+    assert threads and threads[0] is not worker_loop._thread
@@ -311,6 +311,40 @@ export function GlobalGraphExplorer() {
     handleSearch(true);
   }, [fetchDirectoryTree]);
 
+  // 读取联邦图谱搜索的 SSE 流：每个 collection 事件增量渲染，done 事件为最终聚合结果
+  const readGraphStream = async (
+    body: ReadableStream<Uint8Array>,
+    onData: (data: any, isFinal: boolean) => void,
+  ) => {
+    const reader = body.getReader();
+    const decoder = new TextDecoder();
+    const partialNodes: GraphNode[] = [];
+    const partialEdges: GraphEdge[] = [];
+    let buffer = '';
+
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      const events = buffer.split('\n\n');
+      buffer = events.pop() || '';
+      for (const raw of events) {
+        if (!raw.startsWith('data: ')) continue;
+        const event = JSON.parse(raw.slice(6));
+        if (event.event === 'collection') {
+          partialNodes.push(...(event.nodes || []));
+          partialEdges.push(...(event.edges || []));
+          onData({ nodes: [...partialNodes], edges: [...partialEdges] }, false);
+        } else if (event.event === 'done') {
+          onData(event, true);
+        } else if (event.event === 'error') {
+          throw new Error(event.message);
+        }
+      }
+    }
+  };
+
   // -- 2. Search & Graph Logic with Entity Deduplication --
   const handleSearch = async (initialLoad = false) => {
     if (!initialLoad && !query.trim()) return;
@@ -320,9 +354,11 @@ export function GlobalGraphExplorer() {
     setSelectedTreeId(null);
 
     try {
-      const endpoint = initialLoad || hierarchicalView
-        ? '/api/v1/graphs/hierarchy/global'
-        : '/api/v1/graphs/search/global';
+      // 实体搜索走流式接口：每个 Collection 完成后立即渲染，无需等待最慢的库
+      const useStream = !(initialLoad || hierarchicalView);
+      const endpoint = useStream
+        ? '/api/v1/graphs/search/global/stream'
+        : '/api/v1/graphs/hierarchy/global';
 
       const response = await fetch(endpoint, {
         method: 'POST',
@@ -335,142 +371,151 @@ export function GlobalGraphExplorer() {
       });
 
       if (response.ok) {
-        const data = await response.json();
-        let nodes = data.nodes || [];
-        let links = data.edges || [];
-
-        // 🔥 处理重复实体：合并来自多个文档的同名实体
-        const entityMap = new Map<string, GraphNode>();
-        const nonEntityNodes: GraphNode[] = [];
-
-        nodes.forEach((node: GraphNode) => {
-          if (!node.type) node.type = 'entity';
-
-          if (node.type === 'entity') {
-            const entityKey = node.name || node.entity_name || node.id;
+        const applyGraphData = (data: any, isFinal: boolean) => {
+          let nodes = data.nodes || [];
+          let links = data.edges || [];
+
+          // 🔥 处理重复实体：合并来自多个文档的同名实体
+          const entityMap = new Map<string, GraphNode>();
+          const nonEntityNodes: GraphNode[] = [];
+
+          nodes.forEach((node: GraphNode) => {
+            if (!node.type) node.type = 'entity';
+
+            if (node.type === 'entity') {
+              const entityKey = node.name || node.entity_name || node.id;
+
+              if (entityMap.has(entityKey)) {
+                // 实体已存在，合并来源信息
+                const existingNode = entityMap.get(entityKey)!;
+
+                // 合并 source_collections
+                const existingCollections = existingNode.source_collections || [];
+                const newCollections = node.metadata?.workspace ? [node.metadata.workspace as string] : [];
+                existingNode.source_collections = Array.from(new Set([...existingCollections, ...newCollections]));
+
+                // 合并 source_documents
+                const existingDocs = existingNode.source_documents || [];
+                const newDocs = node.metadata?.document_id ? [node.metadata.document_id as string] : [];
+                existingNode.source_documents = Array.from(new Set([...existingDocs, ...newDocs]));
+
+                // 增加节点权重（表示重要性）
+                existingNode.val = (existingNode.val || 1) + 1;
+
+              } else {
+                // 新实体，初始化来源信息
+                node.source_collections = node.metadata?.workspace ? [node.metadata.workspace as string] : [];
+                node.source_documents = node.metadata?.document_id ? [node.metadata.document_id as string] : [];
+                node.val = 1;
+                entityMap.set(entityKey, node);
+              }
+            } else {
+              // Collection 和 Document 节点直接添加
+              nonEntityNodes.push(node);
+            }
+          });
 
-            if (entityMap.has(entityKey)) {
-              // 实体已存在，合并来源信息
-              const existingNode = entityMap.get(entityKey)!;
+          // 合并去重后的节点
+          const deduplicatedNodes = [...nonEntityNodes, ...Array.from(entityMap.values())];
+
+          // 计算节点度数
+          deduplicatedNodes.forEach((node: GraphNode) => {
+            const degree = links.filter((l: GraphEdge) => {
+              const s = typeof l.source === 'object' ? l.source.id : l.source;
+              const t = typeof l.target === 'object' ? l.target.id : l.target;
+              return s === node.id || t === node.id;
+            }).length;
+            if (node.type !== 'entity') {
+              node.val = Math.max(degree, 2);
+            }
+          });
 
-              // 合并 source_collections
-              const existingCollections = existingNode.source_collections || [];
-              const newCollections = node.metadata?.workspace ? [node.metadata.workspace as string] : [];
-              existingNode.source_collections = Array.from(new Set([...existingCollections, ...newCollections]));
+          setGraphData({ nodes: deduplicatedNodes, links });
 
-              // 合并 source_documents
-              const existingDocs = existingNode.source_documents || [];
-              const newDocs = node.metadata?.document_id ? [node.metadata.document_id as string] : [];
-              existingNode.source_documents = Array.from(new Set([...existingDocs, ...newDocs]));
+          // 流式中间结果只刷新图谱，高亮与聚光灯等到全部 Collection 返回后再计算
+          if (!isFinal) return;
 
-              // 增加节点权重（表示重要性）
-              existingNode.val = (existingNode.val || 1) + 1;
+          // 🔥 高亮搜索匹配的节点
+          if (!initialLoad && query) {
+            console.log('🔍 Search query:', query);
+            const matchedNodeIds = new Set<string>();
+            const matchedDocIds = new Set<string>();
+            const matchedColIds = new Set<string>();
 
-            } else {
-              // 新实体，初始化来源信息
-              node.source_collections = node.metadata?.workspace ? [node.metadata.workspace as string] : [];
-              node.source_documents = node.metadata?.document_id ? [node.metadata.document_id as string] : [];
-              node.val = 1;
-              entityMap.set(entityKey, node);
-            }
-          } else {
-            // Collection 和 Document 节点直接添加
-            nonEntityNodes.push(node);
-          }
-        });
+            deduplicatedNodes.forEach((n: GraphNode) => {
+              // 尝试多个名称字段，确保转换为字符串
+              const nodeName = String(n.name || n.entity_name || n.label || n.id || '').toLowerCase();
+              const queryLower = query.toLowerCase();
 
-        // 合并去重后的节点
-        const deduplicatedNodes = [...nonEntityNodes, ...Array.from(entityMap.values())];
-
-        // 计算节点度数
-        deduplicatedNodes.forEach((node: GraphNode) => {
-          const degree = links.filter((l: GraphEdge) => {
-            const s = typeof l.source === 'object' ? l.source.id : l.source;
-            const t = typeof l.target === 'object' ? l.target.id : l.target;
-            return s === node.id || t === node.id;
-          }).length;
-          if (node.type !== 'entity') {
-            node.val = Math.max(degree, 2);
-          }
-        });
+              if (nodeName.includes(queryLower)) {
+                console.log('✅ Matched node:', n.id, nodeName);
+                matchedNodeIds.add(n.id);
 
-        setGraphData({ nodes: deduplicatedNodes, links });
+                if (n.type === 'entity') {
+                  links.forEach((l: GraphEdge) => {
+                    const targetId = typeof l.target === 'object' ? l.target.id : l.target;
+                    const sourceId = typeof l.source === 'object' ? l.source.id : l.source;
 
-        // 🔥 高亮搜索匹配的节点
-        if (!initialLoad && query) {
-          console.log('🔍 Search query:', query);
-          const matchedNodeIds = new Set<string>();
-          const matchedDocIds = new Set<string>();
-          const matchedColIds = new Set<string>();
-
-          deduplicatedNodes.forEach((n: GraphNode) => {
-            // 尝试多个名称字段，确保转换为字符串
-            const nodeName = String(n.name || n.entity_name || n.label || n.id || '').toLowerCase();
-            const queryLower = query.toLowerCase();
-
-            if (nodeName.includes(queryLower)) {
-              console.log('✅ Matched node:', n.id, nodeName);
-              matchedNodeIds.add(n.id);
+                    if (targetId === n.id && l.type === 'EXTRACTED_FROM') {
+                      if (sourceId.startsWith('doc_')) matchedDocIds.add(sourceId);
+                    }
+                  });
+                } else if (n.type === 'document') {
+                  matchedDocIds.add(n.id);
+                }
+              }
+            });
 
-              if (n.type === 'entity') {
-                links.forEach((l: GraphEdge) => {
-                  const targetId = typeof l.target === 'object' ? l.target.id : l.target;
-                  const sourceId = typeof l.source === 'object' ? l.source.id : l.source;
+            console.log('🎯 Total matched nodes:', matchedNodeIds.size);
+            console.log('📄 Matched documents:', matchedDocIds.size);
 
-                  if (targetId === n.id && l.type === 'EXTRACTED_FROM') {
-                    if (sourceId.startsWith('doc_')) matchedDocIds.add(sourceId);
-                  }
+            treeData.forEach(col => {
+              if (col.children?.some(doc => matchedDocIds.has(doc.id))) {
+                matchedColIds.add(col.id);
+                setExpandedTreeIds(prev => {
+                  const next = new Set(prev);
+                  next.add(col.id);
+                  return next;
                 });
-              } else if (n.type === 'document') {
-                matchedDocIds.add(n.id);
               }
-            }
-          });
-
-          console.log('🎯 Total matched nodes:', matchedNodeIds.size);
-          console.log('📄 Matched documents:', matchedDocIds.size);
+            });
 
-          treeData.forEach(col => {
-            if (col.children?.some(doc => matchedDocIds.has(doc.id))) {
-              matchedColIds.add(col.id);
-              setExpandedTreeIds(prev => {
-                const next = new Set(prev);
-                next.add(col.id);
-                return next;
+            setHighlightTreeIds(new Set([...matchedDocIds, ...matchedColIds]));
+            setSearchMatchedNodes(matchedNodeIds);
+            console.log('🌟 Search matched nodes state updated:', matchedNodeIds.size);
+
+            // 🔦 启用聚光灯模式
+            if (matchedNodeIds.size > 0) {
+              const spotlight = new Set(matchedNodeIds);
+              // 添加一跳邻居到聚光灯
+              matchedNodeIds.forEach(id => {
+                const neighbors = getNeighbors(id);
+                neighbors.forEach(n => spotlight.add(n));
               });
+              setSpotlightNodes(spotlight);
+              setSpotlightMode(true);
+              console.log('🔦 Spotlight mode activated. Spotlight nodes:', spotlight.size);
+            } else {
+              setSpotlightMode(false);
+              setSpotlightNodes(new Set());
             }
-          });
-
-          setHighlightTreeIds(new Set([...matchedDocIds, ...matchedColIds]));
-          setSearchMatchedNodes(matchedNodeIds);
-          console.log('🌟 Search matched nodes state updated:', matchedNodeIds.size);
-
-          // 🔦 启用聚光灯模式
-          if (matchedNodeIds.size > 0) {
-            const spotlight = new Set(matchedNodeIds);
-            // 添加一跳邻居到聚光灯
-            matchedNodeIds.forEach(id => {
-              const neighbors = getNeighbors(id);
-              neighbors.forEach(n => spotlight.add(n));
-            });
-            setSpotlightNodes(spotlight);
-            setSpotlightMode(true);
-            console.log('🔦 Spotlight mode activated. Spotlight nodes:', spotlight.size);
           } else {
+            setHighlightTreeIds(new Set());
+            setSearchMatchedNodes(new Set());
             setSpotlightMode(false);
             setSpotlightNodes(new Set());
           }
-        } else {
-          setHighlightTreeIds(new Set());
-          setSearchMatchedNodes(new Set());
-          setSpotlightMode(false);
-          setSpotlightNodes(new Set());
-        }
 
-        setTimeout(() => {
-          graphRef.current?.zoomToFit(400);
-        }, 500);
+          setTimeout(() => {
+            graphRef.current?.zoomToFit(400);
+          }, 500);
+        };
 
+        if (useStream && response.body) {
+          await readGraphStream(response.body, applyGraphData);
+        } else {
+          applyGraphData(await response.json(), true);
+        }
       }
     } catch (error) {
       console.error('Search error:', error);